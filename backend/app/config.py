@@ -29,14 +29,119 @@ class Settings(BaseSettings):
     agent_timeout: int = 30
     agent_max_retries: int = 3
 
+    # Knowledge Base Retrieval (local prompt grounding)
+    knowledge_index_enabled: bool = True
+    knowledge_base_dir: Optional[str] = None
+    knowledge_index_cache_dir: Optional[str] = ".cache/knowledge-index"
+    knowledge_top_k: int = 3
+    knowledge_chunk_chars: int = 1200
+
+    # Prompt Token Budget ("trim" drops optional sections, "reject" fails
+    # fast when caller-supplied context does not fit)
+    prompt_token_budget: int = 4000
+    prompt_overflow_policy: str = "trim"
+
+    # Request Deadlines (seconds; callers send X-Request-Timeout or ?timeout=)
+    request_timeout_default: Optional[float] = None
+    request_timeout_max: float = 300.0
+
+    # Client Disconnects ("discard", "save_completed" or "finish")
+    disconnect_policy: str = "save_completed"
+    disconnect_poll_interval: float = 0.5
+
     # Database Configuration (optional if using mock services)
     cosmos_endpoint: Optional[str] = None
     cosmos_key: Optional[str] = None
     cosmos_database: str = "storycircuit"
     cosmos_container: str = "content"
-
-    # Authentication
+    # Partition layout of the content container: "user" (/partitionKey) or
+    # "user_month" (hierarchical /partitionKey, /partitionMonth) for users
+    # whose content outgrows one logical partition. Changing it needs a new
+    # container, see scripts/migrate_partitions.py
+    cosmos_partition_scheme: str = "user"
+    # Storage layout of new content: "document" (one item) or "split" (a
+    # header item plus one item per platform output, written in one batch,
+    # so single-platform reads skip the other outputs). Both are readable
+    content_layout: str = "document"
+    # Content store: "cosmos" or "sqlite" (single node, offline, CI)
+    database_backend: str = "cosmos"
+    sqlite_path: str = ".data/storycircuit.db"
+    # Read-through cache for content by ID: size bound in bytes (0 disables)
+    # and seconds an entry is served without an ETag revalidation
+    content_cache_max_bytes: int = 32 * 1024 * 1024
+    content_cache_fresh_seconds: float = 0.0
+    # Storage encoding of generatedContent: strings of at least
+    # compress_threshold UTF-8 bytes are zstd-compressed (0 disables) and
+    # those of at least offload_threshold bytes go to the blob store
+    # (local directory content_blob_path; unset disables offload).
+    # Dictionaries: comma-separated files, the first compresses new content
+    content_compress_threshold: int = 2048
+    content_offload_threshold: int = 256 * 1024
+    content_blob_path: Optional[str] = None
+    content_compression_dictionaries: str = ""
+    # Output strings of at least span_min_chars characters that are cut
+    # from the raw response kept in notes are stored as spans of it (0 disables)
+    content_span_min_chars: int = 64
+    # Change-feed maintained history views (first history page and stats)
+    history_views_enabled: bool = True
+    history_view_recent_items: int = 50
+    # Days of per-day counts a view keeps; older buckets are read with a query
+    history_view_daily_days: int = 400
+    change_feed_poll_interval: float = 1.0
+    cosmos_lease_container: str = "leases"
+    # Write-behind: content created by generation is queued in a durable
+    # local outbox (SQLite file, on a persistent volume) and written to the
+    # database by a background flusher in batches of batch_size every
+    # flush_interval seconds, retrying failures with backoff up to
+    # max_backoff seconds. Reads include queued content until it is written
+    write_behind_enabled: bool = False
+    write_behind_path: str = ".data/outbox.db"
+    write_behind_flush_interval: float = 0.5
+    write_behind_batch_size: int = 100
+    write_behind_max_backoff: float = 60.0
+    # Full-text search over history: "memory" or "sqlite" (FTS5 file at
+    # search_index_path). A user's entries load in the background on their
+    # first search; after refresh seconds the documents changed since are
+    # read to pick up other replicas' writes (0 never)
+    search_backend: str = "memory"
+    search_index_path: str = ".data/search.db"
+    search_index_refresh_seconds: float = 300.0
+    # Users whose postings the "memory" backend keeps (least recent dropped)
+    search_index_max_users: int = 1000
+    # Log Cosmos DB query metrics and index utilization with each query's
+    # RU charge (costs extra RU; unset means on in development only)
+    cosmos_query_diagnostics: Optional[bool] = None
+    # Throttled (429) calls are retried after the server's x-ms-retry-after-ms
+    # while the request deadline allows, at most max_retries times and
+    # max_wait seconds per call
+    cosmos_throttle_max_retries: int = 5
+    cosmos_throttle_max_wait: float = 10.0
+    # Client-side RU pacing: this process's share of the provisioned RU/s
+    # (0 disables) and seconds of unused RU that may be spent in a burst
+    cosmos_ru_limit: float = 0.0
+    cosmos_ru_burst_seconds: float = 1.0
+    # Startup check of the container indexing policy: off | warn | fail
+    cosmos_indexing_policy_check: str = "warn"
+    # Seconds between full recounts of per-user counters (0 disables)
+    counter_reconcile_interval: float = 3600.0
+    # Seconds soft-deleted content is kept before Cosmos purges it by TTL
+    # (0 keeps it forever; needs TTL enabled on the container)
+    deleted_content_ttl: int = 30 * 24 * 3600
+    # Seconds between compaction passes removing orphaned blobs and counters
+    # of purged users (0 disables); blobs younger than the minimum age are
+    # kept because their document may still be being written
+    compaction_interval: float = 6 * 3600.0
+    blob_orphan_min_age: float = 3600.0
+    # Bulk operations: operations per transactional batch (Cosmos max 100)
+    # and batches in flight at once
+    bulk_batch_size: int = 100
+    bulk_max_parallel_batches: int = 4
+
+    # Authentication: with auth enabled every request must carry the
+    # principal forwarded by Container Apps authentication (Easy Auth);
+    # otherwise principal headers are ignored and every request is dev_user_id
     auth_enabled: bool = False
+    dev_user_id: str = "dev-user@example.com"
 
     # Application Configuration
     log_level: str = "INFO"
@@ -48,6 +153,12 @@ class Settings(BaseSettings):
     # Rate Limiting
     rate_limit_per_minute: int = 100
 
+    # Admission Control for generation (load shedding)
+    admission_max_concurrent: int = 8
+    admission_max_queue: int = 16
+    admission_max_queue_wait: float = 60.0
+    admission_initial_service_time: float = 20.0
+
     # Optional: Application Insights
     applicationinsights_connection_string: Optional[str] = None
 
@@ -2,7 +2,13 @@
 Shared dependency injection functions.
 """
 
-from fastapi import Depends
+from functools import lru_cache
+from pathlib import Path
+from typing import Annotated, Optional
+from fastapi import Depends, Header, Query, Request
+import structlog
+
+logger = structlog.get_logger(__name__)
 
 
 # Import  settings
@@ -13,6 +19,41 @@ def get_settings():
     return _get_settings()
 
 
+@lru_cache()
+def get_knowledge_index():
+    """
+    Provide the shared knowledge-base index.
+    Built once per process (or loaded from the on-disk cache).
+    Returns None when retrieval is disabled or the files are missing.
+    """
+    settings = get_settings()
+    if not settings.knowledge_index_enabled:
+        return None
+
+    if settings.knowledge_base_dir:
+        knowledge_dir = Path(settings.knowledge_base_dir)
+    else:
+        # Repository layout locally, /app/knowledge-base in the container
+        knowledge_dir = Path(__file__).parent.parent.parent / "knowledge-base"
+        if not knowledge_dir.exists():
+            knowledge_dir = Path(__file__).parent.parent / "knowledge-base"
+    if not knowledge_dir.exists():
+        return None
+
+    from .services.knowledge_index import KnowledgeIndex
+
+    cache_dir = settings.knowledge_index_cache_dir
+    try:
+        return KnowledgeIndex.from_directory(
+            knowledge_dir,
+            cache_dir=Path(cache_dir) if cache_dir else None,
+            max_chunk_chars=settings.knowledge_chunk_chars,
+        )
+    except Exception as e:
+        logger.warning("Knowledge index unavailable", error=str(e))
+        return None
+
+
 # Service dependencies
 def get_agent_service():
     """Provide AgentService instance (or mock)."""
@@ -23,19 +64,42 @@ def get_agent_service():
         return MockAgentService(settings)
     from .services import AgentService
 
-    return AgentService(settings)
+    return AgentService(settings, knowledge_index=get_knowledge_index())
 
 
-def get_content_repository():
-    """Provide ContentRepository instance (or mock)."""
+def get_content_repository(request: Request):
+    """
+    Provide the application-scoped content repository (or mock).
+    Cosmos and SQLite repositories are created and warmed up once in the
+    app lifespan; the mock is created on first use and then shared too.
+    """
     settings = get_settings()
-    if settings.use_mock_database:
-        from .utils.mock_database import MockContentRepository
+    repository = getattr(request.app.state, "content_repository", None)
+    if repository is None and settings.use_mock_database:
+        from .utils.mock_services import MockContentRepository
 
-        return MockContentRepository()
-    from .repositories import ContentRepository
+        repository = MockContentRepository(settings)
+        request.app.state.content_repository = repository
 
-    return ContentRepository(settings)
+    if repository is None:
+        from .utils.exceptions import DatabaseError
+
+        raise DatabaseError("Content repository is not initialized")
+    return repository
+
+
+def get_search_index(request: Request):
+    """
+    Provide the application-scoped full-text search index.
+    Created on first use; users' entries are loaded lazily by the service.
+    """
+    index = getattr(request.app.state, "search_index", None)
+    if index is None:
+        from .services.search_index import create_search_index
+
+        index = create_search_index(get_settings())
+        request.app.state.search_index = index
+    return index
 
 
 def get_export_service():
@@ -48,19 +112,86 @@ def get_export_service():
 def get_content_service(
     agent_service=Depends(get_agent_service),
     content_repo=Depends(get_content_repository),
+    search_index=Depends(get_search_index),
 ):
     """Provide ContentService instance."""
     from .services import ContentService
 
     settings = get_settings()
-    return ContentService(agent_service, content_repo, settings)
+    return ContentService(agent_service, content_repo, settings, search_index)
+
+
+def get_deadline(
+    x_request_timeout: Annotated[
+        Optional[float],
+        Header(gt=0, description="Seconds the caller is willing to wait"),
+    ] = None,
+    timeout: Annotated[
+        Optional[float],
+        Query(gt=0, description="Seconds the caller is willing to wait"),
+    ] = None,
+):
+    """
+    Provide the request deadline.
+    Taken from the X-Request-Timeout header or the timeout query parameter,
+    falling back to the configured default, and capped at the configured max.
+    Returns None when the caller did not ask for a deadline.
+    """
+    from .utils.deadline import Deadline
+
+    settings = get_settings()
+    seconds = x_request_timeout or timeout or settings.request_timeout_default
+    if seconds is None:
+        return None
+    return Deadline.after(min(seconds, settings.request_timeout_max))
+
+
+@lru_cache()
+def get_generation_admission():
+    """Provide the shared admission controller for generation requests."""
+    from .utils.admission import AdmissionController
+
+    settings = get_settings()
+    return AdmissionController(
+        max_concurrent=settings.admission_max_concurrent,
+        max_queue=settings.admission_max_queue,
+        max_queue_wait=settings.admission_max_queue_wait,
+        initial_service_time=settings.admission_initial_service_time,
+    )
+
+
+async def admit_generation(
+    admission=Depends(get_generation_admission),
+    deadline=Depends(get_deadline),
+):
+    """
+    Hold a generation slot for the duration of the request (or of its work,
+    if that outlives a disconnected client).
+    Raises RateLimitError / ServiceOverloadedError when load is shed.
+    """
+    async with admission.slot(deadline) as slot:
+        yield slot
 
 
-# User dependency (for auth - returns dev user for now)
-def get_user_id() -> str:
+# User dependency: the partition key of everything the caller reads or writes
+def get_user_id(request: Request) -> str:
     """
-    Get current user ID.
-    In production, this would extract from JWT token.
-    For development, return a default user.
+    Identify the caller from the Easy Auth principal headers.
+
+    The headers are only trusted with AUTH_ENABLED, where Easy Auth strips
+    any sent by the client; otherwise every request acts as DEV_USER_ID.
+
+    Raises:
+        AuthenticationError: If auth is enabled and no principal was forwarded
     """
-    return "dev-user@example.com"
+    from .utils.identity import principal_id
+
+    settings = get_settings()
+    if not settings.auth_enabled:
+        return settings.dev_user_id
+    user_id = principal_id(request.headers)
+    if not user_id:
+        from .utils.exceptions import AuthenticationError
+
+        raise AuthenticationError("Authentication required")
+    return user_id
@@ -3,6 +3,7 @@ StoryCircuit FastAPI Application.
 Main application entry point with dependency injection and routing.
 """
 
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
@@ -13,16 +14,23 @@ import structlog
 
 from .config import get_settings
 from .utils import configure_logging
+from .utils.metrics import metrics
+from .utils.request_charge import REQUEST_CHARGE_HEADER, begin_request, end_request
 from .utils.security import SecurityHeaders
 from .utils.exceptions import (
     StoryCircuitError,
     AgentServiceError,
     AgentTimeoutError,
+    DeadlineExceededError,
     DatabaseError,
+    ConcurrencyConflictError,
     ContentNotFoundError,
     ValidationError as AppValidationError,
     ExportError,
+    AuthenticationError,
     RateLimitError,
+    ServiceOverloadedError,
+    PromptTooLargeError,
 )
 
 # Import dependencies from dedicated file
@@ -37,18 +45,83 @@ configure_logging(settings.log_level)
 logger = structlog.get_logger(__name__)
 
 
+async def _open_content_repository():
+    """Create and warm the configured database repository, if any.
+
+    Returns:
+        The repository, or None when the mock repository is in use (it is
+        created on first use by the dependency)
+    """
+    if settings.use_mock_database:
+        return None
+    if settings.database_backend == "sqlite":
+        from .repositories import SQLiteContentRepository
+
+        content_repository = SQLiteContentRepository(settings)
+        await content_repository.warm_up()
+        return content_repository
+    if not settings.cosmos_endpoint:
+        return None
+
+    from .repositories import ContentRepository
+
+    content_repository = ContentRepository(settings)
+    try:
+        await content_repository.warm_up()
+    except DatabaseError as e:
+        logger.warning("Starting without Cosmos DB warm-up", error=str(e))
+        return content_repository
+    # Raises in "fail" mode so a drifted container stops the rollout
+    try:
+        await content_repository.verify_indexing_policy()
+    except DatabaseError:
+        await content_repository.close()
+        raise
+    return content_repository
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     logger.info("Starting StoryCircuit application", environment=settings.environment)
 
     # Startup
+    knowledge_index = dependencies.get_knowledge_index()
+    logger.info(
+        "Knowledge index ready",
+        chunks=len(knowledge_index.chunks) if knowledge_index else 0,
+    )
+
+    # One repository per process, warmed before serving traffic
+    content_repository = await _open_content_repository()
+    maintenance_tasks = []
+    if content_repository is not None:
+        from .services.maintenance import start_maintenance
+
+        maintenance_tasks = start_maintenance(content_repository, settings)
+    if content_repository is not None and settings.write_behind_enabled:
+        from .repositories.outbox import ContentOutbox, WriteBehindRepository
+
+        content_repository = WriteBehindRepository(
+            content_repository, ContentOutbox(settings.write_behind_path), settings
+        )
+        await content_repository.open()
+        maintenance_tasks.append(asyncio.create_task(content_repository.run()))
+    app.state.content_repository = content_repository
+
     logger.info("Application startup complete")
 
     yield
 
     # Shutdown
     logger.info("Shutting down StoryCircuit application")
+    for task in maintenance_tasks:
+        task.cancel()
+    if content_repository is not None:
+        await content_repository.close()
+    search_index = getattr(app.state, "search_index", None)
+    if hasattr(search_index, "close"):
+        await search_index.close()
 
 
 # Create FastAPI app
@@ -69,7 +142,8 @@ app.add_middleware(
     allow_origins=settings.cors_origins_list,
     allow_credentials=True,
     allow_methods=["GET", "POST", "DELETE", "OPTIONS"],
-    allow_headers=["Content-Type", "Authorization"],
+    allow_headers=["Content-Type", "Authorization", "X-Request-Timeout", "If-Match"],
+    expose_headers=["ETag", REQUEST_CHARGE_HEADER],
 )
 
 
@@ -101,6 +175,26 @@ async def agent_timeout_handler(request: Request, exc: AgentTimeoutError):
     )
 
 
+@app.exception_handler(PromptTooLargeError)
+async def prompt_too_large_handler(request: Request, exc: PromptTooLargeError):
+    """Handle prompts that exceed the token budget."""
+    logger.warning("Prompt exceeds token budget", error=str(exc), path=request.url.path)
+    return JSONResponse(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        content={"detail": str(exc), "error_code": "PROMPT_TOO_LARGE"},
+    )
+
+
+@app.exception_handler(DeadlineExceededError)
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceededError):
+    """Handle requests abandoned because the caller's deadline cannot be met."""
+    logger.warning("Request deadline exceeded", error=str(exc), path=request.url.path)
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        content={"detail": str(exc), "error_code": "DEADLINE_EXCEEDED"},
+    )
+
+
 @app.exception_handler(AgentServiceError)
 async def agent_service_error_handler(request: Request, exc: AgentServiceError):
     """Handle agent service errors."""
@@ -119,13 +213,15 @@ async def agent_service_error_handler(request: Request, exc: AgentServiceError):
 async def database_error_handler(request: Request, exc: DatabaseError):
     """Handle database errors."""
     logger.error("Database error", error=str(exc), path=request.url.path)
+    retry_after = getattr(exc, "retry_after", 10)
     return JSONResponse(
         status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
         content={
             "detail": "Database temporarily unavailable. Please try again.",
             "error_code": "DATABASE_ERROR",
-            "retry_after": 10,
+            "retry_after": retry_after,
         },
+        headers={"Retry-After": str(retry_after)},
     )
 
 
@@ -139,6 +235,26 @@ async def content_not_found_handler(request: Request, exc: ContentNotFoundError)
     )
 
 
+@app.exception_handler(ConcurrencyConflictError)
+async def concurrency_conflict_handler(request: Request, exc: ConcurrencyConflictError):
+    """Handle conditional writes that lost to a concurrent edit."""
+    logger.warning("Concurrency conflict", error=str(exc), path=request.url.path)
+    return JSONResponse(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        content={"detail": str(exc), "error_code": "CONCURRENCY_CONFLICT"},
+    )
+
+
+@app.exception_handler(AuthenticationError)
+async def authentication_error_handler(request: Request, exc: AuthenticationError):
+    """Handle requests without an authenticated principal."""
+    logger.warning("Unauthenticated request", path=request.url.path)
+    return JSONResponse(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        content={"detail": str(exc), "error_code": "UNAUTHORIZED"},
+    )
+
+
 @app.exception_handler(RateLimitError)
 async def rate_limit_handler(request: Request, exc: RateLimitError):
     """Handle rate limit errors."""
@@ -148,8 +264,24 @@ async def rate_limit_handler(request: Request, exc: RateLimitError):
         content={
             "detail": "Rate limit exceeded. Please try again later.",
             "error_code": "RATE_LIMITED",
-            "retry_after": 60,
+            "retry_after": exc.retry_after,
         },
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.exception_handler(ServiceOverloadedError)
+async def service_overloaded_handler(request: Request, exc: ServiceOverloadedError):
+    """Handle requests shed by admission control."""
+    logger.warning("Service overloaded", error=str(exc), path=request.url.path)
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "detail": "Service is busy. Please try again later.",
+            "error_code": "OVERLOADED",
+            "retry_after": exc.retry_after,
+        },
+        headers={"Retry-After": str(exc.retry_after)},
     )
 
 
@@ -227,7 +359,7 @@ from fastapi import Depends
 # Logging middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    """Log all HTTP requests."""
+    """Log all HTTP requests with the Cosmos DB request units they used."""
     logger.info(
         "Request received",
         method=request.method,
@@ -235,13 +367,26 @@ async def log_requests(request: Request, call_next):
         client=request.client.host if request.client else None,
     )
 
-    response = await call_next(request)
+    charges, token = begin_request()
+    try:
+        response = await call_next(request)
+    finally:
+        end_request(token)
+    response.headers[REQUEST_CHARGE_HEADER] = f"{charges.total:.2f}"
+    if charges.calls:
+        route = request.scope.get("route")
+        metrics.increment(
+            f"http.ru.{getattr(route, 'name', None) or 'unmatched'}", charges.total
+        )
 
     logger.info(
         "Request completed",
         method=request.method,
         path=request.url.path,
         status_code=response.status_code,
+        request_charge=round(charges.total, 2),
+        cosmos_calls=charges.calls,
+        charge_by_operation=charges.by_operation or None,
     )
 
     return response
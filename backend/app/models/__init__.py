@@ -5,6 +5,9 @@ Exports all model classes for easy import.
 
 from .requests import (
     Platform,
+    BulkAction,
+    BulkContentRequest,
+    ContentImportItem,
     ContentGenerationRequest,
     ContentHistoryQueryParams,
     ExportQueryParams,
@@ -27,6 +30,8 @@ from .responses import (
     ContentHistoryItem,
     PaginationInfo,
     ContentHistoryResponse,
+    BulkItemResult,
+    BulkContentResponse,
     HealthResponse,
     ServiceHealth,
     ReadinessResponse,
@@ -37,13 +42,26 @@ from .responses import (
 from .database import (
     ContentDocument,
     ContentQueryResult,
+    ContentSummary,
+    UserContentCounts,
+    HistoryView,
+    HistoryViewMember,
+    content_part_id,
     content_to_document,
+    counter_document_id,
+    history_member_id,
+    history_view_id,
+    stored_timestamp,
     document_to_response,
+    summarize_content,
 )
 
 __all__ = [
     # Request models
     "Platform",
+    "BulkAction",
+    "BulkContentRequest",
+    "ContentImportItem",
     "ContentGenerationRequest",
     "ContentHistoryQueryParams",
     "ExportQueryParams",
@@ -64,6 +82,8 @@ __all__ = [
     "ContentHistoryItem",
     "PaginationInfo",
     "ContentHistoryResponse",
+    "BulkItemResult",
+    "BulkContentResponse",
     "HealthResponse",
     "ServiceHealth",
     "ReadinessResponse",
@@ -72,6 +92,16 @@ __all__ = [
     # Database models
     "ContentDocument",
     "ContentQueryResult",
+    "ContentSummary",
+    "UserContentCounts",
+    "HistoryView",
+    "HistoryViewMember",
+    "content_part_id",
     "content_to_document",
+    "counter_document_id",
+    "history_member_id",
+    "history_view_id",
+    "stored_timestamp",
     "document_to_response",
+    "summarize_content",
 ]
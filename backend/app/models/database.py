@@ -4,15 +4,22 @@ Defines data structures for Cosmos DB storage.
 """
 
 from typing import Optional, Any
-from datetime import datetime
-from pydantic import BaseModel, Field
+from datetime import datetime, timezone
+from pydantic import BaseModel, Field, field_serializer
 from .requests import Platform
 
+SUMMARY_MAX_CHARS = 200
+COUNTER_DOC_TYPE = "userCounter"
+VIEW_DOC_TYPE = "userHistoryView"
+VIEW_MEMBER_DOC_TYPE = "historyViewMember"
+PART_DOC_TYPE = "contentPart"
 
-class ContentDocument(BaseModel):
+
+class ContentSummary(BaseModel):
     """
-    Cosmos DB document model for storing generated content.
-    Maps to 'ContentGenerations' container.
+    List view of a stored generation.
+    Holds only the top-level fields history queries project, so listing
+    never reads or validates the generated content itself.
     """
 
     # Document identity (Cosmos DB required fields)
@@ -27,6 +34,30 @@ class ContentDocument(BaseModel):
     # Content details
     topic: str = Field(..., description="Content topic")
     platforms: list[str] = Field(..., description="Target platforms")
+    summary: Optional[str] = Field(
+        None, description="Short summary computed at write time (plan hook)"
+    )
+
+    # Audit fields
+    created_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        alias="createdAt",
+        description="Document creation timestamp",
+    )
+
+    class Config:
+        populate_by_name = True
+
+    @field_serializer("created_at", when_used="json")
+    def _serialize_created_at(self, value: datetime) -> str:
+        return stored_timestamp(value)
+
+
+class ContentDocument(ContentSummary):
+    """
+    Cosmos DB document model for storing generated content.
+    Maps to 'ContentGenerations' container.
+    """
 
     # Generated content (stored as nested JSON)
     generated_content: dict[str, Any] = Field(
@@ -39,22 +70,20 @@ class ContentDocument(BaseModel):
     metadata: dict[str, Any] = Field(..., description="Generation metadata")
 
     # Audit fields
-    created_at: datetime = Field(
-        default_factory=datetime.utcnow,
-        alias="createdAt",
-        description="Document creation timestamp",
-    )
-
     updated_at: Optional[datetime] = Field(
         None, alias="updatedAt", description="Last update timestamp"
     )
 
     deleted: bool = Field(default=False, description="Soft delete flag")
 
+    # Concurrency token for conditional writes; never written back
+    etag: Optional[str] = Field(
+        None, alias="_etag", exclude=True, description="Cosmos DB ETag"
+    )
+
     # Cosmos DB system fields (populated by database)
     _rid: Optional[str] = None
     _self: Optional[str] = None
-    _etag: Optional[str] = None
     _attachments: Optional[str] = None
     _ts: Optional[int] = None
 
@@ -66,6 +95,7 @@ class ContentDocument(BaseModel):
                 "partitionKey": "user@example.com",
                 "topic": "AI agent orchestration patterns",
                 "platforms": ["linkedin", "twitter"],
+                "summary": "Most teams struggle...",
                 "generatedContent": {
                     "plan": {
                         "hook": "Most teams struggle...",
@@ -91,10 +121,99 @@ class ContentDocument(BaseModel):
         }
 
 
+class UserContentCounts(BaseModel):
+    """
+    Per-user aggregate document kept next to the user's content.
+    Updated incrementally on create and soft delete and periodically
+    reconciled against the content itself.
+    """
+
+    id: str = Field(..., description="Counter document ID (counter::<userId>)")
+    partition_key: str = Field(..., alias="partitionKey", description="Partition key")
+    user_id: str = Field(..., alias="userId", description="User identifier")
+    doc_type: str = Field(
+        default=COUNTER_DOC_TYPE, alias="docType", description="Document type marker"
+    )
+    total: int = Field(default=0, description="Non-deleted content count")
+    platforms: dict[str, int] = Field(
+        default_factory=dict, description="Non-deleted content count per platform"
+    )
+    updated_at: Optional[datetime] = Field(
+        None, alias="updatedAt", description="Last incremental update"
+    )
+    reconciled_at: Optional[datetime] = Field(
+        None, alias="reconciledAt", description="Last full recount"
+    )
+
+    class Config:
+        populate_by_name = True
+
+
+class HistoryView(BaseModel):
+    """
+    Per-user materialized history view maintained from the change feed.
+    Holds the newest items for the first history page plus aggregates for
+    stats, so neither needs a query at request time.
+    """
+
+    id: str = Field(..., description="View document ID (view::<userId>)")
+    partition_key: str = Field(..., alias="partitionKey", description="Partition key")
+    user_id: str = Field(..., alias="userId", description="User identifier")
+    doc_type: str = Field(
+        default=VIEW_DOC_TYPE, alias="docType", description="Document type marker"
+    )
+    recent: list[ContentSummary] = Field(
+        default_factory=list, description="Newest live items, newest first"
+    )
+    total: int = Field(default=0, description="Live item count")
+    platform_counts: dict[str, int] = Field(
+        default_factory=dict, alias="platformCounts", description="Items per platform"
+    )
+    daily_counts: dict[str, int] = Field(
+        default_factory=dict,
+        alias="dailyCounts",
+        description="Items generated per UTC day (YYYY-MM-DD)",
+    )
+    daily_since: Optional[str] = Field(
+        None,
+        alias="dailySince",
+        description="First day daily_counts covers once older days were trimmed",
+    )
+    updated_at: Optional[datetime] = Field(
+        None, alias="updatedAt", description="Last change applied"
+    )
+
+    class Config:
+        populate_by_name = True
+
+
+class HistoryViewMember(BaseModel):
+    """
+    What a live item contributes to its user's history view.
+    Kept as one small document per item next to the view, so applying a
+    change again is a no-op and the view itself doesn't grow with history.
+    """
+
+    id: str = Field(..., description="Member document ID (view::<userId>::<id>)")
+    partition_key: str = Field(..., alias="partitionKey", description="Partition key")
+    user_id: str = Field(..., alias="userId", description="User identifier")
+    doc_type: str = Field(
+        default=VIEW_MEMBER_DOC_TYPE,
+        alias="docType",
+        description="Document type marker",
+    )
+    content_id: str = Field(..., alias="contentId", description="Content item ID")
+    day: str = Field(..., description="UTC day the item was generated (YYYY-MM-DD)")
+    platforms: list[str] = Field(default_factory=list, description="Item platforms")
+
+    class Config:
+        populate_by_name = True
+
+
 class ContentQueryResult(BaseModel):
     """Result from content query with pagination."""
 
-    documents: list[ContentDocument]
+    documents: list[ContentSummary]
     continuation_token: Optional[str] = None
     count: int
 
@@ -102,6 +221,96 @@ class ContentQueryResult(BaseModel):
 # Helper functions for database operations
 
 
+def stored_timestamp(value: datetime) -> str:
+    """
+    Serialize a datetime the way createdAt is stored.
+
+    createdAt is filtered, sorted and paged on as a string, so it is written
+    in fixed-width UTC form (always six fractional digits) to make text
+    order time order; naive datetimes are taken as UTC.
+
+    Args:
+        value: Timestamp to serialize
+
+    Returns:
+        e.g. "2026-02-11T14:30:45.123000Z"
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def counter_document_id(user_id: str) -> str:
+    """
+    ID of a user's counter document.
+
+    Args:
+        user_id: User identifier
+
+    Returns:
+        Counter document ID
+    """
+    return f"counter::{user_id}"
+
+
+def history_view_id(user_id: str) -> str:
+    """
+    ID of a user's materialized history view document.
+
+    Args:
+        user_id: User identifier
+
+    Returns:
+        View document ID
+    """
+    return f"view::{user_id}"
+
+
+def history_member_id(user_id: str, content_id: str) -> str:
+    """
+    ID of the document recording an item's contribution to a history view.
+
+    Args:
+        user_id: User identifier
+        content_id: Content identifier
+
+    Returns:
+        Member document ID
+    """
+    return f"{history_view_id(user_id)}::{content_id}"
+
+
+def content_part_id(content_id: str, part: str) -> str:
+    """
+    ID of the item holding one platform output (or the notes) of split-layout
+    content.
+
+    Args:
+        content_id: Content identifier
+        part: Platform of the output, or the notes part name
+
+    Returns:
+        Part item ID
+    """
+    return f"{content_id}::{part}"
+
+
+def summarize_content(generated_content: dict[str, Any]) -> Optional[str]:
+    """
+    Build the list-view summary for generated content.
+
+    Args:
+        generated_content: Generated content structure
+
+    Returns:
+        Plan hook truncated to SUMMARY_MAX_CHARS, or None if there is no hook
+    """
+    hook = (generated_content.get("plan") or {}).get("hook")
+    if not isinstance(hook, str) or not hook:
+        return None
+    return hook[:SUMMARY_MAX_CHARS]
+
+
 def content_to_document(
     content_id: str,
     user_id: str,
@@ -130,6 +339,7 @@ def content_to_document(
         user_id=user_id,
         topic=topic,
         platforms=[p.value if isinstance(p, Platform) else p for p in platforms],
+        summary=summarize_content(generated_content),
         generated_content=generated_content,
         metadata=metadata,
     )
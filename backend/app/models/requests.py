@@ -3,10 +3,17 @@ Request models for StoryCircuit API.
 Defines input validation schemas using Pydantic.
 """
 
-from typing import Optional
-from pydantic import BaseModel, Field, field_validator
+from datetime import datetime
+from typing import Any, Optional
+from pydantic import BaseModel, Field, field_validator, model_validator
 from enum import Enum
 
+BULK_MAX_ITEMS = 5000
+
+# Content ids: no "::" (reserved for counter, view and part documents) and
+# none of the characters Cosmos DB forbids in ids
+CONTENT_ID_PATTERN = r"^[^:/\\?#]+(:[^:/\\?#]+)*$"
+
 
 class Platform(str, Enum):
     """Supported social media platforms."""
@@ -69,6 +76,78 @@ class ContentGenerationRequest(BaseModel):
         }
 
 
+class BulkAction(str, Enum):
+    """Operations supported by the bulk endpoint."""
+
+    DELETE = "delete"
+    RESTORE = "restore"
+    IMPORT = "import"
+
+
+class ContentImportItem(BaseModel):
+    """Previously generated content to import."""
+
+    id: Optional[str] = Field(
+        None,
+        max_length=255,
+        pattern=CONTENT_ID_PATTERN,
+        description="Content ID (generated if omitted); no '::' or / \\ ? #",
+    )
+    topic: str = Field(..., min_length=3, max_length=500, description="Topic")
+    platforms: list[Platform] = Field(..., min_length=1, description="Platforms")
+    generated_content: dict[str, Any] = Field(
+        ..., description="Generated content structure (plan, outputs, notes)"
+    )
+    metadata: dict[str, Any] = Field(default_factory=dict, description="Metadata")
+    created_at: Optional[datetime] = Field(
+        None, description="Original generation time (now if omitted)"
+    )
+
+
+class BulkContentRequest(BaseModel):
+    """Request model for bulk content operations."""
+
+    action: BulkAction = Field(..., description="Operation to apply")
+
+    ids: list[str] = Field(
+        default_factory=list,
+        max_length=BULK_MAX_ITEMS,
+        description="Content IDs to delete or restore",
+    )
+
+    documents: list[ContentImportItem] = Field(
+        default_factory=list,
+        max_length=BULK_MAX_ITEMS,
+        description="Content to import",
+    )
+
+    @model_validator(mode="after")
+    def validate_targets(self) -> "BulkContentRequest":
+        """Ensure the action comes with the matching, non-empty target list."""
+        if self.action == BulkAction.IMPORT:
+            if not self.documents or self.ids:
+                raise ValueError("import takes a non-empty 'documents' list only")
+        elif not self.ids or self.documents:
+            raise ValueError(f"{self.action.value} takes a non-empty 'ids' list only")
+        import_ids = [item.id for item in self.documents if item.id]
+        if len(set(self.ids)) != len(self.ids) or len(set(import_ids)) != len(
+            import_ids
+        ):
+            raise ValueError("ids must be unique")
+        return self
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "action": "delete",
+                "ids": [
+                    "550e8400-e29b-41d4-a716-446655440000",
+                    "660f9511-f30c-52e5-b827-557766551111",
+                ],
+            }
+        }
+
+
 class ContentHistoryQueryParams(BaseModel):
     """Query parameters for content history endpoint."""
 
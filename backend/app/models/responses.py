@@ -4,7 +4,7 @@ Defines output schemas using Pydantic.
 """
 
 from typing import Optional, Any
-from datetime import datetime
+from datetime import date, datetime
 from pydantic import BaseModel, Field
 from .requests import Platform
 
@@ -183,8 +183,11 @@ class PaginationInfo(BaseModel):
 
     total: int = Field(..., description="Total number of items")
     limit: int = Field(..., description="Items per page")
-    offset: int = Field(..., description="Current offset")
+    offset: int = Field(..., description="Current offset (deprecated, use cursor)")
     has_more: bool = Field(..., description="More items available")
+    next_cursor: Optional[str] = Field(
+        None, description="Opaque cursor for the next page, if any"
+    )
 
 
 class ContentHistoryResponse(BaseModel):
@@ -194,6 +197,76 @@ class ContentHistoryResponse(BaseModel):
     pagination: PaginationInfo = Field(..., description="Pagination info")
 
 
+class ContentStatsResponse(BaseModel):
+    """Per-user content statistics."""
+
+    total: int = Field(..., description="Number of non-deleted items")
+    platform_counts: dict[str, int] = Field(
+        default_factory=dict, description="Items per platform"
+    )
+    daily_counts: dict[str, int] = Field(
+        default_factory=dict,
+        description="Items generated per UTC day (YYYY-MM-DD); empty until the "
+        "history view has been built",
+    )
+    updated_at: Optional[datetime] = Field(
+        None, description="When the statistics were last updated"
+    )
+
+
+class HistoryBucket(BaseModel):
+    """Content count of one day or week."""
+
+    start: date = Field(
+        ..., description="First day of the bucket (UTC; weeks start on Monday)"
+    )
+    count: int = Field(..., description="Items generated in the bucket")
+
+
+class ContentHistoryBucketsResponse(BaseModel):
+    """Content counts over time."""
+
+    interval: str = Field(..., description="Bucket size: day or week")
+    total: int = Field(..., description="Items in the requested range")
+    buckets: list[HistoryBucket] = Field(
+        ...,
+        description="Buckets from the first to the last non-empty one, oldest "
+        "first; empty buckets in between have count 0",
+    )
+
+
+class ContentSearchItem(ContentHistoryItem):
+    """History item matching a search query."""
+
+    score: float = Field(..., description="Relevance score (higher is better)")
+
+
+class ContentSearchResponse(BaseModel):
+    """Response for a full-text search over content history."""
+
+    query: str = Field(..., description="Query as given")
+    items: list[ContentSearchItem] = Field(..., description="Matches, best first")
+
+
+# Bulk Models
+class BulkItemResult(BaseModel):
+    """Outcome of one item in a bulk request."""
+
+    id: str = Field(..., description="Content identifier")
+    status: str = Field(..., description="succeeded, not_found, conflict or failed")
+    status_code: int = Field(..., description="Cosmos DB status code for the item")
+    error: Optional[str] = Field(None, description="Error detail for failed items")
+
+
+class BulkContentResponse(BaseModel):
+    """Response for bulk content operations."""
+
+    action: str = Field(..., description="Operation applied")
+    succeeded: int = Field(..., description="Number of items that succeeded")
+    failed: int = Field(..., description="Number of items that failed")
+    results: list[BulkItemResult] = Field(..., description="Per-item results")
+
+
 # Health Check Models
 class HealthResponse(BaseModel):
     """Basic health check response."""
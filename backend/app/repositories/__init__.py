@@ -3,5 +3,6 @@ Repositories package initialization.
 """
 
 from .content_repo import ContentRepository
+from .sqlite_repo import SQLiteContentRepository
 
-__all__ = ["ContentRepository"]
+__all__ = ["ContentRepository", "SQLiteContentRepository"]
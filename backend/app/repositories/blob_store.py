@@ -0,0 +1,141 @@
+"""
+Blob storage for content bodies too large to keep inline in Cosmos DB.
+Backends implement BlobStore; the local filesystem backend serves
+development and tests.
+"""
+
+import asyncio
+from abc import ABC, abstractmethod
+import os
+from pathlib import Path
+from typing import Optional
+from urllib.parse import quote, unquote
+
+
+class BlobNotFoundError(KeyError):
+    """Raised when a referenced blob does not exist."""
+
+
+class BlobStore(ABC):
+    """Key/value store for opaque byte strings."""
+
+    @abstractmethod
+    async def put(self, key: str, data: bytes) -> None:
+        """
+        Store data under a key, replacing any existing blob.
+
+        Args:
+            key: Blob key ("/"-separated)
+            data: Bytes to store
+        """
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes:
+        """
+        Read a blob.
+
+        Args:
+            key: Blob key
+
+        Returns:
+            Stored bytes
+
+        Raises:
+            BlobNotFoundError: If the blob does not exist
+        """
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """
+        Delete a blob; missing blobs are ignored.
+
+        Args:
+            key: Blob key
+        """
+
+    @abstractmethod
+    async def list(
+        self, prefix: str = "", older_than: Optional[float] = None
+    ) -> list[str]:
+        """
+        List blob keys.
+
+        Args:
+            prefix: Only return keys starting with this prefix
+            older_than: Only return blobs last written before this Unix time
+
+        Returns:
+            Matching keys
+        """
+
+
+class LocalBlobStore(BlobStore):
+    """
+    Blobs as files under a root directory.
+
+    Each "/"-separated key segment is percent-encoded into one path
+    segment, so keys can't escape the root. File I/O runs in a thread.
+    """
+
+    def __init__(self, root: str):
+        """
+        Initialize the store.
+
+        Args:
+            root: Directory holding the blobs (created on first write)
+        """
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root.joinpath(*(quote(part, safe="") for part in key.split("/")))
+
+    async def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+
+        def write() -> None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so readers never see a partial blob
+            partial = path.with_name(path.name + ".partial")
+            partial.write_bytes(data)
+            os.replace(partial, path)
+
+        await asyncio.to_thread(write)
+
+    async def get(self, key: str) -> bytes:
+        try:
+            return await asyncio.to_thread(self._path(key).read_bytes)
+        except FileNotFoundError:
+            raise BlobNotFoundError(key)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._path(key).unlink, missing_ok=True)
+
+    async def list(
+        self, prefix: str = "", older_than: Optional[float] = None
+    ) -> list[str]:
+        def walk() -> list[str]:
+            if not self.root.exists():
+                return []
+            keys = []
+            for path in self.root.rglob("*"):
+                if not path.is_file() or path.name.endswith(".partial"):
+                    continue
+                if older_than is None or path.stat().st_mtime < older_than:
+                    parts = path.relative_to(self.root).parts
+                    keys.append("/".join(unquote(part) for part in parts))
+            return sorted(key for key in keys if key.startswith(prefix))
+
+        return await asyncio.to_thread(walk)
+
+
+def create_blob_store(path: Optional[str]) -> Optional[BlobStore]:
+    """
+    Build the configured blob store.
+
+    Args:
+        path: Root directory for the local backend (None disables offload)
+
+    Returns:
+        Blob store, or None when offload is disabled
+    """
+    return LocalBlobStore(path) if path else None
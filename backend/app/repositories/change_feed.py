@@ -0,0 +1,311 @@
+"""
+Change feed consumption with lease and checkpoint storage.
+A processor reads the content container's change feed from its last
+checkpoint and hands each page of changed documents to a handler. A lease
+makes sure only one replica consumes the feed at a time.
+"""
+
+import asyncio
+from abc import ABC, abstractmethod
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Optional
+import structlog
+from azure.core import MatchConditions
+from azure.cosmos.exceptions import (
+    CosmosHttpResponseError,
+    CosmosResourceExistsError,
+    CosmosResourceNotFoundError,
+)
+
+from ..utils.metrics import metrics
+
+logger = structlog.get_logger(__name__)
+
+ChangeHandler = Callable[[list[dict[str, Any]]], Awaitable[None]]
+# Runs one container call under an operation name, passing it SDK options
+ContainerCall = Callable[[str, Callable[..., Awaitable[Any]]], Awaitable[Any]]
+
+
+async def direct_call(operation: str, call: Callable[..., Awaitable[Any]]) -> Any:
+    """Run a container call as is, without pacing or throttle retries."""
+    return await call()
+
+
+class CheckpointStore(ABC):
+    """Lease ownership and continuation storage for named processors."""
+
+    @abstractmethod
+    async def acquire(self, name: str, owner: str, ttl: float) -> bool:
+        """
+        Take or renew the lease for a processor.
+
+        Args:
+            name: Processor name
+            owner: Identifier of the calling instance
+            ttl: Seconds the lease stays valid without renewal
+
+        Returns:
+            True if the caller holds the lease
+        """
+
+    @abstractmethod
+    async def load(self, name: str) -> Optional[str]:
+        """
+        Read the last checkpointed continuation token.
+
+        Args:
+            name: Processor name
+
+        Returns:
+            Continuation token, or None to start from the beginning
+        """
+
+    @abstractmethod
+    async def save(self, name: str, owner: str, continuation: str, ttl: float) -> bool:
+        """
+        Checkpoint a continuation token and renew the lease.
+
+        Args:
+            name: Processor name
+            owner: Identifier of the calling instance
+            continuation: Token to resume from
+            ttl: Seconds the lease stays valid without renewal
+
+        Returns:
+            False if the lease was lost to another instance
+        """
+
+
+class InMemoryCheckpointStore(CheckpointStore):
+    """Process-local stand-in for tests and single-instance development."""
+
+    def __init__(self):
+        self.leases: dict[str, dict[str, Any]] = {}
+
+    async def acquire(self, name: str, owner: str, ttl: float) -> bool:
+        lease = self.leases.setdefault(name, {"owner": None, "expires": 0.0})
+        if lease["owner"] not in (None, owner) and lease["expires"] > time.time():
+            return False
+        lease.update(owner=owner, expires=time.time() + ttl)
+        return True
+
+    async def load(self, name: str) -> Optional[str]:
+        return self.leases.get(name, {}).get("continuation")
+
+    async def save(self, name: str, owner: str, continuation: str, ttl: float) -> bool:
+        lease = self.leases.get(name)
+        if lease is None or lease["owner"] != owner:
+            return False
+        lease.update(continuation=continuation, expires=time.time() + ttl)
+        return True
+
+
+class CosmosCheckpointStore(CheckpointStore):
+    """
+    Leases stored as documents in a Cosmos DB container partitioned on /id.
+
+    Every write is conditional on the lease document's ETag, so two
+    instances can't both believe they hold the lease.
+    """
+
+    def __init__(self, container, call: Optional[ContainerCall] = None):
+        """
+        Initialize the store.
+
+        Args:
+            container: Async lease container client
+            call: Runs each container call (the repository's paced call, so
+                throttled lease writes are retried; direct if omitted)
+        """
+        self.container = container
+        self._call = call or direct_call
+        self._etags: dict[str, str] = {}
+
+    async def _read(self, name: str) -> Optional[dict[str, Any]]:
+        try:
+            return await self._call(
+                "lease_read",
+                lambda **options: self.container.read_item(
+                    item=name, partition_key=name, **options
+                ),
+            )
+        except CosmosResourceNotFoundError:
+            return None
+
+    async def _write(self, lease: dict[str, Any], etag: Optional[str]) -> bool:
+        try:
+            if etag is None:
+                stored = await self._call(
+                    "lease_write",
+                    lambda **options: self.container.create_item(body=lease, **options),
+                )
+            else:
+                stored = await self._call(
+                    "lease_write",
+                    lambda **options: self.container.replace_item(
+                        item=lease["id"],
+                        body=lease,
+                        etag=etag,
+                        match_condition=MatchConditions.IfNotModified,
+                        **options,
+                    ),
+                )
+        except CosmosResourceExistsError:
+            return False
+        except CosmosHttpResponseError as e:
+            if e.status_code == 412:
+                return False
+            raise
+        self._etags[lease["id"]] = stored["_etag"]
+        return True
+
+    async def acquire(self, name: str, owner: str, ttl: float) -> bool:
+        lease = await self._read(name)
+        if lease is None:
+            lease, etag = {"id": name, "continuation": None}, None
+        else:
+            etag = lease["_etag"]
+            if lease.get("owner") != owner and lease.get("expiresAt", 0) > time.time():
+                return False
+        lease.update(owner=owner, expiresAt=time.time() + ttl)
+        return await self._write(_lease_body(lease), etag)
+
+    async def load(self, name: str) -> Optional[str]:
+        lease = await self._read(name)
+        return lease.get("continuation") if lease else None
+
+    async def save(self, name: str, owner: str, continuation: str, ttl: float) -> bool:
+        body = _lease_body(
+            {
+                "id": name,
+                "owner": owner,
+                "continuation": continuation,
+                "expiresAt": time.time() + ttl,
+            }
+        )
+        return await self._write(body, self._etags.get(name))
+
+
+def _lease_body(lease: dict[str, Any]) -> dict[str, Any]:
+    """Strip Cosmos system properties before writing a lease back."""
+    return {key: value for key, value in lease.items() if not key.startswith("_")}
+
+
+class ChangeFeedProcessor:
+    """Polls a container's change feed and hands changes to a handler."""
+
+    def __init__(
+        self,
+        container,
+        checkpoints: CheckpointStore,
+        handler: ChangeHandler,
+        name: str,
+        owner: Optional[str] = None,
+        poll_interval: float = 1.0,
+        lease_ttl: float = 30.0,
+        max_item_count: int = 100,
+        call: Optional[ContainerCall] = None,
+    ):
+        """
+        Initialize the processor.
+
+        Args:
+            container: Async container whose change feed is read
+            checkpoints: Lease and continuation storage
+            handler: Coroutine called with each non-empty page of changes
+            name: Processor name (lease ID and metric prefix)
+            owner: Instance identifier (random if omitted)
+            poll_interval: Seconds between polls once caught up
+            lease_ttl: Seconds a lease survives without renewal
+            max_item_count: Maximum changes per page
+            call: Runs each page read (the repository's paced call, so a
+                throttled page is retried; direct if omitted)
+        """
+        self.container = container
+        self.checkpoints = checkpoints
+        self.handler = handler
+        self.name = name
+        self.owner = owner or str(uuid.uuid4())
+        self.poll_interval = poll_interval
+        self.lease_ttl = lease_ttl
+        self.max_item_count = max_item_count
+        self._call = call or direct_call
+
+    async def run_once(self) -> int:
+        """
+        Drain the change feed from the last checkpoint.
+
+        A page is checkpointed only after the handler has processed it, so a
+        crash replays at most one page; handlers must be idempotent.
+
+        Returns:
+            Number of changes processed (0 if another instance holds the lease)
+        """
+        if not await self.checkpoints.acquire(self.name, self.owner, self.lease_ttl):
+            return 0
+
+        continuation = await self.checkpoints.load(self.name)
+        processed = 0
+        while True:
+            changes, token = await self._read_page(continuation)
+            if changes:
+                await self.handler(changes)
+                processed += len(changes)
+            if token and token != continuation:
+                if not await self.checkpoints.save(
+                    self.name, self.owner, token, self.lease_ttl
+                ):
+                    logger.warning("Change feed lease lost", processor=self.name)
+                    break
+                continuation = token
+            if not changes:
+                break
+
+        if processed:
+            metrics.increment(f"change_feed.{self.name}.processed", processed)
+        metrics.set_gauge(f"change_feed.{self.name}.last_poll", time.time())
+        return processed
+
+    async def _read_page(
+        self, continuation: Optional[str]
+    ) -> tuple[list[dict[str, Any]], Optional[str]]:
+        """
+        Read one page of changes after a continuation token.
+
+        Each page is its own call resumed from the token, so a throttled
+        read is retried without replaying pages already handled.
+
+        Returns:
+            The page's changes and the continuation token after it
+        """
+        start = (
+            {"continuation": continuation}
+            if continuation
+            else {"start_time": "Beginning"}
+        )
+
+        async def read(**options) -> tuple[list[dict[str, Any]], Optional[str]]:
+            pages = self.container.query_items_change_feed(
+                max_item_count=self.max_item_count, **start, **options
+            ).by_page()
+            async for page in pages:
+                return [item async for item in page], pages.continuation_token
+            return [], continuation
+
+        return await self._call(f"change_feed.{self.name}", read)
+
+    async def run(self) -> None:
+        """Poll until cancelled, logging and surviving handler failures."""
+        logger.info("Change feed processor started", processor=self.name)
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                metrics.increment(f"change_feed.{self.name}.errors")
+                logger.error(
+                    "Change feed processing failed", processor=self.name, error=str(e)
+                )
+            await asyncio.sleep(self.poll_interval)
@@ -0,0 +1,318 @@
+"""
+Storage encoding of generated content bodies.
+Platform outputs cut from the raw agent response are stored as spans of
+the notes field, which holds that response, so the text is stored once.
+Large strings inside generatedContent are stored zstd-compressed (with an
+optional dictionary trained on past generations) and the largest are
+offloaded to a blob store, leaving a small reference in the document.
+"""
+
+import asyncio
+import base64
+import hashlib
+from pathlib import Path
+from typing import Any, Optional, Sequence
+import zstandard
+
+from .blob_store import BlobStore, create_blob_store
+
+COMPRESSED_KEY = "$zstd"
+BLOB_KEY = "$blob"
+SPAN_KEY = "$span"
+
+# Field holding the raw agent response that spans point into
+SPAN_SOURCE = "notes"
+
+
+def _is_marker(value: Any) -> bool:
+    return isinstance(value, dict) and (
+        COMPRESSED_KEY in value or BLOB_KEY in value or SPAN_KEY in value
+    )
+
+
+def is_encoded(content: Any) -> bool:
+    """
+    Check whether content holds compressed or offloaded fields.
+
+    Args:
+        content: generatedContent structure (or any part of it)
+
+    Returns:
+        True if any field needs decoding before use
+    """
+    if _is_marker(content):
+        return True
+    if isinstance(content, dict):
+        return any(is_encoded(value) for value in content.values())
+    if isinstance(content, list):
+        return any(is_encoded(value) for value in content)
+    return False
+
+
+def train_dictionary(samples: list[str], size: int = 64 * 1024) -> bytes:
+    """
+    Train a zstd dictionary from sample content strings.
+
+    Args:
+        samples: Representative field values (a few hundred or more)
+        size: Dictionary size in bytes
+
+    Returns:
+        Dictionary bytes (see the content_compression_dictionaries setting)
+    """
+    encoded = [sample.encode() for sample in samples if sample]
+    return zstandard.train_dictionary(size, encoded).as_bytes()
+
+
+class ContentCodec:
+    """Encodes content for storage and decodes it back."""
+
+    def __init__(
+        self,
+        compress_threshold: int,
+        offload_threshold: int = 0,
+        blob_store: Optional[BlobStore] = None,
+        dictionaries: Sequence[bytes] = (),
+        level: int = 3,
+        span_min_chars: int = 0,
+    ):
+        """
+        Initialize the codec.
+
+        Args:
+            compress_threshold: Strings of at least this many UTF-8 bytes are
+                compressed (0 disables compression)
+            offload_threshold: Strings of at least this many bytes go to the
+                blob store (0, or no blob store, disables offload)
+            blob_store: Store for offloaded bodies
+            dictionaries: Trained zstd dictionaries; the first compresses new
+                content, all of them can decompress
+            level: zstd compression level
+            span_min_chars: Output strings of at least this many characters
+                found in the notes are stored as spans of it (0 disables)
+        """
+        self.compress_threshold = compress_threshold
+        self.offload_threshold = offload_threshold if blob_store else 0
+        self.span_min_chars = span_min_chars
+        self.blob_store = blob_store
+        loaded = [zstandard.ZstdCompressionDict(data) for data in dictionaries]
+        current = loaded[0] if loaded else None
+        self.dictionary_id = current.dict_id() if current else 0
+        self._compressor = zstandard.ZstdCompressor(level=level, dict_data=current)
+        self._decompressors = {0: zstandard.ZstdDecompressor()}
+        for dictionary in loaded:
+            self._decompressors[dictionary.dict_id()] = zstandard.ZstdDecompressor(
+                dict_data=dictionary
+            )
+
+    @classmethod
+    def from_settings(cls, settings) -> "ContentCodec":
+        """
+        Build the codec configured by the content_* settings.
+
+        Args:
+            settings: Application settings
+
+        Returns:
+            Configured codec
+        """
+        return cls(
+            compress_threshold=settings.content_compress_threshold,
+            offload_threshold=settings.content_offload_threshold,
+            blob_store=create_blob_store(settings.content_blob_path),
+            dictionaries=[
+                Path(path.strip()).read_bytes()
+                for path in settings.content_compression_dictionaries.split(",")
+                if path.strip()
+            ],
+            span_min_chars=settings.content_span_min_chars,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """Whether encode can change anything."""
+        return (
+            self.compress_threshold > 0
+            or self.offload_threshold > 0
+            or self.span_min_chars > 0
+        )
+
+    async def encode(
+        self, blob_prefix: str, content: dict[str, Any], spans: bool = True
+    ) -> dict[str, Any]:
+        """
+        Store outputs as spans of the notes, then compress and offload.
+
+        Offloaded blobs are keyed by their digest under blob_prefix, so
+        retried writes reuse the same blob.
+
+        Args:
+            blob_prefix: Key prefix for offloaded bodies ("<user>/<content id>")
+            content: generatedContent structure (not modified)
+            spans: Whether outputs may become spans (False when outputs are
+                stored apart from the notes)
+
+        Returns:
+            Encoded copy of content
+        """
+        if not self.enabled:
+            return content
+        uploads: dict[str, bytes] = {}
+        if spans:
+            content = self.to_spans(content)
+        encoded = self._encode_value(blob_prefix, content, uploads)
+        if uploads:
+            await asyncio.gather(
+                *(self.blob_store.put(key, data) for key, data in uploads.items())
+            )
+        return encoded
+
+    def to_spans(self, content: dict[str, Any]) -> dict[str, Any]:
+        """
+        Replace output strings found in the notes by spans of it.
+
+        Only outputs are considered: plan fields are read by queries (the
+        history summary) and must stay plain.
+
+        Args:
+            content: generatedContent structure (not modified)
+
+        Returns:
+            Copy of content with spans, or content itself if nothing matched
+        """
+        notes = content.get(SPAN_SOURCE) if isinstance(content, dict) else None
+        outputs = content.get("outputs") if isinstance(content, dict) else None
+        if (
+            not self.span_min_chars
+            or not isinstance(notes, str)
+            or len(notes) < self.span_min_chars
+            or not outputs
+        ):
+            return content
+        spanned = self._span_value(outputs, notes)
+        if spanned is outputs:
+            return content
+        return {**content, "outputs": spanned}
+
+    def _span_value(self, value: Any, notes: str) -> Any:
+        if isinstance(value, dict):
+            items = {key: self._span_value(item, notes) for key, item in value.items()}
+            changed = any(items[key] is not value[key] for key in value)
+            return items if changed else value
+        if isinstance(value, list):
+            items = [self._span_value(item, notes) for item in value]
+            changed = any(new is not old for new, old in zip(items, value))
+            return items if changed else value
+        if not isinstance(value, str) or len(value) < self.span_min_chars:
+            return value
+        start = notes.find(value)
+        if start < 0:
+            return value
+        return {SPAN_KEY: [start, start + len(value)]}
+
+    def _encode_value(self, prefix: str, value: Any, uploads: dict[str, bytes]) -> Any:
+        if isinstance(value, dict):
+            return {
+                key: self._encode_value(prefix, item, uploads)
+                for key, item in value.items()
+            }
+        if isinstance(value, list):
+            return [self._encode_value(prefix, item, uploads) for item in value]
+        if not isinstance(value, str):
+            return value
+
+        raw = value.encode()
+        offload = self.offload_threshold and len(raw) >= self.offload_threshold
+        if not offload and not (
+            self.compress_threshold and len(raw) >= self.compress_threshold
+        ):
+            return value
+
+        frame = self._compressor.compress(raw)
+        if offload:
+            key = f"{prefix}/{hashlib.sha256(frame).hexdigest()[:32]}"
+            uploads[key] = frame
+            return {BLOB_KEY: key, "bytes": len(raw)}
+
+        packed = base64.b64encode(frame).decode("ascii")
+        if len(packed) >= len(raw):
+            # Not worth it (short or incompressible text)
+            return value
+        return {COMPRESSED_KEY: packed, "dict": self.dictionary_id}
+
+    async def decode(self, content: dict[str, Any]) -> dict[str, Any]:
+        """
+        Inflate compressed fields, fetch offloaded ones and expand spans.
+
+        Args:
+            content: Stored generatedContent structure (not modified)
+
+        Returns:
+            Decoded copy of content
+
+        Raises:
+            BlobNotFoundError: If an offloaded body is missing
+            zstandard.ZstdError: If a field can't be decompressed
+        """
+        keys = self.blob_keys(content)
+        frames = {}
+        if keys:
+            if self.blob_store is None:
+                raise ValueError("Content references blobs but no blob store is set")
+            fetched = await asyncio.gather(*(self.blob_store.get(k) for k in keys))
+            frames = dict(zip(keys, fetched))
+        decoded = self._decode_value(content, frames)
+        notes = decoded.get(SPAN_SOURCE) if isinstance(decoded, dict) else None
+        if isinstance(notes, str) and "outputs" in decoded:
+            decoded["outputs"] = self._expand_spans(decoded["outputs"], notes)
+        return decoded
+
+    @classmethod
+    def _expand_spans(cls, value: Any, notes: str) -> Any:
+        if isinstance(value, dict):
+            if SPAN_KEY in value:
+                start, end = value[SPAN_KEY]
+                return notes[start:end]
+            return {key: cls._expand_spans(item, notes) for key, item in value.items()}
+        if isinstance(value, list):
+            return [cls._expand_spans(item, notes) for item in value]
+        return value
+
+    def _decode_value(self, value: Any, frames: dict[str, bytes]) -> Any:
+        if isinstance(value, dict):
+            if BLOB_KEY in value:
+                return self._inflate(frames[value[BLOB_KEY]])
+            if COMPRESSED_KEY in value:
+                return self._inflate(base64.b64decode(value[COMPRESSED_KEY]))
+            return {
+                key: self._decode_value(item, frames) for key, item in value.items()
+            }
+        if isinstance(value, list):
+            return [self._decode_value(item, frames) for item in value]
+        return value
+
+    def _inflate(self, frame: bytes) -> str:
+        dict_id = zstandard.get_frame_parameters(frame).dict_id
+        decompressor = self._decompressors.get(dict_id)
+        if decompressor is None:
+            raise zstandard.ZstdError(f"Compression dictionary {dict_id} not loaded")
+        return decompressor.decompress(frame).decode()
+
+    @classmethod
+    def blob_keys(cls, content: Any) -> list[str]:
+        """
+        Collect the blob keys referenced by stored content.
+
+        Args:
+            content: Stored generatedContent structure
+
+        Returns:
+            Referenced keys
+        """
+        if isinstance(content, dict):
+            if BLOB_KEY in content:
+                return [content[BLOB_KEY]]
+            return [key for value in content.values() for key in cls.blob_keys(value)]
+        if isinstance(content, list):
+            return [key for value in content for key in cls.blob_keys(value)]
+        return []
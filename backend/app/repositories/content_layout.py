@@ -0,0 +1,172 @@
+"""
+Per-platform storage layout of content documents.
+In the "split" layout a content document is stored as a header item (every
+field, with the plan of generatedContent) plus one item per platform output
+and one for the notes (the raw agent response, which repeats every output),
+all in the same partition and written in one transactional batch. The
+header keeps a marker in place of each field stored apart, so one platform
+can be read with the header and a single small item, and the whole pack
+with one partition-scoped query. Outputs are not stored as spans of the
+notes in this layout, since that would tie every part to the notes item.
+Documents of either layout can always be read, so the layout can be
+changed without migrating data.
+"""
+
+from typing import Any, Iterable, Optional
+
+from ..models.database import PART_DOC_TYPE, content_part_id
+from .partitioning import MONTH_FIELD
+
+CONTENT_LAYOUTS = ("document", "split")
+PART_KEY = "$part"
+# Part name of the notes item (platform names are plain words)
+NOTES_PART = "$notes"
+
+
+def is_part_marker(value: Any) -> bool:
+    """Whether a value stands for a field stored in its own item."""
+    return isinstance(value, dict) and PART_KEY in value
+
+
+def part_names(body: dict[str, Any]) -> list[str]:
+    """
+    Parts stored apart from a header: output platforms, then NOTES_PART.
+
+    Args:
+        body: Stored document (header) body
+
+    Returns:
+        Names of the header's part items (empty for the document layout)
+    """
+    content = body.get("generatedContent") or {}
+    outputs = content.get("outputs") or {}
+    names = [platform for platform, value in outputs.items() if is_part_marker(value)]
+    if is_part_marker(content.get("notes")):
+        names.append(NOTES_PART)
+    return names
+
+
+def part_item(body: dict[str, Any], name: str, value: Any) -> dict[str, Any]:
+    """
+    Item holding one platform output, or the notes, of a document.
+
+    The value stays under generatedContent so the indexing policy's
+    exclusion and blob compaction treat it like inline content.
+
+    Args:
+        body: Document (header) body the value belongs to
+        name: Platform of the output, or NOTES_PART
+        value: Value as stored (already encoded)
+
+    Returns:
+        Part item body, in the document's partition
+    """
+    item = {
+        "id": content_part_id(body["id"], name),
+        "partitionKey": body["partitionKey"],
+        "docType": PART_DOC_TYPE,
+        "contentId": body["id"],
+    }
+    if name == NOTES_PART:
+        item["generatedContent"] = {"notes": value}
+    else:
+        item["platform"] = name
+        item["generatedContent"] = {"outputs": {name: value}}
+    if MONTH_FIELD in body:
+        item[MONTH_FIELD] = body[MONTH_FIELD]
+    return item
+
+
+def split_document(body: dict[str, Any]) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    """
+    Split a stored document body into its header and part items.
+
+    Args:
+        body: Document as written (generatedContent already encoded)
+
+    Returns:
+        Header body and one part item per platform output and for the notes
+    """
+    content = body.get("generatedContent") or {}
+    outputs = content.get("outputs") or {}
+    notes = content.get("notes")
+    if not outputs and notes is None:
+        return body, []
+    parts = [part_item(body, platform, output) for platform, output in outputs.items()]
+    stored = {
+        **content,
+        "outputs": {platform: {PART_KEY: True} for platform in outputs},
+    }
+    if notes is not None:
+        parts.append(part_item(body, NOTES_PART, notes))
+        stored["notes"] = {PART_KEY: True}
+    return {**body, "generatedContent": stored}, parts
+
+
+def select_outputs(
+    content: dict[str, Any], platforms: Optional[list[str]], notes: bool = True
+) -> dict[str, Any]:
+    """
+    Keep only some platform outputs of generated content.
+
+    Args:
+        content: generatedContent structure (not modified)
+        platforms: Outputs to keep (None keeps everything)
+        notes: Whether to keep the notes when outputs are selected
+
+    Returns:
+        Content with the other outputs removed
+    """
+    outputs = content.get("outputs")
+    if platforms is None or not isinstance(outputs, dict):
+        return content
+    selected = {
+        **content,
+        "outputs": {
+            platform: value
+            for platform, value in outputs.items()
+            if platform in platforms
+        },
+    }
+    if not notes:
+        selected.pop("notes", None)
+    return selected
+
+
+def assemble(
+    header: dict[str, Any],
+    parts: Iterable[dict[str, Any]],
+    platforms: Optional[list[str]] = None,
+) -> dict[str, Any]:
+    """
+    Put a header and its part items back together.
+
+    Args:
+        header: Stored header body
+        parts: Part items read for it
+        platforms: Outputs wanted (None: all); the others are left out
+
+    Returns:
+        Document body with inline values; fields whose part was not read are
+        left out (header is not modified)
+    """
+    content = dict(select_outputs(header.get("generatedContent") or {}, platforms))
+    stored = {}
+    notes = None
+    for part in parts:
+        values = part.get("generatedContent") or {}
+        stored.update(values.get("outputs") or {})
+        notes = values.get("notes", notes)
+    if is_part_marker(content.get("notes")):
+        if notes is None:
+            del content["notes"]
+        else:
+            content["notes"] = notes
+    outputs = content.get("outputs")
+    if outputs:
+        content["outputs"] = {
+            platform: stored[platform] if is_part_marker(value) else value
+            for platform, value in outputs.items()
+            if not is_part_marker(value) or platform in stored
+        }
+    return {**header, "generatedContent": content}
@@ -3,66 +3,251 @@ Content Repository using Azure Cosmos DB SDK.
 Handles database operations for content storage and retrieval.
 """
 
-from typing import Optional, List
+import asyncio
+import bisect
+import json
+from collections import Counter
+import time
+from typing import Any, Awaitable, Callable, Optional
 import uuid
 from datetime import datetime, timezone
 import structlog
-from azure.cosmos import CosmosClient, PartitionKey
-from azure.cosmos.exceptions import CosmosHttpResponseError, CosmosResourceNotFoundError
-from azure.identity import DefaultAzureCredential
+from azure.core import MatchConditions
+from azure.cosmos.aio import ContainerProxy, CosmosClient
+from azure.cosmos.documents import ConnectionPolicy, RetryOptions
+from azure.cosmos.exceptions import (
+    CosmosBatchOperationError,
+    CosmosClientTimeoutError,
+    CosmosHttpResponseError,
+    CosmosResourceNotFoundError,
+)
+from azure.identity.aio import DefaultAzureCredential
 
 from ..config import Settings
-from ..models.database import ContentDocument, ContentQueryResult
-from ..utils.exceptions import DatabaseError, ContentNotFoundError
+from ..models.database import (
+    COUNTER_DOC_TYPE,
+    PART_DOC_TYPE,
+    SUMMARY_MAX_CHARS,
+    ContentDocument,
+    ContentQueryResult,
+    ContentSummary,
+    HistoryView,
+    UserContentCounts,
+    content_part_id,
+    counter_document_id,
+    history_view_id,
+    stored_timestamp,
+)
+from ..utils.deadline import Deadline, remaining_timeout
+from ..utils.metrics import metrics
+from ..utils.request_charge import charge_hook
+from ..utils.exceptions import (
+    ConcurrencyConflictError,
+    DatabaseError,
+    DatabaseThrottledError,
+    ContentNotFoundError,
+    DeadlineExceededError,
+    InvalidCursorError,
+)
+from .blob_store import BlobNotFoundError
+from .content_codec import ContentCodec, is_encoded
+from .content_layout import (
+    CONTENT_LAYOUTS,
+    PART_KEY,
+    assemble,
+    part_item,
+    part_names,
+    select_outputs,
+    split_document,
+)
+from .document_cache import CacheEntry, DocumentCache
+from .indexing import indexing_policy_drift
+from .pagination import decode_cursor, encode_cursor, query_fingerprint
+from .partitioning import (
+    META_BUCKET,
+    MONTH_FIELD,
+    PartitionKeyValue,
+    PartitionScheme,
+    month_bucket,
+)
+from .throttling import THROTTLED_STATUS, RequestUnitLimiter, RetryPolicy
 
 logger = structlog.get_logger(__name__)
 
+# Fields read by history queries. Documents written before summaries were
+# stored fall back to the plan hook so they still list correctly.
+HISTORY_PROJECTION = (
+    "c.id, c.partitionKey, c.userId, c.topic, c.platforms, c.createdAt, "
+    f"c.summary ?? LEFT(c.generatedContent.plan.hook, {SUMMARY_MAX_CHARS}) "
+    "AS summary"
+)
+
 
 class ContentRepository:
-    """Repository for content database operations using Cosmos DB SDK with Azure AD auth."""
+    """Repository for content database operations using Cosmos DB SDK with Azure AD auth.
+
+    One instance is created per process in the application lifespan and
+    shared by all requests; it owns the async Cosmos client and credential.
+    """
 
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, container: Optional[ContainerProxy] = None):
         """
         Initialize content repository.
 
         Args:
             settings: Application settings
+            container: Optional pre-built container client (used by tests and
+                benchmarks); a Cosmos client is created from settings otherwise
         """
         self.settings = settings
+        self.client: Optional[CosmosClient] = None
+        self.database = None
+        self._credential: Optional[DefaultAzureCredential] = None
+
+        if container is None:
+            # Parse endpoint (remove :443 if present)
+            endpoint = settings.cosmos_endpoint.rstrip("/").replace(":443", "")
+
+            # Initialize Cosmos client with Azure AD credential
+            # Note: Cosmos DB has disabled local key auth, so we use Azure AD
+            self._credential = DefaultAzureCredential()
+            # Throttle retries happen in _call, where the deadline is known
+            policy = ConnectionPolicy()
+            policy.RetryOptions = RetryOptions(max_retry_attempt_count=0)
+            self.client = CosmosClient(
+                endpoint, self._credential, connection_policy=policy
+            )
+
+            # Get database and container
+            self.database = self.client.get_database_client(settings.cosmos_database)
+            container = self.database.get_container_client(settings.cosmos_container)
+
+            logger.info(
+                "Cosmos DB repository initialized with Azure AD auth",
+                endpoint=endpoint,
+                database=settings.cosmos_database,
+                container=settings.cosmos_container,
+            )
+
+        self.container = container
+        self._bulk_slots = asyncio.Semaphore(settings.bulk_max_parallel_batches)
+        self._cache: Optional[DocumentCache] = (
+            DocumentCache(settings.content_cache_max_bytes)
+            if settings.content_cache_max_bytes > 0
+            else None
+        )
+        self.codec = ContentCodec.from_settings(settings)
+        self.partitions = PartitionScheme(settings.cosmos_partition_scheme)
+        if settings.content_layout not in CONTENT_LAYOUTS:
+            raise ValueError(f"Unknown content layout {settings.content_layout!r}")
+        self.split_layout = settings.content_layout == "split"
+        self._diagnostics = (
+            settings.cosmos_query_diagnostics
+            if settings.cosmos_query_diagnostics is not None
+            else settings.is_development
+        )
+        self._retries = RetryPolicy(
+            settings.cosmos_throttle_max_retries, settings.cosmos_throttle_max_wait
+        )
+        self._limiter: Optional[RequestUnitLimiter] = (
+            RequestUnitLimiter(
+                settings.cosmos_ru_limit, settings.cosmos_ru_burst_seconds
+            )
+            if settings.cosmos_ru_limit > 0
+            else None
+        )
 
-        # Parse endpoint (remove :443 if present)
-        endpoint = settings.cosmos_endpoint.rstrip("/").replace(":443", "")
+    async def warm_up(self) -> None:
+        """
+        Prime connections and caches before serving traffic.
+
+        Fetches an AAD token, reads container metadata and loads the partition
+        key range routing map so the first requests don't pay for them.
 
-        # Initialize Cosmos client with Azure AD credential
-        # Note: Cosmos DB has disabled local key auth, so we use Azure AD
-        credential = DefaultAzureCredential()
-        self.client = CosmosClient(endpoint, credential)
+        Raises:
+            DatabaseError: If the container cannot be reached
+        """
+        start_time = time.perf_counter()
+        try:
+            properties = await self.container.read()
+            ranges = [r async for r in self.container.read_feed_ranges()]
+        except Exception as e:
+            raise DatabaseError(f"Cosmos DB warm-up failed: {str(e)}")
 
-        # Get database and container
-        self.database = self.client.get_database_client(settings.cosmos_database)
-        self.container = self.database.get_container_client(settings.cosmos_container)
+        paths = (properties.get("partitionKey") or {}).get("paths")
+        if paths != self.partitions.paths:
+            # Every point read and batch would miss; see scripts/migrate_partitions.py
+            logger.error(
+                "Container partition key does not match the partition scheme",
+                container_paths=paths,
+                expected_paths=self.partitions.paths,
+                scheme=self.partitions.scheme,
+            )
 
         logger.info(
-            "Cosmos DB repository initialized with Azure AD auth",
-            endpoint=endpoint,
-            database=settings.cosmos_database,
-            container=settings.cosmos_container,
+            "Cosmos DB repository warmed up",
+            feed_ranges=len(ranges),
+            duration=time.perf_counter() - start_time,
         )
 
-    async def create(self, document: ContentDocument) -> ContentDocument:
+    async def verify_indexing_policy(self, mode: Optional[str] = None) -> list[str]:
+        """
+        Compare the container's indexing policy with the shipped one.
+
+        Args:
+            mode: "off", "warn" or "fail" (defaults to the
+                cosmos_indexing_policy_check setting)
+
+        Returns:
+            Differences found (empty if the policy matches or mode is off)
+
+        Raises:
+            DatabaseError: If mode is "fail" and the policy has drifted
+        """
+        mode = (mode or self.settings.cosmos_indexing_policy_check).lower()
+        if mode == "off":
+            return []
+
+        properties = await self.container.read()
+        drift = indexing_policy_drift(properties.get("indexingPolicy", {}))
+        if not drift:
+            logger.info("Cosmos DB indexing policy verified")
+            return []
+
+        metrics.set_gauge("cosmos.indexing_policy_drift", len(drift))
+        if mode == "fail":
+            raise DatabaseError("Cosmos DB indexing policy drift: " + "; ".join(drift))
+        logger.warning("Cosmos DB indexing policy drift", differences=drift)
+        return drift
+
+    async def close(self) -> None:
+        """Close the Cosmos client and credential."""
+        if self.client is not None:
+            await self.client.close()
+        if self._credential is not None:
+            await self._credential.close()
+
+    async def create(
+        self, document: ContentDocument, deadline: Optional[Deadline] = None
+    ) -> ContentDocument:
         """
         Create a new content document.
 
         Args:
             document: Content document to create
+            deadline: Optional request deadline bounding the call
 
         Returns:
             Created document with database metadata
 
         Raises:
             DatabaseError: If creation fails
+            DeadlineExceededError: If the deadline passes first
         """
         try:
+            if deadline is not None:
+                deadline.check("creating document")
+
             # Ensure ID is set
             if not document.id:
                 document.id = str(uuid.uuid4())
@@ -73,23 +258,66 @@ class ContentRepository:
                 document.created_at = now
             document.updated_at = now
 
-            # Convert to dict
+            # Convert to dict, compressing or offloading large bodies
             doc_dict = document.model_dump(mode="json", by_alias=True)
             doc_dict["id"] = document.id
+            doc_dict["generatedContent"] = await self.codec.encode(
+                f"{document.partition_key}/{document.id}",
+                document.generated_content,
+                spans=not self.split_layout,
+            )
+            bucket = month_bucket(document.created_at)
+            self.partitions.stamp(doc_dict, bucket)
+            header, parts = (
+                split_document(doc_dict) if self.split_layout else (doc_dict, [])
+            )
 
             logger.info(
                 "Creating document in Cosmos DB",
                 document_id=document.id,
                 partition_key=document.partition_key,
+                parts=len(parts),
             )
 
-            # Create document using SDK
-            created_item = self.container.create_item(body=doc_dict)
+            # Create document using SDK; a split document is one batch
+            if parts:
+                responses = await self._call(
+                    "create",
+                    lambda **options: self.container.execute_item_batch(
+                        batch_operations=[
+                            ("create", (item,)) for item in (header, *parts)
+                        ],
+                        partition_key=self.partitions.key(
+                            document.partition_key, bucket
+                        ),
+                        **options,
+                    ),
+                    deadline,
+                )
+                created_item = responses[0]["resourceBody"]
+            else:
+                created_item = await self._call(
+                    "create",
+                    lambda **options: self.container.create_item(
+                        body=doc_dict, **options
+                    ),
+                    deadline,
+                )
 
             logger.info("Document created successfully", document_id=document.id)
-            return ContentDocument(**created_item)
+            self.partitions.remember(document.partition_key, document.id, bucket)
+            await self._adjust_counts(
+                document.partition_key, document.platforms, 1, deadline
+            )
+            created = ContentDocument(**created_item)
+            created.generated_content = document.generated_content
+            return created
 
-        except CosmosHttpResponseError as e:
+        except (DeadlineExceededError, DatabaseThrottledError):
+            raise
+        except CosmosClientTimeoutError:
+            raise DeadlineExceededError("Request deadline reached creating document")
+        except (CosmosHttpResponseError, CosmosBatchOperationError) as e:
             error_msg = (
                 f"Cosmos DB error creating document: {e.status_code} - {e.message}"
             )
@@ -102,13 +330,25 @@ class ContentRepository:
             logger.error("Unexpected error creating document", error=str(e))
             raise DatabaseError(error_msg)
 
-    async def get_by_id(self, content_id: str, user_id: str) -> ContentDocument:
+    async def get_by_id(
+        self,
+        content_id: str,
+        user_id: str,
+        deadline: Optional[Deadline] = None,
+        inflate: bool = True,
+        platform: Optional[str] = None,
+    ) -> ContentDocument:
         """
         Retrieve content by ID.
 
         Args:
             content_id: Content identifier
             user_id: User identifier (partition key)
+            deadline: Optional request deadline bounding the call
+            inflate: Decompress and fetch offloaded bodies and split-layout
+                outputs; pass False when generated_content isn't needed
+            platform: Only return the plan and this platform's output; in the
+                split layout nothing else is read
 
         Returns:
             Content document
@@ -116,26 +356,236 @@ class ContentRepository:
         Raises:
             ContentNotFoundError: If content doesn't exist
             DatabaseError: If retrieval fails
+            DeadlineExceededError: If the deadline passes first
+        """
+        if not inflate:
+            return await self._read_document(
+                content_id, user_id, deadline, with_parts=False
+            )
+        platforms = [platform] if platform else None
+        document = await self.inflate(
+            await self._read_document(content_id, user_id, deadline, platforms)
+        )
+        # Notes are kept until spans of them are expanded
+        document.generated_content = select_outputs(
+            document.generated_content, platforms, notes=False
+        )
+        return document
+
+    async def inflate(self, document: ContentDocument) -> ContentDocument:
         """
+        Decode compressed and offloaded fields of a stored document.
+
+        Args:
+            document: Document as stored (modified in place)
+
+        Returns:
+            The document with plain generated_content
+
+        Raises:
+            DatabaseError: If an offloaded body is missing or unreadable
+        """
+        if not is_encoded(document.generated_content):
+            return document
         try:
-            logger.info(
-                "Getting document from Cosmos DB",
-                document_id=content_id,
-                user_id=user_id,
+            document.generated_content = await self.codec.decode(
+                document.generated_content
             )
+        except BlobNotFoundError as e:
+            raise DatabaseError(f"Offloaded content body {e} missing")
+        except Exception as e:
+            raise DatabaseError(f"Unable to decode content {document.id}: {str(e)}")
+        metrics.increment("content.inflated")
+        return document
 
-            # Read document using SDK
-            item = self.container.read_item(item=content_id, partition_key=user_id)
-            doc = ContentDocument(**item)
+    async def list_documents(
+        self, user_id: str, deadline: Optional[Deadline] = None
+    ) -> list[ContentDocument]:
+        """
+        Read every live document of a user with bodies inflated.
 
-            if doc.deleted:
-                raise ContentNotFoundError(f"Content {content_id} not found")
+        Used to (re)build per-user search entries; this reads full bodies,
+        so callers should not run it per request. Outputs of split-layout
+        documents are read with one more query over the user's part items.
+
+        Args:
+            user_id: User identifier (partition key)
+            deadline: Optional request deadline bounding the query
+
+        Returns:
+            Content documents
+
+        Raises:
+            DatabaseError: If the query fails
+            DeadlineExceededError: If the deadline passes first
+        """
+        items = await self._list_items(
+            "list_documents",
+            user_id,
+            "c.deleted = false",
+            [],
+            deadline,
+        )
+        return [await self.inflate(ContentDocument(**item)) for item in items]
+
+    async def list_changed(
+        self, user_id: str, since: float, deadline: Optional[Deadline] = None
+    ) -> tuple[list[ContentDocument], list[str]]:
+        """
+        Read a user's documents written since a point in time.
 
-            return doc
+        Lets search entries be refreshed from what changed instead of
+        every body. Selected on _ts, so soft deletes and restores show up.
+
+        Args:
+            user_id: User identifier (partition key)
+            since: Epoch seconds; documents written at or after it are read
+            deadline: Optional request deadline bounding the queries
+
+        Returns:
+            Changed live documents (inflated) and the ids of deleted ones
+
+        Raises:
+            DatabaseError: If the query fails
+            DeadlineExceededError: If the deadline passes first
+        """
+        items = await self._list_items(
+            "list_changed",
+            user_id,
+            "c._ts >= @since AND NOT IS_DEFINED(c.docType)",
+            [{"name": "@since", "value": int(since)}],
+            deadline,
+            all_parts=False,
+        )
+        live = [item for item in items if item.get("deleted") is False]
+        removed = [item["id"] for item in items if item.get("deleted") is not False]
+        documents = [await self.inflate(ContentDocument(**item)) for item in live]
+        return documents, removed
+
+    async def _list_items(
+        self,
+        operation: str,
+        user_id: str,
+        condition: str,
+        parameters: list[dict[str, Any]],
+        deadline: Optional[Deadline],
+        all_parts: bool = True,
+    ) -> list[dict[str, Any]]:
+        """
+        Query a user's content documents with split-layout parts folded in.
+
+        Args:
+            operation: Operation name for metrics and logs
+            user_id: User identifier (partition key)
+            condition: Filter added to the userId match
+            parameters: Parameters of condition
+            deadline: Optional request deadline bounding the queries
+            all_parts: Read every part item of the user in one query rather
+                than only those of the documents found
+
+        Returns:
+            Document bodies as stored, with inline outputs
+        """
+        try:
+            if deadline is not None:
+                deadline.check("listing documents")
+            items = await self._call(
+                operation,
+                lambda **options: collect(
+                    self.container.query_items(
+                        query=(
+                            "SELECT * FROM c "
+                            f"WHERE c.userId = @userId AND {condition}"
+                        ),
+                        parameters=[
+                            {"name": "@userId", "value": user_id},
+                            *parameters,
+                        ],
+                        partition_key=self.partitions.prefix(user_id),
+                        **options,
+                    )
+                ),
+                deadline,
+                query=True,
+            )
+            split = [item["id"] for item in items if part_names(item)]
+            if not split:
+                return items
+            condition = "c.docType = @docType"
+            parameters = [{"name": "@docType", "value": PART_DOC_TYPE}]
+            if not all_parts:
+                condition += " AND ARRAY_CONTAINS(@ids, c.contentId)"
+                parameters.append({"name": "@ids", "value": split})
+            parts: dict[str, list[dict]] = {}
+            for part in await self._call(
+                "list_parts",
+                lambda **options: collect(
+                    self.container.query_items(
+                        query=f"SELECT * FROM c WHERE {condition}",
+                        parameters=parameters,
+                        partition_key=self.partitions.prefix(user_id),
+                        **options,
+                    )
+                ),
+                deadline,
+                query=True,
+            ):
+                parts.setdefault(part["contentId"], []).append(part)
+            return [assemble(item, parts.get(item["id"], [])) for item in items]
+        except (DeadlineExceededError, DatabaseThrottledError):
+            raise
+        except CosmosClientTimeoutError:
+            raise DeadlineExceededError("Request deadline reached listing documents")
+        except CosmosHttpResponseError as e:
+            error_msg = (
+                f"Cosmos DB error listing documents: {e.status_code} - {e.message}"
+            )
+            logger.error(
+                "Document listing failed", error=error_msg, status_code=e.status_code
+            )
+            raise DatabaseError(error_msg)
+        except Exception as e:
+            error_msg = f"Unexpected error listing documents: {str(e)}"
+            logger.error("Unexpected error listing documents", error=str(e))
+            raise DatabaseError(error_msg)
+
+    async def _read_document(
+        self,
+        content_id: str,
+        user_id: str,
+        deadline: Optional[Deadline],
+        platforms: Optional[list[str]] = None,
+        with_parts: bool = True,
+    ) -> ContentDocument:
+        """
+        Read a document as stored, through the cache.
+
+        Split-layout outputs are read with the header: in the split layout
+        one query returns the header and the wanted part items, otherwise a
+        point read of the header is followed by a part query if needed. Only
+        complete documents are cached; the header ETag covers the parts,
+        since every output change also patches the header.
+
+        Args:
+            content_id: Content identifier
+            user_id: User identifier (partition key)
+            deadline: Optional request deadline
+            platforms: Outputs to return (None: all)
+            with_parts: False returns the header with its part markers
+        """
+        try:
+            return await self._read_through_cache(
+                content_id, user_id, deadline, platforms, with_parts
+            )
 
         except CosmosResourceNotFoundError:
             logger.info("Document not found", document_id=content_id)
+            self._invalidate(user_id, content_id)
             raise ContentNotFoundError(f"Content {content_id} not found")
+        except (DeadlineExceededError, DatabaseThrottledError):
+            raise
+        except CosmosClientTimeoutError:
+            raise DeadlineExceededError("Request deadline reached reading document")
         except CosmosHttpResponseError as e:
             error_msg = (
                 f"Cosmos DB error getting document: {e.status_code} - {e.message}"
@@ -151,6 +601,191 @@ class ContentRepository:
             logger.error("Unexpected error getting document", error=str(e))
             raise DatabaseError(error_msg)
 
+    async def _read_through_cache(
+        self,
+        content_id: str,
+        user_id: str,
+        deadline: Optional[Deadline],
+        platforms: Optional[list[str]],
+        with_parts: bool,
+    ) -> ContentDocument:
+        """Body of _read_document, raising SDK errors as they come."""
+        if deadline is not None:
+            deadline.check("reading document")
+
+        key = (user_id, content_id)
+        cached = self._cache.get(key) if self._cache is not None else None
+        if cached is not None and self._fresh(cached):
+            return self._selected(cached.document.model_copy(), platforms)
+
+        logger.info(
+            "Getting document from Cosmos DB",
+            document_id=content_id,
+            user_id=user_id,
+            revalidating=cached is not None,
+        )
+        partition_key = await self._content_key(user_id, content_id, deadline)
+        item, parts = await self._fetch_stored(
+            content_id, partition_key, platforms, with_parts, cached, deadline
+        )
+        if cached is not None and not item:
+            # 304: the cached copy is still current
+            cached.validated_at = time.monotonic()
+            self._cache.record(hit=True)
+            return self._selected(cached.document.model_copy(), platforms)
+        if self._cache is not None:
+            self._cache.record(hit=False)
+
+        # Counter and other bookkeeping documents are not content
+        if "docType" in item or item.get("deleted"):
+            self._invalidate(user_id, content_id)
+            raise ContentNotFoundError(f"Content {content_id} not found")
+
+        stored_parts = part_names(item)
+        if with_parts:
+            item = await self._with_parts(
+                item, parts, content_id, partition_key, platforms, deadline
+            )
+        doc = ContentDocument(**item)
+
+        complete = platforms is None and (with_parts or not stored_parts)
+        if self._cache is not None and complete:
+            self._cache.put(key, doc, len(json.dumps(item)))
+            return doc.model_copy()
+        return doc
+
+    def _fresh(self, cached: CacheEntry) -> bool:
+        """Whether a cached document can be served without revalidation."""
+        age = time.monotonic() - cached.validated_at
+        if age < self.settings.content_cache_fresh_seconds:
+            self._cache.record(hit=True)
+            return True
+        return False
+
+    async def _fetch_stored(
+        self,
+        content_id: str,
+        partition_key: PartitionKeyValue,
+        platforms: Optional[list[str]],
+        with_parts: bool,
+        cached: Optional[CacheEntry],
+        deadline: Optional[Deadline],
+    ) -> tuple[dict[str, Any], Optional[list[dict[str, Any]]]]:
+        """
+        Read a stored header, with its wanted parts if one query can.
+
+        In the split layout one query returns the header and the wanted part
+        items; otherwise the header is point read, conditionally if a cached
+        copy is being revalidated.
+
+        Returns:
+            The header ({} if the cached copy is unchanged) and the parts
+            read along with it (None if none were)
+        """
+        if self.split_layout and with_parts and cached is None:
+            items = await self._read_parts(
+                content_id, partition_key, platforms, deadline, header=True
+            )
+            item = next((i for i in items if i.get("id") == content_id), None)
+            if item is None:
+                raise CosmosResourceNotFoundError(status_code=404, message="Not found")
+            return item, [i for i in items if i is not item]
+
+        # Revalidate: Cosmos answers 304 with no body if unchanged
+        conditional = (
+            {"etag": cached.etag, "match_condition": MatchConditions.IfModified}
+            if cached is not None
+            else {}
+        )
+        item = await self._call(
+            "read",
+            lambda **options: self.container.read_item(
+                item=content_id,
+                partition_key=partition_key,
+                **conditional,
+                **options,
+            ),
+            deadline,
+        )
+        return item, None
+
+    async def _with_parts(
+        self,
+        item: dict[str, Any],
+        parts: Optional[list[dict[str, Any]]],
+        content_id: str,
+        partition_key: PartitionKeyValue,
+        platforms: Optional[list[str]],
+        deadline: Optional[Deadline],
+    ) -> dict[str, Any]:
+        """Assemble a header with the wanted parts, reading them if needed."""
+        stored_parts = part_names(item)
+        if not stored_parts:
+            return item if platforms is None else assemble(item, [], platforms)
+        wanted = [p for p in stored_parts if not platforms or p in platforms]
+        if parts is None and wanted:
+            parts = await self._read_parts(content_id, partition_key, wanted, deadline)
+        return assemble(item, parts or [], platforms)
+
+    async def _read_parts(
+        self,
+        content_id: str,
+        partition_key: PartitionKeyValue,
+        platforms: Optional[list[str]],
+        deadline: Optional[Deadline] = None,
+        header: bool = False,
+    ) -> list[dict[str, Any]]:
+        """
+        Read the part items of split-layout content in one query.
+
+        Args:
+            content_id: Content identifier
+            partition_key: Full partition key of the content
+            platforms: Parts to read, by platform or NOTES_PART (None: all)
+            deadline: Optional request deadline
+            header: Also return the header item
+
+        Returns:
+            Items as stored
+        """
+        if platforms is None:
+            condition = "c.contentId = @id"
+            parameters = [{"name": "@id", "value": content_id}]
+        else:
+            condition = "ARRAY_CONTAINS(@parts, c.id)"
+            parameters = [
+                {
+                    "name": "@parts",
+                    "value": [content_part_id(content_id, p) for p in platforms],
+                }
+            ]
+        if header:
+            condition = f"c.id = @contentId OR {condition}"
+            parameters.append({"name": "@contentId", "value": content_id})
+        return await self._call(
+            "read_parts",
+            lambda **options: collect(
+                self.container.query_items(
+                    query=f"SELECT * FROM c WHERE {condition}",
+                    parameters=parameters,
+                    partition_key=partition_key,
+                    **options,
+                )
+            ),
+            deadline,
+            query=True,
+        )
+
+    @staticmethod
+    def _selected(
+        document: ContentDocument, platforms: Optional[list[str]]
+    ) -> ContentDocument:
+        """Leave out the outputs of platforms that were not asked for."""
+        document.generated_content = select_outputs(
+            document.generated_content, platforms
+        )
+        return document
+
     async def query_by_user(
         self,
         user_id: str,
@@ -161,73 +796,96 @@ class ContentRepository:
         order: str = "desc",
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
+        deadline: Optional[Deadline] = None,
+        cursor: Optional[str] = None,
     ) -> ContentQueryResult:
         """
         Query content by user with filters and pagination.
 
+        Only the list fields in HISTORY_PROJECTION are read, never the
+        generated content. Pages are fetched with Cosmos continuation tokens,
+        so the cost of a page does not grow with its depth. A non-zero offset
+        without a cursor falls back to OFFSET/LIMIT for backward compatibility.
+
         Args:
             user_id: User identifier (partition key)
             limit: Maximum number of items to return
-            offset: Pagination offset
+            offset: Legacy pagination offset (ignored when cursor is given)
             platform: Optional platform filter
             sort_by: Sort field (date, topic)
             order: Sort order (asc, desc)
             start_date: Optional start date filter
             end_date: Optional end date filter
+            deadline: Optional request deadline bounding the query
+            cursor: Opaque cursor from a previous page's continuation_token
 
         Returns:
-            Query result with documents and pagination info
+            Query result with content summaries and the next page cursor
 
         Raises:
             DatabaseError: If query fails
+            DeadlineExceededError: If the deadline passes first
+            InvalidCursorError: If the cursor is malformed or for another query
         """
         try:
-            # Build query
-            query = "SELECT * FROM c WHERE c.userId = @userId AND c.deleted = false"
-            parameters = [{"name": "@userId", "value": user_id}]
+            if deadline is not None:
+                deadline.check("querying documents")
 
-            if platform:
-                query += " AND ARRAY_CONTAINS(c.platforms, @platform)"
-                parameters.append({"name": "@platform", "value": platform})
+            # Build query
+            query, parameters = self._history_filters(
+                user_id, platform, start_date, end_date
+            )
+            fingerprint = query_fingerprint(query, parameters, sort_by, order, limit)
 
-            if start_date:
-                query += " AND c.created_at >= @startDate"
-                parameters.append(
-                    {"name": "@startDate", "value": start_date.isoformat()}
+            # Resume position from the cursor
+            continuation, after = None, None
+            legacy_offset = bool(offset) and not cursor
+            if cursor:
+                continuation, after = decode_cursor(cursor, fingerprint)
+            if after is not None:
+                query, parameters = self._history_after(
+                    query, parameters, after, sort_by, order
                 )
 
-            if end_date:
-                query += " AND c.created_at <= @endDate"
-                parameters.append({"name": "@endDate", "value": end_date.isoformat()})
-
             # Add sorting
-            sort_field = "c.created_at" if sort_by == "date" else "c.topic"
-            sort_order = "DESC" if order.lower() == "desc" else "ASC"
-            query += f" ORDER BY {sort_field} {sort_order}"
+            query += " ORDER BY " + self._history_order(sort_by, order)
 
             # Add pagination
-            query += f" OFFSET {offset} LIMIT {limit}"
+            if legacy_offset:
+                # Cosmos still reads (and charges for) every skipped document
+                query += f" OFFSET {offset} LIMIT {limit}"
 
             logger.info(
-                "Querying documents from Cosmos DB", user_id=user_id, platform=platform
+                "Querying documents from Cosmos DB",
+                user_id=user_id,
+                platform=platform,
+                paging="offset" if legacy_offset else "continuation",
             )
 
-            # Execute query using SDK
-            items = list(
-                self.container.query_items(
-                    query=query,
-                    parameters=parameters,
-                    partition_key=user_id,
-                    max_item_count=limit,
-                )
+            # Execute query using SDK, fetching a single page
+            items, next_continuation = await self._history_page(
+                query, parameters, user_id, limit, continuation, deadline
             )
 
-            documents = [ContentDocument(**item) for item in items]
+            documents = [ContentSummary(**item) for item in items]
+            next_cursor = (
+                None
+                if legacy_offset
+                else encode_cursor(next_continuation, fingerprint, after)
+            )
 
             logger.info("Documents retrieved successfully", count=len(documents))
 
-            return ContentQueryResult(documents=documents, count=len(documents))
+            return ContentQueryResult(
+                documents=documents,
+                count=len(documents),
+                continuation_token=next_cursor,
+            )
 
+        except (DeadlineExceededError, DatabaseThrottledError, InvalidCursorError):
+            raise
+        except CosmosClientTimeoutError:
+            raise DeadlineExceededError("Request deadline reached querying documents")
         except CosmosHttpResponseError as e:
             error_msg = (
                 f"Cosmos DB error querying documents: {e.status_code} - {e.message}"
@@ -241,51 +899,1239 @@ class ContentRepository:
             logger.error("Unexpected error querying documents", error=str(e))
             raise DatabaseError(error_msg)
 
-    async def delete(self, content_id: str, user_id: str) -> None:
+    async def patch(
+        self,
+        content_id: str,
+        user_id: str,
+        operations: list[dict[str, Any]],
+        etag: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+        batch: Optional[list[tuple]] = None,
+    ) -> ContentDocument:
         """
-        Soft delete content.
+        Apply a partial update to live content in one round trip.
+
+        Only the patch operations travel to Cosmos DB. With an etag the
+        write fails if the document changed since it was read; without one
+        it only requires the document not to be deleted.
 
         Args:
             content_id: Content identifier
             user_id: User identifier (partition key)
+            operations: Cosmos patch operations (op, path, value)
+            etag: Optional ETag the document must still have
+            deadline: Optional request deadline bounding the call
+            batch: Further operations on items of the same partition (e.g.
+                split-layout parts), applied atomically with the patch
+
+        Returns:
+            Updated document as stored (see inflate)
 
         Raises:
-            ContentNotFoundError: If content doesn't exist
-            DatabaseError: If deletion fails
+            ContentNotFoundError: If content doesn't exist or is deleted
+            ConcurrencyConflictError: If the etag no longer matches
+            DatabaseError: If the update fails
+            DeadlineExceededError: If the deadline passes first
         """
         try:
-            # Get existing document
-            document = await self.get_by_id(content_id, user_id)
+            if deadline is not None:
+                deadline.check("patching document")
 
-            # Mark as deleted
-            document.deleted = True
-            document.updated_at = datetime.now(timezone.utc)
+            operations = operations + [
+                {
+                    "op": "set",
+                    "path": "/updatedAt",
+                    "value": datetime.now(timezone.utc).isoformat(),
+                }
+            ]
 
-            # Convert to dict
-            doc_dict = document.model_dump(mode="json")
-            doc_dict["id"] = document.id
+            logger.info(
+                "Patching document in Cosmos DB",
+                document_id=content_id,
+                paths=[operation["path"] for operation in operations],
+            )
+
+            # Drop the cached copy first so a failed write can't leave it stale
+            self._invalidate(user_id, content_id)
+            partition_key = await self._content_key(user_id, content_id, deadline)
+            item = await self._send_patch(
+                content_id, partition_key, operations, etag, batch, deadline
+            )
+            return ContentDocument(**item)
+
+        except (CosmosResourceNotFoundError, ContentNotFoundError):
+            raise ContentNotFoundError(f"Content {content_id} not found")
+        except (DeadlineExceededError, DatabaseThrottledError):
+            raise
+        except CosmosClientTimeoutError:
+            raise DeadlineExceededError("Request deadline reached patching document")
+        except (CosmosHttpResponseError, CosmosBatchOperationError) as e:
+            if e.status_code in (404, 412):
+                raise self._patch_rejected(content_id, etag, e.status_code)
+            error_msg = (
+                f"Cosmos DB error patching document: {e.status_code} - {e.message}"
+            )
+            logger.error(
+                "Document patch failed", error=error_msg, status_code=e.status_code
+            )
+            raise DatabaseError(error_msg)
+        except Exception as e:
+            error_msg = f"Unexpected error patching document: {str(e)}"
+            logger.error("Unexpected error patching document", error=str(e))
+            raise DatabaseError(error_msg)
 
-            logger.info("Soft deleting document in Cosmos DB", document_id=content_id)
+    @staticmethod
+    def _patch_rejected(
+        content_id: str, etag: Optional[str], status_code: int
+    ) -> Exception:
+        """Error for a patch refused as missing (404) or failing its condition (412)."""
+        if status_code == 412 and etag is not None:
+            return ConcurrencyConflictError(
+                f"Content {content_id} was modified concurrently"
+            )
+        # A batch reports the missing document as its failed operation, and a
+        # failed filter predicate means the document is already deleted
+        return ContentNotFoundError(f"Content {content_id} not found")
 
-            # Replace document using SDK
-            self.container.replace_item(item=content_id, body=doc_dict)
+    async def _send_patch(
+        self,
+        content_id: str,
+        partition_key: PartitionKeyValue,
+        operations: list[dict[str, Any]],
+        etag: Optional[str],
+        batch: Optional[list[tuple]],
+        deadline: Optional[Deadline],
+    ) -> dict[str, Any]:
+        """
+        Send patch operations, alone or at the head of a transactional batch.
 
-            logger.info("Document soft deleted successfully", document_id=content_id)
+        Returns:
+            The patched document as stored
+        """
+        if etag is not None:
+            conditions = {
+                "etag": etag,
+                "match_condition": MatchConditions.IfNotModified,
+            }
+            batch_conditions = {"if_match_etag": etag}
+        else:
+            conditions = {"filter_predicate": "FROM c WHERE c.deleted = false"}
+            batch_conditions = conditions
 
-        except ContentNotFoundError:
+        if batch:
+            batch_operations = [
+                ("patch", (content_id, operations), batch_conditions),
+                *batch,
+            ]
+            responses = await self._call(
+                "patch",
+                lambda **options: self.container.execute_item_batch(
+                    batch_operations=batch_operations,
+                    partition_key=partition_key,
+                    **options,
+                ),
+                deadline,
+            )
+            return responses[0]["resourceBody"]
+        return await self._call(
+            "patch",
+            lambda **options: self.container.patch_item(
+                item=content_id,
+                partition_key=partition_key,
+                patch_operations=operations,
+                **conditions,
+                **options,
+            ),
+            deadline,
+        )
+
+    @staticmethod
+    def _history_filters(
+        user_id: str,
+        platform: Optional[str],
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+        select: str = HISTORY_PROJECTION,
+    ) -> tuple[str, list[dict[str, Any]]]:
+        """Build the filtered history SELECT (without ORDER BY) and parameters."""
+        query = (
+            f"SELECT {select} FROM c " "WHERE c.userId = @userId AND c.deleted = false"
+        )
+        parameters = [{"name": "@userId", "value": user_id}]
+
+        if platform:
+            query += " AND ARRAY_CONTAINS(c.platforms, @platform)"
+            parameters.append({"name": "@platform", "value": platform})
+
+        if start_date:
+            query += " AND c.createdAt >= @startDate"
+            parameters.append(
+                {"name": "@startDate", "value": stored_timestamp(start_date)}
+            )
+
+        if end_date:
+            query += " AND c.createdAt <= @endDate"
+            parameters.append({"name": "@endDate", "value": stored_timestamp(end_date)})
+
+        return query, parameters
+
+    async def _history_page(
+        self,
+        query: str,
+        parameters: list[dict[str, Any]],
+        user_id: str,
+        limit: int,
+        continuation: Optional[str],
+        deadline: Optional[Deadline],
+    ) -> tuple[list[dict], Optional[str]]:
+        """Fetch one page of a history query and the token of the next."""
+
+        async def first_page(**options) -> tuple[list[dict], Optional[str]]:
+            pages = self.container.query_items(
+                query=query,
+                parameters=parameters,
+                partition_key=self.partitions.prefix(user_id),
+                max_item_count=limit,
+                **options,
+            ).by_page(continuation)
+            async for page in pages:
+                return [item async for item in page], pages.continuation_token
+            return [], pages.continuation_token
+
+        return await self._call("query_history", first_page, deadline, query=True)
+
+    @staticmethod
+    def _history_after(
+        query: str,
+        parameters: list[dict[str, Any]],
+        after: str,
+        sort_by: str,
+        order: str,
+    ) -> tuple[str, list[dict[str, Any]]]:
+        """Restrict a history query to dates past a keyset cursor position."""
+        if sort_by != "date":
+            raise InvalidCursorError("Keyset cursors require sort_by=date")
+        query += (
+            " AND c.createdAt < @after"
+            if order.lower() == "desc"
+            else " AND c.createdAt > @after"
+        )
+        return query, parameters + [{"name": "@after", "value": after}]
+
+    @staticmethod
+    def _history_order(sort_by: str, order: str) -> str:
+        """
+        ORDER BY clause of a history query.
+
+        Date order lists the equality-filtered userId and deleted first so
+        the (userId, deleted, createdAt DESC) composite index serves the sort
+        and any createdAt range; ascending order reverses every path, the
+        other direction a composite index can be read in.
+        """
+        if sort_by != "date":
+            return "c.topic DESC" if order.lower() == "desc" else "c.topic ASC"
+        if order.lower() == "desc":
+            return "c.userId ASC, c.deleted ASC, c.createdAt DESC"
+        return "c.userId DESC, c.deleted DESC, c.createdAt ASC"
+
+    async def count_by_day(
+        self,
+        user_id: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        platform: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> dict[str, int]:
+        """
+        Count a user's live content per UTC day.
+
+        One query inside the user's partition returns the day of every
+        matching document and the days are counted here. The SDK cannot run
+        GROUP BY across physical partitions, and a user_month prefix key can
+        span several of them.
+
+        The cost is O(matches): one short value is returned, and charged
+        for, per matching document. Only start_date and end_date bound it.
+        A platform filter cannot be served from the history view, so that
+        fallback counts the user's whole history unless a date is given.
+
+        Args:
+            user_id: User identifier (partition key)
+            start_date: Optional inclusive lower bound on createdAt
+            end_date: Optional inclusive upper bound on createdAt
+            platform: Optional platform filter
+            deadline: Optional request deadline bounding the query
+
+        Returns:
+            Counts keyed by day (YYYY-MM-DD)
+
+        Raises:
+            DatabaseError: If the query fails
+            DeadlineExceededError: If the deadline passes first
+        """
+        query, parameters = self._history_filters(
+            user_id,
+            platform,
+            start_date,
+            end_date,
+            select="VALUE LEFT(c.createdAt, 10)",
+        )
+        try:
+            if deadline is not None:
+                deadline.check("counting documents")
+            days = await self._call(
+                "count_by_day",
+                lambda **options: collect(
+                    self.container.query_items(
+                        query=query,
+                        parameters=parameters,
+                        partition_key=self.partitions.prefix(user_id),
+                        **options,
+                    )
+                ),
+                deadline,
+                query=True,
+            )
+        except (DeadlineExceededError, DatabaseThrottledError):
             raise
+        except CosmosClientTimeoutError:
+            raise DeadlineExceededError("Request deadline reached counting documents")
         except CosmosHttpResponseError as e:
             error_msg = (
-                f"Cosmos DB error deleting document: {e.status_code} - {e.message}"
+                f"Cosmos DB error counting documents: {e.status_code} - {e.message}"
             )
             logger.error(
-                "Document deletion failed", error=error_msg, status_code=e.status_code
+                "Document count failed", error=error_msg, status_code=e.status_code
             )
             raise DatabaseError(error_msg)
         except Exception as e:
-            error_msg = f"Unexpected error deleting document: {str(e)}"
-            logger.error("Unexpected error deleting document", error=str(e))
+            error_msg = f"Unexpected error counting documents: {str(e)}"
+            logger.error("Unexpected error counting documents", error=str(e))
             raise DatabaseError(error_msg)
+        return dict(Counter(days))
+
+    def history_cursor_after(
+        self, user_id: str, limit: int, last: ContentSummary
+    ) -> Optional[str]:
+        """
+        Cursor for the unfiltered, newest-first history page following an item.
+
+        Lets a page served from a materialized view hand over to
+        query_by_user for the pages after it.
+
+        Args:
+            user_id: User identifier
+            limit: Page size the cursor will be used with
+            last: Last item of the current page
+
+        Returns:
+            Cursor accepted by query_by_user
+        """
+        query, parameters = self._history_filters(user_id, None, None, None)
+        fingerprint = query_fingerprint(query, parameters, "date", "desc", limit)
+        # Serialize exactly as stored so the string comparison lines up
+        after = stored_timestamp(last.created_at)
+        return encode_cursor(None, fingerprint, after=after)
+
+    async def delete(
+        self,
+        content_id: str,
+        user_id: str,
+        deadline: Optional[Deadline] = None,
+        etag: Optional[str] = None,
+    ) -> None:
+        """
+        Soft delete content with a single patch operation.
+
+        The document gets a TTL of deleted_content_ttl seconds, after which
+        Cosmos purges it; until then reads treat it as not found.
+
+        Args:
+            content_id: Content identifier
+            user_id: User identifier (partition key)
+            deadline: Optional request deadline bounding the call
+            etag: Optional ETag the document must still have
+
+        Raises:
+            ContentNotFoundError: If content doesn't exist
+            ConcurrencyConflictError: If the etag no longer matches
+            DatabaseError: If deletion fails
+            DeadlineExceededError: If the deadline passes first
+        """
+        operations = [
+            {"op": "set", "path": "/deleted", "value": True},
+            *self._purge_operations(True),
+        ]
+
+        logger.info("Soft deleting document in Cosmos DB", document_id=content_id)
+        document = await self.patch(
+            content_id, user_id, operations, etag=etag, deadline=deadline
+        )
+        logger.info("Document soft deleted successfully", document_id=content_id)
+        await self._adjust_counts(user_id, document.platforms, -1, deadline)
+
+    async def update_platform_output(
+        self,
+        content_id: str,
+        user_id: str,
+        platform: str,
+        output: dict[str, Any],
+        etag: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> ContentDocument:
+        """
+        Replace the generated output of one platform, e.g. after regenerating it.
+
+        In the split layout the output is written to its part item and the
+        header's marker and updatedAt are patched in the same batch.
+
+        Args:
+            content_id: Content identifier
+            user_id: User identifier (partition key)
+            platform: Platform whose output is replaced
+            output: New platform output
+            etag: Optional ETag the document must still have
+            deadline: Optional request deadline bounding the call
+
+        Returns:
+            Updated document as stored (see inflate)
+        """
+        value = await self.codec.encode(
+            f"{user_id}/{content_id}", output, spans=not self.split_layout
+        )
+        path = f"/generatedContent/outputs/{platform}"
+        if not self.split_layout:
+            return await self.patch(
+                content_id,
+                user_id,
+                [{"op": "set", "path": path, "value": value}],
+                etag=etag,
+                deadline=deadline,
+            )
+        partition_key = await self._content_key(user_id, content_id, deadline)
+        header = {"id": content_id, "partitionKey": user_id}
+        if self.partitions.hierarchical:
+            self.partitions.stamp(header, partition_key[1])
+        return await self.patch(
+            content_id,
+            user_id,
+            [{"op": "set", "path": path, "value": {PART_KEY: True}}],
+            etag=etag,
+            deadline=deadline,
+            batch=[("upsert", (part_item(header, platform, value),))],
+        )
+
+    async def mark_version(
+        self,
+        content_id: str,
+        user_id: str,
+        version: str,
+        etag: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> ContentDocument:
+        """
+        Record a version label in the content metadata.
+
+        Args:
+            content_id: Content identifier
+            user_id: User identifier (partition key)
+            version: Version label
+            etag: Optional ETag the document must still have
+            deadline: Optional request deadline bounding the call
+
+        Returns:
+            Updated document
+        """
+        return await self.patch(
+            content_id,
+            user_id,
+            [{"op": "set", "path": "/metadata/version", "value": version}],
+            etag=etag,
+            deadline=deadline,
+        )
+
+    async def bulk_set_deleted(
+        self,
+        user_id: str,
+        content_ids: list[str],
+        deleted: bool,
+        deadline: Optional[Deadline] = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Soft delete or restore many documents with transactional batches.
+
+        Each item is a patch filtered on its current state, so deleting
+        deleted content (or restoring live content) reports not_found.
+
+        Args:
+            user_id: User identifier (partition key)
+            content_ids: Content identifiers
+            deleted: True to delete, False to restore
+            deadline: Optional request deadline bounding the calls
+
+        Returns:
+            Per-item results (id, status, status_code, error) in input order
+        """
+        now = datetime.now(timezone.utc).isoformat()
+        operations = [
+            {"op": "set", "path": "/deleted", "value": deleted},
+            {"op": "set", "path": "/updatedAt", "value": now},
+            *self._purge_operations(deleted),
+        ]
+        predicate = f"FROM c WHERE c.deleted = {str(not deleted).lower()}"
+        for content_id in content_ids:
+            self._invalidate(user_id, content_id)
+
+        buckets: dict[str, Optional[str]] = dict.fromkeys(content_ids)
+        unresolved: dict[str, dict[str, Any]] = {}
+        if self.partitions.hierarchical:
+            try:
+                buckets = await self._locate(user_id, content_ids, deadline)
+            except (
+                DeadlineExceededError,
+                CosmosClientTimeoutError,
+                DatabaseThrottledError,
+                CosmosHttpResponseError,
+            ) as e:
+                buckets = {}
+                failure = bulk_failure(e)
+            else:
+                failure = (404, None)
+            unresolved = {
+                content_id: bulk_result(content_id, *failure)
+                for content_id in content_ids
+                if content_id not in buckets
+            }
+
+        partitions: dict[tuple[str, Optional[str]], list[tuple[str, tuple]]] = {}
+        for content_id in dict.fromkeys(content_ids):
+            if content_id in unresolved:
+                continue
+            partitions.setdefault((user_id, buckets[content_id]), []).append(
+                (
+                    content_id,
+                    (
+                        "patch",
+                        (content_id, operations),
+                        {"filter_predicate": predicate},
+                    ),
+                )
+            )
+        results = await self._execute_bulk(partitions, deadline) if partitions else []
+        by_id = {**unresolved, **{result["id"]: result for result in results}}
+        return [by_id[content_id] for content_id in content_ids]
+
+    def _purge_operations(self, deleted: bool) -> list[dict[str, Any]]:
+        """Patch operations scheduling (or cancelling) the TTL purge."""
+        if not deleted:
+            # -1: never expire, overriding a TTL set by an earlier delete
+            return [{"op": "set", "path": "/ttl", "value": -1}]
+        if self.settings.deleted_content_ttl > 0:
+            return [
+                {
+                    "op": "set",
+                    "path": "/ttl",
+                    "value": self.settings.deleted_content_ttl,
+                }
+            ]
+        return []
+
+    async def bulk_create(
+        self, documents: list[ContentDocument], deadline: Optional[Deadline] = None
+    ) -> list[dict[str, Any]]:
+        """
+        Import many documents with transactional batches.
+
+        Args:
+            documents: Documents to create (any mix of partitions)
+            deadline: Optional request deadline bounding the calls
+
+        Returns:
+            Per-item results (id, status, status_code, error) in input order
+        """
+        now = datetime.now(timezone.utc)
+        partitions: dict[tuple[str, Optional[str]], list[tuple[str, tuple]]] = {}
+        for document in documents:
+            document.updated_at = now
+            body = document.model_dump(mode="json", by_alias=True)
+            body["generatedContent"] = await self.codec.encode(
+                f"{document.partition_key}/{document.id}",
+                document.generated_content,
+                spans=not self.split_layout,
+            )
+            bucket = month_bucket(document.created_at)
+            self.partitions.stamp(body, bucket)
+            partition = (
+                document.partition_key,
+                bucket if self.partitions.hierarchical else None,
+            )
+            header, parts = split_document(body) if self.split_layout else (body, [])
+            # A split document's items stay together in one batch
+            operation = (
+                [("create", (item,)) for item in (header, *parts)]
+                if parts
+                else ("create", (body,))
+            )
+            partitions.setdefault(partition, []).append((document.id, operation))
+        results = await self._execute_bulk(partitions, deadline)
+        by_id = {result["id"]: result for result in results}
+        return [by_id[document.id] for document in documents]
+
+    async def _execute_bulk(
+        self,
+        partitions: dict[tuple[str, Optional[str]], list[tuple[str, tuple]]],
+        deadline: Optional[Deadline] = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Run batch operations grouped by partition with bounded parallelism.
+
+        Operations are split into batches of bulk_batch_size per partition;
+        at most bulk_max_parallel_batches batches are in flight at once.
+        Counters of touched partitions are recounted once at the end.
+
+        Args:
+            partitions: (item id, batch operation) pairs per (user id, bucket);
+                a list of operations is applied all-or-nothing as one item
+            deadline: Optional request deadline bounding the calls
+
+        Returns:
+            Per-item results, partition by partition in input order
+        """
+        size = max(1, min(self.settings.bulk_batch_size, 100))
+        chunks = []
+        for partition, entries in partitions.items():
+            chunk, weight = [], 0
+            for entry in entries:
+                count = len(batch_operations(entry[1]))
+                if chunk and weight + count > size:
+                    chunks.append((partition, chunk))
+                    chunk, weight = [], 0
+                chunk.append(entry)
+                weight += count
+            if chunk:
+                chunks.append((partition, chunk))
+        start_time = time.perf_counter()
+        chunk_results = await asyncio.gather(
+            *(
+                self._execute_batch(self.partitions.key(*partition), chunk, deadline)
+                for partition, chunk in chunks
+            )
+        )
+        results = [result for chunk in chunk_results for result in chunk]
+
+        succeeded = sum(result["status"] == "succeeded" for result in results)
+        metrics.increment("bulk.items.succeeded", succeeded)
+        metrics.increment("bulk.items.failed", len(results) - succeeded)
+        logger.info(
+            "Bulk operation complete",
+            partitions=len(partitions),
+            batches=len(chunks),
+            items=len(results),
+            succeeded=succeeded,
+            duration=time.perf_counter() - start_time,
+        )
+
+        for user_id in dict.fromkeys(user_id for user_id, _ in partitions):
+            try:
+                await self.reconcile_counts(user_id, deadline=deadline)
+            except Exception as e:
+                metrics.increment("counters.update_failed")
+                logger.warning("Counter update failed", user_id=user_id, error=str(e))
+        return results
+
+    async def _execute_batch(
+        self,
+        partition_key: PartitionKeyValue,
+        entries: list[tuple[str, tuple]],
+        deadline: Optional[Deadline] = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Execute one transactional batch, isolating failed items.
+
+        A batch is all-or-nothing, so when an operation fails it is recorded
+        and the batch is retried without it until the rest succeed.
+
+        Args:
+            partition_key: Partition all entries belong to
+            entries: (item id, batch operation or list of them) pairs, at
+                most 100 operations in all
+            deadline: Optional request deadline bounding the calls
+
+        Returns:
+            Per-item results in input order
+        """
+        results: dict[str, dict[str, Any]] = {}
+        pending = list(entries)
+        async with self._bulk_slots:
+            while pending:
+                try:
+                    if deadline is not None:
+                        deadline.check("executing batch")
+                    # Index of each entry's first operation in the batch
+                    starts, operations = [], []
+                    for _, operation in pending:
+                        starts.append(len(operations))
+                        operations.extend(batch_operations(operation))
+                    responses = await self._call(
+                        "batch",
+                        lambda **options: self.container.execute_item_batch(
+                            batch_operations=operations,
+                            partition_key=partition_key,
+                            **options,
+                        ),
+                        deadline,
+                    )
+                    for (item_id, _), start in zip(pending, starts):
+                        results[item_id] = bulk_result(
+                            item_id, responses[start].get("statusCode", 200)
+                        )
+                    pending = []
+                except CosmosBatchOperationError as e:
+                    failed = (e.operation_responses or [{}])[e.error_index]
+                    index = bisect.bisect_right(starts, e.error_index) - 1
+                    item_id = pending[index][0]
+                    results[item_id] = bulk_result(
+                        item_id, failed.get("statusCode", e.status_code), e.message
+                    )
+                    pending.pop(index)
+                except (
+                    DeadlineExceededError,
+                    CosmosClientTimeoutError,
+                    DatabaseThrottledError,
+                    CosmosHttpResponseError,
+                ) as e:
+                    failure = bulk_failure(e)
+                    for item_id, _ in pending:
+                        results[item_id] = bulk_result(item_id, *failure)
+                    pending = []
+        return [results[item_id] for item_id, _ in entries]
+
+    def _observe(
+        self,
+        operation: str,
+        query: bool = False,
+        on_charge: Optional[Callable[[float], None]] = None,
+    ) -> dict[str, Any]:
+        """SDK options recording the RU charge of a call under an operation name."""
+        diagnostics = query and self._diagnostics
+        options: dict[str, Any] = {
+            "response_hook": charge_hook(operation, diagnostics, on_charge)
+        }
+        if diagnostics:
+            options["populate_query_metrics"] = True
+            options["populate_index_metrics"] = True
+        return options
+
+    async def _call(
+        self,
+        operation: str,
+        call: Callable[..., Awaitable[Any]],
+        deadline: Optional[Deadline] = None,
+        query: bool = False,
+    ) -> Any:
+        """
+        Run one container call with RU pacing and throttle retries.
+
+        Args:
+            operation: Operation name for charges, metrics and estimates
+            call: Makes the SDK call with the keyword options it is given
+                (charge hook and deadline timeout); queries must consume
+                their results inside it so a throttled page is retried
+            deadline: Optional request deadline bounding waits and the call
+            query: Whether the call is a query (for diagnostics)
+
+        Returns:
+            Whatever call returns
+
+        Raises:
+            DatabaseThrottledError: If throttling outlasts the retry budget
+        """
+        attempt, waited = 0, 0.0
+        while True:
+            reserved = (
+                await self._limiter.acquire(operation, deadline)
+                if self._limiter is not None
+                else 0.0
+            )
+            charges: list[float] = []
+            try:
+                return await call(
+                    **self._observe(operation, query, charges.append),
+                    **remaining_timeout(deadline),
+                )
+            except CosmosHttpResponseError as e:
+                if e.status_code != THROTTLED_STATUS:
+                    raise
+                wait = self._retries.next_wait(
+                    operation, e.headers, attempt, waited, deadline
+                )
+            finally:
+                if self._limiter is not None:
+                    self._limiter.settle(operation, reserved, sum(charges))
+            if self._limiter is not None:
+                self._limiter.backoff(wait)
+            attempt += 1
+            waited += wait
+            await asyncio.sleep(wait)
+
+    async def paced_call(
+        self, operation: str, call: Callable[..., Awaitable[Any]]
+    ) -> Any:
+        """
+        Run a call for a component sharing this repository's containers.
+
+        The client is built without SDK throttle retries, so the change
+        feed, lease and view calls go through the same pacing and retries
+        as the repository's own.
+
+        Args:
+            operation: Operation name for charges, metrics and estimates
+            call: Makes the SDK call with the keyword options it is given
+
+        Returns:
+            Whatever call returns
+        """
+        return await self._call(operation, call)
+
+    def _invalidate(self, user_id: str, content_id: str) -> None:
+        """Drop a document from the read cache after this process changes it."""
+        if self._cache is not None:
+            self._cache.invalidate((user_id, content_id))
+
+    async def _content_key(
+        self, user_id: str, content_id: str, deadline: Optional[Deadline] = None
+    ) -> PartitionKeyValue:
+        """
+        Full partition key of a content document.
+
+        Under the user_month scheme the month is not part of the id, so an
+        unknown document's bucket is looked up once (a query scoped to the
+        user's key prefix) and remembered.
+
+        Raises:
+            ContentNotFoundError: If the user has no such document
+        """
+        if not self.partitions.hierarchical:
+            return user_id
+        bucket = self.partitions.remembered(user_id, content_id)
+        if bucket is None:
+            bucket = (await self._locate(user_id, [content_id], deadline)).get(
+                content_id
+            )
+            if bucket is None:
+                raise ContentNotFoundError(f"Content {content_id} not found")
+        return self.partitions.key(user_id, bucket)
+
+    async def _locate(
+        self,
+        user_id: str,
+        content_ids: list[str],
+        deadline: Optional[Deadline] = None,
+    ) -> dict[str, str]:
+        """Month buckets of a user's content documents, deleted ones included."""
+        buckets = {
+            content_id: bucket
+            for content_id in content_ids
+            if (bucket := self.partitions.remembered(user_id, content_id))
+        }
+        missing = [
+            content_id for content_id in content_ids if content_id not in buckets
+        ]
+        if not missing:
+            return buckets
+        metrics.increment("partitions.bucket_lookups")
+        items = await self._call(
+            "locate",
+            lambda **options: collect(
+                self.container.query_items(
+                    query=(
+                        f"SELECT c.id, c.{MONTH_FIELD} FROM c "
+                        "WHERE ARRAY_CONTAINS(@ids, c.id) "
+                        "AND NOT IS_DEFINED(c.docType)"
+                    ),
+                    parameters=[{"name": "@ids", "value": missing}],
+                    partition_key=self.partitions.prefix(user_id),
+                    **options,
+                )
+            ),
+            deadline,
+            query=True,
+        )
+        for item in items:
+            buckets[item["id"]] = item[MONTH_FIELD]
+            self.partitions.remember(user_id, item["id"], item[MONTH_FIELD])
+        return buckets
+
+    async def get_history_view(
+        self, user_id: str, deadline: Optional[Deadline] = None
+    ) -> Optional[HistoryView]:
+        """
+        Read a user's materialized history view with a single point read.
+
+        Args:
+            user_id: User identifier (partition key)
+            deadline: Optional request deadline bounding the call
+
+        Returns:
+            The view, or None if it doesn't exist yet or can't be read
+        """
+        try:
+            item = await self._call(
+                "read_view",
+                lambda **options: self.container.read_item(
+                    item=history_view_id(user_id),
+                    partition_key=self.partitions.key(user_id, META_BUCKET),
+                    **options,
+                ),
+                deadline,
+            )
+            return HistoryView(**item)
+        except CosmosResourceNotFoundError:
+            return None
+        except Exception as e:
+            # Views are an optimisation; callers fall back to querying
+            logger.warning("History view read failed", user_id=user_id, error=str(e))
+            return None
+
+    async def get_counts(
+        self, user_id: str, deadline: Optional[Deadline] = None
+    ) -> Optional[UserContentCounts]:
+        """
+        Read a user's content counters with a single point read.
+
+        Args:
+            user_id: User identifier (partition key)
+            deadline: Optional request deadline bounding the call
+
+        Returns:
+            Counters, or None if the user has none yet or they can't be read
+        """
+        try:
+            item = await self._call(
+                "read_counts",
+                lambda **options: self.container.read_item(
+                    item=counter_document_id(user_id),
+                    partition_key=self.partitions.key(user_id, META_BUCKET),
+                    **options,
+                ),
+                deadline,
+            )
+            return UserContentCounts(**item)
+        except CosmosResourceNotFoundError:
+            return None
+        except Exception as e:
+            # Totals are advisory; history still works without them
+            logger.warning("Counter read failed", user_id=user_id, error=str(e))
+            return None
+
+    async def _adjust_counts(
+        self,
+        user_id: str,
+        platforms: list[str],
+        delta: int,
+        deadline: Optional[Deadline] = None,
+    ) -> None:
+        """
+        Apply an increment to a user's counters after a write.
+
+        Failures are logged and counted rather than raised: the content write
+        has already succeeded and reconciliation repairs any drift.
+
+        Args:
+            user_id: User identifier (partition key)
+            platforms: Platforms of the written content
+            delta: +1 for a new item, -1 for a deleted one
+            deadline: Optional request deadline bounding the call
+        """
+        operations = [{"op": "incr", "path": "/total", "value": delta}]
+        operations += [
+            {"op": "incr", "path": f"/platforms/{platform}", "value": delta}
+            for platform in platforms
+        ]
+        operations.append(
+            {
+                "op": "set",
+                "path": "/updatedAt",
+                "value": datetime.now(timezone.utc).isoformat(),
+            }
+        )
+        try:
+            try:
+                await self._call(
+                    "patch_counts",
+                    lambda **options: self.container.patch_item(
+                        item=counter_document_id(user_id),
+                        partition_key=self.partitions.key(user_id, META_BUCKET),
+                        patch_operations=operations,
+                        **options,
+                    ),
+                    deadline,
+                )
+            except CosmosResourceNotFoundError:
+                # First write for this user: start from a full recount so the
+                # counter also covers content written before counters existed
+                await self.reconcile_counts(user_id, deadline=deadline)
+        except Exception as e:
+            metrics.increment("counters.update_failed")
+            logger.warning("Counter update failed", user_id=user_id, error=str(e))
+
+    async def reconcile_counts(
+        self, user_id: str, deadline: Optional[Deadline] = None
+    ) -> UserContentCounts:
+        """
+        Recount a user's non-deleted content and overwrite their counters.
+
+        Args:
+            user_id: User identifier (partition key)
+            deadline: Optional request deadline bounding the calls
+
+        Returns:
+            The reconciled counters
+        """
+        parameters = [{"name": "@userId", "value": user_id}]
+        # Platforms are counted here: the SDK has no cross-partition GROUP BY,
+        # and the user_month scheme spreads a user over partitions
+        platforms = await self._call(
+            "reconcile_counts",
+            lambda **options: collect(
+                self.container.query_items(
+                    query=(
+                        "SELECT VALUE p FROM c JOIN p IN c.platforms "
+                        "WHERE c.userId = @userId AND c.deleted = false"
+                    ),
+                    parameters=parameters,
+                    partition_key=self.partitions.prefix(user_id),
+                    **options,
+                )
+            ),
+            deadline,
+            query=True,
+        )
+        totals = await self._call(
+            "reconcile_counts",
+            lambda **options: collect(
+                self.container.query_items(
+                    query=(
+                        "SELECT VALUE COUNT(1) FROM c "
+                        "WHERE c.userId = @userId AND c.deleted = false"
+                    ),
+                    parameters=parameters,
+                    partition_key=self.partitions.prefix(user_id),
+                    **options,
+                )
+            ),
+            deadline,
+            query=True,
+        )
+
+        now = datetime.now(timezone.utc)
+        counts = UserContentCounts(
+            id=counter_document_id(user_id),
+            partition_key=user_id,
+            user_id=user_id,
+            total=totals[0] if totals else 0,
+            platforms=dict(Counter(platforms)),
+            updated_at=now,
+            reconciled_at=now,
+        )
+        body = self.partitions.stamp(
+            counts.model_dump(mode="json", by_alias=True), META_BUCKET
+        )
+        await self._call(
+            "upsert_counts",
+            lambda **options: self.container.upsert_item(body=body, **options),
+            deadline,
+        )
+        metrics.increment("counters.reconciled")
+        return counts
+
+    async def reconcile_all_counts(self) -> int:
+        """
+        Reconcile the counters of every user that has them.
+
+        Returns:
+            Number of users reconciled
+        """
+        user_ids = await self._counter_users()
+        reconciled = 0
+        for user_id in user_ids:
+            try:
+                await self.reconcile_counts(user_id)
+                reconciled += 1
+            except Exception as e:
+                logger.warning(
+                    "Counter reconciliation failed", user_id=user_id, error=str(e)
+                )
+        logger.info("Counters reconciled", users=reconciled)
+        return reconciled
+
+    async def _counter_users(self) -> list[str]:
+        """Ids of every user with a counter document."""
+        return await self._call(
+            "list_counter_users",
+            lambda **options: collect(
+                self.container.query_items(
+                    query="SELECT VALUE c.userId FROM c WHERE c.docType = @docType",
+                    parameters=[{"name": "@docType", "value": COUNTER_DOC_TYPE}],
+                    **options,
+                )
+            ),
+            query=True,
+        )
+
+    async def compact(self) -> dict[str, int]:
+        """
+        Remove data left behind once deleted content has been purged.
+
+        Deletes offloaded blobs no document references any more (purged
+        content, replaced platform outputs), split-layout part items whose
+        header was purged, and the counter and view documents of users
+        without any content left.
+
+        Returns:
+            Number of blobs and per-user documents removed
+        """
+        blobs = await self._compact_blobs()
+        documents = await self._compact_parts()
+        documents += await self._compact_user_documents()
+        metrics.increment("compaction.blobs_removed", blobs)
+        metrics.increment("compaction.documents_removed", documents)
+        logger.info("Compaction finished", blobs=blobs, documents=documents)
+        return {"blobs": blobs, "documents": documents}
+
+    async def _compact_blobs(self) -> int:
+        store = self.codec.blob_store
+        if store is None:
+            return 0
+        cutoff = time.time() - self.settings.blob_orphan_min_age
+        by_content: dict[tuple[str, str], list[str]] = {}
+        for key in await store.list(older_than=cutoff):
+            user_id, content_id, _ = key.rsplit("/", 2)
+            by_content.setdefault((user_id, content_id), []).append(key)
+
+        removed = 0
+        for (user_id, content_id), keys in by_content.items():
+            try:
+                partition_key = await self._content_key(user_id, content_id)
+                item = await self._call(
+                    "compact_read",
+                    lambda **options: self.container.read_item(
+                        item=content_id, partition_key=partition_key, **options
+                    ),
+                )
+                referenced = set(ContentCodec.blob_keys(item.get("generatedContent")))
+                if part_names(item):
+                    for part in await self._read_parts(content_id, partition_key, None):
+                        referenced.update(
+                            ContentCodec.blob_keys(part.get("generatedContent"))
+                        )
+            except (CosmosResourceNotFoundError, ContentNotFoundError):
+                referenced = set()
+            for key in keys:
+                if key not in referenced:
+                    await store.delete(key)
+                    removed += 1
+        return removed
+
+    async def _compact_parts(self) -> int:
+        removed = 0
+        for user_id in await self._counter_users():
+            parts = await self._call(
+                "compact_parts",
+                lambda **options: collect(
+                    self.container.query_items(
+                        query=(
+                            f"SELECT c.id, c.contentId, c.{MONTH_FIELD} FROM c "
+                            "WHERE c.docType = @docType"
+                        ),
+                        parameters=[{"name": "@docType", "value": PART_DOC_TYPE}],
+                        partition_key=self.partitions.prefix(user_id),
+                        **options,
+                    )
+                ),
+                query=True,
+            )
+            if not parts:
+                continue
+            # Headers are kept while deleted content can still be restored;
+            # parts go once their header has been purged
+            headers = await self._call(
+                "compact_headers",
+                lambda **options: collect(
+                    self.container.query_items(
+                        query=(
+                            "SELECT VALUE c.id FROM c "
+                            "WHERE ARRAY_CONTAINS(@ids, c.id) "
+                            "AND NOT IS_DEFINED(c.docType)"
+                        ),
+                        parameters=[
+                            {
+                                "name": "@ids",
+                                "value": list({p["contentId"] for p in parts}),
+                            }
+                        ],
+                        partition_key=self.partitions.prefix(user_id),
+                        **options,
+                    )
+                ),
+                query=True,
+            )
+            for part in parts:
+                if part["contentId"] in headers:
+                    continue
+                try:
+                    await self._call(
+                        "compact_delete",
+                        lambda **options: self.container.delete_item(
+                            item=part["id"],
+                            partition_key=self.partitions.key(
+                                user_id, part.get(MONTH_FIELD)
+                            ),
+                            **options,
+                        ),
+                    )
+                    removed += 1
+                except CosmosResourceNotFoundError:
+                    pass
+        return removed
+
+    async def _compact_user_documents(self) -> int:
+        user_ids = await self._counter_users()
+        removed = 0
+        for user_id in user_ids:
+            # Deleted content inside its grace period still counts: it can
+            # be restored, and restoring adjusts the counters
+            remaining = await self._call(
+                "compact_count",
+                lambda **options: collect(
+                    self.container.query_items(
+                        query=(
+                            "SELECT VALUE COUNT(1) FROM c "
+                            "WHERE c.userId = @userId AND NOT IS_DEFINED(c.docType)"
+                        ),
+                        parameters=[{"name": "@userId", "value": user_id}],
+                        partition_key=self.partitions.prefix(user_id),
+                        **options,
+                    )
+                ),
+                query=True,
+            )
+            if remaining and remaining[0]:
+                continue
+            for document_id in (counter_document_id(user_id), history_view_id(user_id)):
+                try:
+                    await self._call(
+                        "compact_delete",
+                        lambda **options: self.container.delete_item(
+                            item=document_id,
+                            partition_key=self.partitions.key(user_id, META_BUCKET),
+                            **options,
+                        ),
+                    )
+                    removed += 1
+                except CosmosResourceNotFoundError:
+                    pass
+        return removed
 
     async def health_check(self) -> bool:
         """
@@ -295,13 +2141,44 @@ class ContentRepository:
             True if database is accessible, False otherwise
         """
         try:
-            # Simple query to test connectivity
-            query = "SELECT VALUE COUNT(1) FROM c"
-
-            # Execute query using SDK
-            list(self.container.query_items(query=query, max_item_count=1))
-
+            # Container metadata read: cheap and partition-independent
+            await self.container.read()
             return True
         except Exception as e:
             logger.error("Database health check failed", error=str(e))
             return False
+
+
+def batch_operations(operation: Any) -> list[tuple]:
+    """Operations of a bulk entry (one operation or a list applied together)."""
+    return operation if isinstance(operation, list) else [operation]
+
+
+async def collect(items: Any) -> list[Any]:
+    """Read every result of a query iterator."""
+    return [item async for item in items]
+
+
+def bulk_failure(error: Exception) -> tuple[int, Optional[str]]:
+    """Status code and message every item of a failed bulk call reports."""
+    if isinstance(error, (DeadlineExceededError, CosmosClientTimeoutError)):
+        return 408, "Request deadline exceeded"
+    if isinstance(error, DatabaseThrottledError):
+        return THROTTLED_STATUS, str(error)
+    return error.status_code, error.message
+
+
+def bulk_result(
+    item_id: str, status_code: int, error: Optional[str] = None
+) -> dict[str, Any]:
+    """Build a per-item bulk result from a Cosmos status code."""
+    if 200 <= status_code < 300:
+        status, error = "succeeded", None
+    elif status_code in (404, 412):
+        # 412: the filter predicate didn't match (already deleted/restored)
+        status = "not_found"
+    elif status_code == 409:
+        status = "conflict"
+    else:
+        status = "failed"
+    return {"id": item_id, "status": status, "status_code": status_code, "error": error}
@@ -0,0 +1,127 @@
+"""
+In-process LRU cache of parsed content documents.
+Entries are bounded by total serialized size and carry the document's
+ETag so the repository can revalidate them with a conditional read.
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+from ..models.database import ContentDocument
+from ..utils.metrics import metrics
+
+CacheKey = tuple[str, str]
+
+
+@dataclass
+class CacheEntry:
+    """A cached document with its ETag and approximate size in bytes."""
+
+    document: ContentDocument
+    etag: str
+    size: int
+    validated_at: float = field(default_factory=time.monotonic)
+
+
+class DocumentCache:
+    """
+    Byte-bounded LRU cache keyed by (user_id, content_id).
+
+    Not thread-safe; it is meant to be used from the event loop only.
+    """
+
+    def __init__(self, max_bytes: int, name: str = "content"):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Upper bound on the summed size of cached entries
+            name: Metric name prefix (cache.<name>.*)
+        """
+        self.max_bytes = max_bytes
+        self.name = name
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[CacheKey, CacheEntry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_ratio(self) -> float:
+        """Share of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: CacheKey) -> Optional[CacheEntry]:
+        """
+        Look up an entry and mark it most recently used.
+
+        Args:
+            key: (user_id, content_id)
+
+        Returns:
+            The entry, or None if it isn't cached
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: CacheKey, document: ContentDocument, size: int) -> None:
+        """
+        Cache a document, evicting least recently used entries to fit.
+
+        Documents without an ETag or larger than the whole cache are skipped.
+
+        Args:
+            key: (user_id, content_id)
+            document: Parsed document (must carry its etag)
+            size: Approximate serialized size in bytes
+        """
+        self.invalidate(key)
+        if not document.etag or size > self.max_bytes:
+            return
+        self._entries[key] = CacheEntry(
+            document=document, etag=document.etag, size=size
+        )
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= evicted.size
+            metrics.increment(f"cache.{self.name}.evictions")
+        self._publish()
+
+    def invalidate(self, key: CacheKey) -> None:
+        """
+        Drop an entry if present.
+
+        Args:
+            key: (user_id, content_id)
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry.size
+            self._publish()
+
+    def record(self, hit: bool) -> None:
+        """
+        Count a lookup outcome for the hit ratio.
+
+        Args:
+            hit: Whether the lookup was served from the cache
+        """
+        if hit:
+            self.hits += 1
+            metrics.increment(f"cache.{self.name}.hits")
+        else:
+            self.misses += 1
+            metrics.increment(f"cache.{self.name}.misses")
+        metrics.set_gauge(f"cache.{self.name}.hit_ratio", round(self.hit_ratio, 4))
+
+    def _publish(self) -> None:
+        metrics.set_gauge(f"cache.{self.name}.bytes", self.bytes)
+        metrics.set_gauge(f"cache.{self.name}.entries", len(self._entries))
@@ -0,0 +1,348 @@
+"""
+Per-user history views maintained from the change feed.
+Each view document holds the newest items and running aggregates so the
+first history page and stats are a single point read.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+import structlog
+from azure.cosmos.exceptions import (
+    CosmosBatchOperationError,
+    CosmosHttpResponseError,
+    CosmosResourceNotFoundError,
+)
+from pydantic import ValidationError as PydanticValidationError
+
+from ..models.database import (
+    ContentSummary,
+    HistoryView,
+    HistoryViewMember,
+    history_member_id,
+    history_view_id,
+    summarize_content,
+)
+from ..utils.metrics import metrics
+from .change_feed import ContainerCall, direct_call
+from .content_repo import HISTORY_PROJECTION, collect
+from .partitioning import META_BUCKET, PartitionScheme
+
+logger = structlog.get_logger(__name__)
+
+WRITE_ATTEMPTS = 3
+# A transactional batch holds at most 100 operations: the view plus members
+MEMBERS_PER_WRITE = 99
+
+
+def _summary(item: dict[str, Any]) -> ContentSummary:
+    summary = ContentSummary(**item)
+    if summary.summary is None:
+        # Written before summaries were stored at write time
+        summary.summary = summarize_content(item.get("generatedContent") or {})
+    return summary
+
+
+def _sort_key(summary: ContentSummary) -> datetime:
+    created_at = summary.created_at
+    if created_at.tzinfo is None:
+        return created_at.replace(tzinfo=timezone.utc)
+    return created_at
+
+
+def _bump(counts: dict[str, int], key: str, delta: int) -> None:
+    value = counts.get(key, 0) + delta
+    if value > 0:
+        counts[key] = value
+    else:
+        counts.pop(key, None)
+
+
+def apply_changes(
+    view: HistoryView,
+    changes: list[dict[str, Any]],
+    size: int,
+    members: dict[str, list[str]],
+) -> bool:
+    """
+    Fold changed content documents into a view.
+
+    The change feed delivers the latest version of each document, possibly
+    more than once; membership tracking makes re-applying a change a no-op.
+
+    Args:
+        view: View to update in place
+        changes: Changed content documents of the view's user
+        size: Number of recent items to keep
+        members: [day, *platforms] counted for each changed item the view
+            already holds; updated in place
+
+    Returns:
+        True if the recent list lost items it can't rebuild from the changes
+        and needs a refill from the container
+    """
+    refill = False
+    for item in sorted(changes, key=lambda change: change.get("_ts", 0)):
+        content_id = item["id"]
+        live = item.get("deleted") is False
+
+        previous = members.pop(content_id, None)
+        if previous is not None:
+            day, *platforms = previous
+            view.total -= 1
+            _bump(view.daily_counts, day, -1)
+            for platform in platforms:
+                _bump(view.platform_counts, platform, -1)
+
+        was_recent = any(entry.id == content_id for entry in view.recent)
+        view.recent = [entry for entry in view.recent if entry.id != content_id]
+
+        if live:
+            summary = _summary(item)
+            day = _sort_key(summary).astimezone(timezone.utc).strftime("%Y-%m-%d")
+            members[content_id] = [day, *summary.platforms]
+            view.total += 1
+            _bump(view.daily_counts, day, 1)
+            for platform in summary.platforms:
+                _bump(view.platform_counts, platform, 1)
+            view.recent.append(summary)
+        elif was_recent:
+            refill = True
+
+    view.recent.sort(key=_sort_key, reverse=True)
+    del view.recent[size:]
+    return refill and view.total > len(view.recent)
+
+
+def trim_daily(view: HistoryView, days: int) -> None:
+    """
+    Drop per-day counts older than the last days UTC days.
+
+    Args:
+        view: View to update in place
+        days: Days to keep (0 keeps everything)
+    """
+    if days <= 0:
+        return
+    today = datetime.now(timezone.utc).date()
+    cutoff = (today - timedelta(days=days - 1)).isoformat()
+    old = [day for day in view.daily_counts if day < cutoff]
+    if not old:
+        return
+    for day in old:
+        del view.daily_counts[day]
+    view.daily_since = max(view.daily_since or cutoff, cutoff)
+
+
+class HistoryViewBuilder:
+    """Change feed handler that keeps per-user HistoryView documents current."""
+
+    def __init__(
+        self,
+        container,
+        recent_items: int = 50,
+        partitions: Optional[PartitionScheme] = None,
+        call: Optional[ContainerCall] = None,
+        daily_days: int = 0,
+    ):
+        """
+        Initialize the builder.
+
+        Args:
+            container: Async content container (views live next to content)
+            recent_items: Number of newest items each view keeps
+            partitions: Partition scheme of the container (default "user")
+            call: Runs each container call (the repository's paced call, so
+                throttled view updates are retried; direct if omitted)
+            daily_days: Days of per-day counts each view keeps (0 keeps all)
+        """
+        self.container = container
+        self.recent_items = recent_items
+        self.partitions = partitions or PartitionScheme()
+        self._call = call or direct_call
+        self.daily_days = daily_days
+
+    async def handle(self, changes: list[dict[str, Any]]) -> None:
+        """
+        Apply a page of changes, one view update per affected user.
+
+        Args:
+            changes: Changed documents from the change feed
+        """
+        by_user: dict[str, list[dict[str, Any]]] = {}
+        for item in changes:
+            # Counters, views and other bookkeeping documents carry a docType
+            if "docType" in item or "userId" not in item:
+                continue
+            by_user.setdefault(item["userId"], []).append(item)
+
+        for user_id, items in by_user.items():
+            for start in range(0, len(items), MEMBERS_PER_WRITE):
+                await self._update(user_id, items[start : start + MEMBERS_PER_WRITE])
+        metrics.increment("history_views.updated", len(by_user))
+
+    async def _update(self, user_id: str, items: list[dict[str, Any]]) -> None:
+        for _ in range(WRITE_ATTEMPTS):
+            view, etag, legacy = await self._read(user_id)
+            if legacy:
+                await self._store_members(user_id, legacy)
+            counted = await self._members(user_id, {item["id"] for item in items})
+            members = dict(counted)
+            try:
+                if apply_changes(view, items, self.recent_items, members):
+                    view.recent = await self._recent(user_id)
+            except PydanticValidationError as e:
+                logger.warning(
+                    "Skipping malformed change", user_id=user_id, error=str(e)
+                )
+                return
+            trim_daily(view, self.daily_days)
+            view.updated_at = datetime.now(timezone.utc)
+            if await self._write(view, etag, counted, members):
+                return
+        raise RuntimeError(f"History view for {user_id} kept changing; will retry")
+
+    async def _read(
+        self, user_id: str
+    ) -> tuple[HistoryView, Optional[str], dict[str, list[str]]]:
+        """Read a view, its ETag and any membership still kept inside it."""
+        try:
+            item = await self._call(
+                "view_read",
+                lambda **options: self.container.read_item(
+                    item=history_view_id(user_id),
+                    partition_key=self.partitions.key(user_id, META_BUCKET),
+                    **options,
+                ),
+            )
+            # Views written before membership moved to its own documents
+            return HistoryView(**item), item.get("_etag"), item.get("members") or {}
+        except CosmosResourceNotFoundError:
+            view = HistoryView(
+                id=history_view_id(user_id), partition_key=user_id, user_id=user_id
+            )
+            return view, None, {}
+
+    def _member_body(
+        self, user_id: str, content_id: str, entry: list[str]
+    ) -> dict[str, Any]:
+        day, *platforms = entry
+        member = HistoryViewMember(
+            id=history_member_id(user_id, content_id),
+            partition_key=user_id,
+            user_id=user_id,
+            content_id=content_id,
+            day=day,
+            platforms=platforms,
+        )
+        return self.partitions.stamp(
+            member.model_dump(mode="json", by_alias=True), META_BUCKET
+        )
+
+    async def _members(
+        self, user_id: str, content_ids: set[str]
+    ) -> dict[str, list[str]]:
+        """What the view currently counts for each of the given items."""
+        partition_key = self.partitions.key(user_id, META_BUCKET)
+
+        async def read(content_id: str) -> Optional[HistoryViewMember]:
+            try:
+                item = await self._call(
+                    "view_member_read",
+                    lambda **options: self.container.read_item(
+                        item=history_member_id(user_id, content_id),
+                        partition_key=partition_key,
+                        **options,
+                    ),
+                )
+            except CosmosResourceNotFoundError:
+                return None
+            return HistoryViewMember(**item)
+
+        found = await asyncio.gather(*(read(content_id) for content_id in content_ids))
+        return {
+            member.content_id: [member.day, *member.platforms]
+            for member in found
+            if member is not None
+        }
+
+    async def _store_members(self, user_id: str, members: dict[str, list[str]]) -> None:
+        """Move membership out of a legacy view; the next view write drops it."""
+        logger.info(
+            "Moving history view membership out of the view",
+            user_id=user_id,
+            members=len(members),
+        )
+        for content_id, entry in members.items():
+            body = self._member_body(user_id, content_id, entry)
+            await self._call(
+                "view_member_write",
+                lambda **options: self.container.upsert_item(body=body, **options),
+            )
+
+    async def _write(
+        self,
+        view: HistoryView,
+        etag: Optional[str],
+        counted: dict[str, list[str]],
+        members: dict[str, list[str]],
+    ) -> bool:
+        """
+        Write the view and the membership changes in one transactional batch.
+
+        Returns:
+            False if the view changed since it was read (or was created
+            concurrently), so the update has to be redone
+        """
+        body = self.partitions.stamp(
+            view.model_dump(mode="json", by_alias=True), META_BUCKET
+        )
+        operations: list[tuple] = (
+            [("create", (body,))]
+            if etag is None
+            else [("replace", (view.id, body), {"if_match_etag": etag})]
+        )
+        for content_id, entry in members.items():
+            if counted.get(content_id) != entry:
+                operations.append(
+                    ("upsert", (self._member_body(view.user_id, content_id, entry),))
+                )
+        for content_id in counted.keys() - members.keys():
+            operations.append(
+                ("delete", (history_member_id(view.user_id, content_id),))
+            )
+        try:
+            await self._call(
+                "view_write",
+                lambda **options: self.container.execute_item_batch(
+                    batch_operations=operations,
+                    partition_key=self.partitions.key(view.user_id, META_BUCKET),
+                    **options,
+                ),
+            )
+            return True
+        except (CosmosHttpResponseError, CosmosBatchOperationError) as e:
+            if e.status_code in (409, 412):
+                return False
+            raise
+
+    async def _recent(self, user_id: str) -> list[ContentSummary]:
+        items = await self._call(
+            "view_refill",
+            lambda **options: collect(
+                self.container.query_items(
+                    query=(
+                        f"SELECT TOP @top {HISTORY_PROJECTION} FROM c "
+                        "WHERE c.userId = @userId AND c.deleted = false "
+                        "ORDER BY c.createdAt DESC"
+                    ),
+                    parameters=[
+                        {"name": "@top", "value": self.recent_items},
+                        {"name": "@userId", "value": user_id},
+                    ],
+                    partition_key=self.partitions.prefix(user_id),
+                    **options,
+                )
+            ),
+        )
+        return [_summary(item) for item in items]
@@ -0,0 +1,80 @@
+"""
+Cosmos DB indexing policy for the content container.
+Mirrors infra/core/cosmos-indexing-policy.json, which provisions it; the
+repository compares the live policy against this one at startup.
+"""
+
+from typing import Any
+
+# generatedContent is never queried, so indexing it only adds write RU.
+# Composite indexes serve the history filters and sorts.
+INDEXING_POLICY: dict[str, Any] = {
+    "indexingMode": "consistent",
+    "automatic": True,
+    "includedPaths": [{"path": "/*"}],
+    "excludedPaths": [
+        {"path": "/generatedContent/*"},
+        {"path": '/"_etag"/?'},
+    ],
+    "compositeIndexes": [
+        [
+            {"path": "/userId", "order": "ascending"},
+            {"path": "/deleted", "order": "ascending"},
+            {"path": "/createdAt", "order": "descending"},
+        ],
+        [
+            {"path": "/userId", "order": "ascending"},
+            {"path": "/topic", "order": "ascending"},
+        ],
+    ],
+}
+
+
+def _paths(entries: list[dict[str, Any]]) -> set[str]:
+    return {entry["path"] for entry in entries}
+
+
+def _composites(indexes: list[list[dict[str, Any]]]) -> set[tuple]:
+    return {
+        tuple((part["path"], part.get("order", "ascending").lower()) for part in index)
+        for index in indexes
+    }
+
+
+def indexing_policy_drift(
+    actual: dict[str, Any], expected: dict[str, Any] = INDEXING_POLICY
+) -> list[str]:
+    """
+    Describe how a live indexing policy differs from the expected one.
+
+    Extra excluded paths or composite indexes on the container are not
+    drift; missing ones, re-included paths and a different mode are.
+
+    Args:
+        actual: Indexing policy read from the container
+        expected: Policy the application was built against
+
+    Returns:
+        Human-readable differences (empty if the policy matches)
+    """
+    drift = []
+    if actual.get("indexingMode", "").lower() != expected["indexingMode"]:
+        drift.append(
+            f"indexingMode is {actual.get('indexingMode')!r}, "
+            f"expected {expected['indexingMode']!r}"
+        )
+
+    missing_excluded = _paths(expected["excludedPaths"]) - _paths(
+        actual.get("excludedPaths", [])
+    )
+    for path in sorted(missing_excluded):
+        drift.append(f"path {path} is indexed but should be excluded")
+
+    missing_composites = _composites(expected["compositeIndexes"]) - _composites(
+        actual.get("compositeIndexes", [])
+    )
+    for index in sorted(missing_composites):
+        columns = ", ".join(f"{path} {order}" for path, order in index)
+        drift.append(f"composite index ({columns}) is missing")
+
+    return drift
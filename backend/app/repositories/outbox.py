@@ -0,0 +1,543 @@
+"""
+Write-behind persistence through a durable local outbox.
+With write-behind enabled, creating content appends the document to a local
+SQLite outbox (fsynced before create returns) instead of waiting for the
+database. A background flusher writes due entries with bulk_create and
+retries failures with exponential backoff, so a finished generation survives
+database latency and outages. Until an entry is confirmed, reads of its
+content are answered from the outbox.
+
+The outbox is local to the replica: other replicas see new content once it
+is flushed (one flush interval when the database is healthy), and the path
+must be on a volume that outlives the container.
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+import uuid
+import aiosqlite
+import structlog
+
+from ..config import Settings
+from ..models.database import (
+    ContentDocument,
+    ContentQueryResult,
+    ContentSummary,
+    HistoryView,
+    UserContentCounts,
+    counter_document_id,
+)
+from ..utils.deadline import Deadline
+from ..utils.exceptions import DatabaseError
+from ..utils.metrics import metrics
+from .content_layout import select_outputs
+
+logger = structlog.get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    body TEXT NOT NULL,
+    queued_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    PRIMARY KEY (user_id, id)
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (next_attempt);
+"""
+
+# Bulk statuses that mean the document is in the database: a 409 is a
+# retry of a write that succeeded after its response was lost
+CONFIRMED = ("succeeded", "conflict")
+
+OutboxKey = tuple[str, str]
+
+
+# Seconds the final flush may take on shutdown
+SHUTDOWN_FLUSH_SECONDS = 5.0
+
+
+def _utc(value: datetime) -> datetime:
+    """Comparable UTC timestamp (naive values are taken as UTC)."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class ContentOutbox:
+    """Durable queue of documents waiting to be written to the database."""
+
+    def __init__(self, path: str):
+        """
+        Initialize outbox.
+
+        Args:
+            path: SQLite file holding queued documents
+        """
+        self.path = path
+        self._connection: Optional[aiosqlite.Connection] = None
+
+    async def open(self) -> list[ContentDocument]:
+        """
+        Open the outbox file.
+
+        Returns:
+            Documents still queued from earlier runs, oldest first
+        """
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        connection = await aiosqlite.connect(self.path, isolation_level=None)
+        # Every append is on disk before create returns
+        await connection.execute("PRAGMA journal_mode = WAL")
+        await connection.execute("PRAGMA synchronous = FULL")
+        await connection.executescript(SCHEMA)
+        self._connection = connection
+        async with connection.execute(
+            "SELECT body FROM outbox ORDER BY queued_at"
+        ) as rows:
+            return [
+                ContentDocument(**json.loads(row[0])) for row in await rows.fetchall()
+            ]
+
+    async def close(self) -> None:
+        """Close the outbox file."""
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    async def put(self, document: ContentDocument) -> None:
+        """Append a document, replacing a queued copy with the same id."""
+        body = json.dumps(document.model_dump(mode="json", by_alias=True))
+        await self._connection.execute(
+            "INSERT OR REPLACE INTO outbox (user_id, id, body, queued_at) "
+            "VALUES (?, ?, ?, ?)",
+            (document.partition_key, document.id, body, time.time()),
+        )
+
+    async def due(self, limit: int) -> list[OutboxKey]:
+        """Keys of entries whose next attempt is due, oldest first."""
+        async with self._connection.execute(
+            "SELECT user_id, id FROM outbox WHERE next_attempt <= ? "
+            "ORDER BY queued_at LIMIT ?",
+            (time.time(), limit),
+        ) as rows:
+            return [(row[0], row[1]) for row in await rows.fetchall()]
+
+    async def confirm(self, keys: list[OutboxKey]) -> None:
+        """Drop entries the database has accepted."""
+        await self._connection.executemany(
+            "DELETE FROM outbox WHERE user_id = ? AND id = ?", keys
+        )
+
+    async def defer(self, key: OutboxKey, error: str, max_backoff: float) -> float:
+        """
+        Schedule another attempt for an entry that failed to write.
+
+        Returns:
+            Seconds until the next attempt
+        """
+        async with self._connection.execute(
+            "SELECT attempts FROM outbox WHERE user_id = ? AND id = ?", key
+        ) as rows:
+            row = await rows.fetchone()
+        attempts = (row[0] if row else 0) + 1
+        delay = min(max_backoff, 0.5 * 2 ** (attempts - 1))
+        await self._connection.execute(
+            "UPDATE outbox SET attempts = ?, next_attempt = ?, last_error = ? "
+            "WHERE user_id = ? AND id = ?",
+            (attempts, time.time() + delay, error, *key),
+        )
+        return delay
+
+
+class WriteBehindRepository:
+    """Content repository decorator that queues creates in a ContentOutbox.
+
+    Creates return once the document is in the outbox. Reads merge queued
+    documents into results; changes to a queued document flush it first.
+    Everything else is delegated to the wrapped repository.
+    """
+
+    def __init__(self, repository: Any, outbox: ContentOutbox, settings: Settings):
+        """
+        Initialize write-behind repository.
+
+        Args:
+            repository: Repository documents are flushed to
+            outbox: Durable queue of unflushed documents
+            settings: Application settings (flush interval, batch, backoff)
+        """
+        self.repository = repository
+        self.outbox = outbox
+        self.settings = settings
+        self._pending: dict[OutboxKey, ContentDocument] = {}
+        self._flush_lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.repository, name)
+
+    async def open(self) -> None:
+        """Open the outbox and queue what earlier runs left unflushed."""
+        for document in await self.outbox.open():
+            self._pending[(document.partition_key, document.id)] = document
+        self._publish()
+        if self._pending:
+            logger.info("Outbox has unflushed content", documents=len(self._pending))
+            self._wake.set()
+
+    async def close(self) -> None:
+        """Flush what the database accepts, then close outbox and repository."""
+        try:
+            await asyncio.wait_for(self.flush(), SHUTDOWN_FLUSH_SECONDS)
+        except Exception as e:
+            logger.warning("Final outbox flush incomplete", error=str(e))
+        await self.outbox.close()
+        await self.repository.close()
+
+    def _publish(self) -> None:
+        metrics.set_gauge("outbox.pending", len(self._pending))
+
+    # Writes
+
+    async def create(
+        self, document: ContentDocument, deadline: Optional[Deadline] = None
+    ) -> ContentDocument:
+        """
+        Queue a new document for writing.
+
+        Args:
+            document: Content document to create
+            deadline: Unused; the local append does not wait on the database
+
+        Returns:
+            The document as queued
+
+        Raises:
+            DatabaseError: If the outbox cannot be written
+        """
+        if not document.id:
+            document.id = str(uuid.uuid4())
+        now = datetime.now(timezone.utc)
+        if not document.created_at:
+            document.created_at = now
+        document.updated_at = now
+        try:
+            await self.outbox.put(document)
+        except Exception as e:
+            logger.error("Outbox append failed", error=str(e))
+            raise DatabaseError(f"Unable to queue document: {str(e)}")
+        self._pending[(document.partition_key, document.id)] = document.model_copy()
+        metrics.increment("outbox.queued")
+        self._publish()
+        self._wake.set()
+        return document
+
+    async def flush(self, keys: Optional[list[OutboxKey]] = None) -> int:
+        """
+        Write queued documents to the database.
+
+        Args:
+            keys: Entries to write now regardless of backoff; by default every
+                due entry is written, write_behind_batch_size at a time
+
+        Returns:
+            Number of documents confirmed
+        """
+        confirmed = 0
+        async with self._flush_lock:
+            while True:
+                batch = (
+                    await self.outbox.due(self.settings.write_behind_batch_size)
+                    if keys is None
+                    else keys
+                )
+                batch = [key for key in batch if key in self._pending]
+                if not batch:
+                    break
+                written = await self._write(batch)
+                confirmed += written
+                if keys is not None or written < len(batch):
+                    break
+        return confirmed
+
+    async def _write(self, batch: list[OutboxKey]) -> int:
+        documents = [self._pending[key].model_copy() for key in batch]
+        try:
+            results = await self.repository.bulk_create(documents)
+        except Exception as e:
+            results = [
+                {"id": document.id, "status": "failed", "error": str(e)}
+                for document in documents
+            ]
+        done = [
+            key for key, result in zip(batch, results) if result["status"] in CONFIRMED
+        ]
+        await self.outbox.confirm(done)
+        for key in done:
+            self._pending.pop(key, None)
+        for key, result in zip(batch, results):
+            if result["status"] not in CONFIRMED:
+                delay = await self.outbox.defer(
+                    key,
+                    result.get("error") or result["status"],
+                    self.settings.write_behind_max_backoff,
+                )
+                logger.warning(
+                    "Outbox write failed",
+                    content_id=key[1],
+                    error=result.get("error"),
+                    retry_in=delay,
+                )
+        metrics.increment("outbox.flushed", len(done))
+        metrics.increment("outbox.flush_failed", len(batch) - len(done))
+        self._publish()
+        return len(done)
+
+    async def run(self) -> None:
+        """Flush due entries until cancelled (started from the lifespan)."""
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._wake.wait(), self.settings.write_behind_flush_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error("Outbox flush failed", error=str(e))
+
+    async def _flush_pending(self, user_id: str, content_ids: list[str]) -> None:
+        """Write queued documents before they are changed in the database."""
+        keys = [(user_id, content_id) for content_id in content_ids]
+        keys = [key for key in keys if key in self._pending]
+        if not keys:
+            return
+        await self.flush(keys)
+        unwritten = [
+            content_id
+            for _, content_id in keys
+            if (user_id, content_id) in self._pending
+        ]
+        if unwritten:
+            raise DatabaseError(
+                f"Content {', '.join(unwritten)} is not yet written to the database"
+            )
+
+    async def delete(self, content_id: str, user_id: str, *args, **kwargs) -> None:
+        """Soft delete content, writing it first if still queued."""
+        await self._flush_pending(user_id, [content_id])
+        await self.repository.delete(content_id, user_id, *args, **kwargs)
+
+    async def patch(self, content_id: str, user_id: str, *args, **kwargs):
+        """Partially update content, writing it first if still queued."""
+        await self._flush_pending(user_id, [content_id])
+        return await self.repository.patch(content_id, user_id, *args, **kwargs)
+
+    async def update_platform_output(
+        self, content_id: str, user_id: str, *args, **kwargs
+    ):
+        """Replace one platform output, writing the content first if queued."""
+        await self._flush_pending(user_id, [content_id])
+        return await self.repository.update_platform_output(
+            content_id, user_id, *args, **kwargs
+        )
+
+    async def mark_version(self, content_id: str, user_id: str, *args, **kwargs):
+        """Record a version marker, writing the content first if queued."""
+        await self._flush_pending(user_id, [content_id])
+        return await self.repository.mark_version(content_id, user_id, *args, **kwargs)
+
+    async def bulk_set_deleted(
+        self, user_id: str, content_ids: list[str], *args, **kwargs
+    ) -> list[dict[str, Any]]:
+        """Soft delete or restore many documents, writing queued ones first."""
+        await self._flush_pending(user_id, content_ids)
+        return await self.repository.bulk_set_deleted(
+            user_id, content_ids, *args, **kwargs
+        )
+
+    # Reads
+
+    @staticmethod
+    def _summary(document: ContentDocument) -> ContentSummary:
+        return ContentSummary.model_validate(document.model_dump(by_alias=True))
+
+    def _queued(
+        self,
+        user_id: str,
+        platform: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> list[ContentDocument]:
+        """Queued documents of a user matching history filters."""
+        return [
+            document
+            for (owner, _), document in self._pending.items()
+            if owner == user_id
+            and (platform is None or platform in document.platforms)
+            and (start_date is None or _utc(document.created_at) >= _utc(start_date))
+            and (end_date is None or _utc(document.created_at) <= _utc(end_date))
+        ]
+
+    async def get_by_id(
+        self,
+        content_id: str,
+        user_id: str,
+        deadline: Optional[Deadline] = None,
+        inflate: bool = True,
+        platform: Optional[str] = None,
+    ) -> ContentDocument:
+        """Retrieve content by ID, from the outbox while it is queued."""
+        queued = self._pending.get((user_id, content_id))
+        if queued is not None:
+            metrics.increment("outbox.reads")
+            document = queued.model_copy(deep=True)
+            if platform:
+                document.generated_content = select_outputs(
+                    document.generated_content, [platform], notes=False
+                )
+            return document
+        return await self.repository.get_by_id(
+            content_id, user_id, deadline=deadline, inflate=inflate, platform=platform
+        )
+
+    async def list_documents(
+        self, user_id: str, deadline: Optional[Deadline] = None
+    ) -> list[ContentDocument]:
+        """Every live document of a user, queued ones included."""
+        stored = await self.repository.list_documents(user_id, deadline=deadline)
+        queued = self._queued(user_id)
+        ids = {document.id for document in queued}
+        return queued + [document for document in stored if document.id not in ids]
+
+    async def list_changed(
+        self, user_id: str, since: float, deadline: Optional[Deadline] = None
+    ) -> tuple[list[ContentDocument], list[str]]:
+        """Documents written since a point in time, queued ones included."""
+        stored, removed = await self.repository.list_changed(
+            user_id, since, deadline=deadline
+        )
+        queued = self._queued(user_id)
+        ids = {document.id for document in queued}
+        return (
+            queued + [document for document in stored if document.id not in ids],
+            removed,
+        )
+
+    async def query_by_user(self, user_id: str, **kwargs) -> ContentQueryResult:
+        """
+        Query history; the first page also lists matching queued content.
+
+        Queued items are added to the page rather than displacing stored
+        ones, so the continuation cursor still covers everything stored.
+        """
+        result = await self.repository.query_by_user(user_id, **kwargs)
+        if kwargs.get("cursor") or kwargs.get("offset"):
+            return result
+        queued = self._queued(
+            user_id,
+            kwargs.get("platform"),
+            kwargs.get("start_date"),
+            kwargs.get("end_date"),
+        )
+        stored = {document.id for document in result.documents}
+        extra = [
+            self._summary(document) for document in queued if document.id not in stored
+        ]
+        if not extra:
+            return result
+        documents = result.documents + extra
+        if kwargs.get("sort_by", "date") == "date":
+            documents.sort(
+                key=lambda document: _utc(document.created_at),
+                reverse=kwargs.get("order", "desc").lower() == "desc",
+            )
+        else:
+            documents.sort(
+                key=lambda document: document.topic,
+                reverse=kwargs.get("order", "desc").lower() == "desc",
+            )
+        return ContentQueryResult(
+            documents=documents,
+            count=len(documents),
+            continuation_token=result.continuation_token,
+        )
+
+    async def count_by_day(
+        self,
+        user_id: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        platform: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> dict[str, int]:
+        """Per-day counts of stored and queued content."""
+        counts = await self.repository.count_by_day(
+            user_id,
+            start_date=start_date,
+            end_date=end_date,
+            platform=platform,
+            deadline=deadline,
+        )
+        for document in self._queued(user_id, platform, start_date, end_date):
+            day = _utc(document.created_at).date().isoformat()
+            counts[day] = counts.get(day, 0) + 1
+        return counts
+
+    async def get_history_view(
+        self, user_id: str, deadline: Optional[Deadline] = None
+    ) -> Optional[HistoryView]:
+        """
+        Read a user's history view with queued content folded in.
+
+        The view is built from the change feed, which only sees content once
+        it is flushed; until then queued documents are added here.
+        """
+        view = await self.repository.get_history_view(user_id, deadline=deadline)
+        queued = self._queued(user_id)
+        if view is None or not queued:
+            return view
+        listed = {entry.id for entry in view.recent}
+        queued = [document for document in queued if document.id not in listed]
+        for document in queued:
+            day = _utc(document.created_at).date().isoformat()
+            view.daily_counts[day] = view.daily_counts.get(day, 0) + 1
+            for platform in document.platforms:
+                view.platform_counts[platform] = (
+                    view.platform_counts.get(platform, 0) + 1
+                )
+        view.total += len(queued)
+        view.recent = sorted(
+            view.recent + [self._summary(document) for document in queued],
+            key=lambda entry: _utc(entry.created_at),
+            reverse=True,
+        )[: self.settings.history_view_recent_items]
+        return view
+
+    async def get_counts(
+        self, user_id: str, deadline: Optional[Deadline] = None
+    ) -> Optional[UserContentCounts]:
+        """Read a user's content counters with queued content added."""
+        counts = await self.repository.get_counts(user_id, deadline=deadline)
+        queued = self._queued(user_id)
+        if not queued:
+            return counts
+        if counts is None:
+            counts = UserContentCounts(
+                id=counter_document_id(user_id),
+                partition_key=user_id,
+                user_id=user_id,
+            )
+        counts.total += len(queued)
+        for document in queued:
+            for platform in document.platforms:
+                counts.platforms[platform] = counts.platforms.get(platform, 0) + 1
+        return counts
@@ -0,0 +1,82 @@
+"""
+Opaque pagination cursors.
+Wraps a backend continuation token (and optionally a keyset position)
+together with a fingerprint of the query it belongs to, so a cursor cannot
+be replayed against other filters.
+"""
+
+import base64
+import hashlib
+import json
+from typing import Any, Optional
+
+from ..utils.exceptions import InvalidCursorError
+
+
+def query_fingerprint(*parts: Any) -> str:
+    """
+    Short stable hash of the parameters that define a result set.
+
+    Args:
+        parts: Query text, parameters, filters and sort options
+
+    Returns:
+        Hex fingerprint
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:12]
+
+
+def encode_cursor(
+    token: Optional[str], fingerprint: str, after: Optional[str] = None
+) -> Optional[str]:
+    """
+    Encode a continuation token as an opaque URL-safe cursor.
+
+    Args:
+        token: Backend continuation token (None at the end of results, or
+            when the next page starts from a keyset position)
+        fingerprint: Fingerprint of the query the token belongs to
+        after: Optional keyset position (sort value) the query resumes after;
+            carried along because continuation tokens are tied to the query
+
+    Returns:
+        Cursor string, or None if there are no more results
+    """
+    if not token and after is None:
+        return None
+    if token is None and after is not None:
+        payload = {"a": after, "q": fingerprint}
+    else:
+        payload = {"t": token, "q": fingerprint, "a": after}
+    data = json.dumps(payload, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, fingerprint: str) -> tuple[Optional[str], Optional[str]]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor from a previous page
+        fingerprint: Fingerprint of the current query
+
+    Returns:
+        (continuation token, keyset position); either may be None
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or was issued for a
+            different query
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        token, after, issued_for = payload.get("t"), payload.get("a"), payload["q"]
+    except (ValueError, KeyError, TypeError, AttributeError):
+        raise InvalidCursorError("Malformed pagination cursor")
+
+    if issued_for != fingerprint:
+        raise InvalidCursorError("Pagination cursor does not match this query")
+    if token is None and after is None:
+        raise InvalidCursorError("Malformed pagination cursor")
+    return token, after
@@ -0,0 +1,111 @@
+"""
+Partition key layout of the content container.
+"user" partitions on /partitionKey (the user id). "user_month" adds a
+second level, /partitionMonth (YYYY-MM of createdAt), so a heavy user's
+content spreads over several physical partitions and past the 20 GB
+logical partition limit; per-user queries pass the user alone as a key
+prefix and still only reach that user's partitions.
+"""
+
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Optional, Union
+
+PARTITION_SCHEMES = ("user", "user_month")
+MONTH_FIELD = "partitionMonth"
+# Second-level key of per-user bookkeeping documents (counters, views)
+META_BUCKET = "meta"
+
+PartitionKeyValue = Union[str, list[str]]
+
+
+def month_bucket(created_at: Union[datetime, str]) -> str:
+    """
+    Month bucket of a creation time.
+
+    Args:
+        created_at: Datetime (naive means UTC) or ISO 8601 string
+
+    Returns:
+        "YYYY-MM" in UTC
+    """
+    if isinstance(created_at, str):
+        created_at = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc)
+    return created_at.strftime("%Y-%m")
+
+
+class PartitionScheme:
+    """Builds partition key values and stamps bucket fields for a scheme."""
+
+    def __init__(self, scheme: str = "user", lookup_cache_size: int = 10000):
+        """
+        Initialize the scheme.
+
+        Args:
+            scheme: "user" or "user_month"
+            lookup_cache_size: Content ids whose month bucket is remembered
+
+        Raises:
+            ValueError: If the scheme is unknown
+        """
+        if scheme not in PARTITION_SCHEMES:
+            raise ValueError(f"Unknown partition scheme {scheme!r}")
+        self.scheme = scheme
+        self.hierarchical = scheme == "user_month"
+        self._buckets: OrderedDict[tuple[str, str], str] = OrderedDict()
+        self._lookup_cache_size = lookup_cache_size
+
+    @property
+    def paths(self) -> list[str]:
+        """Partition key paths of the container definition."""
+        if self.hierarchical:
+            return ["/partitionKey", f"/{MONTH_FIELD}"]
+        return ["/partitionKey"]
+
+    def key(self, user_id: str, bucket: Optional[str] = None) -> PartitionKeyValue:
+        """
+        Full partition key of a document.
+
+        Args:
+            user_id: User identifier
+            bucket: Month bucket or META_BUCKET (ignored by the "user" scheme)
+
+        Returns:
+            Value for the SDK's partition_key argument
+        """
+        if self.hierarchical:
+            return [user_id, bucket or META_BUCKET]
+        return user_id
+
+    def prefix(self, user_id: str) -> PartitionKeyValue:
+        """Partition key (prefix) scoping a query to one user."""
+        return [user_id] if self.hierarchical else user_id
+
+    def stamp(self, body: dict[str, Any], bucket: str) -> dict[str, Any]:
+        """
+        Add the second-level key field to a document body.
+
+        Args:
+            body: Document as written to Cosmos (modified in place)
+            bucket: Month bucket or META_BUCKET
+
+        Returns:
+            The body
+        """
+        if self.hierarchical:
+            body[MONTH_FIELD] = bucket
+        return body
+
+    def remember(self, user_id: str, content_id: str, bucket: str) -> None:
+        """Cache the bucket of a content document (buckets never change)."""
+        key = (user_id, content_id)
+        self._buckets[key] = bucket
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self._lookup_cache_size:
+            self._buckets.popitem(last=False)
+
+    def remembered(self, user_id: str, content_id: str) -> Optional[str]:
+        """Cached bucket of a content document, if known."""
+        return self._buckets.get((user_id, content_id))
@@ -0,0 +1,1123 @@
+"""
+SQLite content repository for single-node and offline deployments.
+Implements the ContentRepository interface on a local database file in
+WAL mode: one writer connection serialised by a lock, one reader
+connection, and indexes matching the history access paths.
+"""
+
+import asyncio
+import json
+import sqlite3
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional, Union
+import aiosqlite
+import structlog
+
+from ..config import Settings
+from ..models.database import (
+    ContentDocument,
+    ContentQueryResult,
+    ContentSummary,
+    HistoryView,
+    UserContentCounts,
+    counter_document_id,
+)
+from ..utils.deadline import Deadline
+from ..utils.exceptions import (
+    ConcurrencyConflictError,
+    ContentNotFoundError,
+    DatabaseError,
+    DeadlineExceededError,
+    InvalidCursorError,
+)
+from ..utils.metrics import metrics
+from .blob_store import BlobNotFoundError
+from .content_codec import ContentCodec, is_encoded
+from .content_layout import select_outputs
+from .content_repo import bulk_result
+from .pagination import decode_cursor, encode_cursor, query_fingerprint
+
+logger = structlog.get_logger(__name__)
+
+SCHEMA_VERSION = 1
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS content (
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    platforms TEXT NOT NULL,
+    summary TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT,
+    deleted INTEGER NOT NULL DEFAULT 0,
+    purge_at REAL,
+    etag TEXT NOT NULL,
+    body TEXT NOT NULL,
+    UNIQUE (user_id, id)
+);
+CREATE INDEX IF NOT EXISTS content_user_created
+    ON content (user_id, deleted, created_at);
+CREATE INDEX IF NOT EXISTS content_user_topic
+    ON content (user_id, deleted, topic);
+CREATE INDEX IF NOT EXISTS content_purge
+    ON content (purge_at) WHERE purge_at IS NOT NULL;
+"""
+
+# List fields only; the body is never read for history pages
+SUMMARY_COLUMNS = "id, user_id, topic, platforms, summary, created_at"
+
+
+def _timestamp(value: Union[datetime, str]) -> str:
+    """Normalise a timestamp to fixed-width UTC ISO 8601 so text order is time order."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+def _new_etag() -> str:
+    return f'"{uuid.uuid4()}"'
+
+
+def _cursor_position(
+    cursor: str, fingerprint: str, sort_by: str, descending: bool
+) -> Optional[list[str]]:
+    """Decode a history cursor into the (sort value, id) to seek past."""
+    token, after = decode_cursor(cursor, fingerprint)
+    if after is not None:
+        if sort_by != "date":
+            raise InvalidCursorError("Keyset cursors require sort_by=date")
+        return [_timestamp(after), "" if descending else "\U0010ffff"]
+    if token is None:
+        return None
+    try:
+        return json.loads(token)
+    except ValueError:
+        raise InvalidCursorError("Malformed pagination cursor")
+
+
+def _summary(row: sqlite3.Row) -> ContentSummary:
+    """Build a ContentSummary from a SUMMARY_COLUMNS row."""
+    return ContentSummary(
+        id=row["id"],
+        partitionKey=row["user_id"],
+        userId=row["user_id"],
+        topic=row["topic"],
+        platforms=json.loads(row["platforms"]),
+        summary=row["summary"],
+        createdAt=row["created_at"],
+    )
+
+
+def _apply_operation(document: dict[str, Any], operation: dict[str, Any]) -> None:
+    """Apply one Cosmos-style patch operation (set/add/replace/remove/incr)."""
+    *parents, leaf = operation["path"].strip("/").split("/")
+    target = document
+    for name in parents:
+        target = target.setdefault(name, {})
+    op = operation["op"]
+    if op in ("set", "add"):
+        target[leaf] = operation["value"]
+    elif op == "replace":
+        if leaf not in target:
+            raise DatabaseError(f"Patch path {operation['path']} does not exist")
+        target[leaf] = operation["value"]
+    elif op == "remove":
+        target.pop(leaf, None)
+    elif op == "incr":
+        target[leaf] = target.get(leaf, 0) + operation["value"]
+    else:
+        raise DatabaseError(f"Unsupported patch operation {op}")
+
+
+class SQLiteContentRepository:
+    """Content repository backed by a local SQLite database."""
+
+    def __init__(self, settings: Settings, path: Optional[str] = None):
+        """
+        Initialize the repository (connections open on warm_up or first use).
+
+        Args:
+            settings: Application settings
+            path: Database file (defaults to settings.sqlite_path; ":memory:"
+                shares one connection for reads and writes)
+        """
+        self.settings = settings
+        self.path = path or settings.sqlite_path
+        # No change feed: history views and their processor are Cosmos-only
+        self.database = None
+        self.codec = ContentCodec.from_settings(settings)
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._reader: Optional[aiosqlite.Connection] = None
+        self._write_lock = asyncio.Lock()
+        self._open_lock = asyncio.Lock()
+
+    async def _open(self, readonly: bool = False) -> aiosqlite.Connection:
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        connection = await aiosqlite.connect(
+            self.path, isolation_level=None, cached_statements=256
+        )
+        connection.row_factory = sqlite3.Row
+        await connection.execute("PRAGMA busy_timeout = 5000")
+        if not readonly:
+            await connection.execute("PRAGMA journal_mode = WAL")
+            await connection.execute("PRAGMA synchronous = NORMAL")
+        return connection
+
+    async def _connections(self) -> tuple[aiosqlite.Connection, aiosqlite.Connection]:
+        if self._writer is None:
+            async with self._open_lock:
+                if self._writer is None:
+                    writer = await self._open()
+                    await writer.executescript(SCHEMA)
+                    await writer.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                    self._reader = (
+                        writer if self.path == ":memory:" else await self._open(True)
+                    )
+                    self._writer = writer
+        return self._writer, self._reader
+
+    async def _bounded(self, coro, deadline: Optional[Deadline], stage: str):
+        """Run a database call within the request deadline."""
+        if deadline is None:
+            return await coro
+        try:
+            deadline.check(stage)
+        except DeadlineExceededError:
+            coro.close()
+            raise
+        try:
+            return await asyncio.wait_for(coro, deadline.timeout())
+        except asyncio.TimeoutError:
+            raise DeadlineExceededError(f"Request deadline reached {stage}")
+
+    async def _transaction(
+        self,
+        work: Callable[[aiosqlite.Connection], Awaitable[Any]],
+        deadline: Optional[Deadline],
+        stage: str,
+    ) -> Any:
+        """
+        Run work in one write transaction on the shared writer connection.
+
+        The deadline is checked before the write lock is taken and again
+        once it is held; after that the transaction runs to COMMIT or
+        ROLLBACK even if the caller is cancelled or times out. Cancelling it
+        partway would leave the connection inside an open transaction, and
+        a timeout during COMMIT would report a failure for a committed write.
+
+        Args:
+            work: Coroutine function running statements on the connection
+            deadline: Optional request deadline checked before starting
+            stage: Description used in deadline errors
+
+        Returns:
+            Whatever work returns
+
+        Raises:
+            DeadlineExceededError: If the deadline passes before the start
+        """
+        if deadline is not None:
+            deadline.check(stage)
+        writer, _ = await self._connections()
+        await self._write_lock.acquire()
+        try:
+            if deadline is not None:
+                deadline.check(stage)
+        except DeadlineExceededError:
+            self._write_lock.release()
+            raise
+        return await asyncio.shield(
+            asyncio.ensure_future(self._run_transaction(writer, work))
+        )
+
+    async def _run_transaction(
+        self,
+        writer: aiosqlite.Connection,
+        work: Callable[[aiosqlite.Connection], Awaitable[Any]],
+    ) -> Any:
+        """Body of _transaction; releases the write lock when done."""
+        try:
+            try:
+                await writer.execute("BEGIN IMMEDIATE")
+                result = await work(writer)
+                await writer.execute("COMMIT")
+                return result
+            except BaseException:
+                if writer.in_transaction:
+                    await writer.execute("ROLLBACK")
+                raise
+        finally:
+            self._write_lock.release()
+
+    async def warm_up(self) -> None:
+        """
+        Open the connections and create the schema.
+
+        Raises:
+            DatabaseError: If the database cannot be opened
+        """
+        try:
+            await self._connections()
+        except Exception as e:
+            raise DatabaseError(f"SQLite warm-up failed: {str(e)}")
+        logger.info("SQLite repository ready", path=self.path)
+
+    async def verify_indexing_policy(self, mode: Optional[str] = None) -> list[str]:
+        """Cosmos-only check; the SQLite schema carries its own indexes."""
+        return []
+
+    async def close(self) -> None:
+        """Close the database connections."""
+        reader, writer = self._reader, self._writer
+        self._reader = self._writer = None
+        if reader is not None and reader is not writer:
+            await reader.close()
+        if writer is not None:
+            await writer.close()
+
+    # Reads
+
+    @staticmethod
+    def _document(row: sqlite3.Row) -> ContentDocument:
+        return ContentDocument(**{**json.loads(row["body"]), "_etag": row["etag"]})
+
+    async def _fetch_row(self, content_id: str, user_id: str) -> Optional[sqlite3.Row]:
+        _, reader = await self._connections()
+        async with reader.execute(
+            "SELECT body, etag, deleted FROM content WHERE user_id = ? AND id = ?",
+            (user_id, content_id),
+        ) as cursor:
+            return await cursor.fetchone()
+
+    async def get_by_id(
+        self,
+        content_id: str,
+        user_id: str,
+        deadline: Optional[Deadline] = None,
+        inflate: bool = True,
+        platform: Optional[str] = None,
+    ) -> ContentDocument:
+        """
+        Retrieve content by ID.
+
+        Args:
+            content_id: Content identifier
+            user_id: User identifier
+            deadline: Optional request deadline bounding the call
+            inflate: Decode compressed and offloaded bodies
+            platform: Only return this platform's output (others are left out)
+
+        Returns:
+            Content document
+
+        Raises:
+            ContentNotFoundError: If content doesn't exist or is deleted
+            DatabaseError: If retrieval fails
+            DeadlineExceededError: If the deadline passes first
+        """
+        try:
+            row = await self._bounded(
+                self._fetch_row(content_id, user_id), deadline, "reading document"
+            )
+        except DeadlineExceededError:
+            raise
+        except Exception as e:
+            logger.error("Unexpected error getting document", error=str(e))
+            raise DatabaseError(f"Unexpected error getting document: {str(e)}")
+        if row is None or row["deleted"]:
+            raise ContentNotFoundError(f"Content {content_id} not found")
+        document = self._document(row)
+        if not inflate:
+            return document
+        document = await self.inflate(document)
+        if platform:
+            document.generated_content = select_outputs(
+                document.generated_content, [platform], notes=False
+            )
+        return document
+
+    async def inflate(self, document: ContentDocument) -> ContentDocument:
+        """
+        Decode compressed and offloaded fields of a stored document.
+
+        Args:
+            document: Document as stored (modified in place)
+
+        Returns:
+            The document with plain generated_content
+
+        Raises:
+            DatabaseError: If an offloaded body is missing or unreadable
+        """
+        if not is_encoded(document.generated_content):
+            return document
+        try:
+            document.generated_content = await self.codec.decode(
+                document.generated_content
+            )
+        except BlobNotFoundError as e:
+            raise DatabaseError(f"Offloaded content body {e} missing")
+        except Exception as e:
+            raise DatabaseError(f"Unable to decode content {document.id}: {str(e)}")
+        return document
+
+    async def list_documents(
+        self, user_id: str, deadline: Optional[Deadline] = None
+    ) -> list[ContentDocument]:
+        """
+        Read every live document of a user with bodies inflated.
+
+        Args:
+            user_id: User identifier
+            deadline: Optional request deadline bounding the call
+
+        Returns:
+            Content documents
+
+        Raises:
+            DatabaseError: If the read fails
+            DeadlineExceededError: If the deadline passes first
+        """
+
+        async def run() -> list[sqlite3.Row]:
+            _, reader = await self._connections()
+            async with reader.execute(
+                "SELECT body, etag FROM content WHERE user_id = ? AND deleted = 0",
+                (user_id,),
+            ) as cursor:
+                return await cursor.fetchall()
+
+        try:
+            rows = await self._bounded(run(), deadline, "listing documents")
+        except DeadlineExceededError:
+            raise
+        except Exception as e:
+            logger.error("Unexpected error listing documents", error=str(e))
+            raise DatabaseError(f"Unexpected error listing documents: {str(e)}")
+        return [await self.inflate(self._document(row)) for row in rows]
+
+    async def list_changed(
+        self, user_id: str, since: float, deadline: Optional[Deadline] = None
+    ) -> tuple[list[ContentDocument], list[str]]:
+        """
+        Read a user's documents written since a point in time.
+
+        Args:
+            user_id: User identifier
+            since: Epoch seconds; documents updated at or after it are read
+            deadline: Optional request deadline bounding the call
+
+        Returns:
+            Changed live documents (inflated) and the ids of deleted ones
+
+        Raises:
+            DatabaseError: If the read fails
+            DeadlineExceededError: If the deadline passes first
+        """
+
+        async def run() -> list[sqlite3.Row]:
+            _, reader = await self._connections()
+            # updatedAt is written in more than one ISO form; julianday reads all
+            async with reader.execute(
+                "SELECT id, body, etag, deleted FROM content WHERE user_id = ? "
+                "AND (julianday(updated_at) - 2440587.5) * 86400.0 >= ?",
+                (user_id, since),
+            ) as cursor:
+                return await cursor.fetchall()
+
+        try:
+            rows = await self._bounded(run(), deadline, "listing changes")
+        except DeadlineExceededError:
+            raise
+        except Exception as e:
+            logger.error("Unexpected error listing changes", error=str(e))
+            raise DatabaseError(f"Unexpected error listing changes: {str(e)}")
+        documents = [
+            await self.inflate(self._document(row))
+            for row in rows
+            if not row["deleted"]
+        ]
+        return documents, [row["id"] for row in rows if row["deleted"]]
+
+    @staticmethod
+    def _history_filters(
+        user_id: str,
+        platform: Optional[str],
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+    ) -> tuple[str, list[Any]]:
+        """WHERE clause and parameters shared by history queries and cursors."""
+        clauses = ["user_id = ?", "deleted = 0"]
+        parameters: list[Any] = [user_id]
+        if platform:
+            clauses.append(
+                "EXISTS (SELECT 1 FROM json_each(platforms) WHERE value = ?)"
+            )
+            parameters.append(platform)
+        if start_date:
+            clauses.append("created_at >= ?")
+            parameters.append(_timestamp(start_date))
+        if end_date:
+            clauses.append("created_at <= ?")
+            parameters.append(_timestamp(end_date))
+        return " AND ".join(clauses), parameters
+
+    async def query_by_user(
+        self,
+        user_id: str,
+        limit: int = 20,
+        offset: int = 0,
+        platform: Optional[str] = None,
+        sort_by: str = "date",
+        order: str = "desc",
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        deadline: Optional[Deadline] = None,
+        cursor: Optional[str] = None,
+    ) -> ContentQueryResult:
+        """
+        Query content by user with filters and keyset pagination.
+
+        Pages seek on (sort column, id) through the (user_id, deleted, ...)
+        indexes, so deep pages cost the same as the first. A non-zero offset
+        without a cursor falls back to OFFSET for backward compatibility.
+
+        Args:
+            user_id: User identifier
+            limit: Maximum number of items to return
+            offset: Legacy pagination offset (ignored when cursor is given)
+            platform: Optional platform filter
+            sort_by: Sort field (date, topic)
+            order: Sort order (asc, desc)
+            start_date: Optional start date filter
+            end_date: Optional end date filter
+            deadline: Optional request deadline bounding the query
+            cursor: Opaque cursor from a previous page's continuation_token
+
+        Returns:
+            Query result with content summaries and the next page cursor
+
+        Raises:
+            DatabaseError: If query fails
+            DeadlineExceededError: If the deadline passes first
+            InvalidCursorError: If the cursor is malformed or for another query
+        """
+        where, parameters = self._history_filters(
+            user_id, platform, start_date, end_date
+        )
+        fingerprint = query_fingerprint(where, parameters, sort_by, order, limit)
+        column = "created_at" if sort_by == "date" else "topic"
+        descending = order.lower() == "desc"
+        comparison = "<" if descending else ">"
+
+        legacy_offset = bool(offset) and not cursor
+        position = (
+            _cursor_position(cursor, fingerprint, sort_by, descending)
+            if cursor
+            else None
+        )
+        if position is not None:
+            where += (
+                f" AND ({column} {comparison} ? "
+                f"OR ({column} = ? AND id {comparison} ?))"
+            )
+            parameters = parameters + [position[0], position[0], position[1]]
+
+        direction = "DESC" if descending else "ASC"
+        sql = (
+            f"SELECT {SUMMARY_COLUMNS} FROM content WHERE {where} "
+            f"ORDER BY {column} {direction}, id {direction} LIMIT ?"
+        )
+        # One extra row tells whether another page exists
+        parameters = parameters + [limit + 1]
+        if legacy_offset:
+            sql += " OFFSET ?"
+            parameters.append(offset)
+
+        async def run() -> list[sqlite3.Row]:
+            _, reader = await self._connections()
+            async with reader.execute(sql, parameters) as rows:
+                return await rows.fetchall()
+
+        try:
+            rows = await self._bounded(run(), deadline, "querying documents")
+        except DeadlineExceededError:
+            raise
+        except Exception as e:
+            logger.error("Unexpected error querying documents", error=str(e))
+            raise DatabaseError(f"Unexpected error querying documents: {str(e)}")
+
+        documents = [_summary(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit and not legacy_offset:
+            last = rows[limit - 1]
+            token = json.dumps([last[column], last["id"]])
+            next_cursor = encode_cursor(token, fingerprint)
+        return ContentQueryResult(
+            documents=documents, count=len(documents), continuation_token=next_cursor
+        )
+
+    async def count_by_day(
+        self,
+        user_id: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        platform: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> dict[str, int]:
+        """
+        Count a user's live content per UTC day.
+
+        Timestamps are stored in UTC, so the day is their date prefix; the
+        range is served by the (user_id, deleted, created_at) index.
+
+        Args:
+            user_id: User identifier
+            start_date: Optional inclusive lower bound on created_at
+            end_date: Optional inclusive upper bound on created_at
+            platform: Optional platform filter
+            deadline: Optional request deadline bounding the query
+
+        Returns:
+            Counts keyed by day (YYYY-MM-DD)
+
+        Raises:
+            DatabaseError: If the query fails
+            DeadlineExceededError: If the deadline passes first
+        """
+        where, parameters = self._history_filters(
+            user_id, platform, start_date, end_date
+        )
+
+        async def run() -> list[sqlite3.Row]:
+            _, reader = await self._connections()
+            async with reader.execute(
+                "SELECT substr(created_at, 1, 10) AS day, COUNT(*) AS n "
+                f"FROM content WHERE {where} GROUP BY day",
+                parameters,
+            ) as cursor:
+                return await cursor.fetchall()
+
+        try:
+            rows = await self._bounded(run(), deadline, "counting documents")
+        except DeadlineExceededError:
+            raise
+        except Exception as e:
+            logger.error("Unexpected error counting documents", error=str(e))
+            raise DatabaseError(f"Unexpected error counting documents: {str(e)}")
+        return {row["day"]: row["n"] for row in rows}
+
+    def history_cursor_after(
+        self, user_id: str, limit: int, last: ContentSummary
+    ) -> Optional[str]:
+        """
+        Cursor for the unfiltered, newest-first history page following an item.
+
+        Args:
+            user_id: User identifier
+            limit: Page size the cursor will be used with
+            last: Last item of the current page
+
+        Returns:
+            Cursor accepted by query_by_user
+        """
+        where, parameters = self._history_filters(user_id, None, None, None)
+        fingerprint = query_fingerprint(where, parameters, "date", "desc", limit)
+        token = json.dumps([_timestamp(last.created_at), last.id])
+        return encode_cursor(token, fingerprint)
+
+    async def get_history_view(
+        self, user_id: str, deadline: Optional[Deadline] = None
+    ) -> Optional[HistoryView]:
+        """No materialized views: indexed queries serve history directly."""
+        return None
+
+    async def get_counts(
+        self, user_id: str, deadline: Optional[Deadline] = None
+    ) -> Optional[UserContentCounts]:
+        """
+        Count a user's live content, in total and per platform.
+
+        Args:
+            user_id: User identifier
+            deadline: Optional request deadline bounding the queries
+
+        Returns:
+            Exact counts (None if they can't be read)
+        """
+
+        async def run() -> tuple[int, list[sqlite3.Row]]:
+            _, reader = await self._connections()
+            async with reader.execute(
+                "SELECT COUNT(*) FROM content WHERE user_id = ? AND deleted = 0",
+                (user_id,),
+            ) as cursor:
+                (total,) = await cursor.fetchone()
+            async with reader.execute(
+                "SELECT p.value AS platform, COUNT(*) AS n "
+                "FROM content, json_each(content.platforms) AS p "
+                "WHERE user_id = ? AND deleted = 0 GROUP BY p.value",
+                (user_id,),
+            ) as cursor:
+                return total, await cursor.fetchall()
+
+        try:
+            total, rows = await self._bounded(run(), deadline, "counting documents")
+        except Exception as e:
+            logger.warning("Counter read failed", user_id=user_id, error=str(e))
+            return None
+        return UserContentCounts(
+            id=counter_document_id(user_id),
+            partitionKey=user_id,
+            userId=user_id,
+            total=total,
+            platforms={row["platform"]: row["n"] for row in rows},
+            updatedAt=datetime.now(timezone.utc),
+        )
+
+    async def reconcile_counts(
+        self, user_id: str, deadline: Optional[Deadline] = None
+    ) -> Optional[UserContentCounts]:
+        """Counts are computed on read, so there is nothing to repair."""
+        return await self.get_counts(user_id, deadline)
+
+    async def reconcile_all_counts(self) -> int:
+        """Counts are computed on read, so there is nothing to repair."""
+        return 0
+
+    # Writes
+
+    def _row(self, body: dict[str, Any], etag: str) -> dict[str, Any]:
+        deleted = bool(body.get("deleted"))
+        ttl = self.settings.deleted_content_ttl
+        return {
+            "user_id": body["partitionKey"],
+            "id": body["id"],
+            "topic": body["topic"],
+            "platforms": json.dumps(body.get("platforms") or []),
+            "summary": body.get("summary"),
+            "created_at": _timestamp(body["createdAt"]),
+            "updated_at": body.get("updatedAt"),
+            "deleted": int(deleted),
+            "purge_at": time.time() + ttl if deleted and ttl > 0 else None,
+            "etag": etag,
+            "body": json.dumps(body),
+        }
+
+    async def _body(self, document: ContentDocument) -> dict[str, Any]:
+        body = document.model_dump(mode="json", by_alias=True)
+        body["generatedContent"] = await self.codec.encode(
+            f"{document.partition_key}/{document.id}", document.generated_content
+        )
+        return body
+
+    @staticmethod
+    async def _insert(connection: aiosqlite.Connection, row: dict[str, Any]) -> None:
+        await connection.execute(
+            "INSERT INTO content (user_id, id, topic, platforms, summary, "
+            "created_at, updated_at, deleted, purge_at, etag, body) VALUES "
+            "(:user_id, :id, :topic, :platforms, :summary, :created_at, "
+            ":updated_at, :deleted, :purge_at, :etag, :body)",
+            row,
+        )
+
+    async def create(
+        self, document: ContentDocument, deadline: Optional[Deadline] = None
+    ) -> ContentDocument:
+        """
+        Create a new content document.
+
+        Args:
+            document: Content document to create
+            deadline: Optional request deadline bounding the call
+
+        Returns:
+            Created document with its etag
+
+        Raises:
+            DatabaseError: If creation fails (including duplicate IDs)
+            DeadlineExceededError: If the deadline passes first
+        """
+        if not document.id:
+            document.id = str(uuid.uuid4())
+        now = datetime.now(timezone.utc)
+        if not document.created_at:
+            document.created_at = now
+        document.updated_at = now
+
+        try:
+            row = self._row(
+                await self._bounded(self._body(document), deadline, "encoding content"),
+                _new_etag(),
+            )
+            await self._transaction(
+                lambda writer: self._insert(writer, row), deadline, "creating document"
+            )
+            document.etag = row["etag"]
+        except DeadlineExceededError:
+            raise
+        except sqlite3.IntegrityError:
+            raise DatabaseError(f"Content {document.id} already exists")
+        except Exception as e:
+            logger.error("Unexpected error creating document", error=str(e))
+            raise DatabaseError(f"Unexpected error creating document: {str(e)}")
+        logger.info("Document created successfully", document_id=document.id)
+        return document
+
+    async def _patch_row(
+        self,
+        connection: aiosqlite.Connection,
+        content_id: str,
+        user_id: str,
+        operations: list[dict[str, Any]],
+        deleted: bool,
+        etag: Optional[str],
+    ) -> tuple[int, Optional[dict[str, Any]]]:
+        """
+        Read-modify-write one row inside the caller's transaction.
+
+        Returns:
+            (status code, stored body): 404 if missing, 412 if the etag or the
+            required deleted state doesn't match, 200 with the new body otherwise
+        """
+        async with connection.execute(
+            "SELECT body, etag, deleted FROM content WHERE user_id = ? AND id = ?",
+            (user_id, content_id),
+        ) as cursor:
+            current = await cursor.fetchone()
+        if current is None:
+            return 404, None
+        if etag is not None and current["etag"] != etag:
+            return 412, None
+        if etag is None and bool(current["deleted"]) != deleted:
+            return 412, None
+
+        body = json.loads(current["body"])
+        for operation in operations:
+            _apply_operation(body, operation)
+        row = self._row(body, _new_etag())
+        await connection.execute(
+            "UPDATE content SET topic = :topic, platforms = :platforms, "
+            "summary = :summary, updated_at = :updated_at, deleted = :deleted, "
+            "purge_at = :purge_at, etag = :etag, body = :body "
+            "WHERE user_id = :user_id AND id = :id",
+            row,
+        )
+        return 200, {**body, "_etag": row["etag"]}
+
+    async def patch(
+        self,
+        content_id: str,
+        user_id: str,
+        operations: list[dict[str, Any]],
+        etag: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> ContentDocument:
+        """
+        Apply Cosmos-style patch operations to live content.
+
+        Args:
+            content_id: Content identifier
+            user_id: User identifier
+            operations: Patch operations (op, path, value)
+            etag: Optional ETag the document must still have
+            deadline: Optional request deadline bounding the call
+
+        Returns:
+            Updated document as stored (see inflate)
+
+        Raises:
+            ContentNotFoundError: If content doesn't exist or is deleted
+            ConcurrencyConflictError: If the etag no longer matches
+            DatabaseError: If the update fails
+            DeadlineExceededError: If the deadline passes first
+        """
+        operations = operations + [
+            {
+                "op": "set",
+                "path": "/updatedAt",
+                "value": datetime.now(timezone.utc).isoformat(),
+            }
+        ]
+
+        try:
+            status_code, body = await self._transaction(
+                lambda writer: self._patch_row(
+                    writer, content_id, user_id, operations, False, etag
+                ),
+                deadline,
+                "patching document",
+            )
+        except (DeadlineExceededError, DatabaseError):
+            raise
+        except Exception as e:
+            logger.error("Unexpected error patching document", error=str(e))
+            raise DatabaseError(f"Unexpected error patching document: {str(e)}")
+        if status_code == 404 or (status_code == 412 and etag is None):
+            raise ContentNotFoundError(f"Content {content_id} not found")
+        if status_code == 412:
+            raise ConcurrencyConflictError(
+                f"Content {content_id} was modified concurrently"
+            )
+        return ContentDocument(**body)
+
+    async def delete(
+        self,
+        content_id: str,
+        user_id: str,
+        deadline: Optional[Deadline] = None,
+        etag: Optional[str] = None,
+    ) -> None:
+        """
+        Soft delete content; it is purged deleted_content_ttl seconds later.
+
+        Args:
+            content_id: Content identifier
+            user_id: User identifier
+            deadline: Optional request deadline bounding the call
+            etag: Optional ETag the document must still have
+
+        Raises:
+            ContentNotFoundError: If content doesn't exist
+            ConcurrencyConflictError: If the etag no longer matches
+            DatabaseError: If deletion fails
+            DeadlineExceededError: If the deadline passes first
+        """
+        await self.patch(
+            content_id,
+            user_id,
+            [{"op": "set", "path": "/deleted", "value": True}],
+            etag=etag,
+            deadline=deadline,
+        )
+        logger.info("Document soft deleted successfully", document_id=content_id)
+
+    async def update_platform_output(
+        self,
+        content_id: str,
+        user_id: str,
+        platform: str,
+        output: dict[str, Any],
+        etag: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> ContentDocument:
+        """
+        Replace the generated output of one platform.
+
+        Args:
+            content_id: Content identifier
+            user_id: User identifier
+            platform: Platform whose output is replaced
+            output: New platform output
+            etag: Optional ETag the document must still have
+            deadline: Optional request deadline bounding the call
+
+        Returns:
+            Updated document
+        """
+        value = await self.codec.encode(f"{user_id}/{content_id}", output)
+        return await self.patch(
+            content_id,
+            user_id,
+            [
+                {
+                    "op": "set",
+                    "path": f"/generatedContent/outputs/{platform}",
+                    "value": value,
+                }
+            ],
+            etag=etag,
+            deadline=deadline,
+        )
+
+    async def mark_version(
+        self,
+        content_id: str,
+        user_id: str,
+        version: str,
+        etag: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> ContentDocument:
+        """
+        Record a version label in the content metadata.
+
+        Args:
+            content_id: Content identifier
+            user_id: User identifier
+            version: Version label
+            etag: Optional ETag the document must still have
+            deadline: Optional request deadline bounding the call
+
+        Returns:
+            Updated document
+        """
+        return await self.patch(
+            content_id,
+            user_id,
+            [{"op": "set", "path": "/metadata/version", "value": version}],
+            etag=etag,
+            deadline=deadline,
+        )
+
+    async def bulk_set_deleted(
+        self,
+        user_id: str,
+        content_ids: list[str],
+        deleted: bool,
+        deadline: Optional[Deadline] = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Soft delete or restore many documents in one transaction.
+
+        Args:
+            user_id: User identifier
+            content_ids: Content identifiers
+            deleted: True to delete, False to restore
+            deadline: Optional request deadline bounding the call
+
+        Returns:
+            Per-item results (id, status, status_code, error) in input order
+        """
+        operations = [
+            {"op": "set", "path": "/deleted", "value": deleted},
+            {
+                "op": "set",
+                "path": "/updatedAt",
+                "value": datetime.now(timezone.utc).isoformat(),
+            },
+        ]
+
+        async def work(writer: aiosqlite.Connection) -> list[dict[str, Any]]:
+            results = []
+            for content_id in content_ids:
+                status_code, _ = await self._patch_row(
+                    writer, content_id, user_id, operations, not deleted, None
+                )
+                results.append(bulk_result(content_id, status_code))
+            return results
+
+        async def run() -> list[dict[str, Any]]:
+            return await self._transaction(work, deadline, "running bulk operation")
+
+        return await self._bulk(run, content_ids)
+
+    async def bulk_create(
+        self, documents: list[ContentDocument], deadline: Optional[Deadline] = None
+    ) -> list[dict[str, Any]]:
+        """
+        Import many documents in one transaction; duplicates conflict per item.
+
+        Args:
+            documents: Documents to create (any mix of users)
+            deadline: Optional request deadline bounding the call
+
+        Returns:
+            Per-item results (id, status, status_code, error) in input order
+        """
+        now = datetime.now(timezone.utc)
+
+        async def encode() -> list[dict[str, Any]]:
+            rows = []
+            for document in documents:
+                document.updated_at = now
+                rows.append(self._row(await self._body(document), _new_etag()))
+            return rows
+
+        async def insert(
+            writer: aiosqlite.Connection, rows: list[dict[str, Any]]
+        ) -> list[dict[str, Any]]:
+            results = []
+            for row in rows:
+                try:
+                    await self._insert(writer, row)
+                    results.append(bulk_result(row["id"], 201))
+                except sqlite3.IntegrityError:
+                    results.append(bulk_result(row["id"], 409))
+            return results
+
+        async def run() -> list[dict[str, Any]]:
+            rows = await self._bounded(encode(), deadline, "encoding content")
+            return await self._transaction(
+                lambda writer: insert(writer, rows), deadline, "running bulk operation"
+            )
+
+        return await self._bulk(run, [d.id for d in documents])
+
+    async def _bulk(
+        self, run: Callable[[], Awaitable[list[dict[str, Any]]]], ids: list[str]
+    ) -> list[dict[str, Any]]:
+        start = time.perf_counter()
+        try:
+            results = await run()
+        except DeadlineExceededError:
+            return [
+                bulk_result(item_id, 408, "Request deadline reached") for item_id in ids
+            ]
+        except Exception as e:
+            logger.error("Bulk operation failed", error=str(e))
+            return [bulk_result(item_id, 500, str(e)) for item_id in ids]
+        metrics.increment("bulk.items", len(ids))
+        metrics.set_gauge("bulk.last_duration_ms", (time.perf_counter() - start) * 1000)
+        return results
+
+    # Maintenance
+
+    async def compact(self) -> dict[str, int]:
+        """
+        Purge deleted content past its grace period and orphaned blobs.
+
+        Returns:
+            Number of blobs and documents removed
+        """
+        writer, reader = await self._connections()
+        async with self._write_lock:
+            cursor = await writer.execute(
+                "DELETE FROM content WHERE purge_at IS NOT NULL AND purge_at < ?",
+                (time.time(),),
+            )
+            documents = cursor.rowcount
+
+        blobs = 0
+        store = self.codec.blob_store
+        if store is not None:
+            cutoff = time.time() - self.settings.blob_orphan_min_age
+            for key in await store.list(older_than=cutoff):
+                user_id, content_id, _ = key.rsplit("/", 2)
+                row = await self._fetch_row(content_id, user_id)
+                referenced = (
+                    ContentCodec.blob_keys(
+                        json.loads(row["body"]).get("generatedContent")
+                    )
+                    if row is not None
+                    else []
+                )
+                if key not in referenced:
+                    await store.delete(key)
+                    blobs += 1
+
+        metrics.increment("compaction.blobs_removed", blobs)
+        metrics.increment("compaction.documents_removed", documents)
+        logger.info("Compaction finished", blobs=blobs, documents=documents)
+        return {"blobs": blobs, "documents": documents}
+
+    async def health_check(self) -> bool:
+        """
+        Check database connectivity.
+
+        Returns:
+            True if healthy
+        """
+        try:
+            _, reader = await self._connections()
+            async with reader.execute("SELECT 1") as cursor:
+                await cursor.fetchone()
+            return True
+        except Exception as e:
+            logger.error("SQLite health check failed", error=str(e))
+            return False
@@ -0,0 +1,207 @@
+"""
+Client-side handling of Cosmos DB throttling (HTTP 429).
+The SDK's own throttle retries are turned off so that retries can honor
+the request deadline: RetryPolicy waits for the server's
+x-ms-retry-after-ms and gives up when the wait would outlast the deadline.
+RequestUnitLimiter paces calls below provisioned throughput with a token
+bucket charged by the request charges Cosmos reports.
+"""
+
+import asyncio
+import math
+import time
+from typing import Callable, Mapping, Optional
+import structlog
+
+from ..utils.deadline import Deadline
+from ..utils.exceptions import DatabaseThrottledError
+from ..utils.metrics import metrics
+
+logger = structlog.get_logger(__name__)
+
+RETRY_AFTER_HEADER = "x-ms-retry-after-ms"
+THROTTLED_STATUS = 429
+
+# Wait used when a 429 carries no retry-after header
+DEFAULT_RETRY_AFTER = 0.1
+
+
+def retry_after_seconds(headers: Mapping[str, str]) -> float:
+    """
+    Server-suggested wait from a throttled response.
+
+    Args:
+        headers: Headers of the 429 response
+
+    Returns:
+        Seconds to wait before retrying
+    """
+    try:
+        return max(0.0, float(headers[RETRY_AFTER_HEADER]) / 1000)
+    except (KeyError, TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+
+
+def throttled(operation: str, wait: float) -> DatabaseThrottledError:
+    """Error raised when a call cannot be served within its budget."""
+    metrics.increment(f"cosmos.throttle_exhausted.{operation}")
+    logger.warning("Cosmos DB throttling not absorbed", operation=operation, wait=wait)
+    return DatabaseThrottledError(
+        f"Cosmos DB throttled {operation}; retry in {wait:.2f}s",
+        retry_after=max(1, math.ceil(wait)),
+    )
+
+
+class RequestUnitLimiter:
+    """Token bucket of request units refilled at a fixed rate.
+
+    Calls reserve the recent average charge of their operation before they
+    start and settle the difference once the real charge is known, so the
+    bucket tracks observed cost without knowing it in advance. The balance
+    may go negative; a reservation then waits until it is repaid.
+    """
+
+    def __init__(
+        self,
+        ru_per_second: float,
+        burst_seconds: float = 1.0,
+        smoothing: float = 0.2,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize limiter.
+
+        Args:
+            ru_per_second: Refill rate (this process's share of throughput)
+            burst_seconds: Seconds of unused throughput that may be saved up
+            smoothing: Weight of the newest charge in per-operation averages
+            clock: Monotonic clock (replaceable in tests)
+        """
+        self.rate = ru_per_second
+        self.capacity = ru_per_second * burst_seconds
+        self.smoothing = smoothing
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._estimates: dict[str, float] = {}
+
+    @property
+    def tokens(self) -> float:
+        """Request units currently available (negative while in debt)."""
+        now = self._clock()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+        return self._tokens
+
+    def estimate(self, operation: str) -> float:
+        """Expected charge of an operation (1 RU until one is observed)."""
+        return min(self._estimates.get(operation, 1.0), self.capacity)
+
+    async def acquire(
+        self, operation: str, deadline: Optional[Deadline] = None
+    ) -> float:
+        """
+        Reserve the expected charge of a call, waiting for it if necessary.
+
+        Args:
+            operation: Repository operation name
+            deadline: Optional request deadline bounding the wait
+
+        Returns:
+            Request units reserved (pass to settle)
+
+        Raises:
+            DatabaseThrottledError: If the wait would outlast the deadline
+        """
+        cost = self.estimate(operation)
+        wait = (cost - self.tokens) / self.rate
+        if deadline is not None and wait > deadline.remaining():
+            raise throttled(operation, wait)
+        self._tokens -= cost
+        metrics.set_gauge("cosmos.ru_limiter.tokens", self._tokens)
+        if wait > 0:
+            metrics.increment("cosmos.ru_limiter.delayed")
+            metrics.increment("cosmos.ru_limiter.wait_seconds", wait)
+            await asyncio.sleep(wait)
+        return cost
+
+    def settle(self, operation: str, reserved: float, charge: float) -> None:
+        """
+        Replace a reservation by the charge the call actually incurred.
+
+        Args:
+            operation: Repository operation name
+            reserved: Amount returned by acquire
+            charge: Request units reported for the call (all pages)
+        """
+        self._tokens = self.tokens + reserved - charge
+        if charge > 0:
+            previous = self._estimates.get(operation, charge)
+            self._estimates[operation] = (
+                1 - self.smoothing
+            ) * previous + self.smoothing * charge
+
+    def backoff(self, wait: float) -> None:
+        """
+        Hold back other calls after a 429 until the server's retry time.
+
+        Args:
+            wait: Server-suggested wait in seconds
+        """
+        self._tokens = min(self.tokens, -wait * self.rate)
+
+
+class RetryPolicy:
+    """Retries throttled calls after the server's suggested wait."""
+
+    def __init__(self, max_retries: int, max_wait: float):
+        """
+        Initialize retry policy.
+
+        Args:
+            max_retries: Retries allowed per call
+            max_wait: Total seconds a call may spend waiting, deadline or not
+        """
+        self.max_retries = max_retries
+        self.max_wait = max_wait
+
+    def next_wait(
+        self,
+        operation: str,
+        headers: Mapping[str, str],
+        attempt: int,
+        waited: float,
+        deadline: Optional[Deadline] = None,
+    ) -> float:
+        """
+        Decide how long to wait before retrying a throttled call.
+
+        Args:
+            operation: Repository operation name
+            headers: Headers of the 429 response
+            attempt: Retries already made for this call
+            waited: Seconds already spent waiting on this call
+            deadline: Optional request deadline
+
+        Returns:
+            Seconds to wait before the next attempt
+
+        Raises:
+            DatabaseThrottledError: If no retry fits the limits or deadline
+        """
+        wait = retry_after_seconds(headers)
+        metrics.increment(f"cosmos.throttled.{operation}")
+        out_of_time = deadline is not None and wait >= deadline.remaining()
+        if attempt >= self.max_retries or waited + wait > self.max_wait or out_of_time:
+            raise throttled(operation, wait)
+        metrics.increment(f"cosmos.throttle_retries.{operation}")
+        metrics.increment("cosmos.throttle_wait_seconds", wait)
+        logger.info(
+            "Cosmos DB throttled, retrying",
+            operation=operation,
+            attempt=attempt + 1,
+            retry_after=wait,
+        )
+        return wait
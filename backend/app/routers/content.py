@@ -4,15 +4,28 @@ Handles content generation, history, and management endpoints.
 """
 
 from typing import Annotated, Optional
-from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from datetime import date, datetime, timezone
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    status,
+    Query,
+    Request,
+    Response,
+)
 from fastapi.responses import PlainTextResponse, JSONResponse
 import structlog
 
-from ..models.requests import ContentGenerationRequest, Platform
+from ..models.requests import BulkContentRequest, ContentGenerationRequest, Platform
 from ..models.responses import (
+    BulkContentResponse,
     ContentGenerationResponse,
+    ContentHistoryBucketsResponse,
     ContentHistoryResponse,
+    ContentSearchResponse,
+    ContentStatsResponse,
     ErrorResponse,
 )
 from ..services.content_service import ContentService
@@ -20,26 +33,42 @@ from ..services.export_service import ExportService
 from ..utils.exceptions import (
     AgentServiceError,
     AgentTimeoutError,
+    ClientDisconnectedError,
+    ConcurrencyConflictError,
     DatabaseError,
+    DeadlineExceededError,
     ContentNotFoundError,
     ExportError,
+    InvalidCursorError,
+    PromptTooLargeError,
+    SearchIndexBuildingError,
+)
+from ..dependencies import (
+    admit_generation,
+    get_content_service,
+    get_deadline,
+    get_export_service,
+    get_settings,
+    get_user_id,
 )
-from ..dependencies import get_content_service, get_export_service
+from ..utils.disconnect import run_until_disconnected
 from ..utils.security import ContentSecurityValidator
 
 logger = structlog.get_logger(__name__)
 router = APIRouter(prefix="/content", tags=["content"])
 
 
-# Dependency injection helpers
-def get_user_id() -> str:
-    """
-    Get current user ID.
-    In production, this would extract from JWT token.
-    For development, return a default user.
-    """
-    # TODO: Extract from authentication token in production
-    return "dev-user@example.com"
+def _retry_headers(error: Exception) -> Optional[dict[str, str]]:
+    """Retry-After for database errors that know when to retry (throttling)."""
+    retry_after = getattr(error, "retry_after", None)
+    return {"Retry-After": str(retry_after)} if retry_after else None
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Read a timestamp without an offset as UTC."""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
 
 
 @router.post(
@@ -48,14 +77,21 @@ def get_user_id() -> str:
     status_code=status.HTTP_200_OK,
     responses={
         400: {"model": ErrorResponse, "description": "Validation error"},
+        413: {"model": ErrorResponse, "description": "Prompt exceeds token budget"},
+        429: {"model": ErrorResponse, "description": "Generation queue is full"},
         502: {"model": ErrorResponse, "description": "Agent service error"},
+        503: {"model": ErrorResponse, "description": "Service overloaded"},
+        504: {"model": ErrorResponse, "description": "Request deadline exceeded"},
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 )
 async def generate_content(
     request: ContentGenerationRequest,
+    http_request: Request,
     user_id: Annotated[str, Depends(get_user_id)],
+    slot=Depends(admit_generation),
     content_service=Depends(get_content_service),
+    deadline=Depends(get_deadline),
 ):
     """
     Generate platform-optimized content from a technical topic.
@@ -65,6 +101,11 @@ async def generate_content(
     - **audience**: Optional target audience description
     - **additional_context**: Optional additional context or requirements
 
+    Send an `X-Request-Timeout` header (or `timeout` query parameter) in seconds
+    to have the request abandoned with 504 once it can no longer finish in time.
+    If the client disconnects, in-flight work is cancelled according to the
+    configured disconnect policy.
+
     Returns structured content with plan, platform outputs, and notes.
     """
     try:
@@ -90,16 +131,37 @@ async def generate_content(
             user_id=user_id,
         )
 
-        result = await content_service.generate_content(
-            topic=request.topic,
-            platforms=request.platforms,
-            user_id=user_id,
-            audience=request.audience,
-            additional_context=request.additional_context,
+        settings = get_settings()
+        result = await run_until_disconnected(
+            http_request,
+            content_service.generate_content(
+                topic=request.topic,
+                platforms=request.platforms,
+                user_id=user_id,
+                audience=request.audience,
+                additional_context=request.additional_context,
+                deadline=deadline,
+            ),
+            policy=settings.disconnect_policy,
+            poll_interval=settings.disconnect_poll_interval,
+            on_disconnect=slot.client_disconnected,
         )
 
         return result
 
+    except ClientDisconnectedError as e:
+        logger.info("Content generation abandoned by client", error=str(e))
+        # 499: client closed request (nobody is listening for the response)
+        return Response(status_code=499)
+
+    except PromptTooLargeError as e:
+        logger.warning("Prompt exceeds token budget", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e)
+        )
+    except DeadlineExceededError as e:
+        logger.warning("Request deadline exceeded", error=str(e))
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
     except AgentTimeoutError as e:
         logger.error("Agent timeout", error=str(e))
         raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
@@ -114,6 +176,7 @@ async def generate_content(
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Database temporarily unavailable. Please try again.",
+            headers=_retry_headers(e),
         )
     except Exception as e:
         logger.error(
@@ -139,20 +202,34 @@ async def get_content_history(
     user_id: Annotated[str, Depends(get_user_id)],
     content_service=Depends(get_content_service),
     limit: Annotated[int, Query(ge=1, le=100)] = 20,
-    offset: Annotated[int, Query(ge=0)] = 0,
+    offset: Annotated[int, Query(ge=0, deprecated=True)] = 0,
+    cursor: Annotated[Optional[str], Query(max_length=2048)] = None,
     platform: Optional[Platform] = None,
     sort_by: Annotated[str, Query(pattern="^(date|topic)$")] = "date",
     order: Annotated[str, Query(pattern="^(asc|desc)$")] = "desc",
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    deadline=Depends(get_deadline),
 ):
     """
     Retrieve content generation history.
 
     - **limit**: Number of items to return (1-100, default: 20)
-    - **offset**: Pagination offset (default: 0)
+    - **cursor**: Opaque cursor from the previous page's `next_cursor`
+    - **offset**: Deprecated pagination offset, ignored when a cursor is given
     - **platform**: Optional platform filter
     - **sort_by**: Sort field - 'date' or 'topic' (default: 'date')
     - **order**: Sort order - 'asc' or 'desc' (default: 'desc')
+    - **start_date**: Optional earliest generation time (inclusive, ISO 8601;
+      UTC unless an offset is given)
+    - **end_date**: Optional latest generation time (inclusive)
     """
+    start_date, end_date = _as_utc(start_date), _as_utc(end_date)
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must not be after end_date",
+        )
     try:
         logger.info(
             "Content history request",
@@ -160,6 +237,8 @@ async def get_content_history(
             limit=limit,
             offset=offset,
             platform=platform,
+            start_date=start_date,
+            end_date=end_date,
         )
 
         result = await content_service.get_content_history(
@@ -169,15 +248,25 @@ async def get_content_history(
             platform=platform.value if platform else None,
             sort_by=sort_by,
             order=order,
+            start_date=start_date,
+            end_date=end_date,
+            deadline=deadline,
+            cursor=cursor,
         )
 
         return result
 
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except DeadlineExceededError as e:
+        logger.warning("Request deadline exceeded", error=str(e))
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
     except DatabaseError as e:
         logger.error("Database error", error=str(e))
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Database temporarily unavailable.",
+            headers=_retry_headers(e),
         )
     except Exception as e:
         logger.error("Unexpected error retrieving history", error=str(e))
@@ -187,6 +276,189 @@ async def get_content_history(
         )
 
 
+@router.get(
+    "/history/buckets",
+    response_model=ContentHistoryBucketsResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_content_history_buckets(
+    user_id: Annotated[str, Depends(get_user_id)],
+    content_service=Depends(get_content_service),
+    interval: Annotated[str, Query(pattern="^(day|week)$")] = "day",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    platform: Optional[Platform] = None,
+    deadline=Depends(get_deadline),
+):
+    """
+    Count content generated per UTC day or week.
+
+    - **interval**: Bucket size - 'day' or 'week' (weeks start on Monday)
+    - **start_date**: Optional first day to include (YYYY-MM-DD)
+    - **end_date**: Optional last day to include (YYYY-MM-DD)
+    - **platform**: Optional platform filter
+    """
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must not be after end_date",
+        )
+    try:
+        return await content_service.get_history_buckets(
+            user_id,
+            interval=interval,
+            start_date=start_date,
+            end_date=end_date,
+            platform=platform.value if platform else None,
+            deadline=deadline,
+        )
+
+    except DeadlineExceededError as e:
+        logger.warning("Request deadline exceeded", error=str(e))
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+    except DatabaseError as e:
+        logger.error("Database error", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database temporarily unavailable.",
+            headers=_retry_headers(e),
+        )
+    except Exception as e:
+        logger.error("Unexpected error counting history", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred.",
+        )
+
+
+@router.get(
+    "/stats", response_model=ContentStatsResponse, status_code=status.HTTP_200_OK
+)
+async def get_content_stats(
+    user_id: Annotated[str, Depends(get_user_id)],
+    content_service=Depends(get_content_service),
+    deadline=Depends(get_deadline),
+):
+    """
+    Retrieve content totals, per-platform counts and daily generation counts.
+    """
+    try:
+        return await content_service.get_content_stats(user_id, deadline=deadline)
+
+    except DeadlineExceededError as e:
+        logger.warning("Request deadline exceeded", error=str(e))
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+    except DatabaseError as e:
+        logger.error("Database error", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database temporarily unavailable.",
+            headers=_retry_headers(e),
+        )
+    except Exception as e:
+        logger.error("Unexpected error retrieving stats", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred.",
+        )
+
+
+@router.get(
+    "/search", response_model=ContentSearchResponse, status_code=status.HTTP_200_OK
+)
+async def search_content(
+    user_id: Annotated[str, Depends(get_user_id)],
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    limit: Annotated[int, Query(ge=1, le=50)] = 20,
+    content_service=Depends(get_content_service),
+    deadline=Depends(get_deadline),
+):
+    """
+    Full-text search over the user's content history.
+
+    Matches topic, hook, key points and platform bodies; results are ranked
+    by relevance, topic matches weighing most.
+    """
+    try:
+        return await content_service.search_content(
+            user_id, q, limit=limit, deadline=deadline
+        )
+
+    except SearchIndexBuildingError as e:
+        logger.info("Search index building", user_id=user_id)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Search is being prepared; retry shortly.",
+            headers=_retry_headers(e),
+        )
+    except DeadlineExceededError as e:
+        logger.warning("Request deadline exceeded", error=str(e))
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+    except DatabaseError as e:
+        logger.error("Database error", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database temporarily unavailable.",
+            headers=_retry_headers(e),
+        )
+    except Exception as e:
+        logger.error("Unexpected error searching content", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred.",
+        )
+
+
+@router.post(
+    "/bulk",
+    response_model=BulkContentResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        400: {"model": ErrorResponse, "description": "Validation error"},
+        504: {"model": ErrorResponse, "description": "Request deadline exceeded"},
+    },
+)
+async def bulk_content(
+    request: BulkContentRequest,
+    user_id: Annotated[str, Depends(get_user_id)],
+    content_service=Depends(get_content_service),
+    deadline=Depends(get_deadline),
+):
+    """
+    Delete, restore or import many items in one call.
+
+    Items are applied with per-partition transactional batches. One item
+    failing does not fail the others; check each entry in **results**.
+
+    - **action**: 'delete', 'restore' or 'import'
+    - **ids**: Content IDs (delete, restore)
+    - **documents**: Content to import (import)
+    """
+    try:
+        logger.info(
+            "Bulk content request", user_id=user_id, action=request.action.value
+        )
+
+        return await content_service.bulk_content(user_id, request, deadline=deadline)
+
+    except DeadlineExceededError as e:
+        logger.warning("Request deadline exceeded", error=str(e))
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+    except DatabaseError as e:
+        logger.error("Database error", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database temporarily unavailable.",
+            headers=_retry_headers(e),
+        )
+    except Exception as e:
+        logger.error("Unexpected error in bulk operation", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred.",
+        )
+
+
 @router.get(
     "/{content_id}",
     status_code=status.HTTP_200_OK,
@@ -194,18 +466,32 @@ async def get_content_history(
 )
 async def get_content_by_id(
     content_id: str,
+    response: Response,
     user_id: Annotated[str, Depends(get_user_id)],
     content_service=Depends(get_content_service),
+    deadline=Depends(get_deadline),
+    platform: Optional[Platform] = None,
 ):
     """
     Retrieve specific content by ID.
 
+    The ETag response header can be sent back as If-Match on delete.
+
     - **content_id**: Unique content identifier
+    - **platform**: Only return this platform's output and the plan (no notes)
     """
     try:
         logger.info("Content retrieval request", content_id=content_id, user_id=user_id)
 
-        result = await content_service.get_content_by_id(content_id, user_id)
+        result = await content_service.get_content_by_id(
+            content_id,
+            user_id,
+            deadline=deadline,
+            platform=platform.value if platform else None,
+        )
+        etag = result.pop("etag", None)
+        if etag:
+            response.headers["ETag"] = etag
         return result
 
     except ContentNotFoundError:
@@ -213,11 +499,15 @@ async def get_content_by_id(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Content {content_id} not found",
         )
+    except DeadlineExceededError as e:
+        logger.warning("Request deadline exceeded", error=str(e))
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
     except DatabaseError as e:
         logger.error("Database error", error=str(e))
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Database temporarily unavailable.",
+            headers=_retry_headers(e),
         )
     except Exception as e:
         logger.error("Unexpected error retrieving content", error=str(e))
@@ -235,6 +525,7 @@ async def export_content(
     export_service=Depends(get_export_service),
     format: Annotated[str, Query(pattern="^(markdown|json)$")] = "markdown",
     platform: str = "all",
+    deadline=Depends(get_deadline),
 ):
     """
     Export content in specified format.
@@ -251,8 +542,13 @@ async def export_content(
             platform=platform,
         )
 
-        # Get content
-        content_data = await content_service.get_content_by_id(content_id, user_id)
+        # Get content (a single platform export reads only that output)
+        content_data = await content_service.get_content_by_id(
+            content_id,
+            user_id,
+            deadline=deadline,
+            platform=None if platform == "all" else platform,
+        )
 
         # Generate filename
         filename = export_service.get_filename(content_id, format, platform)
@@ -290,6 +586,9 @@ async def export_content(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Content {content_id} not found",
         )
+    except DeadlineExceededError as e:
+        logger.warning("Request deadline exceeded", error=str(e))
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
     except ExportError as e:
         logger.error("Export error", error=str(e))
         raise HTTPException(
@@ -307,22 +606,31 @@ async def export_content(
 @router.delete(
     "/{content_id}",
     status_code=status.HTTP_204_NO_CONTENT,
-    responses={404: {"model": ErrorResponse, "description": "Content not found"}},
+    responses={
+        404: {"model": ErrorResponse, "description": "Content not found"},
+        412: {"model": ErrorResponse, "description": "Content changed (If-Match)"},
+    },
 )
 async def delete_content(
     content_id: str,
     user_id: Annotated[str, Depends(get_user_id)],
     content_service=Depends(get_content_service),
+    deadline=Depends(get_deadline),
+    if_match: Annotated[Optional[str], Header()] = None,
 ):
     """
     Delete specific content (soft delete).
 
     - **content_id**: Unique content identifier
+    - **If-Match** header: Optional ETag from GET; the delete fails with 412
+      if the content changed since
     """
     try:
         logger.info("Content deletion request", content_id=content_id, user_id=user_id)
 
-        await content_service.delete_content(content_id, user_id)
+        await content_service.delete_content(
+            content_id, user_id, deadline=deadline, etag=if_match
+        )
         return Response(status_code=status.HTTP_204_NO_CONTENT)
 
     except ContentNotFoundError:
@@ -330,11 +638,19 @@ async def delete_content(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Content {content_id} not found",
         )
+    except ConcurrencyConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED, detail=str(e)
+        )
+    except DeadlineExceededError as e:
+        logger.warning("Request deadline exceeded", error=str(e))
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
     except DatabaseError as e:
         logger.error("Database error", error=str(e))
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Database temporarily unavailable.",
+            headers=_retry_headers(e),
         )
     except Exception as e:
         logger.error("Unexpected error deleting content", error=str(e))
@@ -12,6 +12,7 @@ from ..models.responses import HealthResponse, ReadinessResponse, ServiceHealth
 from ..services.agent_service import AgentService
 from ..repositories.content_repo import ContentRepository
 from ..dependencies import get_agent_service, get_content_repository
+from ..utils.metrics import metrics
 
 logger = structlog.get_logger(__name__)
 router = APIRouter(prefix="/health", tags=["health"])
@@ -66,3 +67,13 @@ async def readiness_check(
         checks=ServiceHealth(database=db_status, agent=agent_status),
         timestamp=datetime.utcnow(),
     )
+
+
+@router.get("/metrics", status_code=status.HTTP_200_OK)
+async def metrics_snapshot():
+    """
+    In-process counters and gauges.
+    Includes cancelled-work counts (generation.cancelled.*) so recovered
+    capacity is visible.
+    """
+    return {"timestamp": datetime.utcnow(), **metrics.snapshot()}
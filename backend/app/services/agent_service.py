@@ -13,25 +13,47 @@ from tenacity import (
     stop_after_attempt,
     wait_exponential,
     retry_if_exception_type,
+    retry_if_not_exception_type,
 )
 
 from ..config import Settings
-from ..utils.exceptions import AgentServiceError, AgentTimeoutError
+from ..utils.deadline import Deadline
+from ..utils.exceptions import (
+    AgentServiceError,
+    AgentTimeoutError,
+    DeadlineExceededError,
+    PromptTooLargeError,
+)
+from .knowledge_index import KnowledgeIndex
+from .prompt_budget import AssembledPrompt, PromptAssembler
 
 logger = structlog.get_logger(__name__)
 
 
+def _deadline_exhausted(retry_state) -> bool:
+    """Stop retrying when the caller's deadline leaves no room for another attempt."""
+    deadline = retry_state.kwargs.get("deadline")
+    if deadline is None:
+        return False
+    # Minimum backoff is 1s, so an attempt needs at least that much budget
+    return deadline.remaining() <= max(retry_state.upcoming_sleep or 0, 1.0)
+
+
 class AgentService:
     """Service for interacting with Azure AI Foundry agent using SDK."""
 
-    def __init__(self, settings: Settings):
+    def __init__(
+        self, settings: Settings, knowledge_index: Optional[KnowledgeIndex] = None
+    ):
         """
         Initialize agent service.
 
         Args:
             settings: Application settings
+            knowledge_index: Optional local knowledge-base index for grounding
         """
         self.settings = settings
+        self.knowledge_index = knowledge_index
         self._project_client: Optional[AIProjectClient] = None
         self._agent = None
 
@@ -77,9 +99,10 @@ class AgentService:
         return self._agent
 
     @retry(
-        stop=stop_after_attempt(3),
+        stop=stop_after_attempt(3) | _deadline_exhausted,
         wait=wait_exponential(multiplier=1, min=1, max=10),
-        retry=retry_if_exception_type((Exception,)),
+        retry=retry_if_exception_type((Exception,))
+        & retry_if_not_exception_type((PromptTooLargeError, DeadlineExceededError)),
         reraise=True,
     )
     async def generate_content(
@@ -88,6 +111,7 @@ class AgentService:
         platforms: list[str],
         audience: Optional[str] = None,
         additional_context: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
     ) -> dict[str, Any]:
         """
         Generate content using Azure AI Foundry agent with SDK.
@@ -97,6 +121,7 @@ class AgentService:
             platforms: List of target platforms
             audience: Optional target audience
             additional_context: Optional additional context
+            deadline: Optional request deadline bounding the call and retries
 
         Returns:
             Generated content from agent
@@ -104,10 +129,15 @@ class AgentService:
         Raises:
             AgentServiceError: If agent communication fails
             AgentTimeoutError: If request times out
+            PromptTooLargeError: If the prompt exceeds the token budget
+            DeadlineExceededError: If the deadline passes before completion
         """
         try:
-            # Build prompt for agent
-            prompt = self._build_prompt(topic, platforms, audience, additional_context)
+            # Build prompt for agent (raises before any remote call if too large)
+            assembled = self._assemble_prompt(
+                topic, platforms, audience, additional_context
+            )
+            prompt = assembled.text
 
             logger.info(
                 "Generating content with new Foundry agent",
@@ -115,6 +145,7 @@ class AgentService:
                 platforms=platforms,
                 agent_name=self.settings.agent_name,
                 prompt_length=len(prompt),
+                estimated_prompt_tokens=assembled.estimated_tokens,
             )
 
             start_time = asyncio.get_event_loop().time()
@@ -126,22 +157,43 @@ class AgentService:
             # Get OpenAI client from project
             openai_client = client.get_openai_client()
 
-            # Call agent using responses API
-            logger.info("Calling agent via responses API")
-            response = openai_client.responses.create(
-                input=[{"role": "user", "content": prompt}],
-                extra_body={"agent": {"name": agent.name, "type": "agent_reference"}},
-            )
+            # Call agent using responses API. The SDK call is blocking, so it
+            # runs in a worker thread and is bounded by the request deadline.
+            request_options = {}
+            if deadline is not None:
+                deadline.check("agent call")
+                request_options["timeout"] = deadline.timeout()
+
+            logger.info("Calling agent via responses API", deadline=deadline)
+            try:
+                response = await asyncio.wait_for(
+                    asyncio.to_thread(
+                        openai_client.responses.create,
+                        input=[{"role": "user", "content": prompt}],
+                        extra_body={
+                            "agent": {"name": agent.name, "type": "agent_reference"}
+                        },
+                        **request_options,
+                    ),
+                    timeout=request_options.get("timeout"),
+                )
+            except asyncio.TimeoutError:
+                raise DeadlineExceededError(
+                    "Request deadline reached while waiting for the agent"
+                )
 
             duration = asyncio.get_event_loop().time() - start_time
 
             # Extract content from response
             content = response.output_text
 
+            usage = self._token_usage(response, assembled)
+
             logger.info(
                 "Content generated successfully with new Foundry agent",
                 duration=duration,
                 content_length=len(content),
+                **usage,
             )
 
             # Parse the content into structured format
@@ -150,11 +202,17 @@ class AgentService:
             return {
                 "content": parsed_content,
                 "duration": duration,
+                "usage": usage,
             }
 
-        except AgentServiceError:
+        except (AgentServiceError, PromptTooLargeError, DeadlineExceededError):
             raise
         except Exception as e:
+            if deadline is not None and deadline.expired:
+                # e.g. the SDK's own timeout fired at the deadline
+                raise DeadlineExceededError(
+                    f"Request deadline reached during agent call: {str(e)}"
+                )
             logger.error(
                 "Unexpected error during content generation",
                 error=str(e),
@@ -162,6 +220,27 @@ class AgentService:
             )
             raise AgentServiceError(f"Failed to generate content: {str(e)}")
 
+    @staticmethod
+    def _token_usage(response: Any, assembled: AssembledPrompt) -> dict[str, Any]:
+        """
+        Compare the local prompt estimate with the usage reported by the agent.
+
+        Args:
+            response: Responses API result
+            assembled: Assembled prompt with its estimate
+
+        Returns:
+            Dictionary of estimated and actual token counts
+        """
+        usage = getattr(response, "usage", None)
+        actual_input = getattr(usage, "input_tokens", None)
+        return {
+            "estimated_prompt_tokens": assembled.estimated_tokens,
+            "actual_input_tokens": actual_input,
+            "actual_output_tokens": getattr(usage, "output_tokens", None),
+            "prompt_budget": assembled.budget,
+        }
+
     def _build_prompt(
         self,
         topic: str,
@@ -180,31 +259,121 @@ class AgentService:
 
         Returns:
             Formatted prompt string
+
+        Raises:
+            PromptTooLargeError: If the prompt cannot fit the budget
+        """
+        return self._assemble_prompt(
+            topic, platforms, audience, additional_context
+        ).text
+
+    def _assemble_prompt(
+        self,
+        topic: str,
+        platforms: list[str],
+        audience: Optional[str],
+        additional_context: Optional[str],
+    ) -> AssembledPrompt:
+        """
+        Assemble the prompt within the configured token budget.
+
+        The task description and output instructions are required; the
+        additional context and knowledge excerpts are trimmed or dropped
+        (lowest-ranked excerpts first) when the budget is tight.
+
+        Args:
+            topic: Technical topic
+            platforms: Target platforms
+            audience: Optional audience
+            additional_context: Optional context
+
+        Returns:
+            Assembled prompt with token estimate
+
+        Raises:
+            PromptTooLargeError: If the prompt cannot fit the budget
         """
         platform_str = ", ".join(platforms)
+        assembler = PromptAssembler(
+            budget=self.settings.prompt_token_budget,
+            reject_on_overflow=self.settings.prompt_overflow_policy == "reject",
+        )
 
-        prompt_parts = [
-            f"Generate technical content about: {topic}",
+        assembler.add(
+            "task",
+            f"Generate technical content about: {topic}\n"
             f"Target platforms: {platform_str}",
-        ]
-
+            required=True,
+        )
         if audience:
-            prompt_parts.append(f"Target audience: {audience}")
-
+            assembler.add("audience", f"Target audience: {audience}", required=True)
         if additional_context:
-            prompt_parts.append(f"Additional context: {additional_context}")
+            assembler.add(
+                "additional_context",
+                f"Additional context: {additional_context}",
+                priority=1,
+                trimmable=True,
+            )
+
+        excerpts = self._retrieve_knowledge(topic, platforms, audience)
+        for rank, excerpt in enumerate(excerpts):
+            # The heading rides on the best excerpt, and the others are only
+            # kept with it, so excerpts never appear unlabeled
+            assembler.add(
+                f"knowledge_{rank}",
+                f"{excerpt}\n",
+                priority=2 + rank,
+                trimmable=True,
+                internal=True,
+                lead=(
+                    "\nRelevant knowledge base excerpts (use file_search only if these are insufficient):\n"
+                    if rank == 0
+                    else ""
+                ),
+                after="knowledge_0" if rank else "",
+            )
 
-        prompt_parts.append(
-            f"\nIMPORTANT: You MUST generate SEPARATE, DISTINCT content for EACH platform: {platform_str}."
+        assembler.add(
+            "instructions",
+            f"\nIMPORTANT: You MUST generate SEPARATE, DISTINCT content for EACH platform: {platform_str}.\n"
+            "Each platform requires different formatting and length (see agent-instructions.md).\n"
+            "\nPlease provide a complete Content Pack with plan, platform outputs for ALL requested platforms, and notes.",
+            required=True,
         )
-        prompt_parts.append(
-            "Each platform requires different formatting and length (see agent-instructions.md)."
+
+        return assembler.assemble()
+
+    def _retrieve_knowledge(
+        self, topic: str, platforms: list[str], audience: Optional[str]
+    ) -> list[str]:
+        """
+        Look up knowledge-base chunks relevant to the request.
+
+        Args:
+            topic: Technical topic
+            platforms: Target platforms
+            audience: Optional audience
+
+        Returns:
+            Formatted excerpts, best match first
+        """
+        if self.knowledge_index is None:
+            return []
+
+        query = " ".join([topic, *platforms, audience or ""])
+        results = self.knowledge_index.search(
+            query, top_k=self.settings.knowledge_top_k
         )
-        prompt_parts.append(
-            "\nPlease provide a complete Content Pack with plan, platform outputs for ALL requested platforms, and notes."
+
+        logger.info(
+            "Knowledge base excerpts retrieved",
+            count=len(results),
+            sources=[chunk.source for chunk, _ in results],
         )
 
-        return "\n".join(prompt_parts)
+        return [
+            f"[{chunk.source} - {chunk.heading}]\n{chunk.text}" for chunk, _ in results
+        ]
 
     def _parse_agent_response(self, content_text: str) -> dict[str, Any]:
         """
@@ -3,20 +3,80 @@ Content Service.
 Orchestrates content generation business logic.
 """
 
+import asyncio
 import uuid
-from datetime import datetime
+from datetime import date, datetime, time, timedelta, timezone
 from typing import Optional
 import structlog
 
 from ..config import Settings
-from ..models.requests import Platform
-from ..models.database import content_to_document
+from ..models.requests import BulkAction, BulkContentRequest, Platform
+from ..models.database import ContentDocument, ContentSummary, content_to_document
 from ..services.agent_service import AgentService
 from ..repositories.content_repo import ContentRepository
-from ..utils.exceptions import AgentServiceError, DatabaseError
+from .search_index import SearchIndex
+from ..utils.deadline import Deadline
+from ..utils.exceptions import (
+    AgentServiceError,
+    DatabaseError,
+    DeadlineExceededError,
+    SearchIndexBuildingError,
+)
+from ..utils.metrics import metrics
 
 logger = structlog.get_logger(__name__)
 
+# Seconds a search refresh re-reads before the last sync, covering clock
+# skew between replicas and the database's _ts (re-applying is harmless)
+SEARCH_SYNC_OVERLAP = 60.0
+
+# Saves allowed to outlive a cancelled request (kept referenced until done)
+_pending_saves: set[asyncio.Future] = set()
+
+
+def _detached_save_done(save: asyncio.Future) -> None:
+    """Count how a save that outlived its request ended."""
+    if save.cancelled() or save.exception() is not None:
+        metrics.increment("generation.persist_failed_after_disconnect")
+    else:
+        metrics.increment("generation.persisted_after_disconnect")
+
+
+def _history_item(doc: ContentSummary) -> dict:
+    """Shape a stored summary as a history list item."""
+    return {
+        "id": doc.id,
+        "topic": doc.topic,
+        "platforms": doc.platforms,
+        "generated_at": doc.created_at,
+        "user_id": doc.partition_key,
+        "summary": doc.summary or "Content generated",
+    }
+
+
+def _bucket_counts(daily: dict[str, int], interval: str) -> list[dict]:
+    """
+    Roll per-day counts up into consecutive day or week buckets.
+
+    Weeks start on Monday. Buckets run from the first to the last non-empty
+    one, with empty buckets in between reported as zero.
+    """
+    step = 7 if interval == "week" else 1
+    totals: dict[date, int] = {}
+    for day, count in daily.items():
+        start = date.fromisoformat(day)
+        if step == 7:
+            start -= timedelta(days=start.weekday())
+        totals[start] = totals.get(start, 0) + count
+    if not totals:
+        return []
+    buckets = []
+    start, last = min(totals), max(totals)
+    while start <= last:
+        buckets.append({"start": start, "count": totals.get(start, 0)})
+        start += timedelta(days=step)
+    return buckets
+
 
 class ContentService:
     """Service for content generation orchestration."""
@@ -26,6 +86,7 @@ class ContentService:
         agent_service: AgentService,
         content_repo: ContentRepository,
         settings: Settings,
+        search_index: Optional[SearchIndex] = None,
     ):
         """
         Initialize content service.
@@ -34,10 +95,22 @@ class ContentService:
             agent_service: Agent service instance
             content_repo: Content repository instance
             settings: Application settings
+            search_index: Optional full-text index kept current on writes
         """
         self.agent_service = agent_service
         self.content_repo = content_repo
         self.settings = settings
+        self.search_index = search_index
+
+    async def _update_search(self, operation, *args) -> None:
+        """Apply a search index update; a stale index must not fail the write."""
+        if self.search_index is None:
+            return
+        try:
+            await operation(*args)
+        except Exception as e:
+            metrics.increment("search.update_failed")
+            logger.warning("Search index update failed", error=str(e))
 
     async def generate_content(
         self,
@@ -46,6 +119,7 @@ class ContentService:
         user_id: str,
         audience: Optional[str] = None,
         additional_context: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
     ) -> dict:
         """
         Generate content and save to database.
@@ -56,6 +130,7 @@ class ContentService:
             user_id: User identifier
             audience: Optional target audience
             additional_context: Optional additional context
+            deadline: Optional request deadline checked before each stage
 
         Returns:
             Dictionary with content ID, status, content, and metadata
@@ -63,8 +138,14 @@ class ContentService:
         Raises:
             AgentServiceError: If content generation fails
             DatabaseError: If database save fails
+            DeadlineExceededError: If the deadline cannot be met
+
+        If the calling task is cancelled (e.g. the client disconnected) the
+        agent call and pending retries are abandoned. A save that has already
+        started still completes unless the disconnect policy is "discard".
         """
         content_id = str(uuid.uuid4())
+        stage = "agent"
 
         logger.info(
             "Starting content generation",
@@ -75,37 +156,27 @@ class ContentService:
         )
 
         try:
+            if deadline is not None:
+                deadline.check("content generation")
+
             # Generate content with agent
             result = await self.agent_service.generate_content(
                 topic=topic,
                 platforms=[p.value for p in platforms],
                 audience=audience,
                 additional_context=additional_context,
+                deadline=deadline,
             )
 
             generated_content = result["content"]
             duration = result["duration"]
-
-            # Prepare metadata
-            metadata = {
-                "userId": user_id,
-                "timestamp": datetime.utcnow().isoformat(),
-                "agentVersion": "storycircuit-v1.0",
-                "duration": duration,
-            }
-
-            # Save to database
-            document = content_to_document(
-                content_id=content_id,
-                user_id=user_id,
-                topic=topic,
-                platforms=platforms,
-                generated_content=generated_content,
-                metadata=metadata,
-            )
+            document = self._document(content_id, user_id, topic, platforms, result)
 
             # Save document to database (pass the ContentDocument object, not dict)
-            await self.content_repo.create(document)
+            stage = "persist"
+            await self._save(document, deadline)
+            if self.search_index is not None:
+                await self._update_search(self.search_index.add, document)
 
             logger.info(
                 "Content generation completed", content_id=content_id, duration=duration
@@ -124,6 +195,21 @@ class ContentService:
                 },
             }
 
+        except asyncio.CancelledError:
+            # A started save carries on unless the policy is "discard"
+            if stage != "persist" or self.settings.disconnect_policy == "discard":
+                metrics.increment(f"generation.cancelled.{stage}")
+            logger.info(
+                "Content generation cancelled", content_id=content_id, stage=stage
+            )
+            raise
+        except DeadlineExceededError as e:
+            logger.warning(
+                "Content generation abandoned at deadline",
+                error=str(e),
+                content_id=content_id,
+            )
+            raise
         except AgentServiceError as e:
             logger.error("Agent service error", error=str(e), content_id=content_id)
             raise
@@ -138,6 +224,59 @@ class ContentService:
             )
             raise
 
+    @staticmethod
+    def _document(
+        content_id: str,
+        user_id: str,
+        topic: str,
+        platforms: list[Platform],
+        result: dict,
+    ) -> ContentDocument:
+        """Build the document to store from an agent result."""
+        metadata = {
+            "userId": user_id,
+            "timestamp": datetime.utcnow().isoformat(),
+            "agentVersion": "storycircuit-v1.0",
+            "duration": result["duration"],
+        }
+        if result.get("usage"):
+            metadata["tokenUsage"] = result["usage"]
+
+        return content_to_document(
+            content_id=content_id,
+            user_id=user_id,
+            topic=topic,
+            platforms=platforms,
+            generated_content=result["content"],
+            metadata=metadata,
+        )
+
+    async def _save(
+        self, document: ContentDocument, deadline: Optional[Deadline]
+    ) -> None:
+        """
+        Save a generated document.
+
+        Unless the disconnect policy is "discard", cancelling the caller
+        leaves the save running; it is tracked until it finishes.
+        """
+        if deadline is not None:
+            deadline.check("saving content")
+        save = asyncio.ensure_future(
+            self.content_repo.create(document, deadline=deadline)
+        )
+        if self.settings.disconnect_policy == "discard":
+            await save
+            return
+        _pending_saves.add(save)
+        save.add_done_callback(_pending_saves.discard)
+        try:
+            await asyncio.shield(save)
+        except asyncio.CancelledError:
+            # The shielded save carries on: not cancelled work
+            save.add_done_callback(_detached_save_done)
+            raise
+
     async def get_content_history(
         self,
         user_id: str,
@@ -148,6 +287,8 @@ class ContentService:
         order: str = "desc",
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
+        deadline: Optional[Deadline] = None,
+        cursor: Optional[str] = None,
     ) -> dict:
         """
         Retrieve content history for user.
@@ -155,12 +296,14 @@ class ContentService:
         Args:
             user_id: User identifier
             limit: Maximum items to return
-            offset: Pagination offset
+            offset: Legacy pagination offset
             platform: Optional platform filter
             sort_by: Sort field
             order: Sort order
             start_date: Optional start date
             end_date: Optional end date
+            deadline: Optional request deadline
+            cursor: Cursor returned as next_cursor by the previous page
 
         Returns:
             Dictionary with items and pagination info
@@ -169,63 +312,225 @@ class ContentService:
             "Retrieving content history", user_id=user_id, limit=limit, offset=offset
         )
 
-        result = await self.content_repo.query_by_user(
-            user_id=user_id,
-            limit=limit,
-            offset=offset,
-            platform=platform,
-            sort_by=sort_by,
-            order=order,
-            start_date=start_date,
-            end_date=end_date,
+        if (
+            self.settings.history_views_enabled
+            and not cursor
+            and not offset
+            and sort_by == "date"
+            and order == "desc"
+            and platform is None
+            and start_date is None
+            and end_date is None
+        ):
+            page = await self._history_from_view(user_id, limit, deadline)
+            if page is not None:
+                return page
+
+        result, counts = await asyncio.gather(
+            self.content_repo.query_by_user(
+                user_id=user_id,
+                limit=limit,
+                offset=offset,
+                platform=platform,
+                sort_by=sort_by,
+                order=order,
+                start_date=start_date,
+                end_date=end_date,
+                deadline=deadline,
+                cursor=cursor,
+            ),
+            self.content_repo.get_counts(user_id, deadline=deadline),
         )
 
-        # Convert documents to history items
-        items = []
-        for doc in result.documents:
-            # Extract summary (hook from plan)
-            summary = "Content generated"
-            if (
-                "plan" in doc.generated_content
-                and "hook" in doc.generated_content["plan"]
-            ):
-                summary = doc.generated_content["plan"]["hook"][:200]
-
-            items.append(
-                {
-                    "id": doc.id,
-                    "topic": doc.topic,
-                    "platforms": doc.platforms,
-                    "generated_at": doc.created_at,
-                    "user_id": doc.partition_key,
-                    "summary": summary,
-                }
-            )
+        # Counters track all non-deleted content, so they give the total
+        # for unfiltered and platform-filtered listings but not date ranges
+        total = None
+        if counts is not None and start_date is None and end_date is None:
+            total = counts.platforms.get(platform, 0) if platform else counts.total
+        if total is None:
+            total = offset + result.count + (1 if result.continuation_token else 0)
+
+        items = [_history_item(doc) for doc in result.documents]
 
         return {
             "items": items,
             "pagination": {
-                "total": result.count,
+                "total": total,
                 "limit": limit,
                 "offset": offset,
-                "has_more": offset + limit < result.count,
+                "has_more": result.continuation_token is not None
+                or (bool(offset) and not cursor and result.count == limit),
+                "next_cursor": result.continuation_token,
+            },
+        }
+
+    async def get_content_stats(
+        self, user_id: str, deadline: Optional[Deadline] = None
+    ) -> dict:
+        """
+        Retrieve per-user content statistics.
+
+        Reads the change-feed maintained history view; until it exists the
+        counter document supplies totals without daily counts.
+
+        Args:
+            user_id: User identifier
+            deadline: Optional request deadline
+
+        Returns:
+            Dictionary with total, platform_counts, daily_counts, updated_at
+        """
+        view = None
+        if self.settings.history_views_enabled:
+            view = await self.content_repo.get_history_view(user_id, deadline=deadline)
+        if view is not None:
+            return {
+                "total": view.total,
+                "platform_counts": view.platform_counts,
+                "daily_counts": view.daily_counts,
+                "updated_at": view.updated_at,
+            }
+
+        counts = await self.content_repo.get_counts(user_id, deadline=deadline)
+        if counts is None:
+            return {"total": 0, "platform_counts": {}, "daily_counts": {}}
+        return {
+            "total": counts.total,
+            "platform_counts": counts.platforms,
+            "daily_counts": {},
+            "updated_at": counts.updated_at,
+        }
+
+    async def get_history_buckets(
+        self,
+        user_id: str,
+        interval: str = "day",
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        platform: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> dict:
+        """
+        Count content per UTC day or week over an optional date range.
+
+        Unfiltered counts come from the history view's daily counts with a
+        single point read; platform filters, ranges starting before the days
+        the view keeps, or a missing view fall back to a count query over
+        the date range.
+
+        Args:
+            user_id: User identifier
+            interval: Bucket size, "day" or "week"
+            start_date: Optional first day to include (UTC)
+            end_date: Optional last day to include (UTC)
+            platform: Optional platform filter
+            deadline: Optional request deadline
+
+        Returns:
+            Dictionary with interval, total and buckets (start, count)
+        """
+        daily = None
+        if self.settings.history_views_enabled and platform is None:
+            view = await self.content_repo.get_history_view(user_id, deadline=deadline)
+            # Views keep recent days only; older ranges need the query
+            covered = view is not None and (
+                view.daily_since is None
+                or (
+                    start_date is not None
+                    and start_date.isoformat() >= view.daily_since
+                )
+            )
+            if covered:
+                metrics.increment("history_views.buckets_served")
+                daily = view.daily_counts
+        if daily is None:
+            daily = await self.content_repo.count_by_day(
+                user_id,
+                start_date=(
+                    datetime.combine(start_date, time.min, timezone.utc)
+                    if start_date
+                    else None
+                ),
+                end_date=(
+                    datetime.combine(end_date, time.max, timezone.utc)
+                    if end_date
+                    else None
+                ),
+                platform=platform,
+                deadline=deadline,
+            )
+
+        first = start_date.isoformat() if start_date else ""
+        last = end_date.isoformat() if end_date else "9999-12-31"
+        daily = {day: n for day, n in daily.items() if first <= day <= last and n}
+        return {
+            "interval": interval,
+            "total": sum(daily.values()),
+            "buckets": _bucket_counts(daily, interval),
+        }
+
+    async def _history_from_view(
+        self, user_id: str, limit: int, deadline: Optional[Deadline]
+    ) -> Optional[dict]:
+        """
+        Serve the newest-first first page from the user's history view.
+
+        Returns:
+            History response, or None if the view is missing or too short
+            for the requested page
+        """
+        view = await self.content_repo.get_history_view(user_id, deadline=deadline)
+        if view is None or (len(view.recent) < limit and len(view.recent) < view.total):
+            return None
+
+        page = view.recent[:limit]
+        has_more = view.total > len(page)
+        metrics.increment("history_views.served")
+        return {
+            "items": [_history_item(doc) for doc in page],
+            "pagination": {
+                "total": view.total,
+                "limit": limit,
+                "offset": 0,
+                "has_more": has_more,
+                "next_cursor": (
+                    self.content_repo.history_cursor_after(user_id, limit, page[-1])
+                    if has_more
+                    else None
+                ),
             },
         }
 
-    async def get_content_by_id(self, content_id: str, user_id: str) -> dict:
+    async def get_content_by_id(
+        self,
+        content_id: str,
+        user_id: str,
+        deadline: Optional[Deadline] = None,
+        platform: Optional[str] = None,
+    ) -> dict:
         """
         Retrieve specific content by ID.
 
         Args:
             content_id: Content identifier
             user_id: User identifier
+            deadline: Optional request deadline
+            platform: Only read the plan and this platform's output (notes
+                are left out)
 
         Returns:
-            Dictionary with content details
+            Dictionary with content details and its etag
         """
-        logger.info("Retrieving content", content_id=content_id, user_id=user_id)
+        logger.info(
+            "Retrieving content",
+            content_id=content_id,
+            user_id=user_id,
+            platform=platform,
+        )
 
-        document = await self.content_repo.get_by_id(content_id, user_id)
+        document = await self.content_repo.get_by_id(
+            content_id, user_id, deadline=deadline, platform=platform
+        )
 
         return {
             "id": document.id,
@@ -233,15 +538,158 @@ class ContentService:
             "platforms": document.platforms,
             "content": document.generated_content,
             "metadata": document.metadata,
+            "etag": document.etag,
         }
 
-    async def delete_content(self, content_id: str, user_id: str) -> None:
+    async def delete_content(
+        self,
+        content_id: str,
+        user_id: str,
+        deadline: Optional[Deadline] = None,
+        etag: Optional[str] = None,
+    ) -> None:
         """
         Delete content.
 
         Args:
             content_id: Content identifier
             user_id: User identifier
+            deadline: Optional request deadline
+            etag: Optional ETag from If-Match; the delete fails if it changed
         """
         logger.info("Deleting content", content_id=content_id, user_id=user_id)
-        await self.content_repo.delete(content_id, user_id)
+        await self.content_repo.delete(
+            content_id, user_id, deadline=deadline, etag=etag
+        )
+        if self.search_index is not None:
+            await self._update_search(self.search_index.remove, user_id, content_id)
+
+    async def bulk_content(
+        self,
+        user_id: str,
+        request: BulkContentRequest,
+        deadline: Optional[Deadline] = None,
+    ) -> dict:
+        """
+        Delete, restore or import many items for a user.
+
+        Args:
+            user_id: User identifier
+            request: Bulk action and its targets
+            deadline: Optional request deadline
+
+        Returns:
+            Dictionary with per-item results and success/failure counts
+        """
+        logger.info(
+            "Bulk content operation",
+            user_id=user_id,
+            action=request.action.value,
+            items=len(request.ids) or len(request.documents),
+        )
+
+        if request.action == BulkAction.IMPORT:
+            documents = []
+            for item in request.documents:
+                document = content_to_document(
+                    content_id=item.id or str(uuid.uuid4()),
+                    user_id=user_id,
+                    topic=item.topic,
+                    platforms=item.platforms,
+                    generated_content=item.generated_content,
+                    metadata=item.metadata,
+                )
+                if item.created_at is not None:
+                    document.created_at = item.created_at
+                documents.append(document)
+            results = await self.content_repo.bulk_create(documents, deadline=deadline)
+        else:
+            results = await self.content_repo.bulk_set_deleted(
+                user_id,
+                request.ids,
+                deleted=request.action == BulkAction.DELETE,
+                deadline=deadline,
+            )
+
+        succeeded = sum(result["status"] == "succeeded" for result in results)
+        if succeeded and self.search_index is not None:
+            # Rebuilt from the repository on the user's next search
+            await self._update_search(self.search_index.invalidate, user_id)
+        return {
+            "action": request.action.value,
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "results": results,
+        }
+
+    async def _load_search(self, user_id: str) -> None:
+        """Build a user's search entries from all their documents."""
+        started = datetime.now(timezone.utc).timestamp()
+        documents = await self.content_repo.list_documents(user_id)
+        await self.search_index.load_user(user_id, documents, synced_at=started)
+        metrics.increment("search.user_loaded")
+
+    async def _refresh_search(self, user_id: str, synced_at: float) -> None:
+        """Apply the documents a user changed since their entries were synced."""
+        started = datetime.now(timezone.utc).timestamp()
+        documents, removed = await self.content_repo.list_changed(
+            user_id, synced_at - SEARCH_SYNC_OVERLAP
+        )
+        await self.search_index.apply_changes(user_id, documents, removed, started)
+        metrics.increment("search.user_refreshed")
+
+    async def search_content(
+        self,
+        user_id: str,
+        query: str,
+        limit: int = 20,
+        deadline: Optional[Deadline] = None,
+    ) -> dict:
+        """
+        Full-text search over a user's content.
+
+        A user's first search builds their entries in the background and
+        waits for it within the deadline; a build that needs longer keeps
+        running and the search is answered with SearchIndexBuildingError.
+        Entries older than search_index_refresh_seconds are searched as
+        they are while the documents changed since are read in the
+        background.
+
+        Args:
+            user_id: User identifier
+            query: Free-text query
+            limit: Maximum number of results
+            deadline: Optional request deadline
+
+        Returns:
+            Dictionary with the query and ranked history items with scores
+
+        Raises:
+            DatabaseError: If there is no search index or loading fails
+            SearchIndexBuildingError: If the user's entries are still building
+        """
+        if self.search_index is None:
+            raise DatabaseError("Search is not configured")
+        index = self.search_index
+        synced_at = await index.synced_at(user_id)
+        if synced_at is None:
+            build = index.sync(user_id, lambda: self._load_search(user_id))
+            try:
+                await asyncio.wait_for(
+                    asyncio.shield(build), deadline.timeout() if deadline else None
+                )
+            except asyncio.TimeoutError:
+                metrics.increment("search.build_pending")
+                raise SearchIndexBuildingError(
+                    "Search index is still being built for this user"
+                )
+        elif not index.is_fresh(synced_at):
+            index.sync(user_id, lambda: self._refresh_search(user_id, synced_at))
+        hits = await index.search(user_id, query, limit)
+        return {
+            "query": query,
+            "items": [
+                {**_history_item(hit.summary), "score": round(hit.score, 4)}
+                for hit in hits
+            ],
+        }
@@ -0,0 +1,328 @@
+"""
+Knowledge Base Index.
+In-process BM25 retrieval over the knowledge-base markdown files, used to
+ground agent prompts without a remote file_search round trip.
+"""
+
+import hashlib
+import json
+import re
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Optional
+import numpy as np
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Bump when chunking or scoring changes so stale caches are ignored
+INDEX_FORMAT_VERSION = 2
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+HEADING_PATTERN = re.compile(r"^(#{1,4})\s+(.+?)\s*$", re.MULTILINE)
+
+STOPWORDS = frozenset("""
+    a an and are as at be but by for from has have how if in into is it its
+    of on or our so that the their then there these this to was we what when
+    which will with you your
+    """.split())
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Split text into lowercase index terms.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of terms with stopwords removed
+    """
+    return [
+        token
+        for token in TOKEN_PATTERN.findall(text.lower())
+        if token not in STOPWORDS and len(token) > 1
+    ]
+
+
+def split_paragraph(paragraph: str, max_chars: int) -> list[str]:
+    """
+    Split a paragraph into pieces of at most max_chars.
+
+    Pieces end at the last whitespace that fits; a run of text with no
+    whitespace is cut at max_chars.
+
+    Args:
+        paragraph: Paragraph text
+        max_chars: Maximum characters per piece
+
+    Returns:
+        Pieces that together hold every word of the paragraph
+    """
+    pieces = []
+    while len(paragraph) > max_chars:
+        cut = paragraph.rfind(" ", 0, max_chars + 1)
+        cut = max(cut, paragraph.rfind("\n", 0, max_chars + 1))
+        if cut <= 0:
+            cut = max_chars
+        pieces.append(paragraph[:cut].rstrip())
+        paragraph = paragraph[cut:].lstrip()
+    if paragraph:
+        pieces.append(paragraph)
+    return pieces
+
+
+@dataclass
+class KnowledgeChunk:
+    """A retrievable section of a knowledge-base file."""
+
+    source: str
+    heading: str
+    text: str
+
+
+def chunk_markdown(
+    text: str, source: str, max_chars: int = 1200
+) -> list[KnowledgeChunk]:
+    """
+    Split a markdown document into heading-scoped chunks.
+
+    Sections longer than max_chars are split further on paragraph
+    boundaries, and paragraphs longer than max_chars on whitespace, so each
+    chunk stays small enough to inject into a prompt without losing text.
+
+    Args:
+        text: Markdown document text
+        source: Source file name
+        max_chars: Maximum characters per chunk
+
+    Returns:
+        List of knowledge chunks
+    """
+    sections: list[tuple[str, str]] = []
+    headings = list(HEADING_PATTERN.finditer(text))
+
+    if not headings or headings[0].start() > 0:
+        end = headings[0].start() if headings else len(text)
+        sections.append((source, text[:end]))
+
+    for i, match in enumerate(headings):
+        end = headings[i + 1].start() if i + 1 < len(headings) else len(text)
+        sections.append((match.group(2).strip("# *"), text[match.end() : end]))
+
+    chunks = []
+    for heading, body in sections:
+        paragraphs = [
+            piece
+            for p in re.split(r"\n\s*\n", body)
+            if p.strip()
+            for piece in split_paragraph(p.strip(), max_chars)
+        ]
+        buffer = ""
+        for paragraph in paragraphs:
+            if buffer and len(buffer) + len(paragraph) + 2 > max_chars:
+                chunks.append(KnowledgeChunk(source, heading, buffer))
+                buffer = ""
+            buffer = f"{buffer}\n\n{paragraph}" if buffer else paragraph
+        if buffer:
+            chunks.append(KnowledgeChunk(source, heading, buffer))
+
+    return chunks
+
+
+class KnowledgeIndex:
+    """BM25 index over knowledge-base chunks backed by a dense NumPy matrix."""
+
+    def __init__(
+        self,
+        chunks: list[KnowledgeChunk],
+        vocabulary: dict[str, int],
+        weights: np.ndarray,
+    ):
+        """
+        Initialize knowledge index.
+
+        Args:
+            chunks: Indexed chunks (row order of weights)
+            vocabulary: Term to column mapping
+            weights: Precomputed BM25 term weights (chunks x terms)
+        """
+        self.chunks = chunks
+        self.vocabulary = vocabulary
+        self.weights = weights
+
+    @classmethod
+    def build(
+        cls,
+        chunks: list[KnowledgeChunk],
+        k1: float = 1.5,
+        b: float = 0.75,
+    ) -> "KnowledgeIndex":
+        """
+        Build an index from chunks.
+
+        Args:
+            chunks: Chunks to index
+            k1: BM25 term frequency saturation
+            b: BM25 length normalization
+
+        Returns:
+            Built knowledge index
+        """
+        documents = [tokenize(f"{c.heading} {c.text}") for c in chunks]
+        vocabulary: dict[str, int] = {}
+        for terms in documents:
+            for term in terms:
+                vocabulary.setdefault(term, len(vocabulary))
+
+        tf = np.zeros((len(chunks), len(vocabulary)), dtype=np.float32)
+        for row, terms in enumerate(documents):
+            for term in terms:
+                tf[row, vocabulary[term]] += 1
+
+        lengths = tf.sum(axis=1, keepdims=True)
+        avg_length = float(lengths.mean()) if len(chunks) else 0.0
+        doc_freq = (tf > 0).sum(axis=0)
+        idf = np.log1p((len(chunks) - doc_freq + 0.5) / (doc_freq + 0.5))
+
+        norm = k1 * (1 - b + b * lengths / max(avg_length, 1.0))
+        weights = (tf * (k1 + 1) / (tf + norm)) * idf
+        return cls(chunks, vocabulary, weights.astype(np.float32))
+
+    @classmethod
+    def from_directory(
+        cls,
+        knowledge_dir: Path,
+        cache_dir: Optional[Path] = None,
+        max_chunk_chars: int = 1200,
+    ) -> "KnowledgeIndex":
+        """
+        Load the index from cache or build it from markdown files.
+
+        The cache key is derived from the content hash of every file, so
+        editing the knowledge base invalidates the cache automatically;
+        caches written under other keys are removed once the new one is.
+
+        Args:
+            knowledge_dir: Directory containing knowledge-base markdown files
+            cache_dir: Optional directory for the on-disk index cache
+            max_chunk_chars: Maximum characters per chunk
+
+        Returns:
+            Knowledge index
+        """
+        files = sorted(knowledge_dir.glob("*.md"))
+        digest = hashlib.sha256(f"v{INDEX_FORMAT_VERSION}:{max_chunk_chars}".encode())
+        contents = {}
+        for path in files:
+            data = path.read_bytes()
+            contents[path.name] = data.decode("utf-8")
+            digest.update(path.name.encode())
+            digest.update(hashlib.sha256(data).digest())
+        cache_key = digest.hexdigest()[:16]
+
+        cache_file = cache_dir / f"kb-index-{cache_key}.npz" if cache_dir else None
+        if cache_file and cache_file.exists():
+            try:
+                index = cls.load(cache_file)
+                logger.info(
+                    "Knowledge index loaded from cache",
+                    cache_file=str(cache_file),
+                    chunks=len(index.chunks),
+                )
+                return index
+            except Exception as e:
+                logger.warning(
+                    "Ignoring unreadable knowledge index cache", error=str(e)
+                )
+
+        start_time = time.perf_counter()
+        chunks = []
+        for name, text in contents.items():
+            chunks.extend(chunk_markdown(text, name, max_chunk_chars))
+        index = cls.build(chunks)
+
+        logger.info(
+            "Knowledge index built",
+            files=len(files),
+            chunks=len(chunks),
+            terms=len(index.vocabulary),
+            duration=time.perf_counter() - start_time,
+        )
+
+        if cache_file:
+            index.write_cache(cache_file)
+
+        return index
+
+    def write_cache(self, cache_file: Path) -> None:
+        """
+        Save the index as the current cache and remove caches of older keys.
+
+        A failed write is logged and otherwise ignored.
+
+        Args:
+            cache_file: Cache file for the current cache key
+        """
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            self.save(cache_file)
+            for stale in cache_file.parent.glob("kb-index-*.npz"):
+                if stale != cache_file:
+                    stale.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning("Failed to write knowledge index cache", error=str(e))
+
+    def save(self, path: Path) -> None:
+        """
+        Persist the index to an .npz file.
+
+        Args:
+            path: Destination file
+        """
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        np.savez_compressed(
+            path,
+            weights=self.weights,
+            terms=np.array(json.dumps(terms)),
+            chunks=np.array(json.dumps([asdict(c) for c in self.chunks])),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "KnowledgeIndex":
+        """
+        Load an index previously written by save().
+
+        Args:
+            path: Source file
+
+        Returns:
+            Knowledge index
+        """
+        with np.load(path, allow_pickle=False) as data:
+            terms = json.loads(str(data["terms"]))
+            chunks = [KnowledgeChunk(**c) for c in json.loads(str(data["chunks"]))]
+            weights = data["weights"]
+        return cls(chunks, {t: i for i, t in enumerate(terms)}, weights)
+
+    def search(self, query: str, top_k: int = 3) -> list[tuple[KnowledgeChunk, float]]:
+        """
+        Rank chunks against a query.
+
+        Args:
+            query: Free-text query
+            top_k: Maximum number of results
+
+        Returns:
+            List of (chunk, score) pairs, best first, excluding zero scores
+        """
+        columns = [self.vocabulary[t] for t in tokenize(query) if t in self.vocabulary]
+        if not columns or not self.chunks:
+            return []
+
+        scores = self.weights[:, columns].sum(axis=1)
+        top_k = min(top_k, len(scores))
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best])]
+        return [(self.chunks[i], float(scores[i])) for i in best if scores[i] > 0]
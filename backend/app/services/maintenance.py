@@ -0,0 +1,95 @@
+"""
+Background maintenance jobs.
+Periodic tasks started from the application lifespan that maintain derived
+data: per-user content counters, change-feed history views and compaction
+of what purged content leaves behind.
+"""
+
+import asyncio
+from typing import Awaitable, Callable
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+async def run_periodically(
+    name: str, interval: float, job: Callable[[], Awaitable[object]]
+) -> None:
+    """
+    Run a job every interval seconds until cancelled.
+
+    Failures are logged and the loop carries on, so one bad pass does not
+    stop later ones.
+
+    Args:
+        name: Job name used in logs
+        interval: Seconds to wait between runs
+        job: Coroutine function to run
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await job()
+        except Exception as e:
+            logger.error("Maintenance job failed", job=name, error=str(e))
+
+
+def start_maintenance(repository, settings) -> list[asyncio.Task]:
+    """
+    Start the periodic maintenance jobs that are enabled in settings.
+
+    Args:
+        repository: Shared content repository
+        settings: Application settings
+
+    Returns:
+        Started tasks; cancel them on shutdown
+    """
+    tasks = []
+    if settings.counter_reconcile_interval > 0:
+        tasks.append(
+            asyncio.create_task(
+                run_periodically(
+                    "counter_reconciliation",
+                    settings.counter_reconcile_interval,
+                    repository.reconcile_all_counts,
+                )
+            )
+        )
+    if settings.compaction_interval > 0:
+        tasks.append(
+            asyncio.create_task(
+                run_periodically(
+                    "compaction", settings.compaction_interval, repository.compact
+                )
+            )
+        )
+    if settings.history_views_enabled and repository.database is not None:
+        from ..repositories.change_feed import (
+            ChangeFeedProcessor,
+            CosmosCheckpointStore,
+        )
+        from ..repositories.history_views import HistoryViewBuilder
+
+        builder = HistoryViewBuilder(
+            repository.container,
+            settings.history_view_recent_items,
+            repository.partitions,
+            call=repository.paced_call,
+            daily_days=settings.history_view_daily_days,
+        )
+        processor = ChangeFeedProcessor(
+            repository.container,
+            CosmosCheckpointStore(
+                repository.database.get_container_client(
+                    settings.cosmos_lease_container
+                ),
+                call=repository.paced_call,
+            ),
+            builder.handle,
+            name="history-views",
+            poll_interval=settings.change_feed_poll_interval,
+            call=repository.paced_call,
+        )
+        tasks.append(asyncio.create_task(processor.run()))
+    return tasks
@@ -0,0 +1,212 @@
+"""
+Prompt Budget.
+Local token estimation and priority-based prompt assembly so oversized
+prompts are trimmed or rejected before any remote agent call.
+"""
+
+import math
+import re
+from dataclasses import dataclass, field
+import structlog
+
+from ..utils.exceptions import PromptTooLargeError
+
+logger = structlog.get_logger(__name__)
+
+# Word runs and individual punctuation/symbol characters
+_PIECE_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+# Average characters per token for word-like runs in English text
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of model tokens in a text.
+
+    Words count as one token per ~4 characters and every punctuation or
+    symbol character counts as one token, which slightly overestimates
+    typical BPE tokenizers and keeps the budget on the safe side.
+
+    Args:
+        text: Text to estimate
+
+    Returns:
+        Estimated token count
+    """
+    total = 0
+    for piece in _PIECE_PATTERN.findall(text):
+        total += math.ceil(len(piece) / CHARS_PER_TOKEN) if piece[0].isalnum() else 1
+    return total
+
+
+@dataclass
+class PromptSection:
+    """A named part of a prompt."""
+
+    name: str
+    text: str
+    priority: int = 0
+    required: bool = False
+    trimmable: bool = False
+    internal: bool = False
+    lead: str = ""
+    after: str = ""
+
+
+@dataclass
+class AssembledPrompt:
+    """Result of fitting prompt sections into a token budget."""
+
+    text: str
+    estimated_tokens: int
+    budget: int
+    included: list[str] = field(default_factory=list)
+    trimmed: list[str] = field(default_factory=list)
+    dropped: list[str] = field(default_factory=list)
+
+
+class PromptAssembler:
+    """Fits prompt sections into a token budget by priority."""
+
+    def __init__(self, budget: int, reject_on_overflow: bool = False):
+        """
+        Initialize prompt assembler.
+
+        Args:
+            budget: Maximum estimated tokens for the assembled prompt
+            reject_on_overflow: Raise instead of trimming optional sections
+                supplied by the caller (internal sections are still trimmed)
+        """
+        self.budget = budget
+        self.reject_on_overflow = reject_on_overflow
+        self.sections: list[PromptSection] = []
+
+    def add(
+        self,
+        name: str,
+        text: str,
+        priority: int = 0,
+        required: bool = False,
+        trimmable: bool = False,
+        internal: bool = False,
+        lead: str = "",
+        after: str = "",
+    ) -> "PromptAssembler":
+        """
+        Append a section. Output order follows insertion order.
+
+        Args:
+            name: Section name (used in logs)
+            text: Section text
+            priority: Lower values are kept first when the budget is tight
+            required: Reject the prompt if this section does not fit
+            trimmable: Allow truncating the section to fit the remaining budget
+            internal: Added by the server rather than the caller (such as
+                retrieved excerpts), so trimmed or dropped even when overflow
+                is rejected
+            lead: Text put in front of the section whenever the section is
+                kept; never trimmed, so a heading can't lose what it labels
+            after: Name of a section placed before this one by priority;
+                this section is dropped unless that one was kept
+
+        Returns:
+            The assembler, for chaining
+        """
+        if text:
+            self.sections.append(
+                PromptSection(name, text, priority, required, trimmable, internal, lead)
+            )
+        return self
+
+    def assemble(self) -> AssembledPrompt:
+        """
+        Fit sections into the budget.
+
+        Returns:
+            Assembled prompt with the sections that were kept
+
+        Raises:
+            PromptTooLargeError: If required sections exceed the budget, or
+                a caller-supplied section does not fit and overflow is rejected
+        """
+        # Sections are joined with newlines, which count as whitespace only
+        remaining = self.budget
+        kept: dict[int, str] = {}
+        result = AssembledPrompt(text="", estimated_tokens=0, budget=self.budget)
+
+        order = sorted(
+            range(len(self.sections)),
+            key=lambda i: (not self.sections[i].required, self.sections[i].priority),
+        )
+        for i in order:
+            section = self.sections[i]
+            if section.after and section.after not in result.included:
+                result.dropped.append(section.name)
+                continue
+            tokens = estimate_tokens(section.lead + section.text)
+
+            if tokens <= remaining:
+                kept[i] = section.lead + section.text
+                remaining -= tokens
+                result.included.append(section.name)
+                continue
+
+            if section.required or (self.reject_on_overflow and not section.internal):
+                raise PromptTooLargeError(
+                    f"Prompt section '{section.name}' needs ~{tokens} tokens but only "
+                    f"{remaining} of the {self.budget} token budget remain"
+                )
+
+            lead_tokens = estimate_tokens(section.lead)
+            if section.trimmable and remaining > lead_tokens:
+                trimmed = _truncate_to_tokens(section.text, remaining - lead_tokens)
+                if trimmed:
+                    kept[i] = section.lead + trimmed
+                    remaining -= estimate_tokens(kept[i])
+                    result.included.append(section.name)
+                    result.trimmed.append(section.name)
+                    continue
+
+            result.dropped.append(section.name)
+
+        result.text = "\n".join(kept[i] for i in sorted(kept))
+        result.estimated_tokens = self.budget - remaining
+
+        if result.trimmed or result.dropped:
+            logger.info(
+                "Prompt trimmed to fit token budget",
+                budget=self.budget,
+                estimated_tokens=result.estimated_tokens,
+                trimmed=result.trimmed,
+                dropped=result.dropped,
+            )
+
+        return result
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Truncate text to at most max_tokens, preferring a line boundary.
+
+    Args:
+        text: Text to truncate
+        max_tokens: Token limit
+
+    Returns:
+        Truncated text (may be empty)
+    """
+    # Binary search on character length; estimate_tokens is monotonic
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(text[:mid]) + 1 <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+
+    cut = text[:low]
+    newline = cut.rfind("\n")
+    if newline > len(cut) // 2:
+        cut = cut[:newline]
+    return f"{cut.rstrip()}…" if cut.strip() else ""
@@ -0,0 +1,596 @@
+"""
+Full-text search over a user's content.
+A per-user inverted index over topic, hook, key points and platform
+bodies, ranked with BM25. Backends: in-process postings and SQLite FTS5.
+Users are loaded from the repository on first search and kept current by
+the content service on create and delete. Once entries are older than the
+refresh interval, the documents changed since they were synced are read,
+so writes made by other replicas show up. Loads and refreshes run in the
+background (see SearchIndex.sync), never bounded by a request deadline.
+"""
+
+import asyncio
+import hashlib
+import heapq
+import json
+import math
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+import aiosqlite
+import structlog
+
+from ..models.database import ContentDocument, ContentSummary
+from ..utils.metrics import metrics
+from .knowledge_index import tokenize
+
+logger = structlog.get_logger(__name__)
+
+# Field weights: a topic match outranks a match deep in a blog body
+FIELD_WEIGHTS = {"topic": 3.0, "hook": 2.0, "key_points": 1.5, "body": 1.0}
+
+
+def _strings(value: Any) -> list[str]:
+    if isinstance(value, dict):
+        return [text for item in value.values() for text in _strings(item)]
+    if isinstance(value, list):
+        return [text for item in value for text in _strings(item)]
+    return [value] if isinstance(value, str) else []
+
+
+def searchable_fields(document: ContentDocument) -> dict[str, str]:
+    """
+    Extract the indexed text of a document.
+
+    Args:
+        document: Content document with plain (inflated) generated_content
+
+    Returns:
+        Text per field in FIELD_WEIGHTS
+    """
+    content = document.generated_content or {}
+    plan = content.get("plan") or {}
+    return {
+        "topic": document.topic,
+        "hook": " ".join(_strings(plan.get("hook"))),
+        "key_points": " ".join(_strings(plan.get("keyPoints"))),
+        "body": " ".join(_strings(content.get("outputs"))),
+    }
+
+
+@dataclass
+class SearchHit:
+    """A matching document and its relevance score (higher is better)."""
+
+    summary: ContentSummary
+    score: float
+
+
+def _summary(document: ContentDocument) -> ContentSummary:
+    return ContentSummary(
+        **document.model_dump(include=set(ContentSummary.model_fields), by_alias=True)
+    )
+
+
+class SearchIndex(ABC):
+    """Per-user full-text index; see the module docstring for the lifecycle."""
+
+    def __init__(self, refresh_seconds: float = 0.0):
+        """
+        Initialize the index.
+
+        Args:
+            refresh_seconds: Reload a user's entries after this many seconds
+                (0 keeps them until invalidated)
+        """
+        self.refresh_seconds = refresh_seconds
+        self._syncs: dict[str, asyncio.Task] = {}
+
+    def is_fresh(self, synced_at: Optional[float]) -> bool:
+        """Whether entries synced at this time need no refresh yet."""
+        if synced_at is None:
+            return False
+        return (
+            not self.refresh_seconds or time.time() - synced_at < self.refresh_seconds
+        )
+
+    async def is_loaded(self, user_id: str) -> bool:
+        """Whether the user's entries are present and fresh."""
+        return self.is_fresh(await self.synced_at(user_id))
+
+    def sync(self, user_id: str, work: Callable[[], Awaitable[None]]) -> asyncio.Task:
+        """
+        Run a load or refresh of a user's entries in the background.
+
+        At most one runs per user; while it does, the running task is
+        returned instead of starting another. Failures are logged.
+
+        Args:
+            user_id: User identifier
+            work: Coroutine function doing the load or refresh
+
+        Returns:
+            The task, which callers may wait on (shielded) or leave running
+        """
+        task = self._syncs.get(user_id)
+        if task is None:
+            task = asyncio.create_task(work())
+            self._syncs[user_id] = task
+            task.add_done_callback(lambda done: self._synced(user_id, done))
+        return task
+
+    def _synced(self, user_id: str, task: asyncio.Task) -> None:
+        if self._syncs.get(user_id) is task:
+            del self._syncs[user_id]
+        if not task.cancelled() and task.exception() is not None:
+            metrics.increment("search.sync_failed")
+            logger.warning(
+                "Search index sync failed", user_id=user_id, error=str(task.exception())
+            )
+
+    @abstractmethod
+    async def synced_at(self, user_id: str) -> Optional[float]:
+        """
+        When the user's entries were last loaded or refreshed.
+
+        Args:
+            user_id: User identifier
+
+        Returns:
+            Epoch seconds, or None if the user is not loaded
+        """
+
+    @abstractmethod
+    async def load_user(
+        self,
+        user_id: str,
+        documents: list[ContentDocument],
+        synced_at: Optional[float] = None,
+    ) -> None:
+        """
+        Replace all of a user's entries.
+
+        Args:
+            user_id: User identifier
+            documents: The user's live documents (inflated)
+            synced_at: When the documents were read (default now)
+        """
+
+    @abstractmethod
+    async def apply_changes(
+        self,
+        user_id: str,
+        documents: list[ContentDocument],
+        removed: list[str],
+        synced_at: float,
+    ) -> None:
+        """
+        Refresh a loaded user's entries with what changed since their sync.
+
+        Args:
+            user_id: User identifier
+            documents: Live documents written since the last sync (inflated)
+            removed: IDs of documents deleted since the last sync
+            synced_at: When the changes were read
+        """
+
+    @abstractmethod
+    async def add(self, document: ContentDocument) -> None:
+        """
+        Index or re-index one document of an already loaded user.
+
+        Args:
+            document: Live document (inflated)
+        """
+
+    @abstractmethod
+    async def remove(self, user_id: str, content_id: str) -> None:
+        """
+        Drop one document.
+
+        Args:
+            user_id: User identifier
+            content_id: Content identifier
+        """
+
+    @abstractmethod
+    async def invalidate(self, user_id: str) -> None:
+        """
+        Force a reload of the user's entries on their next search.
+
+        Args:
+            user_id: User identifier
+        """
+
+    @abstractmethod
+    async def search(
+        self, user_id: str, query: str, limit: int = 20
+    ) -> list[SearchHit]:
+        """
+        Rank the user's documents against a query.
+
+        Args:
+            user_id: User identifier
+            query: Free-text query
+            limit: Maximum hits
+
+        Returns:
+            Hits, best first
+        """
+
+
+class _UserPostings:
+    """Inverted index of one user's documents."""
+
+    def __init__(self):
+        self.postings: dict[str, dict[str, float]] = {}
+        self.lengths: dict[str, float] = {}
+        self.summaries: dict[str, ContentSummary] = {}
+        self.synced_at = time.time()
+
+    def add(self, document: ContentDocument) -> None:
+        self.remove(document.id)
+        frequencies: Counter = Counter()
+        for field, text in searchable_fields(document).items():
+            for term in tokenize(text):
+                frequencies[term] += FIELD_WEIGHTS[field]
+        for term, frequency in frequencies.items():
+            self.postings.setdefault(term, {})[document.id] = frequency
+        self.lengths[document.id] = sum(frequencies.values())
+        self.summaries[document.id] = _summary(document)
+
+    def remove(self, content_id: str) -> None:
+        if self.lengths.pop(content_id, None) is None:
+            return
+        self.summaries.pop(content_id, None)
+        for term in list(self.postings):
+            documents = self.postings[term]
+            if documents.pop(content_id, None) is not None and not documents:
+                del self.postings[term]
+
+
+class InMemorySearchIndex(SearchIndex):
+    """
+    Postings held in process memory, scored with BM25.
+
+    At most max_users users are kept; the least recently searched is
+    dropped to make room and reloaded if they search again.
+    """
+
+    def __init__(
+        self,
+        refresh_seconds: float = 0.0,
+        k1: float = 1.5,
+        b: float = 0.75,
+        max_users: int = 1000,
+    ):
+        """
+        Initialize the index.
+
+        Args:
+            refresh_seconds: See SearchIndex
+            k1: BM25 term frequency saturation
+            b: BM25 length normalisation
+            max_users: Users whose postings are kept (0: no limit)
+        """
+        super().__init__(refresh_seconds)
+        self.k1 = k1
+        self.b = b
+        self.max_users = max_users
+        self._users: OrderedDict[str, _UserPostings] = OrderedDict()
+
+    async def synced_at(self, user_id: str) -> Optional[float]:
+        index = self._users.get(user_id)
+        return index.synced_at if index else None
+
+    async def load_user(
+        self,
+        user_id: str,
+        documents: list[ContentDocument],
+        synced_at: Optional[float] = None,
+    ) -> None:
+        index = _UserPostings()
+        for document in documents:
+            index.add(document)
+        if synced_at is not None:
+            index.synced_at = synced_at
+        self._users[user_id] = index
+        self._users.move_to_end(user_id)
+        while self.max_users and len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+            metrics.increment("search.user_evicted")
+
+    async def apply_changes(
+        self,
+        user_id: str,
+        documents: list[ContentDocument],
+        removed: list[str],
+        synced_at: float,
+    ) -> None:
+        index = self._users.get(user_id)
+        if index is None:
+            return
+        for content_id in removed:
+            index.remove(content_id)
+        for document in documents:
+            index.add(document)
+        index.synced_at = synced_at
+
+    async def add(self, document: ContentDocument) -> None:
+        index = self._users.get(document.partition_key)
+        if index is not None:
+            index.add(document)
+
+    async def remove(self, user_id: str, content_id: str) -> None:
+        index = self._users.get(user_id)
+        if index is not None:
+            index.remove(content_id)
+
+    async def invalidate(self, user_id: str) -> None:
+        self._users.pop(user_id, None)
+
+    async def search(
+        self, user_id: str, query: str, limit: int = 20
+    ) -> list[SearchHit]:
+        index = self._users.get(user_id)
+        if index is None:
+            return []
+        self._users.move_to_end(user_id)
+        if not index.lengths:
+            return []
+        count = len(index.lengths)
+        average = sum(index.lengths.values()) / count
+        scores: dict[str, float] = {}
+        for term in set(tokenize(query)):
+            documents = index.postings.get(term)
+            if not documents:
+                continue
+            idf = math.log(1 + (count - len(documents) + 0.5) / (len(documents) + 0.5))
+            for content_id, frequency in documents.items():
+                norm = self.k1 * (
+                    1 - self.b + self.b * index.lengths[content_id] / average
+                )
+                scores[content_id] = scores.get(content_id, 0.0) + idf * (
+                    frequency * (self.k1 + 1) / (frequency + norm)
+                )
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [
+            SearchHit(summary=index.summaries[content_id], score=score)
+            for content_id, score in best
+        ]
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_rows (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    content_id TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    UNIQUE (user_id, content_id)
+);
+CREATE TABLE IF NOT EXISTS search_users (
+    user_id TEXT PRIMARY KEY,
+    loaded_at REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS search_text USING fts5(
+    owner, topic, hook, key_points, body, tokenize = 'unicode61'
+);
+"""
+
+
+def _owner_token(user_id: str) -> str:
+    """Single FTS token identifying a user, so matches are scoped in the index."""
+    return "u" + hashlib.sha256(user_id.encode()).hexdigest()[:24]
+
+
+class SQLiteSearchIndex(SearchIndex):
+    """
+    SQLite FTS5 index in its own database file.
+
+    Every row carries its owner as an indexed token, so a query only walks
+    the user's postings; bm25() applies FIELD_WEIGHTS per column.
+    """
+
+    def __init__(self, path: str, refresh_seconds: float = 0.0):
+        """
+        Initialize the index (the database opens on first use).
+
+        Args:
+            path: Database file, or ":memory:"
+            refresh_seconds: See SearchIndex
+        """
+        super().__init__(refresh_seconds)
+        self.path = path
+        self._connection: Optional[aiosqlite.Connection] = None
+        self._lock = asyncio.Lock()
+
+    async def _db(self) -> aiosqlite.Connection:
+        if self._connection is None:
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            connection = await aiosqlite.connect(self.path, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            await connection.execute("PRAGMA journal_mode = WAL")
+            await connection.executescript(SQLITE_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    async def close(self) -> None:
+        """Close the database connection."""
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    async def synced_at(self, user_id: str) -> Optional[float]:
+        async with self._lock:
+            db = await self._db()
+            async with db.execute(
+                "SELECT loaded_at FROM search_users WHERE user_id = ?", (user_id,)
+            ) as cursor:
+                row = await cursor.fetchone()
+        return row["loaded_at"] if row else None
+
+    @staticmethod
+    async def _remove(db: aiosqlite.Connection, user_id: str, content_id: str) -> None:
+        async with db.execute(
+            "SELECT id FROM search_rows WHERE user_id = ? AND content_id = ?",
+            (user_id, content_id),
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is not None:
+            await db.execute("DELETE FROM search_text WHERE rowid = ?", (row["id"],))
+            await db.execute("DELETE FROM search_rows WHERE id = ?", (row["id"],))
+
+    @staticmethod
+    async def _insert(db: aiosqlite.Connection, document: ContentDocument) -> None:
+        summary = _summary(document).model_dump_json(by_alias=True)
+        cursor = await db.execute(
+            "INSERT INTO search_rows (user_id, content_id, summary) VALUES (?, ?, ?)",
+            (document.partition_key, document.id, summary),
+        )
+        fields = searchable_fields(document)
+        await db.execute(
+            "INSERT INTO search_text (rowid, owner, topic, hook, key_points, body) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                cursor.lastrowid,
+                _owner_token(document.partition_key),
+                fields["topic"],
+                fields["hook"],
+                fields["key_points"],
+                fields["body"],
+            ),
+        )
+
+    async def load_user(
+        self,
+        user_id: str,
+        documents: list[ContentDocument],
+        synced_at: Optional[float] = None,
+    ) -> None:
+        async with self._lock:
+            db = await self._db()
+            await db.execute("BEGIN IMMEDIATE")
+            try:
+                async with db.execute(
+                    "SELECT content_id FROM search_rows WHERE user_id = ?", (user_id,)
+                ) as cursor:
+                    existing = [row["content_id"] for row in await cursor.fetchall()]
+                for content_id in existing:
+                    await self._remove(db, user_id, content_id)
+                for document in documents:
+                    await self._insert(db, document)
+                await db.execute(
+                    "INSERT OR REPLACE INTO search_users (user_id, loaded_at) "
+                    "VALUES (?, ?)",
+                    (user_id, time.time() if synced_at is None else synced_at),
+                )
+            except BaseException:
+                await db.execute("ROLLBACK")
+                raise
+            await db.execute("COMMIT")
+
+    async def apply_changes(
+        self,
+        user_id: str,
+        documents: list[ContentDocument],
+        removed: list[str],
+        synced_at: float,
+    ) -> None:
+        async with self._lock:
+            db = await self._db()
+            await db.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = await db.execute(
+                    "UPDATE search_users SET loaded_at = ? WHERE user_id = ?",
+                    (synced_at, user_id),
+                )
+                if cursor.rowcount:
+                    for content_id in removed:
+                        await self._remove(db, user_id, content_id)
+                    for document in documents:
+                        await self._remove(db, user_id, document.id)
+                        await self._insert(db, document)
+            except BaseException:
+                await db.execute("ROLLBACK")
+                raise
+            await db.execute("COMMIT")
+
+    async def add(self, document: ContentDocument) -> None:
+        async with self._lock:
+            db = await self._db()
+            await db.execute("BEGIN IMMEDIATE")
+            try:
+                await self._remove(db, document.partition_key, document.id)
+                await self._insert(db, document)
+            except BaseException:
+                await db.execute("ROLLBACK")
+                raise
+            await db.execute("COMMIT")
+
+    async def remove(self, user_id: str, content_id: str) -> None:
+        async with self._lock:
+            db = await self._db()
+            await db.execute("BEGIN IMMEDIATE")
+            try:
+                await self._remove(db, user_id, content_id)
+            except BaseException:
+                await db.execute("ROLLBACK")
+                raise
+            await db.execute("COMMIT")
+
+    async def invalidate(self, user_id: str) -> None:
+        async with self._lock:
+            db = await self._db()
+            await db.execute("DELETE FROM search_users WHERE user_id = ?", (user_id,))
+
+    async def search(
+        self, user_id: str, query: str, limit: int = 20
+    ) -> list[SearchHit]:
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return []
+        # Quoted terms can't be read as FTS5 operators or column filters
+        match = f'owner:{_owner_token(user_id)} AND ({" OR ".join(json.dumps(t) for t in terms)})'
+        weights = ", ".join(str(weight) for weight in FIELD_WEIGHTS.values())
+        async with self._lock:
+            db = await self._db()
+            async with db.execute(
+                f"SELECT r.summary, bm25(search_text, 0.0, {weights}) AS rank "
+                "FROM search_text JOIN search_rows r ON r.id = search_text.rowid "
+                "WHERE search_text MATCH ? ORDER BY rank LIMIT ?",
+                (match, limit),
+            ) as cursor:
+                rows = await cursor.fetchall()
+        # bm25() is lower-is-better; flip it so scores read like BM25
+        return [
+            SearchHit(
+                summary=ContentSummary.model_validate_json(row["summary"]),
+                score=-row["rank"],
+            )
+            for row in rows
+        ]
+
+
+def create_search_index(settings) -> SearchIndex:
+    """
+    Build the configured search index.
+
+    Args:
+        settings: Application settings
+
+    Returns:
+        In-memory or SQLite FTS5 index
+    """
+    if settings.search_backend == "sqlite":
+        return SQLiteSearchIndex(
+            settings.search_index_path, settings.search_index_refresh_seconds
+        )
+    return InMemorySearchIndex(
+        settings.search_index_refresh_seconds,
+        max_users=settings.search_index_max_users,
+    )
@@ -0,0 +1,180 @@
+"""
+Admission control for expensive endpoints.
+Bounds in-flight work and the waiting queue, and sheds load immediately
+with a computed Retry-After instead of letting requests pile up.
+"""
+
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+import structlog
+
+from .deadline import Deadline
+from .exceptions import DeadlineExceededError, RateLimitError, ServiceOverloadedError
+from .metrics import metrics
+
+logger = structlog.get_logger(__name__)
+
+
+class AdmissionSlot:
+    """
+    A held concurrency slot.
+
+    Released when its block ends, unless the request's work was handed to
+    the background, in which case it is held until that work finishes.
+    """
+
+    def __init__(self):
+        self.disconnected = False
+        self.detached: Optional[asyncio.Future] = None
+
+    def client_disconnected(self, work: Optional[asyncio.Future] = None) -> None:
+        """
+        Record that the client went away.
+
+        The request's service time is then not sampled, since it was cut
+        short or no longer ends with the response.
+
+        Args:
+            work: Work that carries on without the client; the slot is
+                held until it finishes
+        """
+        self.disconnected = True
+        if work is not None and not work.done():
+            self.detached = work
+
+
+class AdmissionController:
+    """Concurrency limiter with a bounded queue and wait-time estimation."""
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queue: int,
+        max_queue_wait: float,
+        initial_service_time: float,
+        name: str = "generation",
+        smoothing: float = 0.2,
+    ):
+        """
+        Initialize admission controller.
+
+        Args:
+            max_concurrent: Requests allowed to run at once
+            max_queue: Requests allowed to wait for a slot
+            max_queue_wait: Longest estimated wait accepted (seconds)
+            initial_service_time: Service time estimate before any samples
+            name: Metric name prefix
+            smoothing: Weight of the newest sample in the moving average
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_queue_wait = max_queue_wait
+        self.name = name
+        self.smoothing = smoothing
+        self.avg_service_time = initial_service_time
+        self.in_flight = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    def estimated_wait(self) -> float:
+        """
+        Estimate how long a new request would wait for a slot.
+
+        Returns:
+            Seconds until a slot is expected to free up (0 if one is free)
+        """
+        if self.in_flight < self.max_concurrent:
+            return 0.0
+        return self.avg_service_time * (self.waiting + 1) / self.max_concurrent
+
+    def _reject(self, error: RateLimitError) -> None:
+        metrics.increment(f"admission.{self.name}.rejected")
+        logger.warning(
+            "Request shed by admission control",
+            admission=self.name,
+            in_flight=self.in_flight,
+            waiting=self.waiting,
+            retry_after=error.retry_after,
+        )
+        raise error
+
+    def _publish(self) -> None:
+        metrics.set_gauge(f"admission.{self.name}.in_flight", self.in_flight)
+        metrics.set_gauge(f"admission.{self.name}.waiting", self.waiting)
+        metrics.set_gauge(
+            f"admission.{self.name}.avg_service_time", self.avg_service_time
+        )
+
+    def _release(self, held: AdmissionSlot, start_time: float) -> None:
+        if not held.disconnected:
+            elapsed = time.monotonic() - start_time
+            self.avg_service_time += self.smoothing * (elapsed - self.avg_service_time)
+        self.in_flight -= 1
+        self._semaphore.release()
+        self._publish()
+
+    @asynccontextmanager
+    async def slot(
+        self, deadline: Optional[Deadline] = None
+    ) -> AsyncIterator[AdmissionSlot]:
+        """
+        Hold a concurrency slot for the duration of the block.
+
+        The block receives the slot, so it can keep it held for work that
+        outlives the request (see AdmissionSlot.client_disconnected).
+
+        Args:
+            deadline: Optional request deadline; requests that cannot get a
+                slot before it expires are rejected up front
+
+        Raises:
+            RateLimitError: If the queue is full (429)
+            ServiceOverloadedError: If the estimated wait is too long (503)
+            DeadlineExceededError: If the wait would outlast the deadline
+        """
+        wait = self.estimated_wait()
+        if wait > 0:
+            retry_after = max(1, math.ceil(wait))
+            if self.waiting >= self.max_queue:
+                self._reject(
+                    RateLimitError("Too many requests queued", retry_after=retry_after)
+                )
+            if wait > self.max_queue_wait:
+                self._reject(
+                    ServiceOverloadedError(
+                        f"Estimated queue wait {wait:.0f}s exceeds limit",
+                        retry_after=retry_after,
+                    )
+                )
+            if deadline is not None and wait > deadline.remaining():
+                metrics.increment(f"admission.{self.name}.rejected")
+                raise DeadlineExceededError(
+                    f"Estimated queue wait {wait:.0f}s exceeds request deadline"
+                )
+
+        self.waiting += 1
+        self._publish()
+        try:
+            timeout = deadline.remaining() if deadline is not None else None
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise DeadlineExceededError("Request deadline reached waiting in queue")
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        self._publish()
+        start_time = time.monotonic()
+        held = AdmissionSlot()
+        try:
+            yield held
+        finally:
+            if held.detached is not None:
+                held.detached.add_done_callback(
+                    lambda _: self._release(held, start_time)
+                )
+            else:
+                self._release(held, start_time)
@@ -0,0 +1,94 @@
+"""
+Request deadline tracking.
+A Deadline is created from the caller's timeout and passed down through
+services and repositories so each stage can check the remaining budget.
+"""
+
+import time
+from typing import Optional
+
+from .exceptions import DeadlineExceededError
+
+
+class Deadline:
+    """Absolute point in time by which a request must complete."""
+
+    def __init__(self, expires_at: float):
+        """
+        Initialize deadline.
+
+        Args:
+            expires_at: Expiry time on the time.monotonic() clock
+        """
+        self.expires_at = expires_at
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        """
+        Create a deadline a number of seconds from now.
+
+        Args:
+            seconds: Time budget in seconds
+
+        Returns:
+            Deadline instance
+        """
+        return cls(time.monotonic() + seconds)
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (never negative)."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        """Check if the deadline has passed."""
+        return self.remaining() <= 0
+
+    def check(self, stage: str, needed: float = 0.0) -> None:
+        """
+        Ensure enough budget remains to start a stage.
+
+        Args:
+            stage: Name of the stage about to run (for the error message)
+            needed: Minimum seconds the stage is expected to take
+
+        Raises:
+            DeadlineExceededError: If the remaining budget is insufficient
+        """
+        remaining = self.remaining()
+        if remaining <= 0 or remaining < needed:
+            raise DeadlineExceededError(
+                f"Request deadline cannot be met before {stage} "
+                f"({remaining:.2f}s remaining)"
+            )
+
+    def timeout(self, cap: Optional[float] = None) -> float:
+        """
+        Timeout to use for a downstream call.
+
+        Args:
+            cap: Optional upper bound (e.g. a per-call timeout setting)
+
+        Returns:
+            Remaining seconds, limited by cap
+        """
+        remaining = self.remaining()
+        return min(remaining, cap) if cap is not None else remaining
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.3f}s)"
+
+
+def remaining_timeout(deadline: Optional[Deadline]) -> dict:
+    """
+    Build SDK keyword arguments that bound a call by the deadline.
+
+    Args:
+        deadline: Optional request deadline
+
+    Returns:
+        {"timeout": seconds} when a deadline is set, otherwise {}
+    """
+    if deadline is None:
+        return {}
+    return {"timeout": deadline.timeout()}
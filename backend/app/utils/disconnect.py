@@ -0,0 +1,81 @@
+"""
+Client disconnect handling.
+Runs request work as a task and cancels it when the HTTP client goes away,
+so abandoned generations stop consuming agent and database capacity.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+import structlog
+from starlette.requests import Request
+
+from .exceptions import ClientDisconnectedError
+from .metrics import metrics
+
+logger = structlog.get_logger(__name__)
+
+# Disconnect policies
+DISCARD = "discard"  # cancel everything, including an in-flight save
+SAVE_COMPLETED = "save_completed"  # cancel the agent call, finish a started save
+FINISH = "finish"  # let the work complete in the background
+
+# Tasks detached under the FINISH policy (kept referenced until done)
+_background_tasks: set[asyncio.Task] = set()
+
+
+async def run_until_disconnected(
+    request: Request,
+    work: Awaitable[Any],
+    policy: str = SAVE_COMPLETED,
+    poll_interval: float = 0.5,
+    operation: str = "generation",
+    on_disconnect: Optional[Callable[[Optional[asyncio.Future]], None]] = None,
+) -> Any:
+    """
+    Await work while watching for the client to disconnect.
+
+    Args:
+        request: Incoming request to watch
+        work: Coroutine performing the request's work
+        policy: What to do with in-flight work when the client disconnects
+        poll_interval: Seconds between disconnect checks
+        operation: Metric name prefix
+        on_disconnect: Called once the client is gone, with the work if it
+            carries on in the background (FINISH) or None if it was cancelled
+
+    Returns:
+        Result of the work
+
+    Raises:
+        ClientDisconnectedError: If the client disconnected first
+    """
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                break
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+
+    metrics.increment(f"{operation}.client_disconnected")
+    if on_disconnect is not None:
+        on_disconnect(task if policy == FINISH else None)
+    if policy == FINISH:
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+        logger.info(
+            "Client disconnected, finishing work in background", path=request.url.path
+        )
+    else:
+        # Under SAVE_COMPLETED the service shields a save that already started
+        task.cancel()
+        await asyncio.wait({task})
+        if not task.cancelled() and task.exception() is None:
+            metrics.increment(f"{operation}.completed_after_disconnect")
+        logger.info("Client disconnected, work cancelled", path=request.url.path)
+
+    raise ClientDisconnectedError(f"Client disconnected from {request.url.path}")
@@ -21,24 +21,70 @@ class AgentTimeoutError(AgentServiceError):
     pass
 
 
+class DeadlineExceededError(StoryCircuitError):
+    """Exception raised when the caller's deadline cannot be met."""
+
+    pass
+
+
+class ClientDisconnectedError(StoryCircuitError):
+    """Exception raised when the HTTP client disconnects before completion."""
+
+    pass
+
+
 class DatabaseError(StoryCircuitError):
     """Exception raised when database operation fails."""
 
     pass
 
 
+class DatabaseThrottledError(DatabaseError):
+    """Exception raised when database throttling outlasts the request's budget."""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class SearchIndexBuildingError(DatabaseError):
+    """Exception raised when a user's search index is still being built."""
+
+    def __init__(self, message: str, retry_after: int = 2):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
 class ContentNotFoundError(StoryCircuitError):
     """Exception raised when content is not found."""
 
     pass
 
 
+class ConcurrencyConflictError(StoryCircuitError):
+    """Exception raised when a conditional write loses to a concurrent edit."""
+
+    pass
+
+
 class ValidationError(StoryCircuitError):
     """Exception raised for validation errors."""
 
     pass
 
 
+class PromptTooLargeError(ValidationError):
+    """Exception raised when a prompt cannot fit the token budget."""
+
+    pass
+
+
+class InvalidCursorError(ValidationError):
+    """Exception raised for malformed or mismatched pagination cursors."""
+
+    pass
+
+
 class ExportError(StoryCircuitError):
     """Exception raised when export operation fails."""
 
@@ -60,4 +106,12 @@ class AuthorizationError(StoryCircuitError):
 class RateLimitError(StoryCircuitError):
     """Exception raised when rate limit is exceeded."""
 
+    def __init__(self, message: str = "Rate limit exceeded", retry_after: int = 60):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ServiceOverloadedError(RateLimitError):
+    """Exception raised when load is shed to protect server capacity."""
+
     pass
@@ -0,0 +1,52 @@
+"""
+Caller identity from Azure Container Apps authentication (Easy Auth).
+The platform validates the caller's token before the request reaches the
+app and forwards the principal in X-MS-CLIENT-PRINCIPAL* headers, removing
+any the client sent itself. Those headers are only trustworthy behind that
+ingress, which is why AUTH_ENABLED requires them.
+"""
+
+import base64
+import binascii
+import json
+from typing import Mapping, Optional
+
+PRINCIPAL_ID_HEADER = "x-ms-client-principal-id"
+PRINCIPAL_HEADER = "x-ms-client-principal"
+
+# Stable object id claim of Microsoft Entra ID principals
+OBJECT_ID_CLAIMS = (
+    "http://schemas.microsoft.com/identity/claims/objectidentifier",
+    "oid",
+)
+
+
+def _claims_object_id(encoded: str) -> Optional[str]:
+    """Object id from the base64 JSON principal, if present and well formed."""
+    try:
+        principal = json.loads(base64.b64decode(encoded))
+    except (binascii.Error, ValueError):
+        return None
+    if not isinstance(principal, dict):
+        return None
+    for claim in principal.get("claims") or []:
+        if isinstance(claim, dict) and claim.get("typ") in OBJECT_ID_CLAIMS:
+            return claim.get("val") or None
+    return None
+
+
+def principal_id(headers: Mapping[str, str]) -> Optional[str]:
+    """
+    Authenticated principal id forwarded by Easy Auth.
+
+    Args:
+        headers: Request headers (case-insensitive mapping)
+
+    Returns:
+        The principal's object id, or None if the request carries none
+    """
+    value = (headers.get(PRINCIPAL_ID_HEADER) or "").strip()
+    if value:
+        return value
+    encoded = headers.get(PRINCIPAL_HEADER)
+    return _claims_object_id(encoded) if encoded else None
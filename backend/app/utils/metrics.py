@@ -0,0 +1,60 @@
+"""
+In-process metrics for StoryCircuit application.
+Simple counters and gauges exposed through the health router.
+"""
+
+import threading
+from collections import defaultdict
+
+
+class Metrics:
+    """Thread-safe registry of named counters and gauges."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = defaultdict(float)
+        self._gauges: dict[str, float] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """
+        Increase a counter.
+
+        Args:
+            name: Dotted counter name (e.g. "generation.cancelled")
+            value: Amount to add
+        """
+        with self._lock:
+            self._counters[name] += value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """
+        Set a gauge to its current value.
+
+        Args:
+            name: Dotted gauge name
+            value: Current value
+        """
+        with self._lock:
+            self._gauges[name] = value
+
+    def get(self, name: str) -> float:
+        """Current value of a counter or gauge (0 if never set)."""
+        with self._lock:
+            if name in self._gauges:
+                return self._gauges[name]
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        """Copy of all counters and gauges."""
+        with self._lock:
+            return {"counters": dict(self._counters), "gauges": dict(self._gauges)}
+
+    def reset(self) -> None:
+        """Clear all values (used by tests)."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+
+
+# Process-wide registry
+metrics = Metrics()
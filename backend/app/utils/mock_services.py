@@ -18,8 +18,16 @@ class MockAgentService:
         platforms: list[str],
         audience: Optional[str] = None,
         additional_context: Optional[str] = None,
+        deadline=None,
     ) -> dict[str, Any]:
         """Mock content generation with realistic, topic-aware output."""
+        from ..utils.exceptions import DeadlineExceededError
+
+        if deadline is not None and deadline.remaining() < 1.5:
+            await asyncio.sleep(deadline.remaining())
+            raise DeadlineExceededError(
+                "Request deadline reached while waiting for the agent"
+            )
         await asyncio.sleep(1.5)  # Simulate API call
 
         # Generate more realistic content based on topic
@@ -344,12 +352,14 @@ class MockContentRepository:
         self.settings = settings
         self._storage = {}
 
-    async def create(self, document) -> Any:
+    async def create(self, document, deadline=None) -> Any:
         """Mock create."""
         self._storage[document.id] = document
         return document
 
-    async def get_by_id(self, content_id: str, user_id: str) -> Any:
+    async def get_by_id(
+        self, content_id: str, user_id: str, deadline=None, platform=None
+    ) -> Any:
         """Mock get."""
         from ..utils.exceptions import ContentNotFoundError
 
@@ -364,7 +374,83 @@ class MockContentRepository:
         docs = [doc for doc in self._storage.values() if doc.partition_key == user_id]
         return ContentQueryResult(documents=docs, count=len(docs))
 
-    async def delete(self, content_id: str, user_id: str) -> None:
+    async def list_documents(self, user_id: str, deadline=None) -> list:
+        """Mock listing of a user's live documents."""
+        return [
+            doc
+            for doc in self._storage.values()
+            if doc.partition_key == user_id and not doc.deleted
+        ]
+
+    async def list_changed(self, user_id: str, since: float, deadline=None) -> tuple:
+        """Mock listing of changes (every document counts as changed)."""
+        documents = [
+            doc for doc in self._storage.values() if doc.partition_key == user_id
+        ]
+        return (
+            [doc for doc in documents if not doc.deleted],
+            [doc.id for doc in documents if doc.deleted],
+        )
+
+    async def bulk_set_deleted(
+        self, user_id: str, content_ids: list, deleted: bool, deadline=None
+    ) -> list:
+        """Mock bulk delete/restore."""
+        results = []
+        for content_id in content_ids:
+            doc = self._storage.get(content_id)
+            if doc is None or doc.partition_key != user_id or doc.deleted == deleted:
+                results.append(
+                    {"id": content_id, "status": "not_found", "status_code": 404}
+                )
+                continue
+            doc.deleted = deleted
+            results.append(
+                {"id": content_id, "status": "succeeded", "status_code": 200}
+            )
+        return results
+
+    async def bulk_create(self, documents: list, deadline=None) -> list:
+        """Mock bulk import."""
+        results = []
+        for doc in documents:
+            if doc.id in self._storage:
+                results.append({"id": doc.id, "status": "conflict", "status_code": 409})
+                continue
+            self._storage[doc.id] = doc
+            results.append({"id": doc.id, "status": "succeeded", "status_code": 201})
+        return results
+
+    async def count_by_day(self, user_id: str, **kwargs) -> dict:
+        """Mock per-day counts (filters ignored)."""
+        counts: dict = {}
+        for doc in self._storage.values():
+            if doc.partition_key == user_id and not doc.deleted and doc.created_at:
+                day = doc.created_at.date().isoformat()
+                counts[day] = counts.get(day, 0) + 1
+        return counts
+
+    async def get_history_view(self, user_id: str, deadline=None) -> Any:
+        """Mock history view: none, so history falls back to querying."""
+        return None
+
+    async def get_counts(self, user_id: str, deadline=None) -> Any:
+        """Mock counters computed from storage."""
+        from ..models.database import UserContentCounts, counter_document_id
+
+        counts = UserContentCounts(
+            id=counter_document_id(user_id), partition_key=user_id, user_id=user_id
+        )
+        for doc in self._storage.values():
+            if doc.partition_key == user_id and not doc.deleted:
+                counts.total += 1
+                for platform in doc.platforms:
+                    counts.platforms[platform] = counts.platforms.get(platform, 0) + 1
+        return counts
+
+    async def delete(
+        self, content_id: str, user_id: str, deadline=None, etag=None
+    ) -> None:
         """Mock delete."""
         if content_id in self._storage:
             self._storage[content_id].deleted = True
@@ -0,0 +1,157 @@
+"""
+Cosmos DB request unit (RU) accounting.
+Repository calls pass a response hook that reads the charge, server
+duration and item count from each response's headers. Charges add up per
+operation in the metrics registry and per HTTP request in a context
+variable, which the request middleware reports as X-Request-Charge.
+"""
+
+import base64
+import binascii
+import json
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Any, Callable, Mapping, Optional
+import structlog
+
+from .metrics import metrics
+
+logger = structlog.get_logger(__name__)
+
+REQUEST_CHARGE_HEADER = "X-Request-Charge"
+
+
+@dataclass
+class RequestCharges:
+    """RU spent by one HTTP request, in total and per repository operation."""
+
+    total: float = 0.0
+    calls: int = 0
+    by_operation: dict[str, float] = field(default_factory=dict)
+
+    def add(self, operation: str, charge: float) -> None:
+        """Add the charge of one Cosmos DB response."""
+        self.total += charge
+        self.calls += 1
+        self.by_operation[operation] = self.by_operation.get(operation, 0.0) + charge
+
+
+_charges: ContextVar[Optional[RequestCharges]] = ContextVar(
+    "request_charges", default=None
+)
+
+
+def begin_request() -> tuple[RequestCharges, Token]:
+    """
+    Start accumulating charges for the current request.
+
+    Tasks started from the request (including saves that outlive it) copy
+    the context and keep adding to the same totals.
+
+    Returns:
+        The accumulator and a token for end_request
+    """
+    charges = RequestCharges()
+    return charges, _charges.set(charges)
+
+
+def end_request(token: Token) -> None:
+    """Stop accumulating charges for the current request."""
+    _charges.reset(token)
+
+
+def current_charges() -> Optional[RequestCharges]:
+    """Charges of the request being served, if any."""
+    return _charges.get()
+
+
+def _number(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _index_utilization(encoded: Optional[str]) -> Optional[Any]:
+    """Decode the base64 JSON index metrics header."""
+    if not encoded:
+        return None
+    try:
+        return json.loads(base64.b64decode(encoded))
+    except (binascii.Error, ValueError):
+        return encoded
+
+
+def record_response(
+    operation: str, headers: Mapping[str, str], diagnostics: bool = False
+) -> float:
+    """
+    Record the cost of one Cosmos DB response.
+
+    Args:
+        operation: Repository operation name (e.g. "query_history")
+        headers: Response headers
+        diagnostics: Also log query metrics and index utilization (only
+            present when the query asked for them)
+
+    Returns:
+        Request charge in RU
+    """
+    charge = _number(headers.get("x-ms-request-charge")) or 0.0
+    duration = _number(headers.get("x-ms-request-duration-ms"))
+    items = _number(headers.get("x-ms-item-count"))
+
+    metrics.increment(f"cosmos.calls.{operation}")
+    metrics.increment(f"cosmos.ru.{operation}", charge)
+    if duration is not None:
+        metrics.increment(f"cosmos.server_ms.{operation}", duration)
+    charges = _charges.get()
+    if charges is not None:
+        charges.add(operation, charge)
+
+    details: dict[str, Any] = {}
+    if diagnostics:
+        details["query_metrics"] = headers.get("x-ms-documentdb-query-metrics")
+        details["index_utilization"] = _index_utilization(
+            headers.get("x-ms-cosmos-index-utilization")
+        )
+    logger.info(
+        "Cosmos DB response",
+        operation=operation,
+        request_charge=charge,
+        server_duration_ms=duration,
+        item_count=int(items) if items is not None else None,
+        **{key: value for key, value in details.items() if value is not None},
+    )
+    return charge
+
+
+def charge_hook(
+    operation: str,
+    diagnostics: bool = False,
+    on_charge: Optional[Callable[[float], None]] = None,
+) -> Callable[[Mapping[str, str], Any], None]:
+    """
+    Response hook recording charges, for the SDK's response_hook argument.
+
+    Query hooks fire once per page. Accounting must never fail a call, so
+    errors are logged and swallowed.
+
+    Args:
+        operation: Repository operation name
+        diagnostics: See record_response
+        on_charge: Optional callback receiving each response's charge
+
+    Returns:
+        Callable taking (headers, result)
+    """
+
+    def hook(headers: Mapping[str, str], result: Any) -> None:
+        try:
+            charge = record_response(operation, headers, diagnostics)
+            if on_charge is not None:
+                on_charge(charge)
+        except Exception as e:
+            logger.warning("Request charge not recorded", error=str(e))
+
+    return hook
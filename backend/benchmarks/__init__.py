@@ -0,0 +1,4 @@
+"""
+Benchmarks for StoryCircuit backend.
+Run from the backend directory, e.g. python -m benchmarks.bench_knowledge_index
+"""
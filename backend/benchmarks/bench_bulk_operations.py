@@ -0,0 +1,85 @@
+"""
+Benchmark bulk delete: one call per item vs transactional batches.
+
+Uses a local stand-in for Cosmos DB with fixed latency per round trip, so
+it measures round trips and parallelism rather than service performance.
+
+"before" is what clients had to do: one DELETE per item, each a
+read-modify-write (two round trips), a few at a time.
+"after" is ContentRepository.bulk_set_deleted: batches of 100 patch
+operations, several batches in flight.
+
+Usage (from backend/):
+    python -m benchmarks.bench_bulk_operations
+"""
+
+import asyncio
+import time
+
+from app.config import Settings
+from app.repositories.content_repo import ContentRepository
+
+DOCUMENTS = 3000
+CLIENT_CONCURRENCY = 8
+IO_LATENCY = 0.010  # one Cosmos round trip
+USER = "user@example.com"
+
+
+class StandInContainer:
+    """Async container with fixed latency per call and no storage."""
+
+    async def read_item(self, item, partition_key, **kwargs):
+        await asyncio.sleep(IO_LATENCY)
+        return {}
+
+    async def replace_item(self, item, body, **kwargs):
+        await asyncio.sleep(IO_LATENCY)
+        return body
+
+    async def execute_item_batch(self, batch_operations, partition_key, **kwargs):
+        # A batch is one round trip; server time grows a little with size
+        await asyncio.sleep(IO_LATENCY + len(batch_operations) * 0.00005)
+        return [{"statusCode": 200} for _ in batch_operations]
+
+    def query_items(self, **kwargs):
+        async def results():
+            yield 0
+
+        return results()
+
+    async def upsert_item(self, body, **kwargs):
+        await asyncio.sleep(IO_LATENCY)
+        return body
+
+
+async def per_item(container: StandInContainer, ids: list[str]) -> None:
+    semaphore = asyncio.Semaphore(CLIENT_CONCURRENCY)
+
+    async def delete(content_id: str) -> None:
+        async with semaphore:
+            await container.read_item(item=content_id, partition_key=USER)
+            await container.replace_item(item=content_id, body={})
+
+    await asyncio.gather(*(delete(content_id) for content_id in ids))
+
+
+async def main() -> None:
+    ids = [f"doc-{index}" for index in range(DOCUMENTS)]
+    container = StandInContainer()
+    print(f"{DOCUMENTS} deletes, {IO_LATENCY * 1000:.0f} ms round trip")
+
+    start = time.perf_counter()
+    await per_item(container, ids)
+    elapsed = time.perf_counter() - start
+    print(f"{'before: per-item calls':<28} {DOCUMENTS / elapsed:8.0f} items/s")
+
+    repo = ContentRepository(Settings(), container=container)
+    start = time.perf_counter()
+    results = await repo.bulk_set_deleted(USER, ids, deleted=True)
+    elapsed = time.perf_counter() - start
+    assert all(result["status"] == "succeeded" for result in results)
+    print(f"{'after: batched':<28} {DOCUMENTS / elapsed:8.0f} items/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
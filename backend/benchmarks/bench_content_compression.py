@@ -0,0 +1,101 @@
+"""
+Benchmark stored document size with compressed content bodies.
+
+Builds generations from docs/example-output.md with per-document variation
+and compares the serialized document size (a proxy for read RU and the
+2 MB item limit) as plain JSON, zstd-compressed and zstd with a dictionary
+trained on other generations, plus the cost of inflating one document.
+
+Usage (from backend/):
+    python -m benchmarks.bench_content_compression
+"""
+
+import asyncio
+import json
+import random
+import time
+from pathlib import Path
+
+from app.models.database import content_to_document
+from app.repositories.content_codec import ContentCodec, train_dictionary
+
+EXAMPLE = Path(__file__).resolve().parents[2] / "docs" / "example-output.md"
+TRAIN = 300
+MEASURE = 50
+ROUNDS = 200
+
+
+def _generated(text: str, rng: random.Random) -> dict:
+    paragraphs = [line for line in text.splitlines() if len(line) > 40]
+
+    def body(count: int) -> str:
+        return "\n\n".join(rng.choice(paragraphs) for _ in range(count))
+
+    return {
+        "plan": {"hook": rng.choice(paragraphs)[:120], "keyPoints": []},
+        "outputs": {
+            "linkedin": {"content": body(12)},
+            "twitter": {"tweets": [{"order": n, "content": body(1)} for n in range(8)]},
+            "blog": {"title": "Intelligent multi-agent apps", "content": body(60)},
+        },
+        "notes": f"Run {rng.random()}\n" + body(30),
+    }
+
+
+def _document(index: int, content: dict) -> dict:
+    return content_to_document(
+        content_id=f"doc-{index}",
+        user_id="user@example.com",
+        topic="Intelligent multi-agent apps with Microsoft Foundry",
+        platforms=["linkedin", "twitter", "blog"],
+        generated_content=content,
+        metadata={"duration": 3.2},
+    ).model_dump(mode="json", by_alias=True)
+
+
+def _strings(value) -> list[str]:
+    if isinstance(value, dict):
+        return [text for item in value.values() for text in _strings(item)]
+    if isinstance(value, list):
+        return [text for item in value for text in _strings(item)]
+    return [value] if isinstance(value, str) else []
+
+
+async def _measure(label: str, codec: ContentCodec, contents: list[dict]) -> None:
+    sizes = []
+    encoded = []
+    for index, content in enumerate(contents):
+        document = _document(index, content)
+        document["generatedContent"] = await codec.encode("bench", content)
+        encoded.append(document["generatedContent"])
+        sizes.append(len(json.dumps(document).encode()))
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        await codec.decode(encoded[0])
+    inflate = (time.perf_counter() - start) / ROUNDS * 1000
+    mean = sum(sizes) / len(sizes)
+    print(f"{label:<22} {mean / 1024:8.1f} KiB/doc  {inflate:6.3f} ms inflate")
+
+
+async def main() -> None:
+    text = EXAMPLE.read_text()
+    rng = random.Random(7)
+    training = [_generated(text, rng) for _ in range(TRAIN)]
+    contents = [_generated(text, rng) for _ in range(MEASURE)]
+    dictionary = train_dictionary(
+        [sample for content in training for sample in _strings(content)]
+    )
+
+    print(f"{MEASURE} documents built from {EXAMPLE.name}")
+    await _measure("before: plain JSON", ContentCodec(compress_threshold=0), contents)
+    await _measure("after: zstd", ContentCodec(compress_threshold=2048), contents)
+    await _measure(
+        "after: zstd + dict",
+        ContentCodec(compress_threshold=2048, dictionaries=[dictionary]),
+        contents,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
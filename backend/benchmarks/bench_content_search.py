@@ -0,0 +1,118 @@
+"""
+Benchmark full-text search over one user's history.
+
+Builds a synthetic corpus in a single partition (the worst case: every
+document belongs to the searching user) and reports query latency for both
+index backends against a linear scan, which is what a CONTAINS query over
+the history container amounts to.
+
+Usage (from backend/):
+    python -m benchmarks.bench_content_search [documents]
+"""
+
+import asyncio
+import random
+import statistics
+import sys
+import time
+
+from app.models.database import content_to_document
+from app.services.knowledge_index import tokenize
+from app.services.search_index import (
+    InMemorySearchIndex,
+    SQLiteSearchIndex,
+    searchable_fields,
+)
+
+USER = "user@example.com"
+QUERIES = [
+    "kubernetes operators",
+    "agent retries",
+    "vector search latency",
+    "serverless cold start",
+    "observability tracing budget",
+    "platform engineering golden paths",
+]
+
+
+def _corpus(size: int) -> list:
+    rng = random.Random(7)
+    vocabulary = sorted({t for q in QUERIES for t in tokenize(q)}) + [
+        f"term{n}" for n in range(5000)
+    ]
+    # Zipf-like: a few common words, a long tail of rare ones
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    rng.shuffle(weights)
+
+    def words(count: int) -> str:
+        return " ".join(rng.choices(vocabulary, weights, k=count))
+
+    return [
+        content_to_document(
+            content_id=f"doc-{n}",
+            user_id=USER,
+            topic=words(5),
+            platforms=["linkedin", "blog"],
+            generated_content={
+                "plan": {"hook": words(10), "keyPoints": [words(6), words(6)]},
+                "outputs": {"linkedin": {"content": words(80)}},
+            },
+            metadata={},
+        )
+        for n in range(size)
+    ]
+
+
+def _scan(documents: list, query: str, limit: int = 20) -> list:
+    terms = set(tokenize(query))
+    matches = []
+    for document in documents:
+        text = " ".join(searchable_fields(document).values()).lower()
+        if any(term in text for term in terms):
+            matches.append(document.id)
+    return matches[:limit]
+
+
+async def _latencies(search, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        for query in QUERIES:
+            start = time.perf_counter()
+            await search(query)
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _report(name: str, timings: list[float]) -> None:
+    print(
+        f"{name:<10} median {statistics.median(timings):9.2f} ms"
+        f"  p95 {sorted(timings)[int(len(timings) * 0.95)]:9.2f} ms"
+    )
+
+
+async def main(size: int) -> None:
+    documents = _corpus(size)
+    print(f"documents={size}")
+
+    memory = InMemorySearchIndex()
+    start = time.perf_counter()
+    await memory.load_user(USER, documents)
+    print(f"memory build {time.perf_counter() - start:8.2f} s")
+
+    sqlite = SQLiteSearchIndex(":memory:")
+    start = time.perf_counter()
+    await sqlite.load_user(USER, documents)
+    print(f"sqlite build {time.perf_counter() - start:8.2f} s")
+
+    _report("memory", await _latencies(lambda q: memory.search(USER, q), 10))
+    _report("sqlite", await _latencies(lambda q: sqlite.search(USER, q), 10))
+
+    async def scan(query: str) -> list:
+        return _scan(documents, query)
+
+    _report("scan", await _latencies(scan, 1))
+    await sqlite.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000))
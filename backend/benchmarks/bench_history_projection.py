@@ -0,0 +1,64 @@
+"""
+Benchmark a history page: SELECT * documents vs projected summaries.
+
+Compares the JSON payload a page of full documents carries against the
+projected list fields, and the pydantic validation cost of each. Payload
+size is a proxy for the RU charge and network time of the query.
+
+Usage (from backend/):
+    python -m benchmarks.bench_history_projection
+"""
+
+import json
+import time
+
+from app.models.database import ContentDocument, ContentSummary, content_to_document
+
+PAGE = 20
+ROUNDS = 200
+
+
+def _document(index: int) -> dict:
+    body = "Paragraph about agent orchestration and Azure deployments. " * 60
+    document = content_to_document(
+        content_id=f"doc-{index}",
+        user_id="user@example.com",
+        topic=f"Benchmark topic {index}",
+        platforms=["linkedin", "twitter", "blog"],
+        generated_content={
+            "plan": {"hook": "Most teams struggle with orchestration", "keyPoints": []},
+            "outputs": {
+                "linkedin": {"content": body[:2500]},
+                "twitter": {"tweets": [body[:270]] * 8},
+                "blog": {"content": body * 3},
+            },
+            "notes": body * 4,
+        },
+        metadata={"duration": 3.2, "agentVersion": "storycircuit-v1.0"},
+    )
+    return document.model_dump(mode="json", by_alias=True)
+
+
+def _projected(item: dict) -> dict:
+    fields = ("id", "partitionKey", "userId", "topic", "platforms", "createdAt")
+    return {**{name: item[name] for name in fields}, "summary": item["summary"]}
+
+
+def _measure(label: str, items: list[dict], model) -> None:
+    payload = len(json.dumps(items).encode())
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        [model(**item) for item in items]
+    per_page = (time.perf_counter() - start) / ROUNDS * 1000
+    print(f"{label:<22} {payload / 1024:8.1f} KiB/page  {per_page:6.3f} ms validate")
+
+
+def main() -> None:
+    full = [_document(index) for index in range(PAGE)]
+    print(f"{PAGE} documents per page, {ROUNDS} rounds")
+    _measure("before: SELECT *", full, ContentDocument)
+    _measure("after: projection", [_projected(item) for item in full], ContentSummary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark knowledge index build, cache load and query time.
+
+Usage (from backend/):
+    python -m benchmarks.bench_knowledge_index
+"""
+
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.knowledge_index import KnowledgeIndex
+
+KNOWLEDGE_DIR = Path(__file__).parent.parent.parent / "knowledge-base"
+
+QUERIES = [
+    "Kubernetes best practices for platform engineers linkedin",
+    "Azure Functions cold start twitter thread",
+    "AI agent orchestration patterns blog",
+    "GitHub README structure for open source projects",
+    "brand voice and tone guidelines",
+    "Microsoft Learn documentation sources for Azure AI Foundry",
+]
+
+
+def _timed(fn, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = Path(tmp)
+
+        build = _timed(lambda: KnowledgeIndex.from_directory(KNOWLEDGE_DIR), 5)
+        KnowledgeIndex.from_directory(KNOWLEDGE_DIR, cache_dir=cache_dir)
+        cached = _timed(
+            lambda: KnowledgeIndex.from_directory(KNOWLEDGE_DIR, cache_dir=cache_dir),
+            5,
+        )
+
+    index = KnowledgeIndex.from_directory(KNOWLEDGE_DIR)
+    query = _timed(lambda: [index.search(q, top_k=3) for q in QUERIES], 200)
+    per_query = [t / len(QUERIES) for t in query]
+
+    print(f"chunks={len(index.chunks)} terms={len(index.vocabulary)}")
+    print(f"build (no cache):  median {statistics.median(build):8.2f} ms")
+    print(f"load (from cache): median {statistics.median(cached):8.2f} ms")
+    print(
+        f"query:             median {statistics.median(per_query):8.3f} ms"
+        f"  p95 {sorted(per_query)[int(len(per_query) * 0.95)]:8.3f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
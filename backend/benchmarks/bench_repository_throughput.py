@@ -0,0 +1,103 @@
+"""
+Benchmark repository throughput: per-request sync client vs shared async client.
+
+Uses a local stand-in for Cosmos DB with fixed network latency, so it
+measures how the access pattern behaves under concurrency rather than
+real service performance.
+
+"before" mirrors the original code path: a new repository (credential
+discovery, token fetch and container metadata lookup) per request, and
+blocking SDK calls made from async handlers.
+"after" is the application-scoped, warmed, non-blocking repository.
+
+Usage (from backend/):
+    python -m benchmarks.bench_repository_throughput
+"""
+
+import asyncio
+import time
+
+from app.config import Settings
+from app.repositories.content_repo import ContentRepository
+
+REQUESTS = 200
+CONCURRENCY = 20
+IO_LATENCY = 0.010  # one Cosmos round trip
+CLIENT_SETUP = 0.030  # credential discovery + token + metadata per new client
+
+ITEM = {
+    "id": "doc-1",
+    "partitionKey": "user@example.com",
+    "userId": "user@example.com",
+    "topic": "Benchmark",
+    "platforms": ["linkedin"],
+    "generatedContent": {"plan": {"hook": "hook"}, "outputs": {}},
+    "metadata": {},
+    "createdAt": "2026-02-11T14:30:45",
+    "deleted": False,
+}
+
+
+class StandInContainer:
+    """Async container with fixed latency per call."""
+
+    async def read(self, **kwargs):
+        await asyncio.sleep(IO_LATENCY)
+        return {}
+
+    async def _ranges(self):
+        await asyncio.sleep(IO_LATENCY)
+        yield {}
+
+    def read_feed_ranges(self, **kwargs):
+        return self._ranges()
+
+    async def read_item(self, item, partition_key, **kwargs):
+        await asyncio.sleep(IO_LATENCY)
+        return dict(ITEM)
+
+
+class BlockingContainer:
+    """Sync container: every call blocks the calling thread."""
+
+    def __init__(self):
+        time.sleep(CLIENT_SETUP)
+
+    def read_item(self, item, partition_key, **kwargs):
+        time.sleep(IO_LATENCY)
+        return dict(ITEM)
+
+
+async def legacy_get(content_id: str, user_id: str):
+    """Original pattern: new client per request, blocking call in async def."""
+    container = BlockingContainer()
+    return container.read_item(item=content_id, partition_key=user_id)
+
+
+async def run(get, label: str) -> None:
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def one():
+        async with semaphore:
+            await get("doc-1", "user@example.com")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(REQUESTS)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {REQUESTS / elapsed:8.1f} req/s  ({elapsed:.2f}s)")
+
+
+async def main() -> None:
+    print(
+        f"{REQUESTS} reads, concurrency {CONCURRENCY}, "
+        f"{IO_LATENCY * 1000:.0f} ms round trip, {CLIENT_SETUP * 1000:.0f} ms client setup"
+    )
+    await run(legacy_get, "before: per-request sync")
+
+    repo = ContentRepository(Settings(), container=StandInContainer())
+    await repo.warm_up()
+    await run(repo.get_by_id, "after: shared async")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,489 @@
+"""
+In-memory stand-ins for the async Cosmos DB container client.
+Only the behaviour the repository relies on is modelled; queries are
+recorded and answered by a pluggable handler instead of being parsed
+(by default: every non-deleted item in the partition). make_document
+builds the content documents the tests store.
+"""
+
+import asyncio
+import copy
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Optional, Union
+
+from azure.cosmos.exceptions import (
+    CosmosBatchOperationError,
+    CosmosHttpResponseError,
+    CosmosResourceExistsError,
+    CosmosResourceNotFoundError,
+)
+
+from app.models.database import ContentDocument, content_to_document
+
+USER = "user@example.com"
+
+
+class FakeItemPaged:
+    """Async iterable of query results, pageable by continuation token."""
+
+    def __init__(
+        self,
+        items: list[dict],
+        page_size: Optional[int] = None,
+        on_page: Optional[Callable[[int], None]] = None,
+    ):
+        self._items = items
+        self._page_size = page_size or len(items) or 1
+        self._on_page = on_page
+
+    def _page_fetched(self, count: int) -> None:
+        if self._on_page is not None:
+            self._on_page(count)
+
+    def __aiter__(self):
+        self._page_fetched(len(self._items))
+        return self._iterate(self._items)
+
+    @staticmethod
+    async def _iterate(items: list[dict]):
+        for item in items:
+            yield item
+
+    def by_page(self, continuation_token: Optional[str] = None) -> "FakePager":
+        return FakePager(self, int(continuation_token or 0))
+
+
+class FakePager:
+    """Page iterator exposing continuation_token like the SDK's."""
+
+    def __init__(self, paged: FakeItemPaged, start: int):
+        self._paged = paged
+        self._position = start
+        self.continuation_token: Optional[str] = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        items = self._paged._items
+        if self._position >= len(items) and self._position > 0:
+            raise StopAsyncIteration
+        end = self._position + self._paged._page_size
+        page = items[self._position : end]
+        self._position = end
+        self.continuation_token = str(end) if end < len(items) else None
+        self._paged._page_fetched(len(page))
+        return FakeItemPaged._iterate(page)
+
+
+class FakeContainer:
+    """Async container stand-in keyed by (partition key, id)."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        partition_key_field: Union[str, tuple[str, ...]] = "partitionKey",
+    ):
+        self.latency = latency
+        self.partition_key_field = partition_key_field
+        fields = (
+            partition_key_field
+            if isinstance(partition_key_field, tuple)
+            else (partition_key_field,)
+        )
+        self._lsn = 0
+        self.items: dict[tuple[Any, str], dict] = {}
+        self.queries: list[dict] = []
+        self.query_handler: Optional[Callable[[dict], list[dict]]] = None
+        self.calls: list[str] = []
+        # RU reported to response hooks for every call
+        self.request_charge = 1.0
+        # Calls (or query pages) to answer with 429 before serving normally
+        self.throttle_next = 0
+        self.retry_after_ms = 20
+        self.patches: list[dict] = []
+        self.properties: dict = {
+            "id": "content",
+            "partitionKey": {"paths": [f"/{field}" for field in fields]},
+        }
+
+    def _respond(self, kwargs: dict, item_count: int = 1) -> None:
+        if self.throttle_next:
+            self.throttle_next -= 1
+            raise http_error(
+                429,
+                "Request rate is large",
+                {"x-ms-retry-after-ms": str(self.retry_after_ms)},
+            )
+        hook = kwargs.get("response_hook")
+        if hook is not None:
+            headers = {
+                "x-ms-request-charge": str(self.request_charge),
+                "x-ms-request-duration-ms": "0.5",
+                "x-ms-item-count": str(item_count),
+            }
+            hook(headers, None)
+
+    async def _io(self, name: str, kwargs: Optional[dict] = None) -> None:
+        self.calls.append(name)
+        self._respond(kwargs or {})
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    @staticmethod
+    def _key(partition_key: Any) -> Any:
+        return (
+            tuple(partition_key) if isinstance(partition_key, list) else partition_key
+        )
+
+    def _body_key(self, body: dict) -> Any:
+        if isinstance(self.partition_key_field, tuple):
+            return tuple(body.get(field) for field in self.partition_key_field)
+        return self._key(body.get(self.partition_key_field))
+
+    def _in_partition(self, stored_key: Any, partition_key: Any) -> bool:
+        """Whether a stored key matches a query's partition key or key prefix."""
+        if partition_key is None:
+            return True
+        if isinstance(partition_key, list) and isinstance(stored_key, tuple):
+            return stored_key[: len(partition_key)] == tuple(partition_key)
+        return stored_key == self._key(partition_key)
+
+    def _stored(self, body: dict) -> dict:
+        stored = copy.deepcopy(body)
+        stored["_etag"] = f'"{uuid.uuid4()}"'
+        stored["_ts"] = int(asyncio.get_event_loop().time())
+        self._lsn += 1
+        stored["_lsn"] = self._lsn
+        return stored
+
+    async def read(self, **kwargs) -> dict:
+        await self._io("read")
+        return copy.deepcopy(self.properties)
+
+    def read_feed_ranges(self, **kwargs):
+        self.calls.append("read_feed_ranges")
+        return FakeItemPaged([{"Range": {"min": "", "max": "FF"}}])
+
+    async def create_item(self, body: dict, **kwargs) -> dict:
+        await self._io("create_item", kwargs)
+        key = (self._body_key(body), body["id"])
+        if key in self.items:
+            raise CosmosResourceExistsError(status_code=409, message="Conflict")
+        self.items[key] = self._stored(body)
+        return copy.deepcopy(self.items[key])
+
+    async def upsert_item(self, body: dict, **kwargs) -> dict:
+        await self._io("upsert_item", kwargs)
+        key = (self._body_key(body), body["id"])
+        self.items[key] = self._stored(body)
+        return copy.deepcopy(self.items[key])
+
+    async def read_item(
+        self,
+        item: str,
+        partition_key: Any,
+        etag: Optional[str] = None,
+        match_condition: Any = None,
+        **kwargs,
+    ) -> dict:
+        await self._io("read_item", kwargs)
+        key = (self._key(partition_key), item)
+        if key not in self.items:
+            raise CosmosResourceNotFoundError(status_code=404, message="Not found")
+        if match_condition is not None and self.items[key].get("_etag") == etag:
+            # 304 Not Modified: no body
+            return {}
+        return copy.deepcopy(self.items[key])
+
+    async def replace_item(
+        self,
+        item: str,
+        body: dict,
+        etag: Optional[str] = None,
+        match_condition: Any = None,
+        **kwargs,
+    ) -> dict:
+        await self._io("replace_item", kwargs)
+        key = (self._body_key(body), item)
+        if key not in self.items:
+            raise CosmosResourceNotFoundError(status_code=404, message="Not found")
+        if match_condition is not None and self.items[key].get("_etag") != etag:
+            raise http_error(412, "Precondition failed")
+        self.items[key] = self._stored(body)
+        return copy.deepcopy(self.items[key])
+
+    async def delete_item(self, item: str, partition_key: Any, **kwargs) -> None:
+        await self._io("delete_item", kwargs)
+        key = (self._key(partition_key), item)
+        if key not in self.items:
+            raise CosmosResourceNotFoundError(status_code=404, message="Not found")
+        del self.items[key]
+
+    async def patch_item(
+        self,
+        item: str,
+        partition_key: Any,
+        patch_operations: list[dict],
+        filter_predicate: Optional[str] = None,
+        etag: Optional[str] = None,
+        match_condition: Any = None,
+        **kwargs,
+    ) -> dict:
+        await self._io("patch_item", kwargs)
+        self.patches.append(
+            {
+                "item": item,
+                "operations": patch_operations,
+                "filter_predicate": filter_predicate,
+                "etag": etag,
+            }
+        )
+        key = (self._key(partition_key), item)
+        self.items[key] = self._patched(
+            self.items, key, patch_operations, filter_predicate, etag, match_condition
+        )
+        return copy.deepcopy(self.items[key])
+
+    def _patched(
+        self,
+        items: dict,
+        key: tuple,
+        patch_operations: list[dict],
+        filter_predicate: Optional[str] = None,
+        etag: Optional[str] = None,
+        match_condition: Any = None,
+        if_match_etag: Optional[str] = None,
+    ) -> dict:
+        if key not in items:
+            raise CosmosResourceNotFoundError(status_code=404, message="Not found")
+        stored = copy.deepcopy(items[key])
+        if if_match_etag is not None:
+            # Batch operations carry the precondition as if_match_etag
+            etag, match_condition = if_match_etag, True
+        if etag is not None and match_condition is not None:
+            if stored.get("_etag") != etag:
+                raise http_error(412, "Precondition failed")
+        for state in (False, True):
+            predicate = f"c.deleted = {str(state).lower()}"
+            if filter_predicate and predicate in filter_predicate:
+                if stored.get("deleted") is not state:
+                    raise http_error(412, "Precondition failed")
+        for operation in patch_operations:
+            _apply_patch(stored, operation)
+        return self._stored(stored)
+
+    async def execute_item_batch(
+        self, batch_operations: list[tuple], partition_key: Any, **kwargs
+    ) -> list[dict]:
+        await self._io("execute_item_batch", kwargs)
+        if len(batch_operations) > 100:
+            raise http_error(400, "Batch request has more operations than allowed")
+        pk = self._key(partition_key)
+        staged = dict(self.items)
+        responses = []
+        for index, entry in enumerate(batch_operations):
+            kind, args = entry[0], entry[1]
+            options = entry[2] if len(entry) > 2 else {}
+            try:
+                if kind == "create":
+                    key = (pk, args[0]["id"])
+                    if key in staged:
+                        raise CosmosResourceExistsError(
+                            status_code=409, message="Conflict"
+                        )
+                    staged[key] = self._stored(args[0])
+                elif kind == "upsert":
+                    key = (pk, args[0]["id"])
+                    staged[key] = self._stored(args[0])
+                elif kind == "replace":
+                    key = (pk, args[0])
+                    if key not in staged:
+                        raise CosmosResourceNotFoundError(
+                            status_code=404, message="Not found"
+                        )
+                    etag = options.get("if_match_etag")
+                    if etag is not None and staged[key].get("_etag") != etag:
+                        raise http_error(412, "Precondition failed")
+                    staged[key] = self._stored(args[1])
+                elif kind == "delete":
+                    key = (pk, args[0])
+                    if key not in staged:
+                        raise CosmosResourceNotFoundError(
+                            status_code=404, message="Not found"
+                        )
+                    del staged[key]
+                elif kind == "patch":
+                    key = (pk, args[0])
+                    staged[key] = self._patched(staged, key, args[1], **options)
+                else:
+                    raise http_error(400, f"Unsupported batch operation {kind}")
+            except CosmosHttpResponseError as e:
+                # Atomic: nothing is applied and the rest report 424
+                failed = [{"statusCode": 424}] * len(batch_operations)
+                failed[index] = {"statusCode": e.status_code}
+                raise CosmosBatchOperationError(
+                    error_index=index,
+                    headers={},
+                    status_code=e.status_code,
+                    message=f"Batch operation {index} failed",
+                    operation_responses=failed,
+                )
+            if kind == "delete":
+                responses.append({"statusCode": 204})
+                continue
+            responses.append(
+                {
+                    "statusCode": 201 if kind == "create" else 200,
+                    "resourceBody": copy.deepcopy(staged[key]),
+                }
+            )
+        self.items = staged
+        return responses
+
+    def query_items(self, query: str, parameters=None, partition_key=None, **kwargs):
+        request = {
+            "query": query,
+            "parameters": {p["name"]: p["value"] for p in parameters or []},
+            "partition_key": partition_key,
+            **kwargs,
+        }
+        self.queries.append(request)
+        self.calls.append("query_items")
+        if self.query_handler is not None:
+            results = self.query_handler(request)
+        else:
+            results = [
+                copy.deepcopy(item)
+                for (pk, _), item in self.items.items()
+                if self._in_partition(pk, partition_key)
+                and item.get("deleted") is False
+            ]
+        return FakeItemPaged(
+            results,
+            page_size=kwargs.get("max_item_count"),
+            on_page=lambda count: self._respond(kwargs, count),
+        )
+
+    def query_items_change_feed(
+        self,
+        start_time: Any = None,
+        continuation: Optional[str] = None,
+        max_item_count: Optional[int] = None,
+        **kwargs,
+    ) -> "FakeChangeFeed":
+        self.calls.append("query_items_change_feed")
+        after = int(continuation) if continuation else 0
+        changes = sorted(
+            (
+                copy.deepcopy(item)
+                for item in self.items.values()
+                if item.get("_lsn", 0) > after
+            ),
+            key=lambda item: item["_lsn"],
+        )
+        return FakeChangeFeed(
+            changes, after, max_item_count or 100, lambda: self._respond(kwargs)
+        )
+
+
+class FakeChangeFeed:
+    """
+    Latest-version change feed: pages of items written after a logical
+    sequence number, with the LSN as continuation token. Like the SDK, the
+    token is always set and the final page is empty.
+    """
+
+    def __init__(
+        self,
+        changes: list[dict],
+        after: int,
+        page_size: int,
+        on_page: Optional[Callable[[], None]] = None,
+    ):
+        self._changes = changes
+        self._after = after
+        self._page_size = page_size
+        self._on_page = on_page
+
+    def by_page(self) -> "FakeChangeFeed":
+        self._position = 0
+        self.continuation_token = str(self._after)
+        self._done = False
+        return self
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._done:
+            raise StopAsyncIteration
+        if self._on_page is not None:
+            self._on_page()
+        page = self._changes[self._position : self._position + self._page_size]
+        self._position += len(page)
+        self._done = not page
+        if page:
+            self.continuation_token = str(page[-1]["_lsn"])
+        return FakeItemPaged._iterate(page)
+
+
+def _apply_patch(document: dict, operation: dict) -> None:
+    """Apply one Cosmos patch operation (add/set/replace/remove/incr)."""
+    *parents, leaf = operation["path"].strip("/").split("/")
+    target = document
+    for name in parents:
+        target = target[name]
+    op = operation["op"]
+    if op in ("add", "set"):
+        target[leaf] = operation["value"]
+    elif op == "replace":
+        if leaf not in target:
+            raise http_error(400, f"Path {operation['path']} does not exist")
+        target[leaf] = operation["value"]
+    elif op == "remove":
+        target.pop(leaf)
+    elif op == "incr":
+        target[leaf] = target.get(leaf, 0) + operation["value"]
+    else:
+        raise http_error(400, f"Unsupported patch op {op}")
+
+
+def http_error(status_code: int, message: str = "error", headers=None):
+    """Build a CosmosHttpResponseError with the given status."""
+    error = CosmosHttpResponseError(status_code=status_code, message=message)
+    error.headers = headers or {}
+    return error
+
+
+def make_document(
+    content_id: str = "doc-1",
+    user_id: str = USER,
+    topic: str = "Async Cosmos clients",
+    platforms: Union[list[str], tuple[str, ...]] = ("linkedin", "blog"),
+    generated_content: Optional[dict[str, Any]] = None,
+    metadata: Optional[dict[str, Any]] = None,
+    created_at: Optional[datetime] = None,
+    etag: Optional[str] = None,
+) -> ContentDocument:
+    """Build a content document; every field can be overridden."""
+    if generated_content is None:
+        generated_content = {
+            "plan": {"hook": "Stop creating a client per request"},
+            "outputs": {"linkedin": {"content": "Post"}},
+            "notes": "Raw agent text",
+        }
+    document = content_to_document(
+        content_id=content_id,
+        user_id=user_id,
+        topic=topic,
+        platforms=list(platforms),
+        generated_content=generated_content,
+        metadata={"duration": 1.0} if metadata is None else metadata,
+    )
+    if created_at is not None:
+        document.created_at = created_at
+    if etag is not None:
+        document.etag = etag
+    return document
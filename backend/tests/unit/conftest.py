@@ -0,0 +1,17 @@
+"""Fixtures shared by the repository tests."""
+
+import pytest
+
+from app.config import Settings
+from app.repositories.content_repo import ContentRepository
+from tests.fakes import FakeContainer
+
+
+@pytest.fixture
+def container():
+    return FakeContainer()
+
+
+@pytest.fixture
+def repo(container):
+    return ContentRepository(Settings(), container=container)
@@ -0,0 +1,148 @@
+"""
+Unit tests for generation admission control.
+"""
+
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import Settings
+from app.dependencies import (
+    get_content_repository,
+    get_generation_admission,
+)
+from app.main import app
+from app.utils.admission import AdmissionController
+from app.utils.deadline import Deadline
+from app.utils.exceptions import (
+    DeadlineExceededError,
+    RateLimitError,
+    ServiceOverloadedError,
+)
+from app.utils.mock_services import MockContentRepository
+
+
+def _controller(**overrides) -> AdmissionController:
+    options = dict(
+        max_concurrent=1, max_queue=1, max_queue_wait=60, initial_service_time=10
+    )
+    options.update(overrides)
+    return AdmissionController(**options)
+
+
+@pytest.mark.asyncio
+async def test_admits_up_to_capacity_then_queues():
+    """Test requests run when a slot is free and queue otherwise."""
+    controller = _controller()
+    release = asyncio.Event()
+
+    async def hold():
+        async with controller.slot():
+            await release.wait()
+
+    first = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    queued = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+
+    assert controller.in_flight == 1
+    assert controller.waiting == 1
+    assert controller.estimated_wait() == 20
+
+    release.set()
+    await asyncio.gather(first, queued)
+    assert controller.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_full_with_retry_after():
+    """Test a full queue sheds load with a computed Retry-After."""
+    controller = _controller(max_queue=0)
+
+    async with controller.slot():
+        with pytest.raises(RateLimitError) as exc_info:
+            async with controller.slot():
+                pass
+
+    assert exc_info.value.retry_after == 10
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_estimated_wait_too_long():
+    """Test long estimated waits are rejected as overload."""
+    controller = _controller(max_queue_wait=5)
+
+    async with controller.slot():
+        with pytest.raises(ServiceOverloadedError):
+            async with controller.slot():
+                pass
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_wait_exceeds_deadline():
+    """Test requests whose deadline is shorter than the wait fail fast."""
+    controller = _controller()
+
+    async with controller.slot():
+        with pytest.raises(DeadlineExceededError):
+            async with controller.slot(Deadline.after(1)):
+                pass
+
+
+@pytest.mark.asyncio
+async def test_service_time_estimate_tracks_samples():
+    """Test the moving average moves toward observed service times."""
+    controller = _controller(initial_service_time=10, smoothing=0.5)
+
+    async with controller.slot():
+        pass
+
+    assert controller.avg_service_time == pytest.approx(5, abs=0.1)
+
+
+@pytest.mark.asyncio
+async def test_detached_work_keeps_its_slot():
+    """Test work finishing after a disconnect holds the slot, unsampled."""
+    controller = _controller(initial_service_time=10, smoothing=0.5)
+    release = asyncio.Event()
+    work = asyncio.ensure_future(release.wait())
+
+    async with controller.slot() as slot:
+        slot.client_disconnected(work)
+
+    assert controller.in_flight == 1
+    assert controller.estimated_wait() == 10
+    release.set()
+    await work
+    await asyncio.sleep(0)
+    assert controller.in_flight == 0
+    assert controller.avg_service_time == 10
+
+    async with controller.slot() as slot:
+        slot.client_disconnected()
+    assert controller.avg_service_time == 10
+
+
+def test_generation_shed_while_history_served():
+    """Test saturated generation returns 429 but cheap endpoints still work."""
+    controller = _controller(max_queue=0)
+    app.dependency_overrides[get_generation_admission] = lambda: controller
+    app.dependency_overrides[get_content_repository] = lambda: MockContentRepository(
+        Settings()
+    )
+    controller.in_flight = controller.max_concurrent
+    try:
+        client = TestClient(app)
+        generate = client.post(
+            "/api/v1/content/generate",
+            json={"topic": "Load shedding", "platforms": ["linkedin"]},
+        )
+        history = client.get("/api/v1/content/history")
+        health = client.get("/api/v1/health")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert generate.status_code == 429
+    assert generate.headers["Retry-After"] == "10"
+    assert history.status_code == 200
+    assert health.status_code == 200
@@ -0,0 +1,117 @@
+"""
+Unit tests for bulk content operations.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError as PydanticValidationError
+
+from app.config import Settings
+from app.dependencies import get_content_repository
+from app.main import app
+from app.models.requests import ContentImportItem
+from app.utils.mock_services import MockContentRepository
+from tests.fakes import USER, make_document
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_splits_into_batches(repo, container):
+    """Test imports are sent as transactional batches of at most 100."""
+    results = await repo.bulk_create([make_document(f"doc-{i}") for i in range(250)])
+
+    assert [r["status"] for r in results] == ["succeeded"] * 250
+    assert container.calls.count("execute_item_batch") == 3
+    assert all((USER, f"doc-{i}") in container.items for i in range(250))
+
+
+@pytest.mark.asyncio
+async def test_failed_items_do_not_fail_the_batch(repo, container):
+    """Test one bad item is isolated and the rest of its batch still applies."""
+    await repo.bulk_create([make_document("doc-1"), make_document("doc-2")])
+    await repo.bulk_set_deleted(USER, ["doc-2"], deleted=True)
+
+    results = await repo.bulk_set_deleted(
+        USER, ["doc-1", "missing", "doc-2"], deleted=True
+    )
+
+    assert [(r["id"], r["status"]) for r in results] == [
+        ("doc-1", "succeeded"),
+        ("missing", "not_found"),
+        ("doc-2", "not_found"),
+    ]
+    assert container.items[(USER, "doc-1")]["deleted"] is True
+
+
+@pytest.mark.asyncio
+async def test_restore_and_import_conflict(repo, container):
+    """Test restore undoes a delete and re-importing an id conflicts."""
+    await repo.bulk_create([make_document("doc-1")])
+    await repo.bulk_set_deleted(USER, ["doc-1"], deleted=True)
+
+    restored = await repo.bulk_set_deleted(USER, ["doc-1"], deleted=False)
+    again = await repo.bulk_create([make_document("doc-1")])
+
+    assert restored[0]["status"] == "succeeded"
+    assert container.items[(USER, "doc-1")]["deleted"] is False
+    assert container.items[(USER, "doc-1")]["ttl"] == -1
+    assert again[0]["status"] == "conflict"
+
+
+@pytest.mark.parametrize(
+    "content_id",
+    [
+        "counter::dev-user@example.com",
+        "view::dev-user@example.com",
+        "view::dev-user@example.com::doc-1",
+        "doc-1::blog",
+        "a/b",
+        "a\\b",
+        "a?b",
+        "a#b",
+    ],
+)
+def test_import_rejects_reserved_and_invalid_ids(content_id):
+    """Test imported ids can't collide with bookkeeping documents."""
+    item = {
+        "topic": "Imported topic",
+        "platforms": ["blog"],
+        "generated_content": {"plan": {"hook": "Hi"}},
+    }
+    ContentImportItem(id="2024:doc-1", **item)
+    with pytest.raises(PydanticValidationError):
+        ContentImportItem(id=content_id, **item)
+
+
+def test_bulk_endpoint_reports_per_item_results():
+    """Test POST /content/bulk validates input and returns per-item results."""
+    repo = MockContentRepository(Settings())
+    app.dependency_overrides[get_content_repository] = lambda: repo
+    try:
+        client = TestClient(app)
+        imported = client.post(
+            "/api/v1/content/bulk",
+            json={
+                "action": "import",
+                "documents": [
+                    {
+                        "id": "doc-1",
+                        "topic": "Imported topic",
+                        "platforms": ["blog"],
+                        "generated_content": {"plan": {"hook": "Hi"}},
+                    }
+                ],
+            },
+        )
+        deleted = client.post(
+            "/api/v1/content/bulk",
+            json={"action": "delete", "ids": ["doc-1", "missing"]},
+        )
+        invalid = client.post("/api/v1/content/bulk", json={"action": "delete"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert imported.status_code == 200
+    assert imported.json()["succeeded"] == 1
+    assert deleted.json()["succeeded"] == 1
+    assert deleted.json()["results"][1]["status"] == "not_found"
+    assert invalid.status_code == 422
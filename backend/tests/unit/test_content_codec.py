@@ -0,0 +1,193 @@
+"""
+Unit tests for compressed and offloaded content storage.
+"""
+
+import base64
+import json
+import os
+import pytest
+import zstandard
+
+from app.config import Settings
+from app.models.database import content_to_document
+from app.repositories.blob_store import LocalBlobStore
+from app.repositories.content_codec import ContentCodec, is_encoded, train_dictionary
+from app.repositories.content_repo import ContentRepository
+from app.services.agent_service import AgentService
+from app.utils.exceptions import DatabaseError
+from tests.fakes import FakeContainer
+
+USER = "user@example.com"
+BODY = "Agents need explicit hand-offs, retries and shared state. " * 200
+
+
+def _content() -> dict:
+    return {
+        "plan": {"hook": "Stop wiring agents by hand"},
+        "outputs": {
+            "linkedin": {"content": BODY[:3000]},
+            "blog": {"title": "Orchestration", "content": BODY * 10},
+        },
+        "notes": BODY,
+    }
+
+
+@pytest.mark.asyncio
+async def test_large_strings_compressed_and_restored():
+    """Test strings over the threshold round-trip through compression."""
+    codec = ContentCodec(compress_threshold=2048)
+
+    encoded = await codec.encode("prefix", _content())
+
+    assert encoded["plan"] == {"hook": "Stop wiring agents by hand"}
+    assert "$zstd" in encoded["notes"]
+    assert len(json.dumps(encoded)) < len(json.dumps(_content())) / 10
+    assert await codec.decode(encoded) == _content()
+
+
+@pytest.mark.asyncio
+async def test_incompressible_strings_stay_plain():
+    """Test compression is skipped when it would not save space."""
+    codec = ContentCodec(compress_threshold=16)
+    noise = base64.b64encode(os.urandom(3000)).decode()
+
+    encoded = await codec.encode("prefix", {"notes": noise})
+
+    assert encoded == {"notes": noise}
+
+
+@pytest.mark.asyncio
+async def test_documents_from_older_dictionary_still_decode():
+    """Test rotating dictionaries keeps earlier documents readable."""
+    samples = [f"{BODY[n:n + 400]} sample {n}" for n in range(0, 4000, 10)]
+    old_dictionary = train_dictionary(samples, size=4096)
+    new_dictionary = train_dictionary([s.upper() for s in samples], size=4096)
+    old = ContentCodec(2048, dictionaries=[old_dictionary])
+    encoded = await old.encode("prefix", _content())
+
+    rotated = ContentCodec(2048, dictionaries=[new_dictionary, old_dictionary])
+    dropped = ContentCodec(2048, dictionaries=[new_dictionary])
+
+    assert encoded["notes"]["dict"] == old.dictionary_id != rotated.dictionary_id
+    assert await rotated.decode(encoded) == _content()
+    with pytest.raises(zstandard.ZstdError):
+        await dropped.decode(encoded)
+
+
+@pytest.mark.asyncio
+async def test_outputs_cut_from_notes_stored_once():
+    """Test outputs copied from the raw response become spans of the notes."""
+    raw = "## Draft\n\n" + BODY[:1500]
+    parsed = AgentService(Settings())._parse_agent_response(raw)
+    assert all(out["content"] == raw for out in parsed["outputs"].values())
+    codec = ContentCodec(compress_threshold=0, span_min_chars=64)
+
+    encoded = await codec.encode("prefix", parsed)
+
+    assert encoded["notes"] == raw
+    assert encoded["plan"] == parsed["plan"]
+    for output in encoded["outputs"].values():
+        assert output["content"] == {"$span": [0, len(raw)]}
+    assert len(json.dumps(encoded)) < len(json.dumps(parsed)) / 3
+    assert await codec.decode(encoded) == parsed
+
+
+@pytest.mark.asyncio
+async def test_spans_combine_with_compression():
+    """Test spans resolve against notes that were compressed."""
+    codec = ContentCodec(compress_threshold=2048, span_min_chars=64)
+
+    encoded = await codec.encode("prefix", _content())
+
+    assert "$zstd" in encoded["notes"]
+    assert encoded["outputs"]["linkedin"]["content"] == {"$span": [0, 3000]}
+    assert "$zstd" in encoded["outputs"]["blog"]["content"]
+    assert is_encoded(encoded)
+    assert await codec.decode(encoded) == _content()
+
+
+@pytest.fixture
+def offloading_repo(tmp_path):
+    settings = Settings(
+        content_compress_threshold=2048,
+        content_offload_threshold=100_000,
+        content_blob_path=str(tmp_path),
+        blob_orphan_min_age=0,
+    )
+    container = FakeContainer()
+    return ContentRepository(settings, container=container), container
+
+
+@pytest.mark.asyncio
+async def test_large_bodies_offloaded_and_inflated_lazily(offloading_repo):
+    """Test the biggest body lives in the blob store and is read on demand."""
+    repo, container = offloading_repo
+    document = content_to_document(
+        content_id="doc-1",
+        user_id=USER,
+        topic="Agents",
+        platforms=["blog"],
+        generated_content=_content(),
+        metadata={},
+    )
+    await repo.create(document)
+
+    stored = container.items[(USER, "doc-1")]["generatedContent"]
+    key = stored["outputs"]["blog"]["content"]["$blob"]
+    assert key.startswith(f"{USER}/doc-1/")
+    assert await repo.codec.blob_store.list(f"{USER}/doc-1/") == [key]
+
+    summary_only = await repo.get_by_id("doc-1", USER, inflate=False)
+    assert is_encoded(summary_only.generated_content)
+
+    full = await repo.get_by_id("doc-1", USER)
+    assert full.generated_content == _content()
+
+
+@pytest.mark.asyncio
+async def test_missing_blob_is_a_database_error(offloading_repo):
+    """Test a dangling blob reference surfaces as a database error."""
+    repo, container = offloading_repo
+    await repo.create(
+        content_to_document(
+            content_id="doc-1",
+            user_id=USER,
+            topic="Agents",
+            platforms=["blog"],
+            generated_content=_content(),
+            metadata={},
+        )
+    )
+    store: LocalBlobStore = repo.codec.blob_store
+    for key in await store.list():
+        await store.delete(key)
+
+    with pytest.raises(DatabaseError):
+        await repo.get_by_id("doc-1", USER)
+
+
+@pytest.mark.asyncio
+async def test_compaction_removes_orphaned_blobs(offloading_repo):
+    """Test replaced and purged bodies are removed, live ones kept."""
+    repo, container = offloading_repo
+    container.query_handler = lambda request: []
+    for content_id in ("doc-1", "doc-2"):
+        await repo.create(
+            content_to_document(
+                content_id=content_id,
+                user_id=USER,
+                topic="Agents",
+                platforms=["blog"],
+                generated_content=_content(),
+                metadata={},
+            )
+        )
+    await repo.update_platform_output("doc-1", USER, "blog", {"content": BODY * 12})
+    del container.items[(USER, "doc-2")]  # TTL purge
+
+    assert (await repo.compact())["blobs"] == 2
+
+    remaining = await repo.codec.blob_store.list()
+    assert len(remaining) == 1 and remaining[0].startswith(f"{USER}/doc-1/")
+    full = await repo.get_by_id("doc-1", USER)
+    assert full.generated_content["outputs"]["blog"]["content"] == BODY * 12
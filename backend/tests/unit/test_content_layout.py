@@ -0,0 +1,205 @@
+"""
+Unit tests for the per-platform (split) content layout.
+"""
+
+import json
+
+import pytest
+
+from app.config import Settings
+from app.repositories.content_repo import ContentRepository
+from app.utils.exceptions import ConcurrencyConflictError
+from tests.fakes import USER, FakeContainer, make_document
+
+OUTPUTS = {
+    "linkedin": {"content": "Post", "hashtags": ["#agents"]},
+    "twitter": {"tweets": [{"order": 1, "content": "Thread start"}]},
+    "blog": {"title": "Orchestration", "content": "Long form body"},
+}
+
+
+def _document(content_id: str = "doc-1"):
+    return make_document(
+        content_id,
+        topic="Split storage",
+        platforms=list(OUTPUTS),
+        generated_content={
+            "plan": {"hook": "Read only what you show"},
+            "outputs": OUTPUTS,
+            "notes": "Raw agent text",
+        },
+    )
+
+
+def _answer(container: FakeContainer):
+    """Answer the repository's queries over part items from stored items."""
+
+    def handle(request: dict) -> list:
+        params = request["parameters"]
+        items = [
+            item
+            for (key, _), item in container.items.items()
+            if container._in_partition(key, request["partition_key"])
+        ]
+        if "VALUE COUNT(1)" in request["query"]:
+            return [sum("docType" not in item for item in items)]
+        if "JOIN p IN c.platforms" in request["query"]:
+            return []  # per-platform recounts are not under test here
+        if "@docType" in params:
+            matched = [i for i in items if i.get("docType") == params["@docType"]]
+            if "VALUE c.userId" in request["query"]:
+                return [item["userId"] for item in matched]
+            return matched
+        if "@userId" in params:
+            return [
+                item
+                for item in items
+                if item.get("userId") == params["@userId"]
+                and item.get("deleted") is False
+            ]
+        if "@ids" in params:
+            return [
+                item["id"]
+                for item in items
+                if item["id"] in params["@ids"] and "docType" not in item
+            ]
+        ids = set(params.get("@parts", [])) | {params.get("@contentId")}
+        return [
+            item
+            for item in items
+            if item["id"] in ids
+            or ("@id" in params and item.get("contentId") == params["@id"])
+        ]
+
+    return handle
+
+
+@pytest.fixture
+def container():
+    container = FakeContainer()
+    container.query_handler = _answer(container)
+    return container
+
+
+@pytest.fixture
+def repo(container):
+    settings = Settings(content_layout="split", content_cache_max_bytes=0)
+    return ContentRepository(settings, container=container)
+
+
+@pytest.mark.asyncio
+async def test_split_document_written_in_one_batch(repo, container):
+    """Test the header and one item per output are created atomically."""
+    await repo.create(_document())
+
+    assert container.calls[0] == "execute_item_batch"
+    header = container.items[(USER, "doc-1")]
+    assert header["generatedContent"]["outputs"]["blog"] == {"$part": True}
+    assert header["generatedContent"]["notes"] == {"$part": True}
+    assert container.items[(USER, "doc-1::$notes")]["generatedContent"] == {
+        "notes": "Raw agent text"
+    }
+    part = container.items[(USER, "doc-1::twitter")]
+    assert part["docType"] == "contentPart" and part["contentId"] == "doc-1"
+    assert part["generatedContent"]["outputs"]["twitter"] == OUTPUTS["twitter"]
+
+    container.calls.clear()
+    document = await repo.get_by_id("doc-1", USER)
+
+    assert container.calls == ["query_items"]
+    assert document.generated_content["outputs"] == OUTPUTS
+    assert document.generated_content["plan"]["hook"] == "Read only what you show"
+    assert document.generated_content["notes"] == "Raw agent text"
+
+
+@pytest.mark.asyncio
+async def test_single_platform_read_skips_other_outputs(repo, container):
+    """Test a platform read fetches the header and that part only."""
+    await repo.create(_document())
+
+    document = await repo.get_by_id("doc-1", USER, platform="twitter")
+
+    assert container.queries[-1]["parameters"]["@parts"] == ["doc-1::twitter"]
+    assert document.generated_content["outputs"] == {"twitter": OUTPUTS["twitter"]}
+    assert "notes" not in document.generated_content
+
+
+@pytest.mark.asyncio
+async def test_single_platform_read_skips_raw_response(container):
+    """Test spans are not used, so a platform read leaves the notes unread."""
+    read: list[int] = []
+    answer = _answer(container)
+
+    def measured(request: dict) -> list:
+        items = answer(request)
+        read.append(len(json.dumps(items)))
+        return items
+
+    container.query_handler = measured
+    outputs = {
+        platform: {"content": f"{platform} post. " + "Agents need plans. " * 100}
+        for platform in ("linkedin", "blog", "github")
+    }
+    notes = "\n\n".join(output["content"] for output in outputs.values())
+    repo = ContentRepository(
+        Settings(content_layout="split", content_cache_max_bytes=0),
+        container=container,
+    )
+    document = _document()
+    document.generated_content = {"plan": {}, "outputs": outputs, "notes": notes}
+    await repo.create(document)
+
+    blog = await repo.get_by_id("doc-1", USER, platform="blog")
+
+    assert blog.generated_content["outputs"] == {"blog": outputs["blog"]}
+    assert "$span" not in json.dumps(container.items[(USER, "doc-1::blog")])
+    assert read[-1] < len(notes)
+    full = await repo.get_by_id("doc-1", USER)
+    assert full.generated_content["notes"] == notes
+    assert read[-1] > read[-2] * 2
+
+
+@pytest.mark.asyncio
+async def test_output_update_rewrites_one_part(repo, container):
+    """Test replacing an output touches its part and the header only."""
+    created = await repo.create(_document())
+    header_etag = container.items[(USER, "doc-1")]["_etag"]
+
+    await repo.update_platform_output(
+        "doc-1", USER, "blog", {"title": "Orchestration", "content": "Edited"}
+    )
+
+    assert container.items[(USER, "doc-1")]["_etag"] != header_etag
+    document = await repo.get_by_id("doc-1", USER)
+    assert document.generated_content["outputs"]["blog"]["content"] == "Edited"
+    assert document.generated_content["outputs"]["twitter"] == OUTPUTS["twitter"]
+    with pytest.raises(ConcurrencyConflictError):
+        await repo.update_platform_output(
+            "doc-1", USER, "blog", {"content": "Lost"}, etag=created.etag
+        )
+    part = container.items[(USER, "doc-1::blog")]
+    assert part["generatedContent"]["outputs"]["blog"]["content"] == "Edited"
+
+
+@pytest.mark.asyncio
+async def test_layouts_mix_and_purged_parts_are_compacted(repo, container):
+    """Test both layouts stay readable and orphaned parts are removed."""
+    plain = ContentRepository(Settings(content_cache_max_bytes=0), container=container)
+    await plain.create(_document("doc-old"))
+    results = await repo.bulk_create([_document("doc-1"), _document("doc-2")])
+
+    assert [result["status"] for result in results] == ["succeeded"] * 2
+    assert (USER, "doc-2::blog") in container.items
+    assert (await repo.get_by_id("doc-old", USER)).generated_content[
+        "outputs"
+    ] == OUTPUTS
+    assert (await plain.get_by_id("doc-2", USER)).generated_content[
+        "outputs"
+    ] == OUTPUTS
+    listed = {doc.id: doc for doc in await repo.list_documents(USER)}
+    assert listed["doc-1"].generated_content["outputs"] == OUTPUTS
+
+    del container.items[(USER, "doc-2")]  # TTL purge of deleted content
+    assert (await repo.compact())["documents"] == 4
+    assert (USER, "doc-1::blog") in container.items
+    assert not any(key[1].startswith("doc-2") for key in container.items)
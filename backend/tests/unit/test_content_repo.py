@@ -0,0 +1,336 @@
+"""
+Unit tests for the Cosmos DB content repository.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+import pytest
+
+from app.config import Settings
+from app.repositories.content_repo import ContentRepository
+from app.services.content_service import ContentService
+from app.utils.exceptions import (
+    ConcurrencyConflictError,
+    ContentNotFoundError,
+    InvalidCursorError,
+)
+from tests.fakes import USER, FakeContainer, make_document
+
+
+@pytest.mark.asyncio
+async def test_warm_up_reads_metadata_and_feed_ranges(repo, container):
+    """Test warm-up primes container metadata and partition key ranges."""
+    await repo.warm_up()
+
+    assert container.calls == ["read", "read_feed_ranges"]
+
+
+@pytest.mark.asyncio
+async def test_create_and_get_round_trip(repo):
+    """Test a created document can be read back."""
+    await repo.create(make_document())
+
+    document = await repo.get_by_id("doc-1", USER)
+
+    assert document.topic == "Async Cosmos clients"
+    assert document.partition_key == USER
+
+
+@pytest.mark.asyncio
+async def test_get_missing_document_raises_not_found(repo):
+    """Test reading an unknown id raises ContentNotFoundError."""
+    with pytest.raises(ContentNotFoundError):
+        await repo.get_by_id("missing", USER)
+
+
+@pytest.mark.asyncio
+async def test_operations_do_not_block_event_loop():
+    """Test concurrent reads overlap instead of running back to back."""
+    container = FakeContainer(latency=0.05)
+    repo = ContentRepository(Settings(), container=container)
+    await repo.create(make_document())
+
+    start = time.perf_counter()
+    await asyncio.gather(*(repo.get_by_id("doc-1", USER) for _ in range(20)))
+
+    assert time.perf_counter() - start < 0.5
+
+
+@pytest.mark.asyncio
+async def test_query_pages_with_continuation_cursor(repo, container):
+    """Test history pages chain through opaque cursors without OFFSET."""
+    for index in range(5):
+        await repo.create(make_document(f"doc-{index}"))
+
+    first = await repo.query_by_user(USER, limit=2)
+    second = await repo.query_by_user(USER, limit=2, cursor=first.continuation_token)
+    last = await repo.query_by_user(USER, limit=2, cursor=second.continuation_token)
+
+    seen = [d.id for page in (first, second, last) for d in page.documents]
+    assert seen == [f"doc-{index}" for index in range(5)]
+    assert last.continuation_token is None
+    assert all("OFFSET" not in q["query"] for q in container.queries)
+
+
+@pytest.mark.asyncio
+async def test_cursor_rejected_for_different_query(repo):
+    """Test a cursor cannot be replayed with other filters."""
+    for index in range(3):
+        await repo.create(make_document(f"doc-{index}"))
+    page = await repo.query_by_user(USER, limit=2)
+
+    with pytest.raises(InvalidCursorError):
+        await repo.query_by_user(
+            USER, limit=2, platform="blog", cursor=page.continuation_token
+        )
+    with pytest.raises(InvalidCursorError):
+        await repo.query_by_user(USER, limit=2, cursor="not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_offset_kept_for_backward_compatibility(repo, container):
+    """Test a bare offset still issues an OFFSET/LIMIT query."""
+    await repo.query_by_user(USER, limit=2, offset=4)
+
+    assert "OFFSET 4 LIMIT 2" in container.queries[-1]["query"]
+
+
+def test_summary_stored_at_write_time():
+    """Test content_to_document stores the truncated hook as a summary."""
+    document = make_document(
+        generated_content={"plan": {"hook": "x" * 500}, "outputs": {}, "notes": ""}
+    )
+
+    assert document.summary == "x" * 200
+    assert make_document(generated_content={"outputs": {}}).summary is None
+
+
+@pytest.mark.asyncio
+async def test_history_query_projects_list_fields_only(repo, container):
+    """Test history queries never select the generated content."""
+    await repo.create(make_document())
+
+    result = await repo.query_by_user(USER, limit=10)
+
+    query = container.queries[-1]["query"]
+    assert "SELECT *" not in query
+    assert "c.summary" in query
+    assert result.documents[0].summary == "Stop creating a client per request"
+    assert not hasattr(result.documents[0], "generated_content")
+
+
+def _counting_handler(container):
+    """Answer the counter reconciliation queries from the stored items."""
+
+    def handler(request):
+        live = [
+            item
+            for (pk, _), item in container.items.items()
+            if pk == request["partition_key"] and item.get("deleted") is False
+        ]
+        if "JOIN p IN c.platforms" in request["query"]:
+            return [platform for item in live for platform in item["platforms"]]
+        if "COUNT(1)" in request["query"]:
+            return [len(live)]
+        return live
+
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_counters_track_creates(repo, container):
+    """Test counters start from a recount and then move by patch increments."""
+    container.query_handler = _counting_handler(container)
+
+    await repo.create(make_document("doc-1"))
+    await repo.create(make_document("doc-2", platforms=["linkedin"]))
+
+    counts = await repo.get_counts(USER)
+    assert counts.total == 2
+    assert counts.platforms == {"linkedin": 2, "blog": 1}
+    assert container.calls.count("upsert_item") == 1
+
+
+@pytest.mark.asyncio
+async def test_reconcile_repairs_drifted_counters(repo, container):
+    """Test reconciliation overwrites counters with a full recount."""
+    container.query_handler = _counting_handler(container)
+    await repo.create(make_document("doc-1"))
+    await container.patch_item(
+        "counter::" + USER, USER, [{"op": "set", "path": "/total", "value": 42}]
+    )
+
+    await repo.reconcile_counts(USER)
+
+    assert (await repo.get_counts(USER)).total == 1
+
+
+@pytest.mark.asyncio
+async def test_counter_document_is_not_content(repo, container):
+    """Test the counter document can't be read through the content API."""
+    container.query_handler = _counting_handler(container)
+    await repo.create(make_document())
+
+    with pytest.raises(ContentNotFoundError):
+        await repo.get_by_id("counter::" + USER, USER)
+
+
+@pytest.mark.asyncio
+async def test_history_total_comes_from_counters(repo, container):
+    """Test history reports the user's full total, not the page length."""
+    container.query_handler = _counting_handler(container)
+    for index in range(3):
+        await repo.create(make_document(f"doc-{index}"))
+    service = ContentService(agent_service=None, content_repo=repo, settings=Settings())
+
+    history = await service.get_content_history(USER, limit=2, platform="blog")
+
+    assert len(history["items"]) == 2
+    assert history["pagination"]["total"] == 3
+    assert history["pagination"]["has_more"]
+
+
+@pytest.mark.asyncio
+async def test_delete_is_a_single_patch(repo, container):
+    """Test soft delete patches the flag without reading or replacing."""
+    container.query_handler = _counting_handler(container)
+    await repo.create(make_document())
+    container.calls.clear()
+
+    await repo.delete("doc-1", USER)
+
+    assert container.calls[0] == "patch_item"
+    assert "read_item" not in container.calls
+    assert "replace_item" not in container.calls
+    stored = container.items[(USER, "doc-1")]
+    assert stored["deleted"] is True
+    assert stored["ttl"] == Settings().deleted_content_ttl
+    assert "partitionKey" in stored and "partition_key" not in stored
+    assert (await repo.get_counts(USER)).total == 0
+    with pytest.raises(ContentNotFoundError):
+        await repo.delete("doc-1", USER)
+
+
+@pytest.mark.asyncio
+async def test_delete_with_stale_etag_conflicts(repo):
+    """Test a delete guarded by an outdated etag is rejected."""
+    await repo.create(make_document())
+    etag = (await repo.get_by_id("doc-1", USER)).etag
+    await repo.mark_version("doc-1", USER, "v2")
+
+    with pytest.raises(ConcurrencyConflictError):
+        await repo.delete("doc-1", USER, etag=etag)
+
+    document = await repo.get_by_id("doc-1", USER)
+    assert document.metadata["version"] == "v2"
+    await repo.delete("doc-1", USER, etag=document.etag)
+
+
+@pytest.mark.asyncio
+async def test_update_platform_output_patches_one_path(repo, container):
+    """Test regenerating a platform only sends that platform's output."""
+    await repo.create(make_document())
+
+    document = await repo.update_platform_output(
+        "doc-1", USER, "blog", {"content": "New blog"}
+    )
+
+    assert document.generated_content["outputs"]["blog"] == {"content": "New blog"}
+    assert container.patches[-1]["operations"][0]["path"] == (
+        "/generatedContent/outputs/blog"
+    )
+
+
+@pytest.mark.asyncio
+async def test_compaction_removes_documents_of_purged_users(repo, container):
+    """Test counters and views go once a user's content has been purged."""
+
+    counting = _counting_handler(container)
+
+    def handler(request):
+        if request["partition_key"] is None:
+            return [USER]
+        if "IS_DEFINED" in request["query"]:
+            content = [
+                k for k, item in container.items.items() if "docType" not in item
+            ]
+            return [len(content)]
+        return counting(request)
+
+    container.query_handler = handler
+    await repo.create(make_document())
+    await repo.delete("doc-1", USER)
+
+    assert await repo.compact() == {"blobs": 0, "documents": 0}
+
+    del container.items[(USER, "doc-1")]  # TTL purge
+    assert await repo.compact() == {"blobs": 0, "documents": 1}
+    assert (await repo.get_counts(USER)) is None
+
+
+@pytest.mark.asyncio
+async def test_date_range_queries_use_stored_field_names(repo, container):
+    """Test history filters and sorts on createdAt through the composite index."""
+    await repo.query_by_user(
+        USER,
+        start_date=datetime(2024, 3, 1, 10, tzinfo=timezone(timedelta(hours=2))),
+        end_date=datetime(2024, 3, 31),
+        order="asc",
+    )
+    request = container.queries[-1]
+
+    assert "created_at" not in request["query"]
+    assert "c.createdAt >= @startDate AND c.createdAt <= @endDate" in request["query"]
+    assert request["query"].endswith(
+        "ORDER BY c.userId DESC, c.deleted DESC, c.createdAt ASC"
+    )
+    assert request["parameters"]["@startDate"] == "2024-03-01T08:00:00.000000Z"
+    assert request["parameters"]["@endDate"] == "2024-03-31T00:00:00.000000Z"
+
+
+@pytest.mark.asyncio
+async def test_date_bounds_order_within_the_boundary_second(repo, container):
+    """Test createdAt and bounds compare as strings in time order."""
+
+    def handler(request):
+        params = request["parameters"]
+        return [
+            item
+            for item in container.items.values()
+            if params.get("@startDate", "") <= item["createdAt"]
+            and item["createdAt"] <= params.get("@endDate", "~")
+        ]
+
+    container.query_handler = handler
+    for content_id, micro in (("whole", 0), ("half", 500000)):
+        document = make_document(content_id)
+        document.created_at = datetime(2024, 3, 1, 10, 0, 0, micro)
+        await repo.create(document)
+    boundary = datetime(2024, 3, 1, 10, tzinfo=timezone.utc)
+
+    after = await repo.query_by_user(USER, start_date=boundary)
+    before = await repo.query_by_user(USER, end_date=boundary)
+
+    assert {doc.id for doc in after.documents} == {"whole", "half"}
+    assert [doc.id for doc in before.documents] == ["whole"]
+
+
+@pytest.mark.asyncio
+async def test_list_changed_reports_deletes(repo, container):
+    """Test changes since a time split into live documents and deleted ids."""
+    container.query_handler = lambda request: [
+        item for item in container.items.values() if "docType" not in item
+    ]
+    await repo.create(make_document("kept"))
+    await repo.create(make_document("gone"))
+    await repo.delete("gone", USER)
+
+    documents, removed = await repo.list_changed(USER, since=1700000000.5)
+
+    request = container.queries[-1]
+    assert "c._ts >= @since" in request["query"]
+    assert request["parameters"]["@since"] == 1700000000
+    assert [document.id for document in documents] == ["kept"]
+    assert documents[0].generated_content["notes"] == "Raw agent text"
+    assert removed == ["gone"]
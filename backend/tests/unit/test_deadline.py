@@ -0,0 +1,101 @@
+"""
+Unit tests for request deadline propagation.
+"""
+
+import asyncio
+import time
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import Settings
+from app.dependencies import get_agent_service, get_content_repository
+from app.main import app
+from app.models.requests import Platform
+from app.services.content_service import ContentService
+from app.utils.deadline import Deadline, remaining_timeout
+from app.utils.exceptions import DeadlineExceededError
+from app.utils.mock_services import MockAgentService, MockContentRepository
+
+
+class SlowAgentService:
+    """Agent stand-in that honours the deadline like the real service."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    async def generate_content(self, deadline=None, **kwargs):
+        try:
+            await asyncio.wait_for(
+                asyncio.sleep(self.delay),
+                timeout=deadline.timeout() if deadline else None,
+            )
+        except asyncio.TimeoutError:
+            raise DeadlineExceededError("agent deadline")
+        return {"content": {"plan": {"hook": "hook"}, "outputs": {}}, "duration": 0}
+
+
+def test_deadline_remaining_and_check():
+    """Test remaining budget and stage checks."""
+    deadline = Deadline.after(10)
+
+    assert 9 < deadline.remaining() <= 10
+    assert not deadline.expired
+    assert remaining_timeout(deadline)["timeout"] <= 10
+    assert remaining_timeout(None) == {}
+    deadline.check("agent call", needed=1)
+
+    with pytest.raises(DeadlineExceededError):
+        deadline.check("agent call", needed=60)
+    with pytest.raises(DeadlineExceededError):
+        Deadline(time.monotonic() - 1).check("saving content")
+
+
+@pytest.mark.asyncio
+async def test_content_service_abandons_work_at_deadline():
+    """Test generation stops at the deadline and nothing is persisted."""
+    repo = MockContentRepository(Settings())
+    service = ContentService(SlowAgentService(delay=5), repo, Settings())
+
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceededError):
+        await service.generate_content(
+            topic="Deadlines",
+            platforms=[Platform.LINKEDIN],
+            user_id="user@example.com",
+            deadline=Deadline.after(0.2),
+        )
+
+    assert time.monotonic() - start < 1
+    assert repo._storage == {}
+
+
+@pytest.mark.asyncio
+async def test_content_service_without_deadline_completes():
+    """Test generation is unaffected when no deadline is given."""
+    repo = MockContentRepository(Settings())
+    service = ContentService(SlowAgentService(delay=0), repo, Settings())
+
+    result = await service.generate_content(
+        topic="Deadlines", platforms=[Platform.LINKEDIN], user_id="user@example.com"
+    )
+
+    assert result["id"] in repo._storage
+
+
+def test_generate_endpoint_returns_504_when_deadline_cannot_be_met():
+    """Test the API returns 504 for a deadline shorter than the agent call."""
+    repo = MockContentRepository(Settings())
+    app.dependency_overrides[get_agent_service] = lambda: MockAgentService(Settings())
+    app.dependency_overrides[get_content_repository] = lambda: repo
+    try:
+        client = TestClient(app)
+        response = client.post(
+            "/api/v1/content/generate",
+            json={"topic": "Deadline propagation", "platforms": ["linkedin"]},
+            headers={"X-Request-Timeout": "0.2"},
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 504
+    assert repo._storage == {}
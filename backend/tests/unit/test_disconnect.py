@@ -0,0 +1,152 @@
+"""
+Unit tests for cancelling work when the client disconnects.
+"""
+
+import asyncio
+import pytest
+
+from app.config import Settings
+from app.models.requests import Platform
+from app.services.content_service import ContentService
+from app.utils.disconnect import FINISH, SAVE_COMPLETED, run_until_disconnected
+from app.utils.exceptions import ClientDisconnectedError
+from app.utils.metrics import metrics
+from app.utils.mock_services import MockContentRepository
+
+
+class FakeRequest:
+    """Request stand-in that reports a disconnect after a delay."""
+
+    class url:
+        path = "/api/v1/content/generate"
+
+    def __init__(self, disconnect_after: float):
+        self._disconnect_at = asyncio.get_running_loop().time() + disconnect_after
+
+    async def is_disconnected(self) -> bool:
+        return asyncio.get_running_loop().time() >= self._disconnect_at
+
+
+class FakeAgentService:
+    """Agent stand-in with a configurable delay."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.completed = False
+
+    async def generate_content(self, **kwargs):
+        await asyncio.sleep(self.delay)
+        self.completed = True
+        return {"content": {"plan": {"hook": "hook"}, "outputs": {}}, "duration": 0}
+
+
+class SlowRepository(MockContentRepository):
+    """Repository whose writes take a while."""
+
+    async def create(self, document, deadline=None):
+        await asyncio.sleep(0.2)
+        return await super().create(document)
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def _generate(service):
+    return service.generate_content(
+        topic="Disconnects", platforms=[Platform.BLOG], user_id="user@example.com"
+    )
+
+
+@pytest.mark.asyncio
+async def test_returns_result_when_client_stays():
+    """Test work completes normally while the client is connected."""
+    service = ContentService(
+        FakeAgentService(0.05), MockContentRepository(Settings()), Settings()
+    )
+
+    result = await run_until_disconnected(
+        FakeRequest(10), _generate(service), poll_interval=0.01
+    )
+
+    assert result["status"] == "success"
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_agent_call():
+    """Test the agent call is cancelled and nothing is persisted."""
+    agent = FakeAgentService(5)
+    repo = MockContentRepository(Settings())
+    service = ContentService(agent, repo, Settings())
+
+    with pytest.raises(ClientDisconnectedError):
+        await run_until_disconnected(
+            FakeRequest(0.05), _generate(service), poll_interval=0.01
+        )
+
+    assert not agent.completed
+    assert repo._storage == {}
+    assert metrics.get("generation.client_disconnected") == 1
+    assert metrics.get("generation.cancelled.agent") == 1
+
+
+@pytest.mark.asyncio
+async def test_save_completed_policy_finishes_started_save():
+    """Test a save already in progress still completes after a disconnect."""
+    repo = SlowRepository(Settings())
+    settings = Settings(disconnect_policy=SAVE_COMPLETED)
+    service = ContentService(FakeAgentService(0), repo, settings)
+
+    with pytest.raises(ClientDisconnectedError):
+        await run_until_disconnected(
+            FakeRequest(0.05), _generate(service), poll_interval=0.01
+        )
+    await asyncio.sleep(0.3)
+
+    assert len(repo._storage) == 1
+    assert metrics.get("generation.cancelled.persist") == 0
+    assert metrics.get("generation.persisted_after_disconnect") == 1
+
+
+@pytest.mark.asyncio
+async def test_discard_policy_cancels_save():
+    """Test the discard policy cancels an in-flight save."""
+    repo = SlowRepository(Settings())
+    service = ContentService(
+        FakeAgentService(0), repo, Settings(disconnect_policy="discard")
+    )
+
+    with pytest.raises(ClientDisconnectedError):
+        await run_until_disconnected(
+            FakeRequest(0.05), _generate(service), poll_interval=0.01
+        )
+    await asyncio.sleep(0.3)
+
+    assert repo._storage == {}
+
+
+@pytest.mark.asyncio
+async def test_finish_policy_completes_in_background():
+    """Test the finish policy lets the whole generation complete."""
+    agent = FakeAgentService(0.1)
+    repo = MockContentRepository(Settings())
+    service = ContentService(agent, repo, Settings())
+
+    detached = []
+
+    with pytest.raises(ClientDisconnectedError):
+        await run_until_disconnected(
+            FakeRequest(0.02),
+            _generate(service),
+            policy=FINISH,
+            poll_interval=0.01,
+            on_disconnect=detached.append,
+        )
+    assert not detached[0].done()
+    await asyncio.sleep(0.2)
+
+    assert agent.completed
+    assert len(repo._storage) == 1
@@ -0,0 +1,81 @@
+"""
+Unit tests for the content-by-id read cache.
+"""
+
+import pytest
+
+from app.config import Settings
+from app.repositories.content_repo import ContentRepository
+from app.repositories.document_cache import DocumentCache
+from app.utils.exceptions import ContentNotFoundError
+from tests.fakes import USER, make_document
+
+
+def test_lru_evicts_by_bytes():
+    """Test the least recently used entries go first once over the bound."""
+    cache = DocumentCache(max_bytes=250)
+    cache.put((USER, "a"), make_document("a", etag='"1"'), 100)
+    cache.put((USER, "b"), make_document("b", etag='"1"'), 100)
+    cache.get((USER, "a"))
+    cache.put((USER, "c"), make_document("c", etag='"1"'), 100)
+
+    assert cache.get((USER, "b")) is None
+    assert cache.get((USER, "a")) is not None
+    assert cache.bytes == 200
+
+    cache.put((USER, "big"), make_document("big", etag='"1"'), 1000)
+    assert cache.get((USER, "big")) is None
+
+
+@pytest.mark.asyncio
+async def test_repeat_reads_revalidate_with_etag(repo, container):
+    """Test a cached document is revalidated and served on 304."""
+    await repo.create(make_document())
+
+    first = await repo.get_by_id("doc-1", USER)
+    second = await repo.get_by_id("doc-1", USER)
+
+    assert first.topic == second.topic == "Async Cosmos clients"
+    assert repo._cache.hits == 1 and repo._cache.misses == 1
+    assert repo._cache.hit_ratio == 0.5
+
+
+@pytest.mark.asyncio
+async def test_remote_change_is_picked_up(repo, container):
+    """Test a document changed by another process is re-read, not served stale."""
+    await repo.create(make_document())
+    await repo.get_by_id("doc-1", USER)
+    await container.patch_item(
+        "doc-1", USER, [{"op": "set", "path": "/topic", "value": "Changed"}]
+    )
+
+    assert (await repo.get_by_id("doc-1", USER)).topic == "Changed"
+
+
+@pytest.mark.asyncio
+async def test_own_writes_invalidate(repo, container):
+    """Test this process's patch and delete drop the cached copy."""
+    await repo.create(make_document())
+    await repo.get_by_id("doc-1", USER)
+    await repo.mark_version("doc-1", USER, "v2")
+    assert len(repo._cache) == 0
+
+    assert (await repo.get_by_id("doc-1", USER)).metadata["version"] == "v2"
+    await repo.delete("doc-1", USER)
+    with pytest.raises(ContentNotFoundError):
+        await repo.get_by_id("doc-1", USER)
+
+
+@pytest.mark.asyncio
+async def test_fresh_window_skips_round_trip(container):
+    """Test entries inside the freshness window are served without I/O."""
+    repo = ContentRepository(
+        Settings(content_cache_fresh_seconds=60), container=container
+    )
+    await repo.create(make_document())
+    await repo.get_by_id("doc-1", USER)
+    container.calls.clear()
+
+    await repo.get_by_id("doc-1", USER)
+
+    assert container.calls == []
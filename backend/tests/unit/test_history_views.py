@@ -0,0 +1,243 @@
+"""
+Unit tests for the change feed processor and materialized history views.
+"""
+
+from datetime import datetime, timedelta
+import pytest
+
+from app.config import Settings
+from app.models.database import (
+    HistoryView,
+    history_member_id,
+    history_view_id,
+)
+from app.repositories.change_feed import (
+    ChangeFeedProcessor,
+    CosmosCheckpointStore,
+    InMemoryCheckpointStore,
+)
+from app.repositories.content_repo import ContentRepository
+from app.repositories.history_views import HistoryViewBuilder, apply_changes
+from app.services.content_service import ContentService
+from app.utils.metrics import metrics
+from tests.fakes import USER, FakeContainer, make_document
+
+START = datetime(2024, 3, 1, 9, 0, 0)
+
+
+def _document(index: int, platforms=("linkedin",)) -> dict:
+    document = make_document(
+        f"doc-{index}",
+        topic=f"Topic {index}",
+        platforms=platforms,
+        generated_content={"plan": {"hook": f"Hook {index}"}},
+        created_at=START + timedelta(hours=index),
+    )
+    return document.model_dump(mode="json", by_alias=True)
+
+
+def _view() -> HistoryView:
+    return HistoryView(id=history_view_id(USER), partitionKey=USER, userId=USER)
+
+
+def _processor(container, checkpoints=None, owner="replica-a", recent_items=3):
+    builder = HistoryViewBuilder(container, recent_items=recent_items)
+    return ChangeFeedProcessor(
+        container,
+        checkpoints or InMemoryCheckpointStore(),
+        builder.handle,
+        name="history-views",
+        owner=owner,
+        max_item_count=2,
+    )
+
+
+def test_apply_changes_is_idempotent():
+    """Test replaying the same changes leaves the view unchanged."""
+    view, members = _view(), {}
+    changes = [_document(0, ["linkedin", "blog"]), _document(1)]
+
+    apply_changes(view, changes, size=10, members=members)
+    apply_changes(view, changes, size=10, members=members)
+
+    assert view.total == 2
+    assert view.platform_counts == {"linkedin": 2, "blog": 1}
+    assert view.daily_counts == {"2024-03-01": 2}
+    assert [entry.id for entry in view.recent] == ["doc-1", "doc-0"]
+
+
+def test_apply_changes_requests_refill_when_recent_item_deleted():
+    """Test deleting a listed item asks for a refill only if older items exist."""
+    view, members = _view(), {}
+    apply_changes(view, [_document(index) for index in range(3)], 2, members)
+    deleted = _document(2)
+    deleted["deleted"] = True
+
+    assert apply_changes(view, [deleted], 2, members)
+    assert view.total == 2
+    assert [entry.id for entry in view.recent] == ["doc-1"]
+
+
+@pytest.mark.asyncio
+async def test_processor_builds_view_and_resumes_from_checkpoint(container):
+    """Test changes are applied once and later runs pick up only new writes."""
+    checkpoints = InMemoryCheckpointStore()
+    processor = _processor(container, checkpoints)
+    for index in range(3):
+        await container.create_item(body=_document(index))
+
+    # Pages are read as they are handled, so the builder's own writes (the
+    # view and one member document per item) come back through the feed in
+    # the same run and are skipped
+    assert await processor.run_once() == 8
+    assert await processor.run_once() == 0
+
+    await container.create_item(body=_document(3, ["blog"]))
+    assert await processor.run_once() == 3
+
+    view = HistoryView(**await container.read_item(history_view_id(USER), USER))
+    assert view.total == 4
+    assert view.platform_counts == {"linkedin": 3, "blog": 1}
+    assert [entry.id for entry in view.recent] == ["doc-3", "doc-2", "doc-1"]
+
+
+@pytest.mark.asyncio
+async def test_processor_refills_recent_after_delete(container):
+    """Test deleting a listed item backfills the list from the container."""
+    processor = _processor(container, recent_items=2)
+    for index in range(3):
+        await container.create_item(body=_document(index))
+    await processor.run_once()
+
+    repo = ContentRepository(Settings(), container=container)
+    await repo.delete("doc-2", USER)
+    await processor.run_once()
+
+    view = await repo.get_history_view(USER)
+    assert view.total == 2
+    assert {entry.id for entry in view.recent} == {"doc-0", "doc-1"}
+
+
+@pytest.mark.asyncio
+async def test_throttled_feed_and_view_calls_are_retried(container):
+    """Test 429s on feed pages and view writes are retried, not fatal."""
+    metrics.reset()
+    repo = ContentRepository(Settings(), container=container)
+    builder = HistoryViewBuilder(container, recent_items=3, call=repo.paced_call)
+    processor = ChangeFeedProcessor(
+        container,
+        InMemoryCheckpointStore(),
+        builder.handle,
+        name="history-views",
+        max_item_count=2,
+        call=repo.paced_call,
+    )
+    for index in range(3):
+        await container.create_item(body=_document(index))
+
+    # The first page read and its retry
+    container.throttle_next = 2
+    assert await processor.run_once() == 8
+    container.throttle_next = 1
+    await builder.handle([_document(3)])
+
+    view = await repo.get_history_view(USER)
+    assert view.total == 4
+    assert metrics.get("cosmos.throttled.change_feed.history-views") == 2
+    assert metrics.get("cosmos.throttled.view_read") == 1
+
+
+@pytest.mark.asyncio
+async def test_lease_held_by_another_instance_blocks_processing(container):
+    """Test only the lease owner consumes the feed."""
+    leases = FakeContainer(partition_key_field="id")
+    await container.create_item(body=_document(0))
+    owner = _processor(container, CosmosCheckpointStore(leases), owner="replica-a")
+    other = _processor(container, CosmosCheckpointStore(leases), owner="replica-b")
+
+    # The content document, then the view and member written for it
+    assert await owner.run_once() == 3
+    assert await other.run_once() == 0
+    lease = await leases.read_item("history-views", "history-views")
+    assert lease["owner"] == "replica-a"
+    assert lease["continuation"]
+
+
+@pytest.mark.asyncio
+async def test_first_history_page_served_from_view(container):
+    """Test page one is a point read and its cursor continues with a query."""
+    for index in range(5):
+        await container.create_item(body=_document(index))
+    await _processor(container, recent_items=3).run_once()
+    repo = ContentRepository(Settings(), container=container)
+    service = ContentService(agent_service=None, content_repo=repo, settings=Settings())
+
+    first = await service.get_content_history(USER, limit=2)
+
+    assert [item["id"] for item in first["items"]] == ["doc-4", "doc-3"]
+    assert first["pagination"]["total"] == 5
+    assert first["pagination"]["has_more"]
+    assert not container.queries
+
+    await service.get_content_history(
+        USER, limit=2, cursor=first["pagination"]["next_cursor"]
+    )
+    assert (
+        container.queries[-1]["parameters"]["@after"] == "2024-03-01T12:00:00.000000Z"
+    )
+
+
+@pytest.mark.asyncio
+async def test_stats_read_from_view(container):
+    """Test stats report daily counts from the view."""
+    await container.create_item(body=_document(0))
+    await container.create_item(body=_document(20))
+    await _processor(container).run_once()
+    repo = ContentRepository(Settings(), container=container)
+    service = ContentService(agent_service=None, content_repo=repo, settings=Settings())
+
+    stats = await service.get_content_stats(USER)
+
+    assert stats["total"] == 2
+    assert stats["daily_counts"] == {"2024-03-01": 1, "2024-03-02": 1}
+
+
+@pytest.mark.asyncio
+async def test_membership_kept_outside_the_view(container):
+    """Test the view holds no per-item state and legacy membership moves out."""
+    for index in range(2):
+        await container.create_item(body=_document(index))
+    view, members = _view(), {}
+    apply_changes(view, [_document(0), _document(1)], 10, members)
+    legacy = view.model_dump(mode="json", by_alias=True)
+    await container.create_item(body={**legacy, "members": members})
+
+    deleted = _document(0)
+    deleted["deleted"] = True
+    await HistoryViewBuilder(container).handle([deleted, _document(1)])
+
+    stored = await container.read_item(history_view_id(USER), USER)
+    assert "members" not in stored
+    assert stored["total"] == 1
+    member = await container.read_item(history_member_id(USER, "doc-1"), USER)
+    assert member["day"] == "2024-03-01"
+    assert (USER, history_member_id(USER, "doc-0")) not in container.items
+
+
+@pytest.mark.asyncio
+async def test_old_daily_counts_trimmed_and_read_by_query(container):
+    """Test views keep recent days only and older ranges fall back to a query."""
+    await container.create_item(body=_document(0))
+    await HistoryViewBuilder(container, daily_days=30).handle([_document(0)])
+    repo = ContentRepository(Settings(), container=container)
+    service = ContentService(agent_service=None, content_repo=repo, settings=Settings())
+
+    view = await repo.get_history_view(USER)
+    assert view.total == 1
+    assert view.daily_counts == {}
+    assert view.daily_since > "2024-03-01"
+
+    container.query_handler = lambda request: ["2024-03-01"]
+    buckets = await service.get_history_buckets(USER)
+    assert buckets["total"] == 1
+    assert "LEFT(c.createdAt, 10)" in container.queries[-1]["query"]
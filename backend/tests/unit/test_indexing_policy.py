@@ -0,0 +1,60 @@
+"""
+Unit tests for the Cosmos DB indexing policy check.
+"""
+
+import copy
+import json
+from pathlib import Path
+import pytest
+
+from app.config import Settings
+from app.repositories.content_repo import ContentRepository
+from app.repositories.indexing import INDEXING_POLICY, indexing_policy_drift
+from app.utils.exceptions import DatabaseError
+from tests.fakes import FakeContainer
+
+POLICY_FILE = (
+    Path(__file__).parents[3] / "infra" / "core" / "cosmos-indexing-policy.json"
+)
+
+
+def test_shipped_policy_matches_code():
+    """Test infra/ and the repository agree on the policy."""
+    assert json.loads(POLICY_FILE.read_text()) == INDEXING_POLICY
+
+
+def test_matching_policy_with_extras_has_no_drift():
+    """Test extra exclusions or indexes added on the container are tolerated."""
+    actual = copy.deepcopy(INDEXING_POLICY)
+    actual["indexingMode"] = "Consistent"
+    actual["excludedPaths"].append({"path": "/metadata/*"})
+
+    assert indexing_policy_drift(actual) == []
+
+
+def test_default_policy_reports_drift():
+    """Test a container with the default index-everything policy drifts."""
+    default = {
+        "indexingMode": "consistent",
+        "includedPaths": [{"path": "/*"}],
+        "excludedPaths": [{"path": '/"_etag"/?'}],
+    }
+
+    drift = indexing_policy_drift(default)
+
+    assert "path /generatedContent/* is indexed but should be excluded" in drift
+    assert len(drift) == 3
+
+
+@pytest.mark.asyncio
+async def test_verify_warns_or_fails_by_mode():
+    """Test drift is logged in warn mode and raised in fail mode."""
+    repo = ContentRepository(Settings(), container=FakeContainer())
+
+    assert await repo.verify_indexing_policy("off") == []
+    assert await repo.verify_indexing_policy("warn")
+    with pytest.raises(DatabaseError):
+        await repo.verify_indexing_policy("fail")
+
+    repo.container.properties["indexingPolicy"] = INDEXING_POLICY
+    assert await repo.verify_indexing_policy("fail") == []
@@ -0,0 +1,114 @@
+"""
+Unit tests for the local knowledge-base index.
+"""
+
+import pytest
+from app.config import Settings
+from app.services.agent_service import AgentService
+from app.services.knowledge_index import KnowledgeIndex, chunk_markdown, tokenize
+
+
+@pytest.fixture
+def knowledge_dir(tmp_path):
+    """Create a small knowledge base."""
+    (tmp_path / "platforms.md").write_text(
+        "# Platforms\n\n## Twitter\n\nThreads of 5-7 tweets under 280 characters.\n\n"
+        "## LinkedIn\n\nProfessional tone, 1300 characters, three hashtags.\n"
+    )
+    (tmp_path / "brand.md").write_text(
+        "# Brand\n\nUse Microsoft product names exactly as written.\n"
+    )
+    return tmp_path
+
+
+def test_tokenize_drops_stopwords():
+    """Test tokenizer lowercases and removes stopwords."""
+    assert tokenize("The Azure Functions and C# runtime") == [
+        "azure",
+        "functions",
+        "c#",
+        "runtime",
+    ]
+
+
+def test_chunk_markdown_splits_on_headings():
+    """Test markdown is chunked per heading."""
+    chunks = chunk_markdown("# Title\n\nIntro\n\n## Part\n\nBody text", "doc.md")
+
+    assert [c.heading for c in chunks] == ["Title", "Part"]
+    assert chunks[1].text == "Body text"
+
+
+def test_chunk_markdown_respects_max_chars():
+    """Test long sections are split on paragraph boundaries."""
+    body = "\n\n".join(["word " * 40] * 5)
+    chunks = chunk_markdown(f"## Long\n\n{body}", "doc.md", max_chars=300)
+
+    assert len(chunks) > 1
+    assert all(len(c.text) <= 300 for c in chunks)
+
+
+def test_chunk_markdown_splits_oversized_paragraphs():
+    """Test a paragraph longer than max_chars is split, not truncated."""
+    paragraph = " ".join(f"word{i}" for i in range(200))
+    chunks = chunk_markdown(f"## Long\n\n{paragraph}", "doc.md", max_chars=300)
+
+    assert len(chunks) > 1
+    assert all(len(c.text) <= 300 for c in chunks)
+    assert " ".join(c.text for c in chunks).split() == paragraph.split()
+
+
+def test_search_ranks_relevant_chunk_first(knowledge_dir):
+    """Test the most relevant chunk is returned first."""
+    index = KnowledgeIndex.from_directory(knowledge_dir)
+
+    results = index.search("twitter thread tweets", top_k=2)
+
+    assert results[0][0].heading == "Twitter"
+    assert index.search("kubernetes") == []
+
+
+def test_cache_round_trip(knowledge_dir, tmp_path_factory):
+    """Test index is cached by content hash, replaced and pruned on change."""
+    cache_dir = tmp_path_factory.mktemp("cache")
+
+    built = KnowledgeIndex.from_directory(knowledge_dir, cache_dir=cache_dir)
+    loaded = KnowledgeIndex.from_directory(knowledge_dir, cache_dir=cache_dir)
+
+    stale = [path.name for path in cache_dir.glob("*.npz")]
+    assert len(stale) == 1
+    assert loaded.chunks == built.chunks
+    assert loaded.search("linkedin")[0][0].heading == "LinkedIn"
+
+    (knowledge_dir / "brand.md").write_text("# Brand\n\nUpdated guidance.\n")
+    KnowledgeIndex.from_directory(knowledge_dir, cache_dir=cache_dir)
+    caches = list(cache_dir.glob("*.npz"))
+    assert len(caches) == 1 and caches[0].name not in stale
+
+
+def test_build_prompt_includes_knowledge(knowledge_dir):
+    """Test retrieved chunks are injected into the agent prompt."""
+    index = KnowledgeIndex.from_directory(knowledge_dir)
+    service = AgentService(Settings(), knowledge_index=index)
+
+    prompt = service._build_prompt("Writing a twitter thread", ["twitter"], None, None)
+
+    assert "[platforms.md - Twitter]" in prompt
+    assert "280 characters" in prompt
+
+
+def test_excerpts_never_appear_without_their_heading(knowledge_dir):
+    """Test tight budgets keep or drop the heading together with excerpts."""
+    index = KnowledgeIndex.from_directory(knowledge_dir)
+
+    for budget in range(110, 200, 2):
+        service = AgentService(
+            Settings(prompt_token_budget=budget), knowledge_index=index
+        )
+        assembled = service._assemble_prompt(
+            "Writing a twitter thread", ["twitter"], None, None
+        )
+        kept = [name for name in assembled.included if name.startswith("knowledge")]
+        labeled = "Relevant knowledge base excerpts" in assembled.text
+        assert labeled == bool(kept)
+        assert not kept or kept[0] == "knowledge_0"
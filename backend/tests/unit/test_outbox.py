@@ -0,0 +1,122 @@
+"""
+Unit tests for write-behind persistence through the local outbox.
+"""
+
+import pytest
+import pytest_asyncio
+
+from app.config import Settings
+from app.repositories.change_feed import ChangeFeedProcessor, InMemoryCheckpointStore
+from app.repositories.content_repo import ContentRepository
+from app.repositories.history_views import HistoryViewBuilder
+from app.repositories.outbox import ContentOutbox, WriteBehindRepository
+from app.services.content_service import ContentService
+from app.utils.exceptions import ContentNotFoundError
+from app.utils.metrics import metrics
+from tests.fakes import USER, FakeContainer, make_document
+
+
+def _document(content_id: str):
+    return make_document(
+        content_id, topic=f"Write-behind {content_id}", platforms=["blog"]
+    )
+
+
+def _write_behind(container: FakeContainer, path: str) -> WriteBehindRepository:
+    settings = Settings(content_cache_max_bytes=0, cosmos_throttle_max_retries=0)
+    return WriteBehindRepository(
+        ContentRepository(settings, container=container),
+        ContentOutbox(path),
+        settings,
+    )
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+@pytest.fixture
+def container():
+    return FakeContainer()
+
+
+@pytest_asyncio.fixture
+async def repo(container, tmp_path):
+    repository = _write_behind(container, str(tmp_path / "outbox.db"))
+    await repository.open()
+    yield repository
+    await repository.outbox.close()
+
+
+@pytest.mark.asyncio
+async def test_creates_are_queued_and_read_through(repo, container):
+    """Test content is readable before it reaches the database."""
+    await repo.create(_document("queued"))
+
+    assert container.items == {}
+    assert (await repo.get_by_id("queued", USER)).topic == "Write-behind queued"
+    history = await repo.query_by_user(USER)
+    assert [doc.id for doc in history.documents] == ["queued"]
+
+    assert await repo.flush() == 1
+    assert (USER, "queued") in container.items
+    assert metrics.get("outbox.pending") == 0
+    assert (await repo.get_by_id("queued", USER)).id == "queued"
+
+
+@pytest.mark.asyncio
+async def test_outage_keeps_content_until_written(repo, container, tmp_path):
+    """Test failed flushes back off and queued content survives a restart."""
+    await repo.create(_document("survivor"))
+    container.throttle_next = 1
+
+    assert await repo.flush() == 0
+    assert await repo.flush() == 0  # backing off, not retried yet
+    assert (USER, "survivor") not in container.items
+    await repo.outbox.close()
+
+    restarted = _write_behind(container, str(tmp_path / "outbox.db"))
+    await restarted.open()
+    assert (await restarted.get_by_id("survivor", USER)).id == "survivor"
+    assert await restarted.flush([(USER, "survivor")]) == 1
+    assert (USER, "survivor") in container.items
+    await restarted.outbox.close()
+
+
+@pytest.mark.asyncio
+async def test_changes_to_queued_content_write_it_first(repo, container):
+    """Test deleting queued content writes, then deletes it."""
+    service = ContentService(agent_service=None, content_repo=repo, settings=Settings())
+    await repo.create(_document("short-lived"))
+
+    await service.delete_content("short-lived", USER)
+
+    assert container.items[(USER, "short-lived")]["deleted"] is True
+    with pytest.raises(ContentNotFoundError):
+        await repo.get_by_id("short-lived", USER)
+
+
+@pytest.mark.asyncio
+async def test_history_view_pages_include_queued_content(repo, container):
+    """Test history, buckets and stats served from the view list queued content."""
+    service = ContentService(agent_service=None, content_repo=repo, settings=Settings())
+    await repo.create(_document("stored"))
+    await repo.flush()
+    builder = HistoryViewBuilder(container)
+    await ChangeFeedProcessor(
+        container, InMemoryCheckpointStore(), builder.handle, name="views"
+    ).run_once()
+    await repo.create(_document("queued"))
+
+    history = await service.get_content_history(USER)
+    buckets = await service.get_history_buckets(USER)
+    stats = await service.get_content_stats(USER)
+
+    assert metrics.get("history_views.served") == 1
+    assert [item["id"] for item in history["items"]] == ["queued", "stored"]
+    assert history["pagination"]["total"] == 2
+    assert buckets["total"] == 2
+    assert stats["total"] == 2 and stats["platform_counts"] == {"blog": 2}
@@ -0,0 +1,176 @@
+"""
+Unit tests for caller identity and hierarchical partition keys.
+"""
+
+import base64
+import json
+from datetime import datetime
+import pytest
+from starlette.requests import Request
+
+from app import dependencies
+from app.config import Settings
+from app.models.database import content_to_document
+from app.repositories.content_repo import ContentRepository
+from app.repositories.partitioning import PartitionScheme, month_bucket
+from app.utils.exceptions import AuthenticationError, ContentNotFoundError
+from tests.fakes import FakeContainer, http_error
+
+USER = "7f9c2d1e-0000-4000-8000-000000000001"
+
+
+def _request(headers: dict[str, str]) -> Request:
+    raw = [(name.lower().encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "headers": raw})
+
+
+def test_user_id_from_easy_auth_headers(monkeypatch):
+    """Test the principal id is the user and auth requires one."""
+    monkeypatch.setattr(
+        dependencies, "get_settings", lambda: Settings(auth_enabled=True)
+    )
+    principal = base64.b64encode(
+        json.dumps({"claims": [{"typ": "oid", "val": USER}]}).encode()
+    ).decode()
+
+    assert (
+        dependencies.get_user_id(_request({"X-MS-CLIENT-PRINCIPAL-ID": USER})) == USER
+    )
+    assert (
+        dependencies.get_user_id(_request({"X-MS-CLIENT-PRINCIPAL": principal})) == USER
+    )
+    with pytest.raises(AuthenticationError):
+        dependencies.get_user_id(_request({}))
+
+    monkeypatch.setattr(dependencies, "get_settings", lambda: Settings())
+    assert dependencies.get_user_id(_request({})) == "dev-user@example.com"
+
+
+def test_principal_headers_ignored_without_auth(monkeypatch):
+    """Test a forged principal cannot act as another user when auth is off."""
+    monkeypatch.setattr(dependencies, "get_settings", lambda: Settings())
+
+    assert (
+        dependencies.get_user_id(_request({"X-MS-CLIENT-PRINCIPAL-ID": USER}))
+        == "dev-user@example.com"
+    )
+
+
+def test_month_buckets_are_utc():
+    """Test buckets come from createdAt in UTC."""
+    assert month_bucket("2024-03-31T23:30:00-02:00") == "2024-04"
+    assert month_bucket(datetime(2024, 3, 1)) == "2024-03"
+    assert PartitionScheme("user").key(USER, "2024-03") == USER
+
+
+def _hierarchical_handler(container: FakeContainer):
+    """Answer bucket lookups (deleted items included); defaults otherwise."""
+
+    def handler(request: dict) -> list[dict]:
+        prefix = tuple(request["partition_key"] or ())
+        in_prefix = [
+            item
+            for (pk, _), item in container.items.items()
+            if pk[: len(prefix)] == prefix
+        ]
+        if "ARRAY_CONTAINS(@ids" in request["query"]:
+            ids = request["parameters"]["@ids"]
+            return [item for item in in_prefix if item["id"] in ids]
+        if "GROUP BY" in request["query"]:
+            # The SDK's query plan has no cross-partition GROUP BY support
+            raise http_error(400, "GroupBy is not supported")
+        if "JOIN p IN c.platforms" in request["query"]:
+            live = [item for item in in_prefix if item.get("deleted") is False]
+            return [platform for item in live for platform in item["platforms"]]
+        if "VALUE LEFT(c.createdAt, 10)" in request["query"]:
+            return [
+                item["createdAt"][:10]
+                for item in in_prefix
+                if item.get("deleted") is False
+            ]
+        if "COUNT(1)" in request["query"]:
+            return []
+        return [item for item in in_prefix if item.get("deleted") is False]
+
+    return handler
+
+
+@pytest.fixture
+def hierarchical():
+    container = FakeContainer(partition_key_field=("partitionKey", "partitionMonth"))
+    container.query_handler = _hierarchical_handler(container)
+    settings = Settings(cosmos_partition_scheme="user_month")
+    return ContentRepository(settings, container=container), container
+
+
+def _document(content_id: str, created_at: datetime):
+    document = content_to_document(
+        content_id=content_id,
+        user_id=USER,
+        topic="Partitioning",
+        platforms=["blog"],
+        generated_content={"plan": {"hook": "Spread the load"}},
+        metadata={},
+    )
+    document.created_at = created_at
+    return document
+
+
+@pytest.mark.asyncio
+async def test_documents_spread_over_month_partitions(hierarchical):
+    """Test content lands in per-month partitions and history spans them."""
+    repo, container = hierarchical
+    await repo.create(_document("march", datetime(2024, 3, 5)))
+    await repo.bulk_create([_document("april", datetime(2024, 4, 2))])
+
+    history = await repo.query_by_user(USER)
+
+    assert (USER, "2024-03") in {pk for pk, _ in container.items}
+    assert (USER, "2024-04") in {pk for pk, _ in container.items}
+    assert {doc.id for doc in history.documents} == {"march", "april"}
+    assert container.queries[-1]["partition_key"] == [USER]
+
+
+@pytest.mark.asyncio
+async def test_point_operations_resolve_unknown_buckets(hierarchical):
+    """Test a fresh process finds the month of an id once, then reuses it."""
+    repo, container = hierarchical
+    await repo.bulk_create(
+        [
+            _document("march", datetime(2024, 3, 5)),
+            _document("april", datetime(2024, 4, 2)),
+        ]
+    )
+    fresh = ContentRepository(
+        Settings(cosmos_partition_scheme="user_month", content_cache_max_bytes=0),
+        container=container,
+    )
+
+    assert (await fresh.get_by_id("march", USER)).id == "march"
+    lookups = sum("ARRAY_CONTAINS" in q["query"] for q in container.queries)
+    await fresh.delete("march", USER)
+    results = await fresh.bulk_set_deleted(USER, ["april", "march", "nope"], True)
+
+    assert sum("ARRAY_CONTAINS" in q["query"] for q in container.queries) == lookups + 1
+    assert container.items[((USER, "2024-03"), "march")]["deleted"] is True
+    assert [r["status"] for r in results] == ["succeeded", "not_found", "not_found"]
+    with pytest.raises(ContentNotFoundError):
+        await fresh.get_by_id("nope", USER)
+
+
+@pytest.mark.asyncio
+async def test_day_counts_span_month_partitions(hierarchical):
+    """Test per-day counts are totalled here rather than with GROUP BY."""
+    repo, _ = hierarchical
+    await repo.bulk_create(
+        [
+            _document("march", datetime(2024, 3, 31, 9)),
+            _document("march-2", datetime(2024, 3, 31, 17)),
+            _document("april", datetime(2024, 4, 2)),
+        ]
+    )
+
+    counts = await repo.count_by_day(USER, platform="blog")
+
+    assert counts == {"2024-03-31": 2, "2024-04-02": 1}
+    assert (await repo.reconcile_counts(USER)).platforms == {"blog": 3}
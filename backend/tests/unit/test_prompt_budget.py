@@ -0,0 +1,109 @@
+"""
+Unit tests for prompt token budgeting.
+"""
+
+import pytest
+from app.config import Settings
+from app.services.agent_service import AgentService
+from app.services.prompt_budget import PromptAssembler, estimate_tokens
+from app.utils.exceptions import PromptTooLargeError
+
+
+def test_estimate_tokens():
+    """Test token estimate counts word pieces and punctuation."""
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("hello world") == 4
+    assert estimate_tokens("Azure, AI!") == 5
+
+
+def test_assembler_keeps_insertion_order():
+    """Test sections are emitted in insertion order regardless of priority."""
+    prompt = (
+        PromptAssembler(budget=100)
+        .add("a", "first", priority=5)
+        .add("b", "second", required=True)
+        .assemble()
+    )
+
+    assert prompt.text == "first\nsecond"
+    assert prompt.included == ["b", "a"]
+    assert prompt.estimated_tokens == estimate_tokens("first") + estimate_tokens(
+        "second"
+    )
+
+
+def test_assembler_trims_and_drops_low_priority_sections():
+    """Test optional sections are trimmed or dropped to fit the budget."""
+    long_text = "\n".join(f"line {i} " + "word " * 10 for i in range(20))
+    prompt = (
+        PromptAssembler(budget=60)
+        .add("task", "Generate content about testing", required=True)
+        .add("context", long_text, priority=1, trimmable=True)
+        .add("extra", "does not fit " * 20, priority=2)
+        .assemble()
+    )
+
+    assert prompt.trimmed == ["context"]
+    assert prompt.dropped == ["extra"]
+    assert prompt.estimated_tokens <= 60
+    assert prompt.text.startswith("Generate content about testing\nline 0")
+
+
+def test_assembler_rejects_oversized_required_section():
+    """Test required sections that cannot fit raise an error."""
+    assembler = PromptAssembler(budget=5).add("task", "word " * 50, required=True)
+
+    with pytest.raises(PromptTooLargeError):
+        assembler.assemble()
+
+
+def test_assembler_reject_policy():
+    """Test reject mode fails instead of trimming optional sections."""
+    assembler = PromptAssembler(budget=20, reject_on_overflow=True)
+    assembler.add("task", "short", required=True)
+    assembler.add("context", "word " * 50, priority=1, trimmable=True)
+
+    with pytest.raises(PromptTooLargeError):
+        assembler.assemble()
+
+
+def test_reject_policy_still_trims_internal_sections():
+    """Test reject mode trims server-added sections instead of failing."""
+    assembler = PromptAssembler(budget=20, reject_on_overflow=True)
+    assembler.add("task", "short", required=True)
+    assembler.add("excerpt", "word " * 50, priority=1, trimmable=True, internal=True)
+    assembler.add("extra", "word " * 50, priority=2, internal=True)
+
+    prompt = assembler.assemble()
+
+    assert prompt.trimmed == ["excerpt"]
+    assert prompt.dropped == ["extra"]
+
+
+def test_lead_and_after_keep_a_heading_with_its_sections():
+    """Test a lead survives trimming and dependent sections follow it."""
+    assembler = PromptAssembler(budget=12)
+    assembler.add("task", "short", required=True)
+    assembler.add("first", "word " * 50, priority=1, trimmable=True, lead="Notes:\n")
+    assembler.add("second", "tiny", priority=2, after="first")
+
+    prompt = assembler.assemble()
+    assert prompt.text.startswith("short\nNotes:\nword")
+    assert prompt.dropped == ["second"]
+
+    assembler.budget = 2
+    prompt = assembler.assemble()
+    assert prompt.dropped == ["first", "second"]
+
+
+def test_agent_prompt_respects_budget():
+    """Test the agent prompt trims additional context to the budget."""
+    service = AgentService(Settings(prompt_token_budget=150))
+
+    assembled = service._assemble_prompt(
+        "AI agent orchestration", ["linkedin"], None, "detail " * 200
+    )
+
+    assert assembled.estimated_tokens <= 150
+    assert "additional_context" in assembled.trimmed
+    assert "Content Pack" in assembled.text
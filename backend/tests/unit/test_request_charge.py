@@ -0,0 +1,83 @@
+"""
+Unit tests for Cosmos DB request unit accounting.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import Settings
+from app.dependencies import get_content_repository
+from app.main import app
+from app.repositories.content_repo import ContentRepository
+from app.utils.metrics import metrics
+from app.utils.request_charge import begin_request, end_request, record_response
+from tests.fakes import FakeContainer, make_document
+
+USER = "dev-user@example.com"
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+@pytest.mark.asyncio
+async def test_repository_calls_add_up_per_request_and_operation():
+    """Test each Cosmos response is charged to its operation and the request."""
+    container = FakeContainer()
+    container.request_charge = 2.5
+    repo = ContentRepository(Settings(), container=container)
+    await repo.create(make_document(user_id=USER))
+
+    charges, token = begin_request()
+    try:
+        await repo.query_by_user(USER)
+        await repo.delete("doc-1", USER)
+    finally:
+        end_request(token)
+
+    assert charges.by_operation["query_history"] == 2.5
+    assert charges.by_operation["patch"] == 2.5
+    assert "create" not in charges.by_operation
+    assert charges.total == 2.5 * charges.calls == sum(charges.by_operation.values())
+    assert metrics.get("cosmos.ru.patch") == 2.5
+    assert metrics.get("cosmos.calls.create") == 1
+    assert metrics.get("cosmos.server_ms.patch") == 0.5
+
+
+def test_diagnostic_headers_are_optional():
+    """Test missing or malformed headers never break accounting."""
+    assert record_response("read", {}) == 0.0
+    assert record_response("read", {"x-ms-request-charge": "n/a"}) == 0.0
+    assert (
+        record_response(
+            "query",
+            {"x-ms-request-charge": "3.1", "x-ms-cosmos-index-utilization": "%%"},
+            diagnostics=True,
+        )
+        == 3.1
+    )
+
+
+def test_response_reports_request_charge_header():
+    """Test the API returns the RU total of the request."""
+    container = FakeContainer()
+    repo = ContentRepository(Settings(content_cache_max_bytes=0), container=container)
+    container.items[(USER, "doc-1")] = {
+        **make_document(user_id=USER).model_dump(mode="json", by_alias=True),
+        "_etag": '"1"',
+    }
+    app.dependency_overrides[get_content_repository] = lambda: repo
+    try:
+        client = TestClient(app)
+        found = client.get("/api/v1/content/doc-1")
+        missing = client.get("/api/v1/content/nope")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert found.status_code == 200
+    assert found.headers["X-Request-Charge"] == "1.00"
+    assert missing.headers["X-Request-Charge"] == "1.00"
+    assert metrics.get("http.ru.get_content_by_id") == 2.0
@@ -0,0 +1,180 @@
+"""
+Unit tests for full-text search over content history.
+"""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from app.config import Settings
+from app.repositories.sqlite_repo import SQLiteContentRepository
+from app.services.content_service import ContentService
+from app.services.search_index import InMemorySearchIndex, SQLiteSearchIndex
+from app.utils.deadline import Deadline
+from app.utils.exceptions import SearchIndexBuildingError
+from tests.fakes import USER, make_document
+
+
+def _document(content_id: str, topic: str, hook: str = "", body: str = "", user=USER):
+    return make_document(
+        content_id,
+        user,
+        topic,
+        platforms=["linkedin"],
+        generated_content={
+            "plan": {"hook": hook, "keyPoints": []},
+            "outputs": {"linkedin": {"content": body}},
+        },
+    )
+
+
+@pytest_asyncio.fixture(params=["memory", "sqlite"])
+async def index(request):
+    if request.param == "memory":
+        yield InMemorySearchIndex()
+        return
+    sqlite_index = SQLiteSearchIndex(":memory:")
+    yield sqlite_index
+    await sqlite_index.close()
+
+
+@pytest.mark.asyncio
+async def test_topic_matches_rank_above_body_matches(index):
+    """Test field weights: a topic hit beats the same term in a body."""
+    await index.load_user(
+        USER,
+        [
+            _document("body", "Release notes", body="We added kubernetes support."),
+            _document("topic", "Kubernetes operators", body="Reconcile loops."),
+            _document("none", "Team offsite", body="Photos from the trip."),
+        ],
+    )
+
+    hits = await index.search(USER, "Kubernetes")
+
+    assert [hit.summary.id for hit in hits] == ["topic", "body"]
+    assert hits[0].score > hits[1].score > 0
+
+
+@pytest.mark.asyncio
+async def test_results_scoped_to_user_and_follow_updates(index):
+    """Test other users' content never matches and removals take effect."""
+    await index.load_user(USER, [_document("mine", "Vector databases")])
+    await index.load_user(
+        "other", [_document("theirs", "Vector databases", user="other")]
+    )
+    await index.add(_document("new", "Vector search at scale"))
+    await index.remove(USER, "mine")
+
+    hits = await index.search(USER, "vector")
+
+    assert [hit.summary.id for hit in hits] == ["new"]
+    assert await index.search(USER, "the and of") == []
+
+
+@pytest.mark.asyncio
+async def test_operator_characters_are_plain_text(index):
+    """Test query syntax characters can't break or widen the query."""
+    await index.load_user(USER, [_document("c", "C++ and C# tips")])
+
+    hits = await index.search(USER, 'tips" OR owner:* NEAR(')
+
+    assert [hit.summary.id for hit in hits] == ["c"]
+
+
+@pytest.mark.asyncio
+async def test_memory_index_drops_least_recently_searched_user():
+    """Test the in-memory index keeps a bounded number of users."""
+    index = InMemorySearchIndex(max_users=2)
+    for user in ("a", "b"):
+        await index.load_user(user, [_document(user, "Graph search", user=user)])
+    await index.search("a", "graph")
+
+    await index.load_user("c", [_document("c", "Graph search", user="c")])
+
+    assert await index.is_loaded("a") and await index.is_loaded("c")
+    assert not await index.is_loaded("b")
+
+
+@pytest.mark.asyncio
+async def test_service_loads_user_lazily_and_indexes_deletes(tmp_path):
+    """Test the first search builds the user's entries from the repository."""
+    repo = SQLiteContentRepository(Settings(), path=str(tmp_path / "content.db"))
+    index = InMemorySearchIndex(refresh_seconds=300)
+    service = ContentService(None, repo, Settings(), search_index=index)
+    await repo.create(_document("doc-1", "Event sourcing", hook="Replay everything"))
+    await repo.create(_document("doc-2", "Event driven agents"))
+
+    first = await service.search_content(USER, "event replay")
+    await service.delete_content("doc-1", USER)
+    second = await service.search_content(USER, "event replay")
+    await repo.close()
+
+    assert [item["id"] for item in first["items"]] == ["doc-1", "doc-2"]
+    assert first["items"][0]["summary"] == "Replay everything"
+    assert [item["id"] for item in second["items"]] == ["doc-2"]
+
+
+class _SlowListing:
+    """Repository whose full listing waits until released."""
+
+    def __init__(self, repository):
+        self.repository = repository
+        self.release = asyncio.Event()
+        self.listed = 0
+
+    def __getattr__(self, name):
+        return getattr(self.repository, name)
+
+    async def list_documents(self, user_id, deadline=None):
+        self.listed += 1
+        await self.release.wait()
+        return await self.repository.list_documents(user_id)
+
+
+@pytest.mark.asyncio
+async def test_first_build_outlives_a_short_deadline(tmp_path):
+    """Test a slow build answers 'building' and serves the next search."""
+    repo = _SlowListing(
+        SQLiteContentRepository(Settings(), path=str(tmp_path / "content.db"))
+    )
+    index = InMemorySearchIndex()
+    service = ContentService(None, repo, Settings(), search_index=index)
+    await repo.create(_document("doc-1", "Consistent hashing"))
+
+    with pytest.raises(SearchIndexBuildingError):
+        await service.search_content(USER, "hashing", deadline=Deadline.after(0.05))
+    repo.release.set()
+    await asyncio.sleep(0.05)
+    hits = await service.search_content(USER, "hashing", deadline=Deadline.after(1))
+    await repo.close()
+
+    assert [item["id"] for item in hits["items"]] == ["doc-1"]
+    assert repo.listed == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_entries_refresh_from_changes_only(tmp_path):
+    """Test a refresh applies other replicas' writes without a full reload."""
+    repo = _SlowListing(
+        SQLiteContentRepository(Settings(), path=str(tmp_path / "content.db"))
+    )
+    repo.release.set()
+    index = InMemorySearchIndex(refresh_seconds=300)
+    service = ContentService(None, repo, Settings(), search_index=index)
+    await repo.create(_document("old", "Bloom filters"))
+    await service.search_content(USER, "filters")
+    # Written through another replica, so this index never saw them
+    await repo.create(_document("new", "Cuckoo filters"))
+    await repo.delete("old", USER)
+    index._users[USER].synced_at -= 600
+
+    stale = await service.search_content(USER, "filters")
+    await asyncio.sleep(0.05)
+    fresh = await service.search_content(USER, "filters")
+    await repo.close()
+
+    assert [item["id"] for item in stale["items"]] == ["old"]
+    assert [item["id"] for item in fresh["items"]] == ["new"]
+    assert repo.listed == 1
@@ -0,0 +1,273 @@
+"""
+Unit tests for the SQLite content repository.
+"""
+
+import asyncio
+import sqlite3
+from datetime import date, datetime, timedelta
+import pytest
+import pytest_asyncio
+from fastapi.testclient import TestClient
+
+from app.config import Settings
+from app.dependencies import get_content_repository
+from app.main import app
+from app.repositories.sqlite_repo import SQLiteContentRepository
+from app.services.content_service import ContentService
+from app.utils.deadline import Deadline
+from app.utils.exceptions import (
+    ConcurrencyConflictError,
+    ContentNotFoundError,
+    DeadlineExceededError,
+    InvalidCursorError,
+)
+from tests.fakes import USER, make_document
+
+START = datetime(2024, 3, 1, 9, 0, 0)
+
+
+def _document(index: int, platforms=("linkedin",), user_id: str = USER):
+    return make_document(
+        f"doc-{index}",
+        user_id,
+        topic=f"Topic {index:02d}",
+        platforms=platforms,
+        generated_content={"plan": {"hook": f"Hook {index}"}, "notes": "x" * 5000},
+        created_at=START + timedelta(hours=index),
+    )
+
+
+@pytest_asyncio.fixture
+async def repo(tmp_path):
+    repository = SQLiteContentRepository(Settings(), path=str(tmp_path / "content.db"))
+    await repository.warm_up()
+    yield repository
+    await repository.close()
+
+
+@pytest.mark.asyncio
+async def test_create_and_get_round_trip(repo):
+    """Test documents come back intact, bodies compressed at rest."""
+    created = await repo.create(_document(1))
+
+    document = await repo.get_by_id("doc-1", USER)
+    stored = await repo.get_by_id("doc-1", USER, inflate=False)
+
+    assert document.generated_content["notes"] == "x" * 5000
+    assert "$zstd" in stored.generated_content["notes"]
+    assert document.etag == created.etag
+    with pytest.raises(ContentNotFoundError):
+        await repo.get_by_id("doc-1", "someone-else@example.com")
+
+
+@pytest.mark.asyncio
+async def test_database_uses_wal_and_history_index(repo):
+    """Test WAL mode is on and history pages seek the user/created index."""
+    writer, _ = await repo._connections()
+    async with writer.execute("PRAGMA journal_mode") as cursor:
+        assert (await cursor.fetchone())[0] == "wal"
+    async with writer.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM content "
+        "WHERE user_id = ? AND deleted = 0 ORDER BY created_at DESC LIMIT 20",
+        (USER,),
+    ) as cursor:
+        plan = " ".join(row["detail"] for row in await cursor.fetchall())
+    assert "content_user_created" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.asyncio
+async def test_cursor_pages_filtered_history_in_order(repo):
+    """Test keyset pages honour the platform filter and sort order."""
+    for index in range(7):
+        platforms = ("blog",) if index % 2 else ("linkedin", "blog")
+        await repo.create(_document(index, platforms))
+    await repo.create(_document(9, user_id="other@example.com"))
+
+    seen, cursors, cursor = [], [], None
+    while True:
+        page = await repo.query_by_user(
+            USER, limit=2, platform="linkedin", order="asc", cursor=cursor
+        )
+        seen += [doc.id for doc in page.documents]
+        cursor = page.continuation_token
+        if cursor is None:
+            break
+        cursors.append(cursor)
+
+    assert seen == ["doc-0", "doc-2", "doc-4", "doc-6"]
+    with pytest.raises(InvalidCursorError):
+        # Same cursor, different filter
+        await repo.query_by_user(USER, limit=2, order="asc", cursor=cursors[0])
+
+
+@pytest.mark.asyncio
+async def test_date_filters_and_offset_compatibility(repo):
+    """Test date ranges and the legacy offset both work."""
+    for index in range(6):
+        await repo.create(_document(index))
+
+    ranged = await repo.query_by_user(
+        USER,
+        start_date=START + timedelta(hours=2),
+        end_date=START + timedelta(hours=4),
+    )
+    legacy = await repo.query_by_user(USER, limit=2, offset=2, sort_by="topic")
+
+    assert [doc.id for doc in ranged.documents] == ["doc-4", "doc-3", "doc-2"]
+    assert [doc.id for doc in legacy.documents] == ["doc-3", "doc-2"]
+    assert legacy.continuation_token is None
+
+
+@pytest.mark.asyncio
+async def test_counts_patch_and_delete(repo):
+    """Test counts follow deletes and stale etags conflict."""
+    await repo.create(_document(1, ("linkedin", "blog")))
+    await repo.create(_document(2))
+    stale = (await repo.get_by_id("doc-1", USER)).etag
+    await repo.mark_version("doc-1", USER, "v2", etag=stale)
+
+    with pytest.raises(ConcurrencyConflictError):
+        await repo.delete("doc-1", USER, etag=stale)
+    await repo.delete("doc-2", USER)
+
+    counts = await repo.get_counts(USER)
+    assert (counts.total, counts.platforms) == (1, {"linkedin": 1, "blog": 1})
+    assert (await repo.get_by_id("doc-1", USER)).metadata["version"] == "v2"
+    with pytest.raises(ContentNotFoundError):
+        await repo.get_by_id("doc-2", USER)
+    with pytest.raises(ContentNotFoundError):
+        await repo.delete("doc-2", USER)
+
+
+@pytest.mark.asyncio
+async def test_write_waiting_on_the_lock_is_not_cut_short(repo, tmp_path):
+    """Test a deadline passing mid-transaction leaves the writer usable."""
+    await repo.create(_document(1))
+    other = sqlite3.connect(tmp_path / "content.db", isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    asyncio.get_running_loop().call_later(0.5, other.execute, "COMMIT")
+
+    # Started in time, so it completes rather than leaving BEGIN dangling
+    await repo.delete("doc-1", USER, deadline=Deadline.after(0.3))
+    await repo.create(_document(2))
+    await repo.mark_version("doc-2", USER, "v2")
+
+    rows = other.execute("SELECT id, deleted FROM content ORDER BY id").fetchall()
+    assert rows == [("doc-1", 1), ("doc-2", 0)]
+    other.close()
+
+    with pytest.raises(DeadlineExceededError):
+        await repo.create(_document(3), deadline=Deadline.after(0))
+    assert (await repo.get_by_id("doc-2", USER)).metadata["version"] == "v2"
+
+
+@pytest.mark.asyncio
+async def test_bulk_restore_and_purge(repo):
+    """Test bulk results per item, restore, and purge after the grace period."""
+    imported = await repo.bulk_create([_document(1), _document(2), _document(1)])
+    deleted = await repo.bulk_set_deleted(USER, ["doc-1", "doc-2", "nope"], True)
+    restored = await repo.bulk_set_deleted(USER, ["doc-1"], False)
+
+    assert [r["status"] for r in imported] == ["succeeded", "succeeded", "conflict"]
+    assert [r["status"] for r in deleted] == ["succeeded", "succeeded", "not_found"]
+    assert restored[0]["status"] == "succeeded"
+
+    writer, _ = await repo._connections()
+    await writer.execute("UPDATE content SET purge_at = 0 WHERE purge_at IS NOT NULL")
+    assert (await repo.compact())["documents"] == 1
+    assert (await repo.get_by_id("doc-1", USER)).id == "doc-1"
+
+
+@pytest.mark.asyncio
+async def test_history_service_on_sqlite(repo):
+    """Test the history endpoint logic runs unchanged on SQLite."""
+    for index in range(3):
+        await repo.create(_document(index))
+    service = ContentService(agent_service=None, content_repo=repo, settings=Settings())
+
+    first = await service.get_content_history(USER, limit=2)
+    second = await service.get_content_history(
+        USER, limit=2, cursor=first["pagination"]["next_cursor"]
+    )
+
+    assert [item["id"] for item in first["items"]] == ["doc-2", "doc-1"]
+    assert first["pagination"]["total"] == 3
+    assert [item["id"] for item in second["items"]] == ["doc-0"]
+    assert not second["pagination"]["has_more"]
+
+
+@pytest.mark.asyncio
+async def test_history_buckets_by_day_and_week(repo):
+    """Test per-day and per-week counts over a date range, with gaps filled."""
+    days = [0, 0, 1, 3, 9, 10]
+    for index, offset in enumerate(days):
+        document = _document(index, platforms=("blog",) if index else ("linkedin",))
+        document.created_at = START + timedelta(days=offset)
+        await repo.create(document)
+    service = ContentService(agent_service=None, content_repo=repo, settings=Settings())
+
+    daily = await service.get_history_buckets(
+        USER, start_date=date(2024, 3, 1), end_date=date(2024, 3, 4)
+    )
+    weekly = await service.get_history_buckets(USER, interval="week")
+    blog = await service.get_history_buckets(USER, platform="blog")
+
+    assert [(b["start"].day, b["count"]) for b in daily["buckets"]] == [
+        (1, 2),
+        (2, 1),
+        (3, 0),
+        (4, 1),
+    ]
+    assert daily["total"] == 4
+    # 2024-03-01 is a Friday and 2024-03-10 a Sunday
+    assert [(str(b["start"]), b["count"]) for b in weekly["buckets"]] == [
+        ("2024-02-26", 3),
+        ("2024-03-04", 2),
+        ("2024-03-11", 1),
+    ]
+    assert blog["total"] == 5
+
+
+async def _seed(path: str, count: int) -> None:
+    repository = SQLiteContentRepository(Settings(), path=path)
+    for index in range(count):
+        document = _document(index, user_id=Settings().dev_user_id)
+        document.created_at = START + timedelta(days=index)
+        await repository.create(document)
+    await repository.close()
+
+
+def test_history_date_range_end_to_end(tmp_path):
+    """Test the API filters and buckets history by date on the local backend."""
+    path = str(tmp_path / "api.db")
+    asyncio.run(_seed(path, 4))
+    repository = SQLiteContentRepository(Settings(), path=path)
+    app.dependency_overrides[get_content_repository] = lambda: repository
+    try:
+        with TestClient(app) as client:
+            history = client.get(
+                "/api/v1/content/history",
+                params={
+                    "start_date": "2024-03-02T00:00:00Z",
+                    "end_date": "2024-03-03T23:59:59Z",
+                    "order": "asc",
+                },
+            )
+            invalid = client.get(
+                "/api/v1/content/history",
+                params={"start_date": "2024-03-03", "end_date": "2024-03-02"},
+            )
+            buckets = client.get(
+                "/api/v1/content/history/buckets", params={"interval": "week"}
+            )
+            client.portal.call(repository.close)
+    finally:
+        app.dependency_overrides.clear()
+
+    assert [item["id"] for item in history.json()["items"]] == ["doc-1", "doc-2"]
+    assert invalid.status_code == 400
+    assert buckets.json()["buckets"] == [
+        {"start": "2024-02-26", "count": 3},
+        {"start": "2024-03-04", "count": 1},
+    ]
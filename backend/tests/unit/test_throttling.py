@@ -0,0 +1,130 @@
+"""
+Unit tests for Cosmos DB throttle retries and RU pacing.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import Settings
+from app.dependencies import get_content_repository
+from app.main import app
+from app.models.database import content_to_document
+from app.repositories import throttling
+from app.repositories.content_repo import ContentRepository
+from app.repositories.throttling import RequestUnitLimiter
+from app.utils.deadline import Deadline
+from app.utils.exceptions import DatabaseThrottledError
+from app.utils.metrics import metrics
+from tests.fakes import FakeContainer
+
+USER = "dev-user@example.com"
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def _repository(container: FakeContainer, **overrides) -> ContentRepository:
+    settings = Settings(content_cache_max_bytes=0, **overrides)
+    return ContentRepository(settings, container=container)
+
+
+def _store(container: FakeContainer, content_id: str = "doc-1") -> None:
+    document = content_to_document(
+        content_id=content_id,
+        user_id=USER,
+        topic="Throughput",
+        platforms=["blog"],
+        generated_content={"plan": {"hook": "Back off politely"}},
+        metadata={},
+    )
+    container.items[(USER, content_id)] = {
+        **document.model_dump(mode="json", by_alias=True),
+        "_etag": '"1"',
+    }
+
+
+@pytest.mark.asyncio
+async def test_throttled_calls_retry_after_server_hint():
+    """Test 429s are retried after x-ms-retry-after-ms, queries included."""
+    container = FakeContainer()
+    _store(container)
+    repo = _repository(container)
+
+    container.throttle_next = 2
+    document = await repo.get_by_id("doc-1", USER, deadline=Deadline.after(5))
+    container.throttle_next = 1
+    history = await repo.query_by_user(USER, deadline=Deadline.after(5))
+
+    assert document.id == "doc-1"
+    assert [item.id for item in history.documents] == ["doc-1"]
+    assert metrics.get("cosmos.throttled.read") == 2
+    assert metrics.get("cosmos.throttle_retries.query_history") == 1
+    assert metrics.get("cosmos.throttle_wait_seconds") == pytest.approx(0.06)
+
+
+@pytest.mark.asyncio
+async def test_throttling_past_the_deadline_fails_fast():
+    """Test a retry-after beyond the deadline (or retry limit) is not waited."""
+    container = FakeContainer()
+    container.retry_after_ms = 5000
+    _store(container)
+    repo = _repository(container, cosmos_throttle_max_retries=1)
+
+    container.throttle_next = 1
+    with pytest.raises(DatabaseThrottledError) as raised:
+        await repo.get_by_id("doc-1", USER, deadline=Deadline.after(1))
+    assert raised.value.retry_after == 5
+
+    container.retry_after_ms = 1
+    container.throttle_next = 2
+    with pytest.raises(DatabaseThrottledError):
+        await repo.get_by_id("doc-1", USER)
+    assert metrics.get("cosmos.throttle_exhausted.read") == 2
+
+
+def test_exhausted_throttling_returns_retry_after():
+    """Test the API answers 503 with the server's retry time."""
+    container = FakeContainer()
+    container.retry_after_ms = 3500
+    container.throttle_next = 1
+    repo = _repository(container, cosmos_throttle_max_wait=1.0)
+    app.dependency_overrides[get_content_repository] = lambda: repo
+    try:
+        response = TestClient(app).get("/api/v1/content/doc-1")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "4"
+
+
+@pytest.mark.asyncio
+async def test_limiter_paces_by_observed_charges(monkeypatch):
+    """Test the bucket waits for refill and learns per-operation charges."""
+    now = [0.0]
+    waits: list[float] = []
+
+    async def sleep(seconds: float) -> None:
+        waits.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(throttling.asyncio, "sleep", sleep)
+    limiter = RequestUnitLimiter(100, clock=lambda: now[0])
+
+    reserved = await limiter.acquire("query")
+    limiter.settle("query", reserved, 90.0)
+    assert limiter.tokens == pytest.approx(10.0)
+    assert limiter.estimate("query") == 90.0
+
+    reserved = await limiter.acquire("query")
+    assert waits == [pytest.approx(0.8)]
+    limiter.settle("query", reserved, 40.0)
+    assert limiter.estimate("query") == pytest.approx(80.0)
+    limiter.backoff(2.0)
+    with pytest.raises(DatabaseThrottledError):
+        await limiter.acquire("query", Deadline.after(1))
+    assert metrics.get("cosmos.ru_limiter.delayed") == 1
@@ -3,6 +3,8 @@
 // State
 let currentContentId = null;
 let currentPage = 0;
+// Cursor that fetches each visited page; index 0 is the first page
+let pageCursors = [null];
 const historyLimit = 10;
 
 // Initialize app
@@ -332,6 +334,7 @@ window.copyTwitterThread = async function(elementId) {
 function initializeHistoryTab() {
     document.getElementById('refresh-history-btn').addEventListener('click', () => {
         currentPage = 0;
+        pageCursors = [null];
         loadHistory();
     });
 }
@@ -344,10 +347,12 @@ async function loadHistory() {
     containerEl.innerHTML = '';
     
     try {
-        const result = await apiClient.getContentHistory({
-            limit: historyLimit,
-            offset: currentPage * historyLimit
-        });
+        const params = { limit: historyLimit };
+        if (pageCursors[currentPage]) {
+            params.cursor = pageCursors[currentPage];
+        }
+        const result = await apiClient.getContentHistory(params);
+        pageCursors[currentPage + 1] = result.pagination.next_cursor || null;
         
         if (result.items.length === 0) {
             containerEl.innerHTML = '<p style="text-align: center; color: var(--text-secondary); padding: 2rem;">No content history found. Generate some content to get started!</p>';
@@ -385,23 +390,16 @@ function displayHistory(items) {
 function displayPagination(pagination) {
     const container = document.getElementById('history-pagination');
     
-    const totalPages = Math.ceil(pagination.total / pagination.limit);
-    
     let html = '';
     
     // Previous button
     html += `<button ${currentPage === 0 ? 'disabled' : ''} onclick="changePage(${currentPage - 1})">Previous</button>`;
     
-    // Page numbers (show max 5)
-    const startPage = Math.max(0, currentPage - 2);
-    const endPage = Math.min(totalPages, startPage + 5);
-    
-    for (let i = startPage; i < endPage; i++) {
-        html += `<button class="${i === currentPage ? 'active' : ''}" onclick="changePage(${i})">${i + 1}</button>`;
-    }
+    // Cursor pagination has no random access, so show the current page only
+    html += `<button class="active" disabled>${currentPage + 1}</button>`;
     
     // Next button
-    html += `<button ${!pagination.has_more ? 'disabled' : ''} onclick="changePage(${currentPage + 1})">Next</button>`;
+    html += `<button ${!pagination.next_cursor ? 'disabled' : ''} onclick="changePage(${currentPage + 1})">Next</button>`;
     
     container.innerHTML = html;
 }
@@ -58,7 +58,7 @@ try:
             
             if count > 0:
                 # Get recent items
-                query = "SELECT TOP 5 c.id, c.platform, c.created_at FROM c ORDER BY c.created_at DESC"
+                query = "SELECT TOP 5 c.id, c.platform, c.createdAt FROM c ORDER BY c.createdAt DESC"
                 recent = list(container.query_items(query=query, enable_cross_partition_query=True))
                 print(f"\n   Recent items:")
                 for item in recent:
@@ -0,0 +1,175 @@
+"""
+Measure stored document size (and optionally RU) of recorded responses.
+
+Parses recorded agent responses the way generation does and encodes each
+Content Pack three ways: plain, with outputs stored as spans of the notes,
+and as configured (spans plus compression). With --cosmos each variant is
+also written and point-read under a throwaway partition key to record its
+RU charges, and deleted afterwards.
+
+COSMOS_ENDPOINT selects the account; COSMOS_KEY switches from Azure AD to
+key auth. --emulator targets the local Cosmos DB emulator (its well-known
+key unless COSMOS_KEY is set) and creates the database and container there
+if needed. Charges from the emulator track the service's closely but are
+not billing-exact.
+
+Usage:
+    python scripts/measure_content_dedup.py [response.md ...] [--cosmos]
+    python scripts/measure_content_dedup.py [response.md ...] --emulator
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import uuid
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "backend"))
+from app.config import Settings  # noqa: E402
+from app.models.database import content_to_document  # noqa: E402
+from app.repositories.content_codec import ContentCodec  # noqa: E402
+from app.repositories.indexing import INDEXING_POLICY  # noqa: E402
+from app.repositories.partitioning import PartitionScheme, month_bucket  # noqa: E402
+from app.services.agent_service import AgentService  # noqa: E402
+
+load_dotenv()
+
+PARTITION = "dedup-benchmark@example.com"
+DEFAULT_RESPONSES = [ROOT / "docs" / "example-output.md"]
+EMULATOR_ENDPOINT = "https://localhost:8081/"
+# Published, fixed key of the local emulator (not a secret)
+EMULATOR_KEY = "C2y6yDjf5/R+ob0N8A7Cgv30VRDJIWEHLM+4QDU5DE2nQ9nDuVTqobD4b8mGGyPMbIZnqyMsEcaGQy67XIw/Jw=="
+
+
+def variants(settings: Settings) -> dict[str, ContentCodec]:
+    return {
+        "plain": ContentCodec(compress_threshold=0),
+        "spans": ContentCodec(
+            compress_threshold=0, span_min_chars=settings.content_span_min_chars
+        ),
+        "spans+zstd": ContentCodec(
+            compress_threshold=settings.content_compress_threshold,
+            span_min_chars=settings.content_span_min_chars,
+        ),
+    }
+
+
+def stored_documents(path: Path, settings: Settings) -> dict[str, dict]:
+    parsed = AgentService(settings)._parse_agent_response(path.read_text())
+    document = content_to_document(
+        content_id=str(uuid.uuid4()),
+        user_id=PARTITION,
+        topic=path.stem,
+        platforms=["linkedin", "twitter", "github", "blog"],
+        generated_content=parsed,
+        metadata={},
+    )
+    body = document.model_dump(mode="json", by_alias=True)
+    stored = {}
+    for name, codec in variants(settings).items():
+        encoded = asyncio.run(codec.encode(PARTITION, parsed))
+        assert asyncio.run(codec.decode(encoded)) == parsed
+        stored[name] = {
+            **body,
+            "id": str(uuid.uuid4()),
+            "generatedContent": encoded,
+        }
+    return stored
+
+
+def open_container(settings: Settings, scheme: PartitionScheme, emulator: bool):
+    from azure.cosmos import CosmosClient, PartitionKey
+
+    endpoint = os.environ.get("COSMOS_ENDPOINT") or (
+        EMULATOR_ENDPOINT if emulator else None
+    )
+    if endpoint is None:
+        sys.exit("Set COSMOS_ENDPOINT, or use --emulator")
+    key = os.environ.get("COSMOS_KEY") or (EMULATOR_KEY if emulator else None)
+    if key is not None:
+        # The emulator serves a self-signed certificate
+        client = CosmosClient(endpoint, credential=key, connection_verify=not emulator)
+    else:
+        from azure.identity import DefaultAzureCredential
+
+        client = CosmosClient(endpoint, credential=DefaultAzureCredential())
+
+    database_name = os.environ.get("COSMOS_DATABASE", settings.cosmos_database)
+    container_name = os.environ.get("COSMOS_CONTAINER", settings.cosmos_container)
+    if not emulator:
+        database = client.get_database_client(database_name)
+        return database.get_container_client(container_name)
+    database = client.create_database_if_not_exists(id=database_name)
+    kind = "MultiHash" if scheme.hierarchical else "Hash"
+    return database.create_container_if_not_exists(
+        id=container_name,
+        partition_key=PartitionKey(path=scheme.paths, kind=kind),
+        indexing_policy=INDEXING_POLICY,
+    )
+
+
+def charges(container, scheme: PartitionScheme, documents: dict[str, dict]):
+    """Write RU and point-read RU of each variant."""
+    measured = {}
+    for name, document in documents.items():
+        bucket = month_bucket(document["createdAt"])
+        body = scheme.stamp(dict(document), bucket)
+        partition_key = scheme.key(PARTITION, bucket)
+        write, read = {}, {}
+        container.create_item(body=body, response_hook=lambda h, _: write.update(h))
+        try:
+            container.read_item(
+                item=body["id"],
+                partition_key=partition_key,
+                response_hook=lambda h, _: read.update(h),
+            )
+        finally:
+            container.delete_item(item=body["id"], partition_key=partition_key)
+        measured[name] = (
+            float(write.get("x-ms-request-charge", 0)),
+            float(read.get("x-ms-request-charge", 0)),
+        )
+    return measured
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("responses", nargs="*", type=Path, default=DEFAULT_RESPONSES)
+    parser.add_argument(
+        "--cosmos", action="store_true", help="also measure RU in Cosmos DB"
+    )
+    parser.add_argument(
+        "--emulator",
+        action="store_true",
+        help="measure RU in the local Cosmos DB emulator (implies --cosmos)",
+    )
+    args = parser.parse_args()
+    settings = Settings()
+    scheme = PartitionScheme(settings.cosmos_partition_scheme)
+    container = (
+        open_container(settings, scheme, args.emulator)
+        if args.cosmos or args.emulator
+        else None
+    )
+
+    for path in args.responses:
+        documents = stored_documents(path, settings)
+        sizes = {name: len(json.dumps(doc).encode()) for name, doc in documents.items()}
+        measured = charges(container, scheme, documents) if container else {}
+        print(f"{path.name}: {len(path.read_text())} chars of response")
+        for name, size in sizes.items():
+            saved = 1 - size / sizes["plain"]
+            line = f"   {name:<11} {size:>8} bytes ({saved:6.1%} smaller)"
+            if name in measured:
+                write, read = measured[name]
+                line += f", {write:.2f} RU per write, {read:.2f} RU per read"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Measure the RU charge of content writes against a Cosmos DB container.
+
+Run it before and after deploying infra/core/cosmos-indexing-policy.json to
+compare write cost. Writes realistic generations (long blog body, thread,
+notes) under a throwaway partition key and deletes them afterwards.
+
+Usage:
+    python scripts/measure_write_ru.py [--count 50] [--container content]
+"""
+import argparse
+import os
+import statistics
+import sys
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dotenv import load_dotenv
+from azure.identity import DefaultAzureCredential
+from azure.cosmos import CosmosClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+from app.repositories.indexing import indexing_policy_drift  # noqa: E402
+
+load_dotenv()
+
+PARTITION = "ru-benchmark@example.com"
+PARAGRAPH = (
+    "Agent orchestration breaks down when every step owns its own retries, "
+    "timeouts and state. A coordinator with explicit hand-offs keeps it sane. "
+)
+
+
+def sample_document() -> dict:
+    now = datetime.now(timezone.utc).isoformat()
+    return {
+        "id": str(uuid.uuid4()),
+        "partitionKey": PARTITION,
+        "userId": PARTITION,
+        "topic": "AI agent orchestration patterns",
+        "platforms": ["linkedin", "twitter", "blog"],
+        "summary": "Most teams struggle with agent orchestration",
+        "generatedContent": {
+            "plan": {
+                "hook": "Most teams struggle with agent orchestration",
+                "keyPoints": [PARAGRAPH[:80]] * 5,
+            },
+            "outputs": {
+                "linkedin": {"content": PARAGRAPH * 15},
+                "twitter": {
+                    "tweets": [
+                        {"order": n, "content": PARAGRAPH[:270]} for n in range(8)
+                    ]
+                },
+                "blog": {"title": "Orchestrating agents", "content": PARAGRAPH * 80},
+            },
+            "notes": PARAGRAPH * 20,
+        },
+        "metadata": {"duration": 3.2, "agentVersion": "storycircuit-v1.0"},
+        "createdAt": now,
+        "updatedAt": now,
+        "deleted": False,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument(
+        "--container", default=os.environ.get("COSMOS_CONTAINER", "content")
+    )
+    args = parser.parse_args()
+
+    client = CosmosClient(
+        os.environ["COSMOS_ENDPOINT"], credential=DefaultAzureCredential()
+    )
+    database = client.get_database_client(
+        os.environ.get("COSMOS_DATABASE", "storycircuit")
+    )
+    container = database.get_container_client(args.container)
+
+    drift = indexing_policy_drift(container.read().get("indexingPolicy", {}))
+    print(f"Container: {args.container}")
+    print(f"Indexing policy: {'tuned' if not drift else 'differs from infra/'}")
+    for difference in drift:
+        print(f"   - {difference}")
+
+    charges = []
+    created = []
+
+    def capture(headers, _):
+        charges.append(float(headers.get("x-ms-request-charge", 0)))
+
+    try:
+        for _ in range(args.count):
+            document = sample_document()
+            container.create_item(body=document, response_hook=capture)
+            created.append(document["id"])
+    finally:
+        for item_id in created:
+            container.delete_item(item=item_id, partition_key=PARTITION)
+
+    print(f"\nWrites: {len(charges)}")
+    print(f"RU per write: mean {statistics.mean(charges):.2f}, "
+          f"min {min(charges):.2f}, max {max(charges):.2f}")
+
+
+if __name__ == "__main__":
+    main()
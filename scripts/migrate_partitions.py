@@ -0,0 +1,171 @@
+"""
+Copy content into a container with the configured partition layout.
+
+A container's partition key can't be changed in place, so this copies every
+content document from --source into --target (created with the partition
+key of --scheme, the shipped indexing policy and TTL on), adding the
+partitionMonth bucket for the user_month scheme. --user-map rewrites user
+ids, e.g. moving content written as dev-user@example.com to the Easy Auth
+object id of its real owner; offloaded bodies are copied to the new owner's
+blob keys. Counter and view documents are not copied: counters are recounted
+on the user's next write and views rebuilt from the target's change feed.
+Split-layout content (see CONTENT_LAYOUT) is copied as single documents,
+with its part items folded back in, and createdAt is rewritten in the
+fixed-width form date filters compare against.
+
+Upserts make reruns safe. Point COSMOS_CONTAINER (and
+COSMOS_PARTITION_SCHEME) at the target once it is complete; the source is
+left untouched.
+
+Usage:
+    python scripts/migrate_partitions.py --target content-v2
+        [--source content] [--scheme user_month]
+        [--user-map users.csv] [--dry-run]
+"""
+
+import argparse
+import asyncio
+import csv
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from dotenv import load_dotenv
+from azure.identity import DefaultAzureCredential
+from azure.cosmos import CosmosClient, PartitionKey
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+from app.config import Settings  # noqa: E402
+from app.models.database import stored_timestamp  # noqa: E402
+from app.repositories.blob_store import create_blob_store  # noqa: E402
+from app.repositories.content_codec import BLOB_KEY  # noqa: E402
+from app.repositories.content_layout import assemble, part_names  # noqa: E402
+from app.repositories.indexing import INDEXING_POLICY  # noqa: E402
+from app.repositories.partitioning import (  # noqa: E402
+    PartitionScheme,
+    month_bucket,
+)
+
+load_dotenv()
+
+SYSTEM_PROPERTIES = ("_rid", "_self", "_etag", "_attachments", "_ts", "_lsn")
+
+
+def load_user_map(path: str) -> dict[str, str]:
+    """Rows of old_user_id,new_user_id."""
+    with open(path, newline="") as handle:
+        return {row[0].strip(): row[1].strip() for row in csv.reader(handle) if row}
+
+
+def rekey_blobs(value, prefix: str, renames: dict[str, str]):
+    """Point offloaded-body markers at keys under a new prefix."""
+    if isinstance(value, dict):
+        if BLOB_KEY in value:
+            new_key = f"{prefix}/{value[BLOB_KEY].rsplit('/', 1)[-1]}"
+            renames[value[BLOB_KEY]] = new_key
+            return {**value, BLOB_KEY: new_key}
+        return {key: rekey_blobs(item, prefix, renames) for key, item in value.items()}
+    if isinstance(value, list):
+        return [rekey_blobs(item, prefix, renames) for item in value]
+    return value
+
+
+async def copy_blobs(store, renames: dict[str, str]) -> None:
+    for old_key, new_key in renames.items():
+        await store.put(new_key, await store.get(old_key))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--source", default=os.environ.get("COSMOS_CONTAINER", "content")
+    )
+    parser.add_argument("--target", required=True)
+    parser.add_argument("--scheme", choices=["user", "user_month"], default="user")
+    parser.add_argument("--user-map")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    settings = Settings()
+    scheme = PartitionScheme(args.scheme)
+    user_map = load_user_map(args.user_map) if args.user_map else {}
+    blob_store = create_blob_store(settings.content_blob_path)
+
+    client = CosmosClient(
+        os.environ["COSMOS_ENDPOINT"], credential=DefaultAzureCredential()
+    )
+    database = client.get_database_client(
+        os.environ.get("COSMOS_DATABASE", "storycircuit")
+    )
+    source = database.get_container_client(args.source)
+    target = None
+    if not args.dry_run:
+        kind = "MultiHash" if scheme.hierarchical else "Hash"
+        target = database.create_container_if_not_exists(
+            id=args.target,
+            partition_key=PartitionKey(path=scheme.paths, kind=kind),
+            indexing_policy=INDEXING_POLICY,
+            default_ttl=-1,
+        )
+        paths = target.read()["partitionKey"]["paths"]
+        if paths != scheme.paths:
+            sys.exit(f"Target partition key {paths} does not match {scheme.paths}")
+
+    copied = skipped = remapped = 0
+    for item in source.query_items(
+        query="SELECT * FROM c", enable_cross_partition_query=True
+    ):
+        if "docType" in item:
+            skipped += 1
+            continue
+        document = {k: v for k, v in item.items() if k not in SYSTEM_PROPERTIES}
+        if part_names(document):
+            parts = source.query_items(
+                query=(
+                    "SELECT * FROM c "
+                    "WHERE c.contentId = @id AND c.partitionKey = @partitionKey"
+                ),
+                parameters=[
+                    {"name": "@id", "value": document["id"]},
+                    {"name": "@partitionKey", "value": document["partitionKey"]},
+                ],
+                enable_cross_partition_query=True,
+            )
+            document = assemble(document, list(parts))
+        old_user = document.get("userId") or document.get("partitionKey")
+        user_id = user_map.get(old_user, old_user)
+        if user_id != old_user:
+            remapped += 1
+            renames: dict[str, str] = {}
+            document["generatedContent"] = rekey_blobs(
+                document.get("generatedContent"),
+                f"{user_id}/{document['id']}",
+                renames,
+            )
+            if renames and blob_store is None:
+                sys.exit("Offloaded bodies found: set CONTENT_BLOB_PATH")
+            if renames and not args.dry_run:
+                asyncio.run(copy_blobs(blob_store, renames))
+        document["userId"] = document["partitionKey"] = user_id
+        if isinstance(document.get("metadata"), dict) and document["metadata"].get(
+            "userId"
+        ):
+            document["metadata"]["userId"] = user_id
+        document["createdAt"] = stored_timestamp(
+            datetime.fromisoformat(document["createdAt"].replace("Z", "+00:00"))
+        )
+        scheme.stamp(document, month_bucket(document["createdAt"]))
+        if not args.dry_run:
+            target.upsert_item(document)
+        copied += 1
+        if copied % 1000 == 0:
+            print(f"   {copied} documents...")
+
+    action = "Would copy" if args.dry_run else "Copied"
+    print(f"{action} {copied} documents ({remapped} to a new user)")
+    print(f"Skipped {skipped} counter/view/part documents (rebuilt or folded in)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Train a zstd dictionary for generated content from recent documents.
+
+Samples the string fields of the newest generations in the content
+container and writes a dictionary to use as the first entry of
+CONTENT_COMPRESSION_DICTIONARIES. Keep older dictionaries listed after it:
+documents compressed with them still need them to be read.
+
+Usage:
+    python scripts/train_compression_dictionary.py [--documents 2000]
+        [--size 65536] [--output .data/content.zdict]
+"""
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+from azure.identity import DefaultAzureCredential
+from azure.cosmos import CosmosClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+from app.config import Settings  # noqa: E402
+from app.repositories.content_repo import ContentRepository  # noqa: E402
+from app.repositories.content_codec import ContentCodec, train_dictionary  # noqa: E402
+
+load_dotenv()
+
+
+def strings(value) -> list[str]:
+    if isinstance(value, dict):
+        return [text for item in value.values() for text in strings(item)]
+    if isinstance(value, list):
+        return [text for item in value for text in strings(item)]
+    return [value] if isinstance(value, str) else []
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--size", type=int, default=64 * 1024)
+    parser.add_argument("--min-length", type=int, default=256)
+    parser.add_argument("--output", default=".data/content.zdict")
+    args = parser.parse_args()
+
+    client = CosmosClient(
+        os.environ["COSMOS_ENDPOINT"], credential=DefaultAzureCredential()
+    )
+    container = client.get_database_client(
+        os.environ.get("COSMOS_DATABASE", "storycircuit")
+    ).get_container_client(os.environ.get("COSMOS_CONTAINER", "content"))
+
+    # Reuse the app's codec so already-compressed documents are sampled too
+    codec: ContentCodec = ContentRepository(Settings(), container=container).codec
+    items = container.query_items(
+        query=(
+            "SELECT TOP @top c.generatedContent FROM c "
+            "WHERE NOT IS_DEFINED(c.docType) ORDER BY c._ts DESC"
+        ),
+        parameters=[{"name": "@top", "value": args.documents}],
+        enable_cross_partition_query=True,
+    )
+
+    samples = []
+    documents = 0
+    for item in items:
+        content = asyncio.run(codec.decode(item.get("generatedContent") or {}))
+        samples.extend(
+            text for text in strings(content) if len(text) >= args.min_length
+        )
+        documents += 1
+
+    print(f"Documents: {documents}, samples: {len(samples)}")
+    dictionary = train_dictionary(samples, size=args.size)
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_bytes(dictionary)
+    print(f"Wrote {len(dictionary)} byte dictionary to {output}")
+
+
+if __name__ == "__main__":
+    main()